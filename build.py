@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-一键打包脚本：前端构建 → PyInstaller → 后处理
+一键打包脚本：前端构建 → 模板资源包 → PyInstaller → 后处理
 输出到 dist/YYSAutomation/
 
 CONDA_ENV 可通过环境变量设置，例如：
@@ -43,7 +43,7 @@ def get_python():
 
 
 def build_frontend():
-    print("\n===== 1/3  前端构建 =====")
+    print("\n===== 1/4  前端构建 =====")
     frontend_dir = ROOT / "frontend"
     if not frontend_dir.exists():
         raise RuntimeError(f"前端目录不存在：{frontend_dir}")
@@ -58,8 +58,24 @@ def build_frontend():
     print(f"[BUILD] 前端构建完成：{dist}")
 
 
+def build_template_bundle():
+    print("\n===== 2/4  模板资源包 =====")
+    # 预解码 assets/ui 下所有 PNG，产物位于 assets/ 内，随 datas 一并打包
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(ROOT / "src"), env.get("PYTHONPATH", "")) if p
+    )
+    cmd = [get_python(), "-m", "app.modules.vision.template_bundle", "build"]
+    print(f"[BUILD] {' '.join(cmd)}")
+    subprocess.run(cmd, cwd=ROOT, check=True, env=env)
+    bundle = ROOT / "assets" / "ui_templates.bundle"
+    if not bundle.exists():
+        raise RuntimeError(f"模板资源包生成失败：{bundle} 不存在")
+    print(f"[BUILD] 模板资源包完成：{bundle}")
+
+
 def build_pyinstaller():
-    print("\n===== 2/3  PyInstaller 打包 =====")
+    print("\n===== 3/4  PyInstaller 打包 =====")
     spec_file = ROOT / "yys_automation.spec"
     if not spec_file.exists():
         raise RuntimeError(f"spec 文件不存在：{spec_file}")
@@ -75,7 +91,7 @@ def build_pyinstaller():
 
 
 def post_process():
-    print("\n===== 3/3  后处理 =====")
+    print("\n===== 4/4  后处理 =====")
     out = ROOT / "dist" / "YYSAutomation"
     env_example = ROOT / ".env.example"
     env_dest = out / ".env.example"
@@ -94,6 +110,7 @@ def main():
     print("=" * 60)
 
     build_frontend()
+    build_template_bundle()
     build_pyinstaller()
     post_process()
 
@@ -27,6 +27,7 @@ export const API_ENDPOINTS = {
     stats: '/api/tasks/stats',
     logs: '/api/tasks/logs',
     runtimeLogs: '/api/tasks/runtime-logs',
+    runtimeLogsWs: '/api/tasks/runtime-logs/ws',
     scheduler: {
       status: '/api/tasks/scheduler/status',
       start: '/api/tasks/scheduler/start',
@@ -76,6 +77,16 @@ export const buildApiUrl = (endpoint) => {
   return `${API_BASE_URL}${endpoint}`
 }
 
+/**
+ * 构建 WebSocket URL（ws/wss 随 API 地址或当前页面协议）
+ * @param {string} endpoint - API端点
+ * @returns {string} 完整的 WebSocket URL
+ */
+export const buildWsUrl = (endpoint) => {
+  const base = API_BASE_URL || window.location.origin
+  return `${base.replace(/^http/, 'ws')}${endpoint}`
+}
+
 /**
  * API请求封装
  * @param {string} endpoint - API端点
@@ -1,6 +1,9 @@
 """
 PyInstaller 打包入口。
 双击 exe 后：设置 cwd → 后台启动 FastAPI → 打开桌面窗口。
+
+--profile-startup：统计模块导入耗时与各初始化阶段耗时，
+后端就绪后输出报告到控制台与 logs/startup_profile.txt。
 """
 import sys
 import os
@@ -30,15 +33,36 @@ def _wait_for_backend(url: str, timeout: int = 30) -> bool:
     return False
 
 
-def _start_server(host: str, port: int):
+def _start_server(host: str, port: int, profile: bool = False):
     """在后台线程中启动 uvicorn。"""
-    import uvicorn
-    from app.main import app
+    from app.core.startup_profiler import startup_profiler
+
+    if profile:
+        startup_profiler.enable_import_tracking()
+    with startup_profiler.phase("import uvicorn"):
+        import uvicorn
+    with startup_profiler.phase("import app.main"):
+        from app.main import app
 
     uvicorn.run(app, host=host, port=port, log_level="info")
 
 
+def _report_startup_profile(elapsed_ms: float) -> None:
+    """输出启动耗时分析报告（--profile-startup）。"""
+    from app.core.config import settings
+    from app.core.startup_profiler import startup_profiler
+
+    startup_profiler.record_phase("backend_ready(total)", elapsed_ms)
+    report_path = startup_profiler.write_report(
+        str(Path(settings.log_path) / "startup_profile.txt")
+    )
+    print(startup_profiler.format_report())
+    print(f"[YYS Automation] 启动耗时分析报告已写入: {report_path}")
+
+
 def main():
+    started = time.perf_counter()
+    profile = "--profile-startup" in sys.argv[1:]
     app_dir = _get_app_dir()
 
     # 设置 cwd 到应用目录，保证 assets/ 等相对路径有效
@@ -56,7 +80,9 @@ def main():
     print(f"[YYS Automation] 正在启动服务 {backend_url} ...")
 
     # 后台线程启动 uvicorn
-    server_thread = threading.Thread(target=_start_server, args=(host, port), daemon=True)
+    server_thread = threading.Thread(
+        target=_start_server, args=(host, port, profile), daemon=True
+    )
     server_thread.start()
 
     # 等待后端就绪
@@ -67,6 +93,9 @@ def main():
         )
         return
 
+    if profile:
+        _report_startup_profile((time.perf_counter() - started) * 1000)
+
     # 确定前端 URL：打包模式直接用后端（已挂载前端静态文件），
     # 开发模式优先检测 frontend/dist，不存在则使用 Vite dev server
     if getattr(sys, 'frozen', False):
@@ -97,4 +126,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # 多进程 Worker 模式（spawn）在打包后的 exe 中需要 freeze_support
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
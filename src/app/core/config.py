@@ -37,6 +37,15 @@ class Settings(BaseSettings):
         env="DATABASE_URL",
     )
 
+    # SystemConfig 缓存兜底 TTL（秒），本进程内的写入会立即使缓存失效；0 表示每次都查询
+    system_config_cache_ttl_sec: float = Field(default=30.0, env="SYSTEM_CONFIG_CACHE_TTL_SEC")
+    # 批次内账号状态写回缓存（体力 / 资产 / 等级等在 intent 结束与批次结束时统一写回）
+    account_state_cache_enabled: bool = Field(default=True, env="ACCOUNT_STATE_CACHE_ENABLED")
+    # 任务运行流水保留天数（小时级汇总永久保留）；0 表示不清理
+    run_ledger_retention_days: int = Field(default=90, env="RUN_LEDGER_RETENTION_DAYS")
+    # 任务运行分钟级汇总保留天数；0 表示不清理
+    run_ledger_minute_retention_days: int = Field(default=7, env="RUN_LEDGER_MINUTE_RETENTION_DAYS")
+
     # JWT 签名密钥（持久化，重启后 token 仍有效）
     jwt_secret: str = Field(default="", env="JWT_SECRET")
 
@@ -61,6 +70,18 @@ class Settings(BaseSettings):
     activity_name: str = Field(default=".MainActivity", env="ACTIVITY_NAME")
     # 运行链路截图方式
     capture_method: str = Field(default="adb", env="CAPTURE_METHOD")
+    # 按模拟器复用长期存活的 adapter（IPC / ADB 连接跨任务、跨批次保留）
+    emulator_adapter_registry_enabled: bool = Field(
+        default=True, env="EMULATOR_ADAPTER_REGISTRY_ENABLED"
+    )
+    # adapter 连续截图失败达到该次数后重建
+    emulator_adapter_max_failures: int = Field(default=3, env="EMULATOR_ADAPTER_MAX_FAILURES")
+    # 每个模拟器保留的最近截图帧数（失败截图 / 调试接口直接读取，0 关闭）
+    emulator_frame_ring_size: int = Field(default=8, env="EMULATOR_FRAME_RING_SIZE")
+    # 失败截图附带的历史帧数（含操作标注，写入同名子目录）
+    fail_screenshot_history_frames: int = Field(
+        default=4, env="FAIL_SCREENSHOT_HISTORY_FRAMES"
+    )
     # 识图帧缓存总开关
     vision_frame_cache_enabled: bool = Field(
         default=True, env="VISION_FRAME_CACHE_ENABLED"
@@ -79,14 +100,60 @@ class Settings(BaseSettings):
     vision_cross_emulator_cache_enabled: bool = Field(
         default=False, env="VISION_CROSS_EMULATOR_CACHE_ENABLED"
     )
-    # 跨模拟器共享缓存每个桶的最大保留条数（LRU）
-    vision_cross_emulator_shared_bucket_size: int = Field(
-        default=8, env="VISION_CROSS_EMULATOR_SHARED_BUCKET_SIZE"
+    # 跨模拟器共享帧索引容量（dHash 多索引检索，超出后淘汰最旧条目）
+    vision_shared_index_max_entries: int = Field(
+        default=4096, env="VISION_SHARED_INDEX_MAX_ENTRIES"
+    )
+    # 共享帧索引的 dHash 最大汉明距离（越大越宽松，候选经缩略签名二次复核）
+    vision_shared_index_max_hamming: int = Field(
+        default=3, env="VISION_SHARED_INDEX_MAX_HAMMING"
+    )
+    # 持久化识图缓存（SQLite，按模板集哈希版本化，重启后免冷启动整表扫描）
+    vision_persistent_cache_enabled: bool = Field(
+        default=False, env="VISION_PERSISTENT_CACHE_ENABLED"
+    )
+    vision_persistent_cache_path: str = Field(
+        default=str(BASE_DIR / "cache" / "vision_detect_cache.db"),
+        env="VISION_PERSISTENT_CACHE_PATH",
+    )
+    vision_persistent_cache_max_entries: int = Field(
+        default=5000, env="VISION_PERSISTENT_CACHE_MAX_ENTRIES"
+    )
+    # 模板资源包（build.py 预编译的内存映射文件；缺失或过期时回退按路径加载 PNG）
+    vision_template_bundle_enabled: bool = Field(
+        default=True, env="VISION_TEMPLATE_BUNDLE_ENABLED"
+    )
+    vision_template_bundle_path: str = Field(
+        default="assets/ui_templates.bundle", env="VISION_TEMPLATE_BUNDLE_PATH"
+    )
+    # 模板匹配性能画像（按模板累计耗时 / 命中率 / 得分分布，定期写 JSON 快照）
+    vision_template_profile_enabled: bool = Field(
+        default=False, env="VISION_TEMPLATE_PROFILE_ENABLED"
+    )
+    vision_template_profile_path: str = Field(
+        default=str(BASE_DIR / "logs" / "template_profile.json"),
+        env="VISION_TEMPLATE_PROFILE_PATH",
+    )
+    vision_template_profile_save_interval_sec: int = Field(
+        default=60, env="VISION_TEMPLATE_PROFILE_SAVE_INTERVAL_SEC"
     )
+    # 界面转移追踪：按模拟器学习界面转移，先只检测 top-k 预测界面的 tag 模板
+    ui_tracker_enabled: bool = Field(default=True, env="UI_TRACKER_ENABLED")
+    ui_tracker_top_k: int = Field(default=3, env="UI_TRACKER_TOP_K")
+    # 自适应稳定等待：点击后按截图判断画面稳定 / 目标出现即返回，原固定 sleep 作为上限
+    ui_adaptive_settle_enabled: bool = Field(default=True, env="UI_ADAPTIVE_SETTLE_ENABLED")
+    ui_settle_interval_ms: int = Field(default=150, env="UI_SETTLE_INTERVAL_MS")
+    ui_settle_stable_frames: int = Field(default=2, env="UI_SETTLE_STABLE_FRAMES")
+    # 快速点击：点击后新帧确认生效（模板消失 / 画面变化）即停止，关闭则跑满 rapid_count 轮
+    rapid_click_confirm_enabled: bool = Field(default=True, env="RAPID_CLICK_CONFIRM_ENABLED")
     # 同帧连续 miss 最多跳过次数（到达后强制重检）
     vision_unchanged_skip_max: int = Field(default=2, env="VISION_UNCHANGED_SKIP_MAX")
     # 弹窗关闭后立即重试的最小 sleep（毫秒）
     vision_min_retry_sleep_ms: int = Field(default=50, env="VISION_MIN_RETRY_SLEEP_MS")
+    # wait_for_template 流水线：匹配当前帧的同时截取下一帧，命中后取消未用的预取
+    vision_wait_pipeline_enabled: bool = Field(default=True, env="VISION_WAIT_PIPELINE_ENABLED")
+    # 同步识图函数在事件循环线程中执行时的守卫模式: off | warn | raise
+    vision_loop_guard: str = Field(default="off", env="VISION_LOOP_GUARD")
     # 识图缓存统计日志输出间隔（秒）
     vision_cache_stats_interval_sec: int = Field(
         default=10, env="VISION_CACHE_STATS_INTERVAL_SEC"
@@ -95,6 +162,14 @@ class Settings(BaseSettings):
     # 调度
     coop_times: str = Field(default="18:00,21:00", env="COOP_TIMES")
     stamina_threshold: int = Field(default=1000, env="STAMINA_THRESHOLD")
+    # 执行器批次调度模式: fifo（按入队顺序）| global（跨账号全局规划）
+    executor_scheduler_mode: str = Field(default="fifo", env="EXECUTOR_SCHEDULER_MODE")
+    # 全局规划窗口（秒），预测完工时间超出即视为饱和，低价值批次延后
+    executor_plan_horizon_sec: int = Field(default=1800, env="EXECUTOR_PLAN_HORIZON_SEC")
+    # 饱和时最高优先级低于该值的批次延后执行
+    executor_plan_defer_priority: int = Field(default=40, env="EXECUTOR_PLAN_DEFER_PRIORITY")
+    # 批次最长延后时间（秒），超过后恢复正常排序
+    executor_plan_max_defer_sec: int = Field(default=3600, env="EXECUTOR_PLAN_MAX_DEFER_SEC")
 
     # Web服务
     api_host: str = Field(default="0.0.0.0", env="API_HOST")
@@ -118,6 +193,11 @@ class Settings(BaseSettings):
     log_access_enabled: bool = Field(default=True, env="LOG_ACCESS_ENABLED")
     log_access_path: str = Field(default="", env="LOG_ACCESS_PATH")
     log_rotation: str = Field(default="00:00", env="LOG_ROTATION")
+    # 运行时日志存储（logs/runtime 下的段文件 + 索引，运行日志面板查询与 WebSocket 实时推送使用）
+    runtime_log_store_enabled: bool = Field(default=True, env="RUNTIME_LOG_STORE_ENABLED")
+    # Prometheus 指标导出（GET /metrics，文本格式）。该路径不经过 /api 鉴权，会暴露模拟器 ADB 地址、
+    # 模板路径与队列状态，默认关闭，仅在内网按需开启
+    metrics_endpoint_enabled: bool = Field(default=False, env="METRICS_ENDPOINT_ENABLED")
 
     # 备份
     backup_interval_days: int = Field(default=3, env="BACKUP_INTERVAL_DAYS")
@@ -126,6 +206,16 @@ class Settings(BaseSettings):
     # 线程池（多模拟器并发优化，0 表示自动计算）
     io_thread_pool_size: int = Field(default=0, env="IO_THREAD_POOL_SIZE")
     compute_thread_pool_size: int = Field(default=0, env="COMPUTE_THREAD_POOL_SIZE")
+    # 计算进程池大小（重识图任务的多核后端；0 关闭，-1 自动）
+    compute_process_pool_size: int = Field(default=0, env="COMPUTE_PROCESS_POOL_SIZE")
+    # 多进程 Worker 模式：子进程组数（0 表示所有 WorkerActor 运行在主进程事件循环中）
+    executor_process_groups: int = Field(default=0, env="EXECUTOR_PROCESS_GROUPS")
+
+    # 事件循环卡顿监控（哨兵间隔 / 慢回调阈值，单位毫秒）。按需开启：会全局替换 Handle._run
+    # 并启动看门狗线程
+    loop_monitor_enabled: bool = Field(default=False, env="LOOP_MONITOR_ENABLED")
+    loop_monitor_interval_ms: int = Field(default=100, env="LOOP_MONITOR_INTERVAL_MS")
+    loop_monitor_slow_ms: int = Field(default=100, env="LOOP_MONITOR_SLOW_MS")
 
     # OCR 实例池（ddddocr 并行推理）
     digit_ocr_pool_size: int = Field(default=2, env="DIGIT_OCR_POOL_SIZE")
@@ -247,6 +247,22 @@ def setup_logger(force: bool = False):
                 **common_sink_kwargs,
             )
 
+        # 运行时日志存储（段文件 + 索引），供运行日志面板按游标查询与实时订阅
+        if getattr(settings, "runtime_log_store_enabled", True):
+            from .runtime_log import init_runtime_log_store
+
+            store = init_runtime_log_store(
+                log_dir / "runtime", retention_days=settings.log_retention_days
+            )
+            logger.add(
+                store.sink,
+                level=settings.log_level,
+                enqueue=enqueue,
+                backtrace=False,
+                diagnose=False,
+                filter=_is_non_access_record,
+            )
+
         if console_sink_missing:
             logger.warning(
                 "未检测到可用控制台输出流，已自动跳过控制台日志输出"
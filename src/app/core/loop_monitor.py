@@ -0,0 +1,352 @@
+"""
+事件循环卡顿监控
+
+所有模拟器的 WorkerActor 共用一个 asyncio 事件循环，任何阻塞调用都会拖慢整个机群。
+
+- 哨兵协程：按固定间隔 sleep，实际唤醒时间与预期的差值即调度延迟（loop lag）
+- 慢回调捕获：包装 asyncio Handle._run，单步执行超过阈值时记录所属协程；
+  看门狗线程在单步仍未结束时抓取事件循环线程的调用栈，定位真正阻塞的代码行
+- 按调用位置聚合为 top-offenders 表，供 /api/executor/loop 与 metrics_snapshot 使用
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .config import settings
+from .logger import logger
+
+# 单个调用位置保留的栈帧数
+_STACK_DEPTH = 12
+# 聚合表上限，超出时淘汰累计耗时最小的调用位置
+_MAX_SITES = 256
+# 哨兵延迟样本窗口
+_LAG_WINDOW = 600
+
+_orig_handle_run = asyncio.events.Handle._run
+
+
+def _short_path(filename: str) -> str:
+    """截取到 app/ 之后的相对路径，便于阅读。"""
+    normalized = filename.replace("\\", "/")
+    idx = normalized.rfind("/app/")
+    return normalized[idx + 1:] if idx >= 0 else normalized
+
+
+def _library_prefixes() -> Tuple[str, ...]:
+    paths = sysconfig.get_paths()
+    prefixes = {
+        paths.get(key, "").replace("\\", "/")
+        for key in ("stdlib", "platstdlib", "purelib", "platlib")
+    }
+    return tuple(p for p in prefixes if p)
+
+
+_LIBRARY_PREFIXES = _library_prefixes()
+
+
+def _is_app_frame(filename: str) -> bool:
+    """是否为项目自身代码（排除标准库、第三方库与监控模块本身）。"""
+    normalized = filename.replace("\\", "/")
+    if normalized.endswith("/core/loop_monitor.py") or normalized.startswith("<"):
+        return False
+    return not normalized.startswith(_LIBRARY_PREFIXES)
+
+
+def _describe_callback(handle: asyncio.Handle) -> Tuple[str, Optional[Any]]:
+    """返回 (回调描述, 协程对象或 None)。"""
+    callback = getattr(handle, "_callback", None)
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        name = getattr(coro, "__qualname__", None) or repr(coro)
+        return f"task:{name}", coro
+    name = getattr(callback, "__qualname__", None) or repr(callback)
+    return f"callback:{name}", None
+
+
+def _coro_site(coro: Any) -> Optional[str]:
+    """沿 cr_await 链找到最内层项目协程的挂起位置。"""
+    site = None
+    depth = 0
+    while coro is not None and depth < 32:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is not None and _is_app_frame(frame.f_code.co_filename):
+            site = (
+                f"{_short_path(frame.f_code.co_filename)}:{frame.f_lineno}"
+                f" ({frame.f_code.co_name})"
+            )
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+        depth += 1
+    return site
+
+
+def _format_stack(frame) -> Tuple[Optional[str], List[str]]:
+    """格式化栈帧，返回 (最内层应用代码位置, 栈文本列表)。"""
+    summary = traceback.extract_stack(frame)
+    site = None
+    for entry in reversed(summary):
+        if _is_app_frame(entry.filename):
+            site = f"{_short_path(entry.filename)}:{entry.lineno} ({entry.name})"
+            break
+    lines = [
+        f"{_short_path(e.filename)}:{e.lineno} in {e.name}"
+        + (f" | {e.line.strip()}" if e.line else "")
+        for e in summary[-_STACK_DEPTH:]
+    ]
+    return site, lines
+
+
+def _percentile(values: List[float], percentile: int) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * (percentile / 100)
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    weight = rank - lower
+    return round(ordered[lower] * (1 - weight) + ordered[upper] * weight, 2)
+
+
+class LoopMonitor:
+    """单个事件循环的卡顿监控器。"""
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._sentinel_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.interval_sec = 0.1
+        self.slow_sec = 0.1
+
+        # 当前正在执行的回调（看门狗线程读取）
+        self._step_seq = 0
+        self._step_start = 0.0
+        self._step_sampled: Optional[Tuple[int, Optional[str], List[str]]] = None
+
+        self._lag_samples: Deque[float] = deque(maxlen=_LAG_WINDOW)
+        self._lag_max_ms = 0.0
+        self._lag_stalls = 0
+        self._slow_total = 0
+        self._sites: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    # ── 生命周期 ──
+
+    def start(
+        self,
+        *,
+        interval_ms: Optional[int] = None,
+        slow_ms: Optional[int] = None,
+    ) -> None:
+        """在当前运行中的事件循环上启动监控（需在协程中调用）。"""
+        global _active_monitor
+        if self._loop is not None:
+            return
+        if interval_ms is None:
+            interval_ms = settings.loop_monitor_interval_ms
+        if slow_ms is None:
+            slow_ms = settings.loop_monitor_slow_ms
+        self.interval_sec = max(0.01, interval_ms / 1000.0)
+        self.slow_sec = max(0.005, slow_ms / 1000.0)
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._stop_event = threading.Event()
+
+        _active_monitor = self
+        asyncio.events.Handle._run = _monitored_handle_run
+        self._sentinel_task = self._loop.create_task(
+            self._sentinel(), name="loop-monitor-sentinel"
+        )
+        self._watchdog = threading.Thread(
+            target=self._watchdog_main, name="loop-monitor-watchdog", daemon=True
+        )
+        self._watchdog.start()
+        logger.info(
+            "事件循环监控已启动: interval={}ms, slow_threshold={}ms",
+            int(self.interval_sec * 1000),
+            int(self.slow_sec * 1000),
+        )
+
+    async def stop(self) -> None:
+        global _active_monitor
+        if self._loop is None:
+            return
+        if _active_monitor is self:
+            _active_monitor = None
+            asyncio.events.Handle._run = _orig_handle_run
+        self._stop_event.set()
+        if self._sentinel_task is not None:
+            self._sentinel_task.cancel()
+            try:
+                await self._sentinel_task
+            except asyncio.CancelledError:
+                pass
+        self._sentinel_task = None
+        self._watchdog = None
+        self._loop = None
+        self._thread_id = None
+
+    def reset(self) -> None:
+        """清空统计。"""
+        with self._lock:
+            self._lag_samples.clear()
+            self._lag_max_ms = 0.0
+            self._lag_stalls = 0
+            self._slow_total = 0
+            self._sites.clear()
+
+    # ── 哨兵 & 看门狗 ──
+
+    async def _sentinel(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_sec
+            await asyncio.sleep(self.interval_sec)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000.0)
+            with self._lock:
+                self._lag_samples.append(lag_ms)
+                if lag_ms > self._lag_max_ms:
+                    self._lag_max_ms = lag_ms
+                if lag_ms >= self.slow_sec * 1000.0:
+                    self._lag_stalls += 1
+
+    def _watchdog_main(self) -> None:
+        """单步超过阈值仍未结束时抓取事件循环线程调用栈（每步最多一次）。"""
+        period = self.slow_sec / 2
+        stop_event = self._stop_event
+        while not stop_event.wait(period):
+            seq = self._step_seq
+            start = self._step_start
+            if not start or time.perf_counter() - start < self.slow_sec:
+                continue
+            sampled = self._step_sampled
+            if sampled is not None and sampled[0] == seq:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            site, stack = _format_stack(frame)
+            del frame
+            if self._step_seq == seq:
+                self._step_sampled = (seq, site, stack)
+
+    # ── 慢回调记录 ──
+
+    def _record_slow(self, handle: asyncio.Handle, seq: int, duration: float) -> None:
+        name, coro = _describe_callback(handle)
+        sampled = self._step_sampled
+        site = None
+        stack: List[str] = []
+        if sampled is not None and sampled[0] == seq:
+            site, stack = sampled[1], sampled[2]
+        if site is None and coro is not None:
+            # 未采样到栈（单步略超阈值）：回退到协程执行后的挂起位置
+            site = _coro_site(coro)
+        if site is None:
+            site = name
+        duration_ms = duration * 1000.0
+        with self._lock:
+            self._slow_total += 1
+            entry = self._sites.get(site)
+            if entry is None:
+                if len(self._sites) >= _MAX_SITES:
+                    victim = min(self._sites, key=lambda k: self._sites[k]["total_ms"])
+                    self._sites.pop(victim, None)
+                entry = self._sites[site] = {
+                    "site": site,
+                    "callback": name,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "stack": [],
+                    "last_at": None,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["callback"] = name
+            entry["last_at"] = datetime.utcnow().isoformat()
+            if duration_ms >= entry["max_ms"]:
+                entry["max_ms"] = duration_ms
+                if stack:
+                    entry["stack"] = stack
+
+    # ── 查询 ──
+
+    def top_offenders(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = sorted(
+                self._sites.values(), key=lambda e: e["total_ms"], reverse=True
+            )[: max(0, limit)]
+            return [
+                {
+                    **entry,
+                    "total_ms": round(entry["total_ms"], 1),
+                    "max_ms": round(entry["max_ms"], 1),
+                    "avg_ms": round(entry["total_ms"] / max(1, entry["count"]), 1),
+                    "stack": list(entry["stack"]),
+                }
+                for entry in entries
+            ]
+
+    def snapshot(self, top: int = 5) -> dict:
+        with self._lock:
+            samples = list(self._lag_samples)
+            lag = {
+                "samples": len(samples),
+                "p50_ms": _percentile(samples, 50),
+                "p95_ms": _percentile(samples, 95),
+                "p99_ms": _percentile(samples, 99),
+                "max_ms": round(self._lag_max_ms, 1),
+                "stalls": self._lag_stalls,
+            }
+            slow_total = self._slow_total
+        return {
+            "enabled": self.running,
+            "interval_ms": int(self.interval_sec * 1000),
+            "slow_threshold_ms": int(self.slow_sec * 1000),
+            "lag": lag,
+            "slow_callbacks": slow_total,
+            "top_offenders": self.top_offenders(top),
+        }
+
+
+_active_monitor: Optional[LoopMonitor] = None
+
+
+def _monitored_handle_run(self) -> None:
+    monitor = _active_monitor
+    if monitor is None or threading.get_ident() != monitor._thread_id:
+        return _orig_handle_run(self)
+    monitor._step_seq += 1
+    seq = monitor._step_seq
+    start = time.perf_counter()
+    monitor._step_start = start
+    try:
+        return _orig_handle_run(self)
+    finally:
+        monitor._step_start = 0.0
+        duration = time.perf_counter() - start
+        if duration >= monitor.slow_sec:
+            try:
+                monitor._record_slow(self, seq, duration)
+            except Exception:
+                pass
+
+
+loop_monitor = LoopMonitor()
+
+
+__all__ = ["LoopMonitor", "loop_monitor"]
@@ -0,0 +1,290 @@
+"""
+计算进程池（ProcessPoolExecutor 后端）
+
+为纯 Python 逻辑较重的识图任务（结界突破网格、战斗阵容、整帧 UI 检测等）
+提供真正的多核并行，绕开 GIL。
+
+- 大帧（ndarray / bytes）通过 multiprocessing.shared_memory 传递，
+  进程间只序列化段名、形状和 dtype，避免每次任务复制 ~1.5MB 截图
+- 子进程启动时由 initializer 预加载父进程 _GRAY_TEMPLATE_CACHE 中的灰度模板
+  （模板资源包内的条目除外，子进程直接映射同一文件）
+- 进程池不可用（未启用、当前为守护进程、进程池崩溃）时由调用方回退到计算线程池
+
+调用方通过 run_in_compute(..., backend=COMPUTE_BACKEND_PROCESS) 按调用点选择。
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import settings
+from .logger import logger
+
+COMPUTE_BACKEND_THREAD = "thread"
+COMPUTE_BACKEND_PROCESS = "process"
+
+# 小于该字节数的参数直接 pickle，共享内存的创建开销不划算
+_SHARE_MIN_BYTES = 64 * 1024
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_size = 0
+_pool_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {
+    "jobs": 0,
+    "shared_frames": 0,
+    "shared_bytes": 0,
+    "fallbacks": 0,
+    "broken": 0,
+}
+
+
+class ProcessPoolUnavailable(RuntimeError):
+    """进程池不可用，调用方应回退到线程池。"""
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    """共享内存帧句柄（可 pickle，跨进程传递）。"""
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+    is_bytes: bool = False
+
+
+def share_frame(obj: Any) -> Tuple[SharedFrame, shared_memory.SharedMemory]:
+    """将 ndarray / bytes 拷贝到新建共享内存段，返回句柄和段对象（调用方负责释放）。"""
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        data = memoryview(obj).cast("B")
+        shm = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+        shm.buf[:data.nbytes] = data
+        return SharedFrame(shm.name, (data.nbytes,), "uint8", is_bytes=True), shm
+
+    arr = np.ascontiguousarray(obj)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+    view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+    view[...] = arr
+    del view
+    return SharedFrame(shm.name, tuple(arr.shape), arr.dtype.str), shm
+
+
+def release_frame(shm: shared_memory.SharedMemory) -> None:
+    """关闭并删除父进程创建的共享内存段。"""
+    try:
+        shm.close()
+    except BufferError:
+        pass
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _attach_frame(handle: SharedFrame) -> Tuple[Any, shared_memory.SharedMemory]:
+    """子进程侧：按句柄挂载共享内存，返回 ndarray 视图（bytes 帧返回拷贝）。"""
+    # spawn 子进程与父进程共用 resource_tracker，段由父进程统一 unlink
+    shm = shared_memory.SharedMemory(name=handle.name)
+    if handle.is_bytes:
+        return bytes(shm.buf[:handle.shape[0]]), shm
+    arr = np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=shm.buf)
+    return arr, shm
+
+
+def _should_share(value: Any) -> bool:
+    if isinstance(value, np.ndarray):
+        return value.nbytes >= _SHARE_MIN_BYTES
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) >= _SHARE_MIN_BYTES
+    return False
+
+
+def _init_worker(templates: Dict[str, np.ndarray]) -> None:
+    """子进程 initializer：预加载父进程的灰度模板缓存。"""
+    from ..modules.vision.template import _GRAY_TEMPLATE_CACHE
+
+    _GRAY_TEMPLATE_CACHE.update(templates)
+
+
+def _run_job(func, args: tuple, kwargs: dict):
+    """子进程侧：挂载共享帧 → 执行函数 → 释放映射。"""
+    attached: List[shared_memory.SharedMemory] = []
+    value = None
+    real_args = []
+    for value in args:
+        if isinstance(value, SharedFrame):
+            value, shm = _attach_frame(value)
+            attached.append(shm)
+        real_args.append(value)
+    real_kwargs = {}
+    for key, value in kwargs.items():
+        if isinstance(value, SharedFrame):
+            value, shm = _attach_frame(value)
+            attached.append(shm)
+        real_kwargs[key] = value
+    try:
+        return func(*real_args, **real_kwargs)
+    finally:
+        del real_args, real_kwargs, value
+        for shm in attached:
+            try:
+                shm.close()
+            except BufferError:
+                # 返回值仍引用共享内存视图，交给 GC 在进程内回收
+                pass
+
+
+def _auto_process_pool_size() -> int:
+    """规则: max(2, cpu_count // 2)，上限 8。"""
+    cpu = os.cpu_count() or 4
+    return min(max(2, cpu // 2), 8)
+
+
+def _template_snapshot() -> Dict[str, np.ndarray]:
+    from ..modules.vision.template import _CACHE_LOCK, _GRAY_TEMPLATE_CACHE
+    from ..modules.vision.template_bundle import get_template_bundle
+
+    bundle = get_template_bundle()
+    with _CACHE_LOCK:
+        # 资源包内的模板由子进程自行映射同一文件，无需序列化传输
+        return {
+            path: tpl
+            for path, tpl in _GRAY_TEMPLATE_CACHE.items()
+            if bundle is None or path not in bundle
+        }
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """获取计算进程池；未启用（COMPUTE_PROCESS_POOL_SIZE=0）或当前为守护进程时返回 None。
+
+    模板快照在进程池创建时获取，应在 UIDetector.warmup() 之后首次调用。
+    """
+    global _process_pool, _process_pool_size
+    if _process_pool is not None:
+        return _process_pool
+    size = settings.compute_process_pool_size
+    if size == 0:
+        return None
+    if multiprocessing.current_process().daemon:
+        # 守护进程（如多进程 Worker 组）不允许再创建子进程
+        return None
+    with _pool_lock:
+        if _process_pool is None:
+            if size < 0:
+                size = _auto_process_pool_size()
+            templates = _template_snapshot()
+            _process_pool = ProcessPoolExecutor(
+                max_workers=size,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(templates,),
+            )
+            _process_pool_size = size
+            logger.info(
+                "计算进程池已创建: max_workers={}, 预加载模板={}", size, len(templates)
+            )
+    return _process_pool
+
+
+def _bump(key: str, value: int = 1) -> None:
+    with _stats_lock:
+        _stats[key] = _stats.get(key, 0) + value
+
+
+async def run_in_process(func, *args, **kwargs):
+    """在计算进程池中执行函数并 await 结果。
+
+    func 必须是可 pickle 的模块级函数（或其 functools.partial）。
+    大帧参数自动经共享内存传递。进程池不可用时抛出 ProcessPoolUnavailable。
+    """
+    pool = get_process_pool()
+    if pool is None:
+        raise ProcessPoolUnavailable("计算进程池未启用")
+
+    if isinstance(func, functools.partial):
+        args = tuple(func.args) + args
+        kwargs = {**(func.keywords or {}), **kwargs}
+        func = func.func
+
+    segments: List[shared_memory.SharedMemory] = []
+    try:
+        job_args = []
+        for value in args:
+            if _should_share(value):
+                handle, shm = share_frame(value)
+                segments.append(shm)
+                value = handle
+            job_args.append(value)
+        job_kwargs = {}
+        for key, value in kwargs.items():
+            if _should_share(value):
+                handle, shm = share_frame(value)
+                segments.append(shm)
+                value = handle
+            job_kwargs[key] = value
+        if segments:
+            _bump("shared_frames", len(segments))
+            _bump("shared_bytes", sum(s.size for s in segments))
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                pool, _run_job, func, tuple(job_args), job_kwargs
+            )
+        except BrokenProcessPool as e:
+            _bump("broken")
+            _discard_broken_pool(pool)
+            raise ProcessPoolUnavailable(f"计算进程池已崩溃: {e}") from e
+        _bump("jobs")
+        return result
+    finally:
+        for shm in segments:
+            release_frame(shm)
+
+
+def note_fallback() -> None:
+    """记录一次进程池 → 线程池的回退。"""
+    _bump("fallbacks")
+
+
+def _discard_broken_pool(pool: ProcessPoolExecutor) -> None:
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    try:
+        pool.shutdown(wait=False, cancel_futures=True)
+    except Exception:
+        pass
+    logger.warning("计算进程池已崩溃，后续任务将重建进程池")
+
+
+def process_pool_stats() -> dict:
+    """返回计算进程池统计。"""
+    with _stats_lock:
+        data = dict(_stats)
+    data["enabled"] = settings.compute_process_pool_size != 0
+    data["max_workers"] = _process_pool_size if _process_pool is not None else 0
+    return data
+
+
+def shutdown_process_pool() -> None:
+    """关闭计算进程池。"""
+    global _process_pool, _process_pool_size
+    with _pool_lock:
+        pool = _process_pool
+        _process_pool = None
+        _process_pool_size = 0
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+        logger.info("计算进程池已关闭")
@@ -0,0 +1,409 @@
+"""
+运行时日志存储（段文件 + 旁路索引）
+
+运行日志面板过去每次轮询都要把 app_*.log 末尾数千行逐行 JSON 解析再在 Python 中过滤。
+这里由 loguru sink 直接写入专用存储（仅 executor / ui / emu / feeder 等运行时模块）：
+
+    logs/runtime/runtime_YYYY-MM-DD.seg   每行一条 JSON（只追加）
+    logs/runtime/runtime_YYYY-MM-DD.idx   定长索引：时间戳、偏移、长度、模块号、级别、模拟器
+    logs/runtime/runtime_YYYY-MM-DD.mod   模块名表（第 n 行即模块号 n）
+
+索引中的时间戳严格递增（乱序到达的记录排在上一条之后），
+游标查询在索引上二分定位，级别 / 模块 / 模拟器在索引上过滤，只读取命中的段文件行。
+
+另支持实时订阅（WebSocket tail）：sink 写入后把记录推送给各订阅队列。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import struct
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+RUNTIME_MODULES = (
+    "app.modules.executor",
+    "app.modules.ui",
+    "app.modules.emu",
+    "app.modules.tasks.feeder",
+)
+
+# ts(double) | offset(uint64) | length(uint32) | module_id(uint16) | level_no(uint8) | emulator_id(int32)
+_INDEX = struct.Struct("<dQIHBi")
+_NO_EMULATOR = -1
+# 反向扫描索引时每次读取的记录数
+_SCAN_CHUNK = 512
+
+
+def _parse_emulator_id(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return _NO_EMULATOR
+
+
+@dataclass
+class RuntimeLogFilter:
+    """运行日志过滤条件（level 为级别名，module / keyword 为不区分大小写的子串）。"""
+
+    level: Optional[str] = None
+    module: Optional[str] = None
+    keyword: Optional[str] = None
+    emulator_id: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        self.level = self.level.upper() if self.level else None
+        self.module = self.module.lower() if self.module else None
+        self.keyword = self.keyword.lower() if self.keyword else None
+
+    def match_entry(self, entry: dict) -> bool:
+        if self.level and (entry.get("level") or "").upper() != self.level:
+            return False
+        if self.module:
+            name = (entry.get("module") or "").lower()
+            if self.module not in name and self.module not in str(entry.get("extra") or {}).lower():
+                return False
+        if self.keyword and self.keyword not in (entry.get("message") or "").lower():
+            return False
+        if self.emulator_id is not None and str(entry.get("emulator_id")) != str(self.emulator_id):
+            return False
+        return True
+
+
+class _Segment:
+    """单日段文件（写入端）。"""
+
+    def __init__(self, base: Path) -> None:
+        self.base = base
+        # 上次异常退出可能留下不完整的索引记录，截断后再追加以保持对齐
+        idx_path = base.with_suffix(".idx")
+        if idx_path.exists():
+            size = idx_path.stat().st_size
+            if size % _INDEX.size:
+                with open(idx_path, "r+b") as f:
+                    f.truncate(size - size % _INDEX.size)
+        self.seg = open(base.with_suffix(".seg"), "ab")
+        self.idx = open(base.with_suffix(".idx"), "ab")
+        self.mod = open(base.with_suffix(".mod"), "a", encoding="utf-8")
+        self.modules = _read_modules(base)
+        self.last_ts = _last_index_ts(base)
+
+    def module_id(self, name: str) -> int:
+        mid = self.modules.get(name)
+        if mid is None:
+            mid = len(self.modules)
+            self.modules[name] = mid
+            self.mod.write(name.replace("\n", " ") + "\n")
+            self.mod.flush()
+        return mid
+
+    def close(self) -> None:
+        for f in (self.seg, self.idx, self.mod):
+            try:
+                f.close()
+            except Exception:
+                pass
+
+
+def _read_modules(base: Path) -> Dict[str, int]:
+    path = base.with_suffix(".mod")
+    if not path.exists():
+        return {}
+    names = path.read_text(encoding="utf-8").splitlines()
+    return {name: i for i, name in enumerate(names)}
+
+
+def _last_index_ts(base: Path) -> float:
+    path = base.with_suffix(".idx")
+    if not path.exists():
+        return 0.0
+    size = path.stat().st_size - path.stat().st_size % _INDEX.size
+    if size <= 0:
+        return 0.0
+    with open(path, "rb") as f:
+        f.seek(size - _INDEX.size)
+        return _INDEX.unpack(f.read(_INDEX.size))[0]
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, flt: RuntimeLogFilter, maxsize: int) -> None:
+        self.loop = loop
+        self.filter = flt
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _put(self, entry: dict) -> None:
+        try:
+            self.queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+
+class RuntimeLogStore:
+    """运行时日志存储（写入线程安全；查询可与写入并发）。"""
+
+    def __init__(self, root: Path, *, retention_days: int = 3) -> None:
+        self.root = Path(root)
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._segment: Optional[_Segment] = None
+        self._segment_day: Optional[date] = None
+        self._subscribers: List[_Subscriber] = []
+        self._sub_lock = threading.Lock()
+
+    # ── 写入 ──
+
+    def sink(self, message) -> None:
+        """loguru sink：仅记录运行时模块的日志。"""
+        record = message.record
+        name = record["name"] or ""
+        if not name.startswith(RUNTIME_MODULES):
+            return
+        extra = record["extra"] or {}
+        entry = {
+            "timestamp": str(record["time"]),
+            "timestamp_epoch": record["time"].timestamp(),
+            "level": record["level"].name,
+            "module": name,
+            "function": record["function"],
+            "message": record["message"],
+            "worker_id": extra.get("worker_id"),
+            "emulator_id": extra.get("emulator_id"),
+            "account_id": extra.get("account_id"),
+            "extra": {k: str(v) for k, v in extra.items()},
+        }
+        self.append(entry, level_no=record["level"].no, day=record["time"].date())
+
+    def append(self, entry: dict, *, level_no: int = 20, day: Optional[date] = None) -> None:
+        with self._lock:
+            seg = self._segment_for(day or date.today())
+            # 索引时间戳取整到微秒（与游标格式一致）且严格递增：
+            # 乱序到达的记录排在上一条之后，游标 "ts > cursor" 不会漏读或重复
+            ts = round(float(entry.get("timestamp_epoch") or 0.0), 6)
+            if ts <= seg.last_ts:
+                ts = round(seg.last_ts + 1e-6, 6)
+            seg.last_ts = ts
+            entry["timestamp_epoch"] = ts
+            line = (json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+            offset = seg.seg.tell()
+            seg.seg.write(line)
+            seg.seg.flush()
+            # 先写段文件再写索引：读端看到索引记录时对应行一定已完整写入
+            seg.idx.write(
+                _INDEX.pack(
+                    ts,
+                    offset,
+                    len(line),
+                    seg.module_id(entry.get("module") or ""),
+                    min(max(int(level_no), 0), 255),
+                    _parse_emulator_id(entry.get("emulator_id")),
+                )
+            )
+            seg.idx.flush()
+        self._publish(entry)
+
+    def _segment_for(self, day: date) -> _Segment:
+        if self._segment is not None and self._segment_day == day:
+            return self._segment
+        if self._segment is not None:
+            self._segment.close()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._segment = _Segment(self.root / f"runtime_{day.isoformat()}")
+        self._segment_day = day
+        self._prune(day)
+        return self._segment
+
+    def _prune(self, today: date) -> None:
+        if self.retention_days <= 0:
+            return
+        cutoff = (today - timedelta(days=self.retention_days)).isoformat()
+        for path in self.root.glob("runtime_*.*"):
+            if path.stem[len("runtime_"):] < cutoff:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+            self._segment = None
+            self._segment_day = None
+
+    # ── 查询 ──
+
+    def _segments(self) -> List[Path]:
+        if not self.root.exists():
+            return []
+        return sorted(
+            (p.with_suffix("") for p in self.root.glob("runtime_*.idx")),
+            key=lambda p: p.name,
+            reverse=True,
+        )
+
+    def query(
+        self,
+        flt: RuntimeLogFilter,
+        *,
+        after_ts: Optional[float] = None,
+        limit: int = 80,
+    ) -> Tuple[List[dict], bool]:
+        """返回 ts > after_ts 的最新 limit 条日志（按时间升序）及是否还有更多。"""
+        entries: List[dict] = []
+        has_more = False
+        level_no = _level_no(flt.level)
+        for base in self._segments():
+            found, more = self._query_segment(base, flt, level_no, after_ts, limit - len(entries))
+            entries.extend(found)
+            if more or len(entries) >= limit:
+                has_more = True
+                break
+            # 段按日期倒序：本段起点已不晚于游标时，更早的段无需再查
+            if after_ts is not None and self._first_ts(base) <= after_ts:
+                break
+        # 收集顺序为新 → 旧，按写入顺序返回
+        entries.reverse()
+        return entries, has_more
+
+    @staticmethod
+    def _first_ts(base: Path) -> float:
+        with open(base.with_suffix(".idx"), "rb") as f:
+            head = f.read(_INDEX.size)
+        return _INDEX.unpack(head)[0] if len(head) == _INDEX.size else 0.0
+
+    def _query_segment(
+        self,
+        base: Path,
+        flt: RuntimeLogFilter,
+        level_no: Optional[int],
+        after_ts: Optional[float],
+        limit: int,
+    ) -> Tuple[List[dict], bool]:
+        idx_path = base.with_suffix(".idx")
+        count = idx_path.stat().st_size // _INDEX.size
+        if count == 0 or limit <= 0:
+            return [], False
+        modules = {i: name for name, i in _read_modules(base).items()}
+        module_ids = None
+        if flt.module:
+            module_ids = {i for i, name in modules.items() if flt.module in name.lower()}
+
+        out: List[dict] = []
+        with open(idx_path, "rb") as idx, open(base.with_suffix(".seg"), "rb") as seg:
+            start = _bisect_index(idx, count, after_ts) if after_ts is not None else 0
+            pos = count
+            while pos > start:
+                lo = max(start, pos - _SCAN_CHUNK)
+                idx.seek(lo * _INDEX.size)
+                chunk = idx.read((pos - lo) * _INDEX.size)
+                records = [
+                    _INDEX.unpack_from(chunk, i * _INDEX.size) for i in range(pos - lo)
+                ]
+                for ts, offset, length, mid, lvl, emu in reversed(records):
+                    if level_no is not None and lvl != level_no:
+                        continue
+                    if flt.emulator_id is not None and emu != flt.emulator_id:
+                        continue
+                    # 模块过滤也匹配 extra，索引未命中模块名时仍需读取该行
+                    seg.seek(offset)
+                    try:
+                        entry = json.loads(seg.read(length).decode("utf-8"))
+                    except (ValueError, UnicodeDecodeError):
+                        continue
+                    if module_ids is not None and mid in module_ids:
+                        entry_flt = RuntimeLogFilter(keyword=flt.keyword)
+                    else:
+                        entry_flt = RuntimeLogFilter(module=flt.module, keyword=flt.keyword)
+                    if not entry_flt.match_entry(entry):
+                        continue
+                    entry.pop("extra", None)
+                    out.append(entry)
+                    if len(out) >= limit:
+                        return out, True
+                pos = lo
+        return out, False
+
+    # ── 实时订阅 ──
+
+    def subscribe(self, flt: RuntimeLogFilter, *, maxsize: int = 1000) -> _Subscriber:
+        sub = _Subscriber(asyncio.get_running_loop(), flt, maxsize)
+        with self._sub_lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: _Subscriber) -> None:
+        with self._sub_lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def _publish(self, entry: dict) -> None:
+        with self._sub_lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        public = {k: v for k, v in entry.items() if k != "extra"}
+        for sub in subscribers:
+            if not sub.filter.match_entry(entry):
+                continue
+            try:
+                sub.loop.call_soon_threadsafe(sub._put, public)
+            except RuntimeError:
+                # 事件循环已关闭
+                self.unsubscribe(sub)
+
+
+def _bisect_index(idx, count: int, after_ts: float) -> int:
+    """返回首个 ts > after_ts 的索引位置（索引时间戳严格递增）。"""
+
+    class _View:
+        def __len__(self) -> int:
+            return count
+
+        def __getitem__(self, i: int) -> float:
+            idx.seek(i * _INDEX.size)
+            return _INDEX.unpack(idx.read(_INDEX.size))[0]
+
+    return bisect_right(_View(), after_ts)
+
+
+def _level_no(level: Optional[str]) -> Optional[int]:
+    if not level:
+        return None
+    from loguru import logger
+
+    try:
+        return logger.level(level).no
+    except ValueError:
+        return -1
+
+
+_store: Optional[RuntimeLogStore] = None
+_store_lock = threading.Lock()
+
+
+def get_runtime_log_store() -> Optional[RuntimeLogStore]:
+    """返回已启用的运行日志存储（setup_logger 注册 sink 后才存在）。"""
+    return _store
+
+
+def init_runtime_log_store(root: Path, *, retention_days: int) -> RuntimeLogStore:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = RuntimeLogStore(root, retention_days=retention_days)
+        return _store
+
+
+__all__ = [
+    "RUNTIME_MODULES",
+    "RuntimeLogFilter",
+    "RuntimeLogStore",
+    "get_runtime_log_store",
+    "init_runtime_log_store",
+]
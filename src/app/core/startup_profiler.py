@@ -0,0 +1,134 @@
+"""
+启动耗时分析
+
+- 阶段耗时：main.startup 各初始化步骤（init_db / 注册路由 / 挂载前端 ...）始终记录，
+  启动完成后输出一行汇总日志
+- 模块导入耗时：--profile-startup 模式下在导入 app.main 之前启用，
+  统计每个模块首次导入的自身耗时与累计耗时（含子模块），等价于 -X importtime，
+  但在 PyInstaller 打包后的 exe 中同样可用
+
+本模块只依赖标准库，需在其它 app 模块之前导入。
+"""
+from __future__ import annotations
+
+import importlib._bootstrap as _bootstrap
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_orig_find_and_load = _bootstrap._find_and_load
+
+
+class StartupProfiler:
+    """进程级启动耗时记录器。"""
+
+    def __init__(self) -> None:
+        self._created = time.perf_counter()
+        self._phases: List[Tuple[str, float]] = []
+        # module -> (self_ms, cumulative_ms)
+        self._imports: Dict[str, Tuple[float, float]] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.import_tracking = False
+
+    # ── 模块导入 ──
+
+    def enable_import_tracking(self) -> None:
+        """开始统计模块导入耗时（替换 importlib 的 _find_and_load，首次导入才会经过）。"""
+        if self.import_tracking:
+            return
+        self.import_tracking = True
+        _bootstrap._find_and_load = self._timed_find_and_load
+
+    def disable_import_tracking(self) -> None:
+        if not self.import_tracking:
+            return
+        self.import_tracking = False
+        _bootstrap._find_and_load = _orig_find_and_load
+
+    def _timed_find_and_load(self, name, import_):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return _orig_find_and_load(name, import_)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                self._imports.setdefault(
+                    name, ((elapsed - children) * 1000, elapsed * 1000)
+                )
+
+    # ── 阶段 ──
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(name, (time.perf_counter() - start) * 1000)
+
+    def record_phase(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self._phases.append((name, round(elapsed_ms, 1)))
+
+    # ── 报告 ──
+
+    def report(self, top: int = 30) -> dict:
+        with self._lock:
+            phases = list(self._phases)
+            imports = dict(self._imports)
+        ranked = sorted(imports.items(), key=lambda kv: kv[1][0], reverse=True)
+        return {
+            "since_process_start_ms": round((time.perf_counter() - self._created) * 1000, 1),
+            "phases": [{"name": n, "ms": ms} for n, ms in phases],
+            "imports": {
+                "modules": len(imports),
+                "top_self": [
+                    {"module": m, "self_ms": round(s, 1), "cumulative_ms": round(c, 1)}
+                    for m, (s, c) in ranked[: max(0, top)]
+                ],
+            },
+        }
+
+    def phase_summary(self) -> str:
+        with self._lock:
+            return ", ".join(f"{n}={ms:.0f}ms" for n, ms in self._phases)
+
+    def format_report(self, top: int = 30) -> str:
+        data = self.report(top)
+        lines = [f"启动耗时分析（进程启动至今 {data['since_process_start_ms']:.0f}ms）", "", "[阶段]"]
+        for item in data["phases"]:
+            lines.append(f"  {item['ms']:>9.1f}ms  {item['name']}")
+        imports = data["imports"]
+        if imports["modules"]:
+            lines += ["", f"[模块导入] 共 {imports['modules']} 个，按自身耗时排序:"]
+            lines.append(f"  {'self':>9}  {'cumulative':>11}  module")
+            for item in imports["top_self"]:
+                lines.append(
+                    f"  {item['self_ms']:>7.1f}ms  {item['cumulative_ms']:>9.1f}ms  {item['module']}"
+                )
+        return "\n".join(lines)
+
+    def write_report(self, path: str, top: int = 60) -> Optional[Path]:
+        target = Path(path)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(self.format_report(top), encoding="utf-8")
+        except OSError:
+            return None
+        return target
+
+
+startup_profiler = StartupProfiler()
+
+
+__all__ = ["StartupProfiler", "startup_profiler"]
@@ -6,20 +6,30 @@
 
 - I/O 池：ADB subprocess、同步 DB 操作等 I/O 密集操作
 - 计算池：OpenCV 模板匹配、OCR 等 CPU 密集操作
+  （可按调用点选择进程池后端，见 process_pool.py）
+  线程后端前置 FairComputeScheduler：按模拟器分队列、加权轮询、
+  按优先级出队，避免单个模拟器的批量计算挤占其他模拟器的 UI 检测
 """
 from __future__ import annotations
 
 import asyncio
 import os
 import threading
-from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, Optional
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import IntEnum
+from typing import Deque, Dict, List, Optional, Tuple
 
 from .config import settings
 from .logger import logger
+from .metrics import metrics
 
 _io_pool: Optional[ThreadPoolExecutor] = None
 _compute_pool: Optional[ThreadPoolExecutor] = None
+_compute_pool_size = 0
+_compute_scheduler: Optional["FairComputeScheduler"] = None
+_compute_lock = threading.Lock()
 _emu_io_pools: Dict[str, ThreadPoolExecutor] = {}
 _emu_io_inflight: Dict[str, int] = {}
 _emu_io_lock = threading.Lock()
@@ -66,7 +76,7 @@ def get_io_pool() -> ThreadPoolExecutor:
 
 def get_compute_pool() -> ThreadPoolExecutor:
     """获取计算线程池（OpenCV 模板匹配、OCR 等）。"""
-    global _compute_pool
+    global _compute_pool, _compute_pool_size
     if _compute_pool is None:
         size = settings.compute_thread_pool_size
         if size <= 0:
@@ -75,10 +85,236 @@ def get_compute_pool() -> ThreadPoolExecutor:
             max_workers=size,
             thread_name_prefix="cv-compute",
         )
+        _compute_pool_size = size
         logger.info("计算线程池已创建: max_workers={}", size)
     return _compute_pool
 
 
+class ComputePriority(IntEnum):
+    """计算任务优先级（数值越小越优先）。"""
+
+    INTERACTIVE = 0  # 交互路径：UI 检测、单模板匹配、OCR
+    POPUP = 1        # 弹窗扫描
+    BULK = 2         # 批量分析：网格检测、find_all_templates 循环
+
+
+# 低优先级任务每排队该时长（秒）视为提升一级，防止被持续的高优先级任务饿死
+_COMPUTE_AGING_SEC = 2.0
+# 每个优先级保留的等待时间样本数
+_COMPUTE_WAIT_SAMPLES = 256
+# 未指定模拟器的任务共用的队列 key
+_GLOBAL_COMPUTE_KEY = "__global__"
+
+
+class _ComputeJob:
+    __slots__ = ("func", "args", "key", "priority", "enqueued_at", "future")
+
+    def __init__(self, func, args: tuple, key: str, priority: int) -> None:
+        self.func = func
+        self.args = args
+        self.key = key
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.future: Future = Future()
+
+
+class FairComputeScheduler:
+    """计算线程池前置的公平调度器。
+
+    - 每个模拟器（key）在每个优先级下各有一条提交队列
+    - 优先级由高到低出队；低优先级排队每满 aging_sec 视为提升一级
+    - 同一优先级内按模拟器加权轮询（权重 w 表示每轮最多连续取 w 个任务）
+    - 在途任务数不超过线程池大小，线程池内部队列始终为空，出队顺序完全由本调度器决定
+    """
+
+    def __init__(
+        self,
+        pool: ThreadPoolExecutor,
+        max_inflight: int,
+        *,
+        aging_sec: float = _COMPUTE_AGING_SEC,
+    ) -> None:
+        self._pool = pool
+        self._max_inflight = max(1, int(max_inflight))
+        self._aging_sec = aging_sec
+        self._lock = threading.Lock()
+        self._queues: Dict[int, Dict[str, Deque[_ComputeJob]]] = {
+            p: {} for p in ComputePriority
+        }
+        self._rr: Dict[int, Deque[str]] = {p: deque() for p in ComputePriority}
+        self._served: Dict[Tuple[int, str], int] = {}
+        self._weights: Dict[str, int] = {}
+        self._waits: Dict[int, Deque[float]] = {
+            p: deque(maxlen=_COMPUTE_WAIT_SAMPLES) for p in ComputePriority
+        }
+        self._inflight = 0
+        self._queued = 0
+        self._max_depth = 0
+        self._submitted = 0
+        self._completed = 0
+        self._closed = False
+
+    def set_weight(self, key: str, weight: int) -> None:
+        with self._lock:
+            self._weights[key] = max(1, int(weight))
+
+    def submit(self, func, args: tuple, *, key: str, priority: int) -> Future:
+        job = _ComputeJob(func, args, key or _GLOBAL_COMPUTE_KEY, int(priority))
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("计算调度器已关闭")
+            queues = self._queues[job.priority]
+            q = queues.get(job.key)
+            if q is None:
+                q = queues[job.key] = deque()
+                self._rr[job.priority].append(job.key)
+            q.append(job)
+            self._queued += 1
+            self._submitted += 1
+            self._max_depth = max(self._max_depth, self._queued)
+            self._dispatch_locked()
+        return job.future
+
+    def _dispatch_locked(self) -> None:
+        while self._inflight < self._max_inflight:
+            job = self._pick_locked()
+            if job is None:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                # 调用方已取消（如 await 被取消），直接丢弃
+                continue
+            self._waits[job.priority].append(time.monotonic() - job.enqueued_at)
+            self._inflight += 1
+            try:
+                self._pool.submit(self._run, job)
+            except RuntimeError as e:
+                self._inflight -= 1
+                job.future.set_exception(e)
+
+    def _pick_locked(self) -> Optional[_ComputeJob]:
+        if self._queued <= 0:
+            return None
+        now = time.monotonic()
+        chosen: Optional[int] = None
+        chosen_rank = 0.0
+        for p in ComputePriority:
+            queues = self._queues[p]
+            if not queues:
+                continue
+            oldest = min(q[0].enqueued_at for q in queues.values())
+            rank = p - int((now - oldest) / self._aging_sec)
+            if chosen is None or rank < chosen_rank:
+                chosen, chosen_rank = p, rank
+        if chosen is None:
+            return None
+
+        queues = self._queues[chosen]
+        rr = self._rr[chosen]
+        key = rr[0]
+        q = queues[key]
+        job = q.popleft()
+        self._queued -= 1
+        served_key = (chosen, key)
+        served = self._served.get(served_key, 0) + 1
+        if not q:
+            del queues[key]
+            rr.popleft()
+            self._served.pop(served_key, None)
+        elif served >= self._weights.get(key, 1):
+            rr.rotate(-1)
+            self._served.pop(served_key, None)
+        else:
+            self._served[served_key] = served
+        return job
+
+    def _run(self, job: _ComputeJob) -> None:
+        result = error = None
+        try:
+            result = job.func(*job.args)
+        except BaseException as e:
+            error = e
+        # 先释放在途名额并派发下一个任务，再唤醒调用方
+        with self._lock:
+            self._inflight -= 1
+            self._completed += 1
+            if not self._closed:
+                self._dispatch_locked()
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_priority = {}
+            by_emulator: Dict[str, int] = {}
+            for p in ComputePriority:
+                queued = 0
+                for key, q in self._queues[p].items():
+                    queued += len(q)
+                    by_emulator[key] = by_emulator.get(key, 0) + len(q)
+                waits = sorted(self._waits[p])
+                by_priority[p.name.lower()] = {
+                    "queued": queued,
+                    "wait_ms_p50": _percentile_ms(waits, 0.50),
+                    "wait_ms_p95": _percentile_ms(waits, 0.95),
+                }
+            return {
+                "max_workers": self._max_inflight,
+                "inflight": self._inflight,
+                "queued": self._queued,
+                "max_depth": self._max_depth,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "by_priority": by_priority,
+                "by_emulator": by_emulator,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            pending: List[_ComputeJob] = []
+            for p in ComputePriority:
+                for q in self._queues[p].values():
+                    pending.extend(q)
+                self._queues[p].clear()
+                self._rr[p].clear()
+            self._served.clear()
+            self._queued = 0
+        for job in pending:
+            job.future.cancel()
+
+
+def _percentile_ms(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return round(ordered[idx] * 1000.0, 2)
+
+
+def get_compute_scheduler() -> FairComputeScheduler:
+    """获取计算线程池的公平调度器。"""
+    global _compute_scheduler
+    if _compute_scheduler is None:
+        with _compute_lock:
+            if _compute_scheduler is None:
+                pool = get_compute_pool()
+                _compute_scheduler = FairComputeScheduler(pool, _compute_pool_size)
+    return _compute_scheduler
+
+
+def set_compute_weight(emulator: str, weight: int) -> None:
+    """设置模拟器在计算池轮询中的权重（默认 1）。"""
+    get_compute_scheduler().set_weight(str(emulator or _GLOBAL_COMPUTE_KEY), weight)
+
+
+def compute_pool_stats() -> dict:
+    """返回计算线程池排队统计（队列深度、在途数、各优先级等待时间）。"""
+    if _compute_scheduler is None:
+        return {"max_workers": 0, "inflight": 0, "queued": 0}
+    return _compute_scheduler.stats()
+
+
 def get_emulator_io_pool(io_key: str) -> ThreadPoolExecutor:
     """获取指定模拟器的单线程 I/O 池。"""
     key = str(io_key or "").strip()
@@ -127,10 +363,35 @@ async def run_in_emulator_io(io_key: str, func, *args):
                 _emu_io_inflight[key] = current - 1
 
 
-async def run_in_compute(func, *args):
-    """在计算线程池中执行同步函数并 await 结果。"""
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(get_compute_pool(), func, *args)
+async def run_in_compute(
+    func,
+    *args,
+    emulator: str = "",
+    priority: ComputePriority = ComputePriority.INTERACTIVE,
+    backend: str = "thread",
+):
+    """在计算池中执行同步函数并 await 结果。
+
+    Args:
+        emulator: 提交方模拟器标识（通常为 adb_addr），用于公平轮询；空为全局队列
+        priority: 任务优先级，见 ComputePriority
+        backend: "thread"（默认，计算线程池）| "process"（计算进程池，
+            大帧经共享内存传递；func 须可 pickle，进程池不可用时回退线程池）
+
+    emulator / priority 作用于线程后端的公平调度；进程池按提交顺序执行。
+    """
+    if backend == "process":
+        from .process_pool import ProcessPoolUnavailable, note_fallback, run_in_process
+
+        try:
+            return await run_in_process(func, *args)
+        except ProcessPoolUnavailable:
+            if settings.compute_process_pool_size != 0:
+                note_fallback()
+    future = get_compute_scheduler().submit(
+        func, args, key=str(emulator or ""), priority=priority
+    )
+    return await asyncio.wrap_future(future)
 
 
 async def run_in_db(func, *args):
@@ -152,12 +413,52 @@ def emulator_io_pool_stats() -> dict:
         }
 
 
+def _collect_pool_metrics():
+    """抓取时导出计算池排队与模拟器 I/O 池在途任务（按模拟器）。"""
+    stats = compute_pool_stats()
+    with _emu_io_lock:
+        io_inflight = dict(_emu_io_inflight)
+    return [
+        ("oas_compute_inflight", "gauge", "计算池在途任务数", [({}, stats.get("inflight", 0))]),
+        (
+            "oas_compute_queue_depth",
+            "gauge",
+            "计算池排队任务数（按优先级）",
+            [
+                ({"priority": name}, info.get("queued", 0))
+                for name, info in (stats.get("by_priority") or {}).items()
+            ],
+        ),
+        (
+            "oas_compute_queue_depth_by_emulator",
+            "gauge",
+            "计算池排队任务数（按模拟器）",
+            [({"emulator": key}, n) for key, n in (stats.get("by_emulator") or {}).items()],
+        ),
+        (
+            "oas_emulator_io_inflight",
+            "gauge",
+            "模拟器 I/O 池在途任务数",
+            [({"emulator": key}, n) for key, n in io_inflight.items()],
+        ),
+    ]
+
+
+metrics.register_collector(_collect_pool_metrics)
+
+
 def shutdown_pools() -> None:
-    """关闭所有线程池（在 app shutdown 时调用）。"""
-    global _io_pool, _compute_pool
+    """关闭所有线程池及计算进程池（在 app shutdown 时调用）。"""
+    global _io_pool, _compute_pool, _compute_scheduler
+    from .process_pool import shutdown_process_pool
+
+    shutdown_process_pool()
     if _io_pool:
         _io_pool.shutdown(wait=False)
         _io_pool = None
+    if _compute_scheduler:
+        _compute_scheduler.shutdown()
+        _compute_scheduler = None
     if _compute_pool:
         _compute_pool.shutdown(wait=False)
         _compute_pool = None
@@ -4,8 +4,11 @@ from .base import Base, engine, SessionLocal, get_db
 from .models import (
     GameAccount, AccountRestConfig, Task, CoopPool,
     Emulator, Log, Worker, TaskRun, RestPlan, SystemConfig,
-    CoopAccount, CoopWindow
+    CoopAccount, CoopWindow, TaskDurationSample,
+    TaskRunRecord, TaskRunRollupMinute, TaskRunRollupHour
 )
+# 注册 SystemConfig 写入监听（任何会话提交 SystemConfig 修改时使缓存失效）
+from . import system_config_cache  # noqa: F401
 
 
 def init_db():
@@ -686,5 +689,5 @@ __all__ = [
     "Base", "engine", "SessionLocal", "get_db", "init_db",
     "GameAccount", "AccountRestConfig", "Task", "CoopPool",
     "Emulator", "Log", "Worker", "TaskRun", "RestPlan", "SystemConfig",
-    "CoopAccount", "CoopWindow"
+    "CoopAccount", "CoopWindow", "TaskDurationSample"
 ]
@@ -0,0 +1,157 @@
+"""
+JSON 列局部更新
+
+GameAccount.task_config 等 JSON 列过去由各写入方整块读出、在 Python 中修改、
+flag_modified 后整块写回：每次 next_time 变化都重写整个 blob，且 web 端与 Worker
+并发写入时后提交的一方会覆盖另一方的修改。
+
+本模块在 SQLite 端用 json_patch / json_set 原地更新指定键，一次 UPDATE 完成、
+无需先读出整行：
+
+    with SessionLocal() as db:
+        patch_task_config(db, account_id, {"签到": {"next_time": "2024-01-02 18:00"}})
+        db.commit()
+
+更新语义（与原 Python 合并逻辑一致）：
+- 值为 dict：合并到该键下的对象（相当于 cfg[key].update(value)），
+  原值不存在或不是对象时先置为 {}
+- 其它值：直接替换 cfg[key]
+
+同一账号的多次修改可先用 TaskConfigPatch 累积，flush 时每个账号一条 UPDATE。
+非 SQLite 数据库回退为行锁（SELECT ... FOR UPDATE）下的 Python 合并。
+"""
+from __future__ import annotations
+
+import json
+from copy import deepcopy
+from typing import Any, Dict, Mapping
+
+from sqlalchemy import String, func, literal, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.orm.util import identity_key
+
+from .models import GameAccount
+
+
+def _dumps(value: Any) -> str:
+    # 必须与 SQLAlchemy JSON 列的默认序列化一致（ensure_ascii=True）：
+    # 列中存的是转义形式 "\u7b7e\u5230"，SQLite 按原始文本比较键名，与未转义的 "签到" 视为不同的键
+    return json.dumps(value)
+
+
+def _json_path(*keys: str) -> str:
+    return "$" + "".join("." + _dumps(str(k)) for k in keys)
+
+
+def merge_json_updates(current: Any, updates: Mapping[str, Any]) -> Dict[str, Any]:
+    """在 Python 中按同样语义应用 updates（非 SQLite 回退 / 内存对象同步）。"""
+    merged = dict(current) if isinstance(current, dict) else {}
+    for key, value in updates.items():
+        if isinstance(value, dict):
+            base = merged.get(key)
+            base = dict(base) if isinstance(base, dict) else {}
+            base.update(deepcopy(value))
+            merged[key] = base
+        else:
+            merged[key] = deepcopy(value)
+    return merged
+
+
+def _sqlite_expr(column, updates: Mapping[str, Any]):
+    """构造 json_set(json_patch(coalesce(col, '{}'), skeleton), path, json(value), ...)。"""
+    # skeleton 中的 {}：按 RFC 7396，已是对象的键保持不变，缺失 / 非对象的键置为 {}
+    skeleton = {key: {} for key, value in updates.items() if isinstance(value, dict)}
+    expr = func.coalesce(column, literal("{}", String))
+    if skeleton:
+        expr = func.json_patch(expr, literal(_dumps(skeleton), String))
+    args = []
+    for key, value in updates.items():
+        if isinstance(value, dict):
+            for field, field_value in value.items():
+                args += [_json_path(key, field), func.json(literal(_dumps(field_value), String))]
+        else:
+            args += [_json_path(key), func.json(literal(_dumps(value), String))]
+    if args:
+        expr = func.json_set(expr, *args)
+    return expr
+
+
+def patch_json_column(
+    db: Session,
+    model: Any,
+    row_id: int,
+    column: str,
+    updates: Mapping[str, Any],
+) -> bool:
+    """局部更新 model.id == row_id 行的 JSON 列（不提交事务）。
+
+    Returns:
+        True 表示该行存在并已更新。
+    """
+    if not updates:
+        return False
+    col = getattr(model, column)
+    if db.get_bind().dialect.name == "sqlite":
+        result = db.execute(
+            update(model)
+            .where(model.id == row_id)
+            .values({column: _sqlite_expr(col, updates)})
+            .execution_options(synchronize_session=False)
+        )
+        # 会话中已加载的对象过期该列，下次访问重新读取
+        obj = db.identity_map.get(identity_key(model, row_id))
+        if obj is not None:
+            db.expire(obj, [column])
+        return result.rowcount > 0
+
+    obj = db.query(model).filter(model.id == row_id).with_for_update().first()
+    if obj is None:
+        return False
+    setattr(obj, column, merge_json_updates(getattr(obj, column), updates))
+    flag_modified(obj, column)
+    return True
+
+
+def patch_task_config(db: Session, account_id: int, updates: Mapping[str, Any]) -> bool:
+    """局部更新 GameAccount.task_config（不提交事务）。"""
+    return patch_json_column(db, GameAccount, account_id, "task_config", updates)
+
+
+class TaskConfigPatch:
+    """按账号累积 task_config 修改，flush 时每个账号一条 UPDATE。"""
+
+    def __init__(self) -> None:
+        self._updates: Dict[int, Dict[str, Any]] = {}
+
+    def set(self, account_id: int, task_key: str, field: str, value: Any) -> "TaskConfigPatch":
+        """设置 task_config[task_key][field] = value（后设置的覆盖先设置的）。"""
+        task = self._updates.setdefault(account_id, {}).setdefault(task_key, {})
+        task[field] = value
+        return self
+
+    def updates(self, account_id: int) -> Dict[str, Any]:
+        return deepcopy(self._updates.get(account_id, {}))
+
+    def __bool__(self) -> bool:
+        return bool(self._updates)
+
+    def __len__(self) -> int:
+        return len(self._updates)
+
+    def flush(self, db: Session) -> int:
+        """执行累积的修改（不提交事务），返回更新的账号数。"""
+        updated = 0
+        for account_id, updates in self._updates.items():
+            if patch_task_config(db, account_id, updates):
+                updated += 1
+        self._updates.clear()
+        return updated
+
+
+__all__ = [
+    "TaskConfigPatch",
+    "merge_json_updates",
+    "patch_json_column",
+    "patch_task_config",
+]
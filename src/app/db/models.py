@@ -232,6 +232,76 @@ class TaskRun(Base):
     emulator = relationship("Emulator")
 
 
+class TaskDurationSample(Base):
+    """任务耗时样本（供调度器预估批次耗时）"""
+    __tablename__ = "task_duration_samples"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_type = Column(String(50), nullable=False, index=True)
+    account_id = Column(Integer, nullable=True, index=True)
+    emulator_id = Column(Integer, nullable=True)
+    duration_sec = Column(Float, nullable=False)
+    success = Column(Boolean, default=True)
+    finished_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class TaskRunRecord(Base):
+    """任务运行流水（只追加，由 WorkerActor 每个 intent 结束后批量写入）"""
+    __tablename__ = "task_run_records"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_type = Column(String(50), nullable=False, index=True)
+    account_id = Column(Integer, nullable=True, index=True)
+    emulator_id = Column(Integer, nullable=True, index=True)
+    started_at = Column(DateTime, nullable=False, index=True)  # UTC
+    finished_at = Column(DateTime, nullable=False)
+    duration_sec = Column(Float, nullable=False)
+    outcome = Column(String(20), nullable=False, index=True)  # succeeded|failed
+    error_code = Column(String(50), nullable=True)
+    capture_count = Column(Integer, default=0)
+    detect_count = Column(Integer, default=0)
+
+
+class TaskRunRollupMinute(Base):
+    """任务运行分钟级汇总（按 task_run_records 增量维护）"""
+    __tablename__ = "task_run_rollup_minute"
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_start = Column(DateTime, nullable=False, index=True)  # UTC，整分钟
+    task_type = Column(String(50), nullable=False)
+    total = Column(Integer, default=0)
+    succeeded = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    duration_sum = Column(Float, default=0.0)
+    duration_max = Column(Float, default=0.0)
+    capture_sum = Column(Integer, default=0)
+    detect_sum = Column(Integer, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('bucket_start', 'task_type', name='ux_task_run_rollup_minute'),
+    )
+
+
+class TaskRunRollupHour(Base):
+    """任务运行小时级汇总（按 task_run_records 增量维护）"""
+    __tablename__ = "task_run_rollup_hour"
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_start = Column(DateTime, nullable=False, index=True)  # UTC，整点
+    task_type = Column(String(50), nullable=False)
+    total = Column(Integer, default=0)
+    succeeded = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    duration_sum = Column(Float, default=0.0)
+    duration_max = Column(Float, default=0.0)
+    capture_sum = Column(Integer, default=0)
+    detect_sum = Column(Integer, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('bucket_start', 'task_type', name='ux_task_run_rollup_hour'),
+    )
+
+
 class RestPlan(Base):
     """休息计划表"""
     __tablename__ = "rest_plans"
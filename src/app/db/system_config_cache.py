@@ -0,0 +1,99 @@
+"""
+SystemConfig 版本化缓存
+
+WorkerActor 每个批次都要重新查询 SystemConfig（确保 capture_method 等配置实时生效）。
+SystemConfig 是单行表且很少修改，这里缓存一份 detach 的副本：
+
+- 任何会话提交了 SystemConfig 的新增 / 修改 / 删除（web 系统设置路由等）时版本号 +1，
+  缓存失效，下次 get() 重新加载
+- 另有 TTL 兜底，覆盖其它进程直接改库的情况（system_config_cache_ttl_sec，0 表示不缓存）
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from .base import SessionLocal
+from .models import SystemConfig
+
+# 按模块名区分：模块以 app. / src.app. 两种路径导入时各自注册一组监听器，
+# 每组只处理自己的标记，互不抢占，各自的缓存实例都能失效
+_PENDING_KEY = f"{__name__}.system_config_dirty"
+
+
+class SystemConfigCache:
+    """进程内 SystemConfig 缓存（线程安全）。"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._row: Optional[SystemConfig] = None
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+        self.version = 0
+        self.loads = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+
+    def _load(self) -> Optional[SystemConfig]:
+        with self._session_factory() as db:
+            row = db.query(SystemConfig).order_by(SystemConfig.id.asc()).first()
+            if row is not None:
+                db.expunge(row)
+            return row
+
+    def get(self) -> Optional[SystemConfig]:
+        """返回 detach 的 SystemConfig 副本（调用方不应修改返回对象）。"""
+        ttl = float(getattr(settings, "system_config_cache_ttl_sec", 30.0))
+        with self._lock:
+            version = self.version
+            fresh = (
+                self._loaded_version == version
+                and ttl > 0
+                and time.monotonic() - self._loaded_at < ttl
+            )
+            if fresh:
+                return self._row
+        row = self._load()
+        with self._lock:
+            self.loads += 1
+            # 加载期间又发生了写入时不缓存，下次重新加载
+            if self.version == version:
+                self._row = row
+                self._loaded_version = version
+                self._loaded_at = time.monotonic()
+        return row
+
+
+system_config_cache = SystemConfigCache()
+
+
+def _mark_system_config_writes(session: Session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, SystemConfig):
+            session.info[_PENDING_KEY] = True
+            return
+
+
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(_PENDING_KEY, False):
+        system_config_cache.invalidate()
+
+
+def _clear_after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(Session, "after_flush", _mark_system_config_writes)
+event.listen(Session, "after_commit", _invalidate_after_commit)
+event.listen(Session, "after_soft_rollback", _clear_after_rollback)
+
+
+__all__ = ["SystemConfigCache", "system_config_cache"]
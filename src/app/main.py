@@ -2,6 +2,7 @@
 Main application entrypoint
 """
 import asyncio
+import time
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -11,6 +12,7 @@ from fastapi.responses import FileResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 
+from .core.startup_profiler import startup_profiler
 from .core.logger import logger, setup_logger
 from .core.config import settings, BASE_DIR
 from .db import init_db
@@ -83,14 +85,24 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup() -> None:
-    setup_logger(force=True)
+    with startup_profiler.phase("setup_logger"):
+        setup_logger(force=True)
     logger.info("starting app ...")
-    init_db()
-    register_routers(app)
-    _mount_frontend(app)
+    with startup_profiler.phase("init_db"):
+        init_db()
+    with startup_profiler.phase("register_routers"):
+        register_routers(app)
+    with startup_profiler.phase("mount_frontend"):
+        _mount_frontend(app)
+    if settings.loop_monitor_enabled:
+        from .core.loop_monitor import loop_monitor
+        loop_monitor.start()
     # 后台初始化 OCR 实例池（不阻塞应用启动）
     asyncio.create_task(_init_ocr_pools())
     logger.info(f"app started at {settings.api_host}:{settings.api_port}")
+    logger.info(f"启动阶段耗时: {startup_profiler.phase_summary()}")
+    # --profile-startup：此后的导入属于运行期按需加载，不再计入启动分析
+    startup_profiler.disable_import_tracking()
 
 
 async def _init_ocr_pools() -> None:
@@ -98,8 +110,12 @@ async def _init_ocr_pools() -> None:
     from .modules.ocr.engine import init_digit_pool, configure_tesseract
     from .core.thread_pool import run_in_compute
     try:
+        started = time.perf_counter()
         configure_tesseract()
         await run_in_compute(init_digit_pool, settings.digit_ocr_pool_size)
+        startup_profiler.record_phase(
+            "init_ocr_pools(background)", (time.perf_counter() - started) * 1000
+        )
     except Exception as e:
         logger.warning(f"OCR 引擎初始化失败（将回退到单例模式）: {e}")
 
@@ -112,6 +128,12 @@ async def shutdown() -> None:
     await scan_task_poller.stop()
     await feeder.stop()
     await executor_service.stop()
+    from .core.loop_monitor import loop_monitor
+    await loop_monitor.stop()
+    from .modules.vision.persistent_cache import shutdown_persistent_detect_cache
+    shutdown_persistent_detect_cache()
+    from .modules.emu.registry import adapter_registry
+    adapter_registry.disconnect_all()
     from .core.thread_pool import shutdown_pools
     shutdown_pools()
     logger.info("shutdown complete")
@@ -22,10 +22,19 @@ import numpy as np
 
 from loguru import logger as _logger
 
+from ...core.metrics import metrics
 from .adb import Adb, AdbError
+from .frame_ring import FrameRing, get_frame_ring, record_action, record_frame
 from .ipc import IpcAdapter, IpcConfig, IpcNotConfigured
 from .manager import MuMuManager, MuMuManagerError
 
+_CAPTURE_SECONDS = metrics.histogram(
+    "oas_capture_seconds", "截图耗时（秒）", ["emulator", "method", "format"]
+)
+_CAPTURE_FAILURES = metrics.counter(
+    "oas_capture_failures", "截图失败次数", ["emulator", "method"]
+)
+
 
 @dataclass
 class AdapterConfig:
@@ -43,6 +52,8 @@ class EmulatorAdapter:
     # 活动心跳注册表：adb_addr -> monotonic timestamp
     # Worker 的 watchdog 通过此注册表检测任务是否卡死
     _heartbeat: dict[str, float] = {}
+    # 截图计数：adb_addr -> 累计截图次数（WorkerActor 按 intent 取差值写入运行流水）
+    _capture_counts: dict[str, int] = {}
 
     @staticmethod
     def touch_heartbeat(adb_addr: str) -> None:
@@ -52,11 +63,17 @@ class EmulatorAdapter:
     def get_heartbeat(adb_addr: str) -> float:
         return EmulatorAdapter._heartbeat.get(adb_addr, 0.0)
 
+    @staticmethod
+    def get_capture_count(adb_addr: str) -> int:
+        return EmulatorAdapter._capture_counts.get(adb_addr, 0)
+
     def __init__(self, cfg: AdapterConfig) -> None:
         self.cfg = cfg
         self.adb = Adb(cfg.adb_path)
         self.ipc = IpcAdapter(IpcConfig(cfg.ipc_dll_path) if cfg.ipc_dll_path else None)
         EmulatorAdapter._heartbeat[cfg.adb_addr] = time.monotonic()
+        # 连续截图失败次数（AdapterRegistry 据此判定是否重建）
+        self.consecutive_failures = 0
 
         manager_path = (cfg.mumu_manager_path or "").strip()
         if manager_path and Path(manager_path).exists():
@@ -69,6 +86,11 @@ class EmulatorAdapter:
                     manager_path,
                 )
 
+    @property
+    def frame_ring(self) -> FrameRing:
+        """该模拟器最近 N 帧截图（按 adb 地址共享）。"""
+        return get_frame_ring(self.cfg.adb_addr)
+
     # 运行状态保障（示例：若使用 MuMu，可确保实例已启动并连接）
     def ensure_running(self) -> bool:
         launch_ok = False
@@ -129,38 +151,67 @@ class EmulatorAdapter:
 
     def capture(self, method: str = "adb") -> bytes:
         EmulatorAdapter._heartbeat[self.cfg.adb_addr] = time.monotonic()
-        if method == "adb":
-            return self.adb.screencap(self.cfg.adb_addr)
-        elif method == "ipc":
-            return self.ipc.screencap(
-                nemu_folder=self.cfg.nemu_folder, instance_id=self.cfg.instance_id
-            )
-        else:
-            raise ValueError("未知截图方式：%s" % method)
+        start = time.perf_counter()
+        try:
+            if method == "adb":
+                data = self.adb.screencap(self.cfg.adb_addr)
+            elif method == "ipc":
+                data = self.ipc.screencap(
+                    nemu_folder=self.cfg.nemu_folder, instance_id=self.cfg.instance_id
+                )
+            else:
+                raise ValueError("未知截图方式：%s" % method)
+        except Exception:
+            self.consecutive_failures += 1
+            _CAPTURE_FAILURES.labels(emulator=self.cfg.adb_addr, method=method).inc()
+            raise
+        self.consecutive_failures = 0
+        counts = EmulatorAdapter._capture_counts
+        counts[self.cfg.adb_addr] = counts.get(self.cfg.adb_addr, 0) + 1
+        _CAPTURE_SECONDS.labels(
+            emulator=self.cfg.adb_addr, method=method, format="png"
+        ).observe(time.perf_counter() - start)
+        record_frame(self.cfg.adb_addr, data, method)
+        return data
 
     def capture_ndarray(self, method: str = "adb") -> np.ndarray:
         """截图并直接返回 BGR ndarray，避免 PNG encode/decode 往返。"""
         EmulatorAdapter._heartbeat[self.cfg.adb_addr] = time.monotonic()
-        if method == "ipc":
-            return self.ipc.screencap_ndarray(
-                nemu_folder=self.cfg.nemu_folder, instance_id=self.cfg.instance_id
-            )
-        elif method == "adb":
-            png = self.adb.screencap(self.cfg.adb_addr)
-            arr = np.frombuffer(png, dtype=np.uint8)
-            mat = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-            if mat is None:
-                raise ValueError("ADB 截图解码失败")
-            return mat
-        else:
-            raise ValueError("未知截图方式：%s" % method)
+        start = time.perf_counter()
+        try:
+            if method == "ipc":
+                mat = self.ipc.screencap_ndarray(
+                    nemu_folder=self.cfg.nemu_folder, instance_id=self.cfg.instance_id
+                )
+            elif method == "adb":
+                png = self.adb.screencap(self.cfg.adb_addr)
+                arr = np.frombuffer(png, dtype=np.uint8)
+                mat = cv2.imdecode(arr, cv2.IMREAD_COLOR)
+                if mat is None:
+                    raise ValueError("ADB 截图解码失败")
+            else:
+                raise ValueError("未知截图方式：%s" % method)
+        except Exception:
+            self.consecutive_failures += 1
+            _CAPTURE_FAILURES.labels(emulator=self.cfg.adb_addr, method=method).inc()
+            raise
+        self.consecutive_failures = 0
+        counts = EmulatorAdapter._capture_counts
+        counts[self.cfg.adb_addr] = counts.get(self.cfg.adb_addr, 0) + 1
+        _CAPTURE_SECONDS.labels(
+            emulator=self.cfg.adb_addr, method=method, format="ndarray"
+        ).observe(time.perf_counter() - start)
+        record_frame(self.cfg.adb_addr, mat, method)
+        return mat
 
     def tap(self, x: int, y: int) -> None:
         EmulatorAdapter._heartbeat[self.cfg.adb_addr] = time.monotonic()
         self.adb.tap(self.cfg.adb_addr, x, y)
+        record_action(self.cfg.adb_addr, f"tap {x},{y}")
 
     def swipe(self, x1: int, y1: int, x2: int, y2: int, dur_ms: int = 300) -> None:
         self.adb.swipe(self.cfg.adb_addr, x1, y1, x2, y2, dur_ms)
+        record_action(self.cfg.adb_addr, f"swipe {x1},{y1}-{x2},{y2}")
 
     def foreground(self) -> bool:
         # 预留：可通过 dumpsys activity/top 解析当前前台 activity
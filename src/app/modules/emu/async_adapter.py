@@ -16,6 +16,7 @@ from typing import Optional
 
 from ...core.thread_pool import run_in_emulator_io
 from .adapter import EmulatorAdapter, AdapterConfig
+from .frame_ring import FrameRing
 
 
 class AsyncEmulatorAdapter:
@@ -50,6 +51,10 @@ class AsyncEmulatorAdapter:
     def mumu(self):
         return self._sync.mumu
 
+    @property
+    def frame_ring(self) -> FrameRing:
+        return self._sync.frame_ring
+
     # ── 心跳代理（轻量操作，无需 offload） ──
 
     @staticmethod
@@ -0,0 +1,229 @@
+"""
+模拟器帧环形缓冲
+
+每次 capture / capture_ndarray 的结果按 adb 地址写入环形缓冲（保存引用，不复制），
+附带时间戳与截图之后发生的操作（tap / swipe）标注：
+
+- 失败截图：直接取缓冲中最近的帧，不再额外截图（失败瞬间的画面往往已经消失）
+- 调试接口 / emulators_test 截图：可读取最近帧，避免与运行中的任务争抢截图
+- 落盘：PNG 编码与写文件在 I/O 线程池中异步执行，不阻塞调用方
+
+缓冲按 adb 地址共享（与 EmulatorAdapter 心跳注册表一致），
+任务间重建 adapter 不会丢失历史帧。
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from ...core.config import settings
+
+# 单帧最多记录的操作标注数
+_MAX_ACTIONS = 8
+
+
+@dataclass
+class FrameRecord:
+    """一帧截图：image 为 BGR ndarray 或 PNG bytes（保存原始引用）。"""
+
+    seq: int
+    ts: float  # time.time()
+    mono: float  # time.monotonic()
+    image: Any
+    method: str = ""
+    actions: List[str] = field(default_factory=list)
+
+    @property
+    def age_ms(self) -> float:
+        return (time.monotonic() - self.mono) * 1000
+
+    def meta(self) -> dict:
+        return {
+            "seq": self.seq,
+            "ts": round(self.ts, 3),
+            "age_ms": round(self.age_ms, 1),
+            "method": self.method,
+            "kind": "png" if isinstance(self.image, (bytes, bytearray)) else "ndarray",
+            "actions": list(self.actions),
+        }
+
+
+class FrameRing:
+    """单个模拟器最近 N 帧的环形缓冲（线程安全）。"""
+
+    def __init__(self, size: int = 8) -> None:
+        self.size = max(1, int(size))
+        self._frames: Deque[FrameRecord] = deque(maxlen=self.size)
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def push(self, image: Any, *, method: str = "") -> Optional[FrameRecord]:
+        if image is None:
+            return None
+        with self._lock:
+            self._seq += 1
+            record = FrameRecord(
+                seq=self._seq,
+                ts=time.time(),
+                mono=time.monotonic(),
+                image=image,
+                method=method,
+            )
+            self._frames.append(record)
+        return record
+
+    def annotate(self, action: str) -> None:
+        """为最近一帧追加操作标注（如 "tap 120,340"）。"""
+        with self._lock:
+            if not self._frames:
+                return
+            actions = self._frames[-1].actions
+            if len(actions) < _MAX_ACTIONS:
+                actions.append(action)
+
+    def latest(self, max_age_ms: Optional[float] = None) -> Optional[FrameRecord]:
+        with self._lock:
+            record = self._frames[-1] if self._frames else None
+        if record is None:
+            return None
+        if max_age_ms is not None and record.age_ms > max_age_ms:
+            return None
+        return record
+
+    def snapshot(self, since: Optional[float] = None) -> List[FrameRecord]:
+        """按时间顺序返回缓冲中的帧（旧 → 新）；since 为 time.time() 时间戳，只返回此后的帧。"""
+        with self._lock:
+            frames = list(self._frames)
+        if since is not None:
+            frames = [r for r in frames if r.ts >= since]
+        return frames
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+
+_rings: Dict[str, FrameRing] = {}
+_rings_lock = threading.Lock()
+
+
+def frame_ring_enabled() -> bool:
+    return int(getattr(settings, "emulator_frame_ring_size", 8)) > 0
+
+
+def get_frame_ring(adb_addr: str) -> FrameRing:
+    ring = _rings.get(adb_addr)
+    if ring is None:
+        with _rings_lock:
+            ring = _rings.get(adb_addr)
+            if ring is None:
+                ring = _rings[adb_addr] = FrameRing(
+                    int(getattr(settings, "emulator_frame_ring_size", 8))
+                )
+    return ring
+
+
+def record_frame(adb_addr: str, image: Any, method: str = "") -> None:
+    """adapter 截图后调用：写入该模拟器的环形缓冲。"""
+    if frame_ring_enabled():
+        get_frame_ring(adb_addr).push(image, method=method)
+
+
+def record_action(adb_addr: str, action: str) -> None:
+    """adapter 执行操作后调用：标注到最近一帧。"""
+    if frame_ring_enabled():
+        ring = _rings.get(adb_addr)
+        if ring is not None:
+            ring.annotate(action)
+
+
+def latest_frame(adb_addr: str, max_age_ms: Optional[float] = None) -> Optional[FrameRecord]:
+    ring = _rings.get(adb_addr)
+    return ring.latest(max_age_ms) if ring is not None else None
+
+
+def ring_stats() -> Dict[str, dict]:
+    with _rings_lock:
+        items = list(_rings.items())
+    out: Dict[str, dict] = {}
+    for addr, ring in items:
+        latest = ring.latest()
+        out[addr] = {
+            "frames": len(ring),
+            "size": ring.size,
+            "latest_age_ms": round(latest.age_ms, 1) if latest else None,
+        }
+    return out
+
+
+# ── 编码与落盘 ──
+
+
+def encode_png(image: Any) -> bytes:
+    """帧转 PNG bytes（PNG 原样返回）。"""
+    if isinstance(image, (bytes, bytearray)):
+        return bytes(image)
+    import cv2  # type: ignore
+
+    ok, buf = cv2.imencode(".png", image)
+    if not ok:
+        raise ValueError("PNG 编码失败")
+    return buf.tobytes()
+
+
+def _safe_name(text: str) -> str:
+    return re.sub(r"[^0-9A-Za-z_\-.,]+", "_", text)[:40]
+
+
+def write_frames(records: List[FrameRecord], path: str, *, history_dir: Optional[str] = None) -> List[Path]:
+    """同步落盘：最新帧写入 path，其余帧（含操作标注）写入 history_dir。"""
+    written: List[Path] = []
+    if not records:
+        return written
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(encode_png(records[-1].image))
+    written.append(target)
+    if history_dir and len(records) > 1:
+        hdir = Path(history_dir)
+        hdir.mkdir(parents=True, exist_ok=True)
+        for idx, rec in enumerate(records[:-1]):
+            stamp = time.strftime("%H%M%S", time.localtime(rec.ts)) + f"{int(rec.ts * 1000) % 1000:03d}"
+            action = _safe_name("+".join(rec.actions)) if rec.actions else "idle"
+            out = hdir / f"{idx:02d}_{stamp}_{action}.png"
+            out.write_bytes(encode_png(rec.image))
+            written.append(out)
+    return written
+
+
+def write_frames_async(
+    records: List[FrameRecord], path: str, *, history_dir: Optional[str] = None
+) -> Future:
+    """提交到 I/O 线程池落盘，立即返回 Future（调用方无需等待）。"""
+    from ...core.thread_pool import get_io_pool
+
+    return get_io_pool().submit(write_frames, list(records), path, history_dir=history_dir)
+
+
+__all__ = [
+    "FrameRecord",
+    "FrameRing",
+    "encode_png",
+    "frame_ring_enabled",
+    "get_frame_ring",
+    "latest_frame",
+    "record_action",
+    "record_frame",
+    "ring_stats",
+    "write_frames",
+    "write_frames_async",
+]
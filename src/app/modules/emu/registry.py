@@ -0,0 +1,233 @@
+"""
+进程级模拟器适配器注册表
+
+过去每个执行器的 _build_adapter 与 web 路由都会新建 EmulatorAdapter，
+连带新建 IpcAdapter：重新加载 DLL、nemu_connect、查询分辨率。
+AdapterRegistry 按 adb 地址复用长期存活的 adapter：
+
+- 引用计数：acquire / release 成对调用；计数归零后 adapter 仍保留，下次直接复用
+- 配置变更失效：连接相关配置（adb 路径、IPC DLL、MuMu 目录、实例 ID）变化时重建，
+  旧 adapter 若仍被占用，待最后一次 release 后再断开；
+  仅 pkg_name / activity_name 不同的调用方拿到共享同一连接的轻量 adapter
+- 健康检查：adapter 连续截图失败达到阈值后，下次 acquire 时重建（IPC 重新连接）
+- 显式断开：应用关闭时 disconnect_all() 断开所有 IPC 连接
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import astuple, dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+
+from loguru import logger as _logger
+
+from ...core.config import settings
+from .adapter import AdapterConfig, EmulatorAdapter
+
+
+# 决定底层连接（ADB / IPC / MuMu）的配置项；其余项（pkg_name 等）只影响调用参数
+_CONNECTION_FIELDS = (
+    "adb_path",
+    "adb_addr",
+    "ipc_dll_path",
+    "mumu_manager_path",
+    "nemu_folder",
+    "instance_id",
+)
+
+
+def _connection_key(cfg: AdapterConfig) -> tuple:
+    return tuple(getattr(cfg, name) for name in _CONNECTION_FIELDS)
+
+
+@dataclass
+class _Entry:
+    """单个模拟器的 adapter 组：连接配置相同、pkg_name 等调用参数不同的 adapter 共享连接。"""
+
+    conn: tuple
+    primary: EmulatorAdapter
+    views: Dict[tuple, EmulatorAdapter] = field(default_factory=dict)
+    refs: int = 0
+    created: float = field(default_factory=time.monotonic)
+    acquired: int = 0
+
+    def owns(self, adapter: EmulatorAdapter) -> bool:
+        return any(view is adapter for view in self.views.values())
+
+    @property
+    def failures(self) -> int:
+        return max(view.consecutive_failures for view in self.views.values())
+
+
+def _disconnect(entry: _Entry) -> None:
+    try:
+        entry.primary.ipc.disconnect()
+    except Exception as exc:
+        _logger.debug("断开 IPC 连接异常: {}", exc)
+
+
+class AdapterRegistry:
+    """按 adb 地址复用 EmulatorAdapter（线程安全）。"""
+
+    def __init__(
+        self,
+        factory: Callable[[AdapterConfig], EmulatorAdapter] = EmulatorAdapter,
+    ) -> None:
+        self._factory = factory
+        self._entries: Dict[str, _Entry] = {}
+        # 已失效但仍被占用的条目（最后一次 release 时断开）
+        self._retired: List[_Entry] = []
+        self._lock = threading.Lock()
+        self._created = 0
+        self._reused = 0
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(getattr(settings, "emulator_adapter_registry_enabled", True))
+
+    @staticmethod
+    def _max_failures() -> int:
+        return max(1, int(getattr(settings, "emulator_adapter_max_failures", 3)))
+
+    def acquire(self, cfg: AdapterConfig) -> EmulatorAdapter:
+        """获取 cfg.adb_addr 对应的 adapter（引用计数 +1）。"""
+        if not self.enabled():
+            return self._factory(cfg)
+        to_close: Optional[_Entry] = None
+        conn = _connection_key(cfg)
+        with self._lock:
+            entry = self._entries.get(cfg.adb_addr)
+            if entry is not None:
+                reason = ""
+                if entry.conn != conn:
+                    reason = "连接配置变更"
+                elif entry.failures >= self._max_failures():
+                    reason = f"连续失败 {entry.failures} 次"
+                if reason:
+                    _logger.info("适配器失效重建: addr={}, 原因={}", cfg.adb_addr, reason)
+                    to_close = self._retire_locked(cfg.adb_addr)
+                    entry = None
+            view_key = astuple(cfg)
+            if entry is None:
+                adapter = self._factory(cfg)
+                entry = self._entries[cfg.adb_addr] = _Entry(conn, adapter, {view_key: adapter})
+                self._created += 1
+            else:
+                adapter = entry.views.get(view_key)
+                if adapter is None:
+                    # 仅调用参数不同：新建轻量 adapter，复用已有连接
+                    adapter = self._factory(cfg)
+                    adapter.adb = entry.primary.adb
+                    adapter.ipc = entry.primary.ipc
+                    adapter.mumu = entry.primary.mumu
+                    entry.views[view_key] = adapter
+                self._reused += 1
+            entry.refs += 1
+            entry.acquired += 1
+        if to_close is not None:
+            _disconnect(to_close)
+        return adapter
+
+    def release(self, adapter: EmulatorAdapter) -> None:
+        """归还 adapter（引用计数 -1）。已失效的 adapter 组在最后一次归还时断开。"""
+        to_close: Optional[_Entry] = None
+        with self._lock:
+            retired = next((e for e in self._retired if e.owns(adapter)), None)
+            if retired is not None:
+                retired.refs = max(0, retired.refs - 1)
+                if retired.refs == 0:
+                    self._retired.remove(retired)
+                    to_close = retired
+            else:
+                addr = getattr(getattr(adapter, "cfg", None), "adb_addr", None)
+                entry = self._entries.get(addr) if addr else None
+                if entry is not None and entry.owns(adapter):
+                    entry.refs = max(0, entry.refs - 1)
+        if to_close is not None:
+            _disconnect(to_close)
+
+    @contextmanager
+    def lease(self, cfg: AdapterConfig) -> Iterator[EmulatorAdapter]:
+        """acquire / release 的上下文管理器形式（web 路由等短时调用）。"""
+        adapter = self.acquire(cfg)
+        try:
+            yield adapter
+        finally:
+            self.release(adapter)
+
+    def get(self, adb_addr: str) -> Optional[EmulatorAdapter]:
+        """查询缓存的 adapter（不计引用）。"""
+        with self._lock:
+            entry = self._entries.get(adb_addr)
+            return entry.primary if entry else None
+
+    def _retire_locked(self, adb_addr: str) -> Optional[_Entry]:
+        """移除条目；空闲则返回待断开的条目，仍被占用则延后到 release。"""
+        entry = self._entries.pop(adb_addr, None)
+        if entry is None:
+            return None
+        if entry.refs > 0:
+            self._retired.append(entry)
+            return None
+        return entry
+
+    def invalidate(self, adb_addr: Optional[str] = None) -> None:
+        """使指定（或全部）adapter 失效，下次 acquire 时重建。"""
+        with self._lock:
+            addrs = [adb_addr] if adb_addr else list(self._entries)
+            to_close = [e for e in (self._retire_locked(addr) for addr in addrs) if e]
+        for entry in to_close:
+            _disconnect(entry)
+
+    def check_health(self, adb_addr: str) -> bool:
+        """主动检查 ADB 连接；设备不在线时使 adapter 失效。"""
+        adapter = self.get(adb_addr)
+        if adapter is None:
+            return False
+        try:
+            healthy = adb_addr in adapter.adb.devices()
+        except Exception:
+            healthy = False
+        if not healthy:
+            self.invalidate(adb_addr)
+        return healthy
+
+    def disconnect_all(self) -> None:
+        """应用关闭时调用：断开全部 IPC 连接并清空注册表。"""
+        with self._lock:
+            entries = list(self._entries.values()) + self._retired
+            self._entries.clear()
+            self._retired = []
+        for entry in entries:
+            _disconnect(entry)
+        if entries:
+            _logger.info("已断开 {} 个模拟器适配器", len(entries))
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "created": self._created,
+                "reused": self._reused,
+                "retired_in_use": len(self._retired),
+                "adapters": {
+                    addr: {
+                        "refs": e.refs,
+                        "acquired": e.acquired,
+                        "age_sec": round(now - e.created, 1),
+                        "views": len(e.views),
+                        "consecutive_failures": e.failures,
+                    }
+                    for addr, e in self._entries.items()
+                },
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+adapter_registry = AdapterRegistry()
+
+
+__all__ = ["AdapterRegistry", "adapter_registry"]
@@ -1,35 +1,21 @@
 """
 执行器模块
 """
+from importlib import import_module
+
 from .base import BaseExecutor, MockExecutor
-from .delegate_help import DelegateHelpExecutor
-from .collect_login_gift import CollectLoginGiftExecutor
-from .collect_mail import CollectMailExecutor
-from .liao_shop import LiaoShopExecutor
-from .add_friend import AddFriendExecutor
-from .init_executor import InitExecutor
-from .init_collect_reward import InitCollectRewardExecutor
-from .init_rent_shikigami import InitRentShikigamiExecutor
-from .init_newbie_quest import InitNewbieQuestExecutor
-from .init_exp_dungeon import InitExpDungeonExecutor
-from .init_collect_jinnang import InitCollectJinnangExecutor
-from .init_shikigami_train import InitShikigamiTrainExecutor
-from .init_fanhe_upgrade import InitFanheUpgradeExecutor
-from .digui import DiGuiExecutor
-from .explore import ExploreExecutor
-from .xuanshang import XuanShangExecutor
-from .climb_tower import ClimbTowerExecutor
-from .weekly_shop import WeeklyShopExecutor
-from .miwen import MiWenExecutor
-from .signin import SigninExecutor
-from .yuhun import YuHunExecutor
-from .collect_achievement import CollectAchievementExecutor
-from .summon_gift import SummonGiftExecutor
-from .weekly_share import WeeklyShareExecutor
-from .collect_fanhe_jiuhu import CollectFanheJiuhuExecutor
-from .fangka import FangkaExecutor
-from .foster import FosterExecutor
-from .team_yuhun import TeamYuhunExecutor
+from .registry import EXECUTOR_MODULES
+
+
+def __getattr__(name: str):
+    """执行器类按需导入（避免导入本包时连带加载全部执行器模块）。"""
+    module = EXECUTOR_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "BaseExecutor",
@@ -62,4 +48,5 @@ __all__ = [
     "FangkaExecutor",
     "FosterExecutor",
     "TeamYuhunExecutor",
+    "DuiyiJingcaiExecutor",
 ]
\ No newline at end of file
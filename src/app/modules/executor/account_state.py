@@ -0,0 +1,182 @@
+"""
+账号状态写回缓存（批次内）
+
+执行器过去每次 OCR 到体力 / 勋章 / 功勋 / 突破票、保存饭盒等级等都单独打开会话、
+查询整行再提交。WorkerActor 在批次开始时为账号建立 AccountState：
+
+- 包装批次加载的（已 detach 的）GameAccount，执行器通过 current_account 直接读取
+- set / update 写入内存并标脏，不立即访问数据库
+- flush 时脏字段在一个事务中一条 UPDATE 写回；Worker 在每个 intent 结束与批次结束时调用
+
+不在批次内的调用方（web 路由、独立脚本）通过 update_account_fields 直接写库。
+"""
+from __future__ import annotations
+
+import threading
+from copy import deepcopy
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import update
+
+from ...core.logger import logger
+from ...core.thread_pool import run_in_db
+from ...db.base import SessionLocal
+from ...db.models import GameAccount
+
+# 允许写回缓存的热字段（task_config 走 db.json_patch 局部更新，不在此列）
+HOT_FIELDS = frozenset(
+    {
+        "level",
+        "stamina",
+        "gouyu",
+        "lanpiao",
+        "gold",
+        "gongxun",
+        "xunzhang",
+        "tupo_ticket",
+        "fanhe_level",
+        "jiuhu_level",
+        "liao_level",
+        "explore_progress",
+    }
+)
+
+
+def _check_fields(fields: Iterable[str]) -> None:
+    unknown = set(fields) - HOT_FIELDS
+    if unknown:
+        raise ValueError(f"不支持写回缓存的字段: {sorted(unknown)}")
+
+
+def _write_fields(account_id: int, values: Dict[str, Any]) -> bool:
+    with SessionLocal() as db:
+        result = db.execute(
+            update(GameAccount).where(GameAccount.id == account_id).values(**values)
+        )
+        db.commit()
+        return result.rowcount > 0
+
+
+class AccountState:
+    """单个账号的批次内状态（线程安全）。"""
+
+    def __init__(self, account: GameAccount) -> None:
+        self.account = account
+        self.account_id: int = account.id
+        self._dirty: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.flushes = 0
+
+    def get(self, field: str, default: Any = None) -> Any:
+        value = getattr(self.account, field, None)
+        return default if value is None else value
+
+    def set(self, field: str, value: Any) -> bool:
+        """写入字段并标脏；值未变化时返回 False。"""
+        return self.update(**{field: value})
+
+    def update(self, **fields: Any) -> bool:
+        _check_fields(fields)
+        changed = False
+        with self._lock:
+            for field, value in fields.items():
+                if getattr(self.account, field, None) == value and field not in self._dirty:
+                    continue
+                value = deepcopy(value) if isinstance(value, (dict, list)) else value
+                setattr(self.account, field, value)
+                self._dirty[field] = value
+                changed = True
+        return changed
+
+    @property
+    def dirty(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._dirty)
+
+    def flush(self) -> int:
+        """同步写回脏字段（一个事务），返回写回的字段数。失败时保留脏字段待下次重试。"""
+        with self._lock:
+            if not self._dirty:
+                return 0
+            values = dict(self._dirty)
+            self._dirty.clear()
+        try:
+            _write_fields(self.account_id, values)
+        except Exception:
+            with self._lock:
+                for field, value in values.items():
+                    self._dirty.setdefault(field, value)
+            raise
+        self.flushes += 1
+        return len(values)
+
+    async def aflush(self) -> int:
+        """在 DB 线程池中写回脏字段，异常只记录日志。"""
+        if not self._dirty:
+            return 0
+        try:
+            return await run_in_db(self.flush)
+        except Exception as e:
+            logger.warning(f"账号状态写回失败: account={self.account_id}, error={e}")
+            return 0
+
+
+_states: Dict[int, AccountState] = {}
+_states_lock = threading.Lock()
+
+
+def open_account_state(account: GameAccount) -> AccountState:
+    """批次开始时为账号建立状态（同一账号已存在时复用并替换包装对象）。"""
+    with _states_lock:
+        state = _states.get(account.id)
+        if state is None:
+            state = _states[account.id] = AccountState(account)
+        else:
+            state.account = account
+        return state
+
+
+def get_account_state(account_id: int) -> Optional[AccountState]:
+    with _states_lock:
+        return _states.get(account_id)
+
+
+async def close_account_state(account_id: int) -> None:
+    """批次结束：写回剩余脏字段并移除状态。"""
+    with _states_lock:
+        state = _states.pop(account_id, None)
+    if state is not None:
+        await state.aflush()
+
+
+def update_account_fields(account_id: int, **fields: Any) -> None:
+    """更新账号热字段：批次内写入 AccountState（延后写回），否则直接写库。"""
+    _check_fields(fields)
+    state = get_account_state(account_id)
+    if state is not None:
+        state.update(**fields)
+        return
+    _write_fields(account_id, fields)
+
+
+def read_account_field(account_id: int, field: str, default: Any = None) -> Any:
+    """读取账号热字段：批次内直接取内存值，否则查询数据库。"""
+    state = get_account_state(account_id)
+    if state is not None:
+        return state.get(field, default)
+    with SessionLocal() as db:
+        row = db.query(getattr(GameAccount, field)).filter(GameAccount.id == account_id).first()
+    if row is None or row[0] is None:
+        return default
+    return row[0]
+
+
+__all__ = [
+    "AccountState",
+    "HOT_FIELDS",
+    "close_account_state",
+    "get_account_state",
+    "open_account_state",
+    "read_account_field",
+    "update_account_fields",
+]
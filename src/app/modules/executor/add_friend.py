@@ -7,16 +7,14 @@ import asyncio
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus
 from ...core.logger import logger
 from ...core.timeutils import add_hours_to_beijing_time, format_beijing_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
-from ..vision.template import match_template
 from .base import BaseExecutor
 from .helpers import click_template, discover_template_paths, wait_for_template
 
@@ -61,7 +59,7 @@ class AddFriendExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[加好友] 准备: account={account.login_id}")
@@ -165,7 +163,7 @@ class AddFriendExecutor(BaseExecutor):
                 if screenshot is None:
                     break
 
-            jiahaoyou_match = match_template(
+            jiahaoyou_match = await self.vision.match_template(
                 screenshot, "assets/ui/templates/jiahaoyou.png"
             )
             if not jiahaoyou_match:
@@ -218,18 +216,9 @@ class AddFriendExecutor(BaseExecutor):
             next_time = add_hours_to_beijing_time(bj_now_str, 10)
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    friend_cfg = cfg.get("加好友", {})
-                    friend_cfg["next_time"] = next_time
-                    cfg["加好友"] = friend_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"加好友": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[加好友] next_time 更新为 {next_time}")
         except Exception as e:
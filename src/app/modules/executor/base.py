@@ -30,6 +30,26 @@ class BaseExecutor(ABC):
         # 签名: async (current_priority: int) -> list[str]
         # 返回已执行的任务类型名列表（空列表 = 无中断）
         self.interrupt_callback: Optional[Any] = None
+        # 异步识图门面（懒初始化，绑定当前 adapter 的 adb_addr）
+        self._vision: Optional[Any] = None
+        # 从 AdapterRegistry 借出的 adapter，run_task 结束时归还
+        self._acquired_adapters: list = []
+
+    @property
+    def vision(self) -> Any:
+        """获取异步识图门面 VisionContext。
+
+        执行器内的模板匹配、网格检测、OCR 一律经此在计算池中执行，
+        避免同步识图阻塞事件循环。
+        """
+        from ..vision.context import VisionContext
+
+        adapter = getattr(self, "adapter", None) or self.shared_adapter
+        vision = getattr(self, "_vision", None)
+        addr = getattr(getattr(adapter, "cfg", None), "adb_addr", "") or ""
+        if vision is None or vision.emulator != addr:
+            vision = self._vision = VisionContext(addr)
+        return vision
 
     @property
     def popup_handler(self) -> Optional[Any]:
@@ -59,6 +79,20 @@ class BaseExecutor(ABC):
             return self._popup_handler
         return None
 
+    def _acquire_adapter(self, cfg: Any) -> Any:
+        """从进程级 AdapterRegistry 获取该模拟器的长期 adapter（run_task 结束时归还）。"""
+        from ..emu.registry import adapter_registry
+
+        adapter = adapter_registry.acquire(cfg)
+        self._acquired_adapters.append(adapter)
+        return adapter
+
+    def _release_adapters(self) -> None:
+        from ..emu.registry import adapter_registry
+
+        while self._acquired_adapters:
+            adapter_registry.release(self._acquired_adapters.pop())
+
     def _wrap_async(self) -> None:
         """将 shared_adapter/adapter 包装为 AsyncEmulatorAdapter（如果尚未包装）。
 
@@ -285,6 +319,7 @@ class BaseExecutor(ABC):
                 pass
             # 清理
             await self.cleanup()
+            self._release_adapters()
             self.current_task = None
             self.current_account = None
 
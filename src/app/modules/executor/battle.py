@@ -12,7 +12,9 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, List, Optional, Tuple
 
-from ..vision.template import Match, match_template
+from ..vision.context import VisionContext
+from ..vision.template import Match
+from ..vision.template_bundle import glob_templates
 from .helpers import (
     click_template, wait_for_template,
     _adapter_capture, _adapter_tap, _adapter_swipe,
@@ -67,8 +69,7 @@ class ManualLineupInfo:
 
 def _discover_templates(pattern: str) -> List[str]:
     """自动发现匹配 pattern 的模板文件。"""
-    paths = sorted(Path("assets/ui/templates").glob(pattern))
-    return [p.as_posix() for p in paths]
+    return glob_templates("assets/ui/templates", pattern)
 
 
 _TPL_ZIDONG_LIST = _discover_templates("zhandou_zidong_*.png")
@@ -102,6 +103,7 @@ async def _wait_for_any_template(
     Returns:
         Match 对象，超时返回 None。
     """
+    vision = VisionContext.for_adapter(adapter)
     tag = f"[{label}] " if label else ""
     elapsed = 0.0
     kwargs = {"threshold": threshold} if threshold is not None else {}
@@ -110,7 +112,7 @@ async def _wait_for_any_template(
         screenshot = await _adapter_capture(adapter, capture_method)
         if screenshot is not None:
             for tpl in templates:
-                m = match_template(screenshot, tpl, **kwargs)
+                m = await vision.match_template(screenshot, tpl, **kwargs)
                 if m:
                     if log:
                         log.info(
@@ -154,8 +156,7 @@ async def _switch_battle_lineup(
     Returns:
         True 切换成功，False 失败（不中断战斗流程）
     """
-    from ..vision.battle_lineup_detect import detect_battle_groups, detect_battle_lineups
-
+    vision = VisionContext.for_adapter(adapter)
     tag = "[阵容切换]"
 
     # 1. 等待准备按钮确认在战斗准备界面
@@ -193,7 +194,7 @@ async def _switch_battle_lineup(
             await asyncio.sleep(0.5)
             continue
 
-        groups = detect_battle_groups(screenshot)
+        groups = await vision.detect_battle_groups(screenshot)
         if log:
             log.info(
                 f"{tag} 检测到 {len(groups)} 个分组 (attempt={attempt}/3)"
@@ -224,7 +225,7 @@ async def _switch_battle_lineup(
             await asyncio.sleep(0.5)
             continue
 
-        lineups = detect_battle_lineups(screenshot)
+        lineups = await vision.detect_battle_lineups(screenshot)
         if log:
             log.info(
                 f"{tag} 检测到 {len(lineups)} 个阵容 (attempt={attempt}/3)"
@@ -289,6 +290,7 @@ async def _manual_setup_lineup(
     Returns:
         True 配置成功，False 失败（不中断战斗流程）
     """
+    vision = VisionContext.for_adapter(adapter)
     tag = "[手动阵容]"
 
     # 1. 等待准备按钮确认在战斗准备界面
@@ -343,7 +345,7 @@ async def _manual_setup_lineup(
                 if screenshot is None:
                     await asyncio.sleep(0.3)
                     continue
-                m = match_template(screenshot, tpl_path, threshold=0.80)
+                m = await vision.match_template(screenshot, tpl_path, threshold=0.80)
                 if m:
                     cx, cy = m.center
                     tx, ty = manual_lineup.lineup_pos_1 or _LINEUP_POS_1
@@ -402,7 +404,7 @@ async def _manual_setup_lineup(
                 await asyncio.sleep(0.5)
                 continue
 
-            m = match_template(
+            m = await vision.match_template(
                 screenshot, manual_lineup.zuofu_template, threshold=0.80,
             )
             if m:
@@ -489,6 +491,7 @@ async def run_battle(
     Returns:
         "victory" | "defeat" | "timeout" | "error" | "scene"
     """
+    vision = VisionContext.for_adapter(adapter)
     tag = "[战斗]"
     _dr = 1 if dismiss_retry_enabled else 0
 
@@ -510,7 +513,7 @@ async def run_battle(
             if scene_template:
                 screenshot = await _adapter_capture(adapter, capture_method)
                 if screenshot is not None:
-                    m_scene = match_template(screenshot, scene_template)
+                    m_scene = await vision.match_template(screenshot, scene_template)
                     if m_scene:
                         if log:
                             log.info(
@@ -569,7 +572,7 @@ async def run_battle(
         # 优先检查是否已进入战斗（自动按钮出现）
         best_zidong_score = 0.0
         for tpl in _TPL_ZIDONG_LIST:
-            m = match_template(screenshot, tpl)
+            m = await vision.match_template(screenshot, tpl)
             if m:
                 if m.score > best_zidong_score:
                     best_zidong_score = m.score
@@ -596,7 +599,7 @@ async def run_battle(
         # 准备按钮检测（多模板）
         zhunbei_clicked = False
         for tpl in _TPL_ZHUNBEI_LIST:
-            m_zhunbei = match_template(screenshot, tpl)
+            m_zhunbei = await vision.match_template(screenshot, tpl)
             if m_zhunbei:
                 cx, cy = m_zhunbei.random_point()
                 if log:
@@ -643,15 +646,15 @@ async def run_battle(
     is_victory = True  # 默认视为胜利
     is_jiangli = False
     if screenshot is not None:
-        m_shibai = match_template(screenshot, _TPL_SHIBAI)
+        m_shibai = await vision.match_template(screenshot, _TPL_SHIBAI)
         if m_shibai:
             is_victory = False
-        m_jiangli_check = match_template(screenshot, _TPL_JIANGLI)
+        m_jiangli_check = await vision.match_template(screenshot, _TPL_JIANGLI)
         if m_jiangli_check:
             is_jiangli = True
         # 检测是否已回到场景界面（战斗弹窗被游戏自动跳过）
         if scene_template and is_victory and not is_jiangli:
-            m_scene = match_template(screenshot, scene_template)
+            m_scene = await vision.match_template(screenshot, scene_template)
             if m_scene:
                 if log:
                     log.info(
@@ -677,7 +680,7 @@ async def run_battle(
             if not shengli_clicked and scene_template:
                 screenshot = await _adapter_capture(adapter, capture_method)
                 if screenshot is not None:
-                    m_scene = match_template(screenshot, scene_template)
+                    m_scene = await vision.match_template(screenshot, scene_template)
                     if m_scene:
                         if log:
                             log.info(
@@ -715,7 +718,7 @@ async def run_battle(
                     screenshot = await _adapter_capture(adapter, capture_method)
                     already_back = False
                     if screenshot is not None:
-                        m_exit_check = match_template(screenshot, _TPL_TANSUO_SHEZHI)
+                        m_exit_check = await vision.match_template(screenshot, _TPL_TANSUO_SHEZHI)
                         if m_exit_check:
                             if log:
                                 log.info(f"{tag} 已检测到 tansuo_shezhi，无需恢复")
@@ -736,7 +739,7 @@ async def run_battle(
                             await asyncio.sleep(1.0)
                             screenshot = await _adapter_capture(adapter, capture_method)
                             if screenshot is not None:
-                                m_exit_recover = match_template(
+                                m_exit_recover = await vision.match_template(
                                     screenshot, _TPL_TANSUO_SHEZHI
                                 )
                                 if m_exit_recover:
@@ -765,7 +768,7 @@ async def run_battle(
                     await asyncio.sleep(click_interval)
                     screenshot = await _adapter_capture(adapter, capture_method)
                     if screenshot is not None:
-                        m_exit = match_template(screenshot, _TPL_TANSUO_SHEZHI)
+                        m_exit = await vision.match_template(screenshot, _TPL_TANSUO_SHEZHI)
                         if m_exit:
                             if log:
                                 log.info(
@@ -798,7 +801,7 @@ async def run_battle(
                 if scene_template:
                     screenshot = await _adapter_capture(adapter, capture_method)
                     if screenshot is not None:
-                        m_scene = match_template(screenshot, scene_template)
+                        m_scene = await vision.match_template(screenshot, scene_template)
                         if m_scene:
                             if log:
                                 log.info(
@@ -15,17 +15,15 @@ import asyncio
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from ...core.config import settings
 from ...core.constants import TaskStatus
 from ...db.base import SessionLocal
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
-from ..ocr.async_recognize import async_ocr_digits
 from ..shikigami import build_manual_lineup_info
 from ..ui.assets import parse_number
 from ..ui.manager import UIManager
-from ..vision.frame_cache import compute_frame_fingerprint
-from ..vision.template import find_all_templates, match_template
+from ..vision.state_classifier import StateClassifier, StateDef, TemplatePredicate
+from ..vision.template import match_template
 from ..vision.utils import load_image
 from .base import BaseExecutor
 from .battle import (
@@ -37,6 +35,7 @@ from .battle import (
     run_battle,
 )
 from .helpers import click_template, click_text, wait_for_template
+from .rapid_click import rapid_click_template
 from .yaml_loader import yaml_task_loader
 
 # 渠道包名
@@ -52,6 +51,39 @@ _CLIMB_STATE_PATA_MAIN = "pata_main"
 _CLIMB_STATE_PATA_MAP = "pata_map"
 _CLIMB_STATE_CHALLENGE = "challenge"
 
+_CLIMB_STATE_LABELS = {
+    _CLIMB_STATE_CHALLENGE: "已在挑战界面",
+    _CLIMB_STATE_PATA_MAP: "已在地图界面",
+    _CLIMB_STATE_PATA_MAIN: "已在爬塔主界面",
+}
+
+# verify_template -> StateClassifier（命中统计跨执行器实例保留）
+_CLIMB_CLASSIFIERS: Dict[Optional[str], StateClassifier] = {}
+
+
+def _climb_state_classifier(verify_tpl: Optional[str]) -> StateClassifier:
+    """爬塔阶段分类器：挑战界面 > 地图界面 > 爬塔主界面。"""
+    classifier = _CLIMB_CLASSIFIERS.get(verify_tpl)
+    if classifier is None:
+        states = [
+            StateDef(
+                _CLIMB_STATE_PATA_MAP,
+                [TemplatePredicate("assets/ui/templates/climb/pata_tag_ditu.png")],
+                priority=20,
+            ),
+            StateDef(
+                _CLIMB_STATE_PATA_MAIN,
+                [TemplatePredicate("assets/ui/templates/climb/pata_tag.png")],
+                priority=10,
+            ),
+        ]
+        if verify_tpl:
+            states.insert(
+                0, StateDef(_CLIMB_STATE_CHALLENGE, [TemplatePredicate(verify_tpl)], priority=30)
+            )
+        classifier = _CLIMB_CLASSIFIERS[verify_tpl] = StateClassifier(states, name="爬塔")
+    return classifier
+
 
 class ClimbTowerExecutor(BaseExecutor):
     """爬塔执行器 - YAML 驱动"""
@@ -85,7 +117,7 @@ class ClimbTowerExecutor(BaseExecutor):
                 syscfg.activity_name or ".MainActivity" if syscfg else ".MainActivity"
             ),
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[爬塔] 准备: account={account.login_id}")
@@ -200,7 +232,7 @@ class ClimbTowerExecutor(BaseExecutor):
     async def _detect_climb_state(self) -> str:
         """截图检测当前处于爬塔流程的哪个阶段。
 
-        按从深到浅的顺序检测，优先识别更深层界面。
+        按从深到浅的优先级检测（StateClassifier 一次评估），优先识别更深层界面。
 
         Returns:
             _CLIMB_STATE_* 常量
@@ -210,27 +242,15 @@ class ClimbTowerExecutor(BaseExecutor):
             self.logger.warning("[爬塔] 状态检测: 截图失败")
             return _CLIMB_STATE_UNKNOWN
 
-        cfg = self.yaml_config
-
-        # 优先检测最深层：挑战界面
-        verify_tpl = cfg["navigation"].get("verify_template")
-        if verify_tpl:
-            m = match_template(screenshot, verify_tpl)
-            if m:
-                self.logger.info(f"[爬塔] 状态检测: 已在挑战界面 (score={m.score:.3f})")
-                return _CLIMB_STATE_CHALLENGE
-
-        # 地图界面
-        m = match_template(screenshot, "assets/ui/templates/climb/pata_tag_ditu.png")
-        if m:
-            self.logger.info(f"[爬塔] 状态检测: 已在地图界面 (score={m.score:.3f})")
-            return _CLIMB_STATE_PATA_MAP
-
-        # 爬塔主界面
-        m = match_template(screenshot, "assets/ui/templates/climb/pata_tag.png")
-        if m:
-            self.logger.info(f"[爬塔] 状态检测: 已在爬塔主界面 (score={m.score:.3f})")
-            return _CLIMB_STATE_PATA_MAIN
+        classifier = _climb_state_classifier(
+            self.yaml_config["navigation"].get("verify_template")
+        )
+        result = await classifier.aclassify(self.vision, screenshot)
+        if result.state is not None:
+            self.logger.info(
+                f"[爬塔] 状态检测: {_CLIMB_STATE_LABELS[result.state]} (score={result.score:.3f})"
+            )
+            return result.state
 
         # 用 UIManager 检测是否在庭院
         detect_result = await self._detect_ui(screenshot)
@@ -476,7 +496,7 @@ class ClimbTowerExecutor(BaseExecutor):
                 if dismissed > 0:
                     continue
 
-            result = await async_ocr_digits(screenshot, roi=roi)
+            result = await self.vision.ocr_digits(screenshot, roi=roi)
             raw = result.text.strip()
             self.logger.info(f"[爬塔] 门票 OCR: raw='{raw}' (attempt={attempt + 1})")
 
@@ -523,7 +543,7 @@ class ClimbTowerExecutor(BaseExecutor):
             self.logger.warning(f"{tag} 截图失败")
             return False
 
-        shikigami_match = match_template(
+        shikigami_match = await self.vision.match_template(
             screenshot, rent_cfg["shikigami_template"], threshold=0.80
         )
         if not shikigami_match:
@@ -539,7 +559,7 @@ class ClimbTowerExecutor(BaseExecutor):
         )
 
         # 3. 找所有借用按钮
-        all_buttons = find_all_templates(
+        all_buttons = await self.vision.find_all_templates(
             screenshot, rent_cfg["borrow_button"], threshold=0.80
         )
         if not all_buttons:
@@ -593,7 +613,7 @@ class ClimbTowerExecutor(BaseExecutor):
             rh = min(rh, img_h - ry)
             crop = screenshot[ry : ry + rh, rx : rx + rw]
 
-            m_check = match_template(crop, rent_cfg["borrow_button"], threshold=0.75)
+            m_check = await self.vision.match_template(crop, rent_cfg["borrow_button"], threshold=0.75)
             if m_check is None:
                 self.logger.info(f"{tag} 借用成功（按钮已消失）")
                 break
@@ -668,7 +688,7 @@ class ClimbTowerExecutor(BaseExecutor):
             self.logger.warning("[爬塔-锁定] 截图失败，无法检测锁定状态")
             return False
 
-        locked, score = _check_locked(screenshot)
+        locked, score = await self.vision.run(_check_locked, screenshot)
         self.logger.info(
             f"[爬塔-锁定] locked={locked}, score={score:.2f}, "
             f"期望={'锁定' if should_lock else '解锁'}"
@@ -688,7 +708,9 @@ class ClimbTowerExecutor(BaseExecutor):
 
             screenshot = await self._capture()
             if screenshot is not None:
-                new_locked, new_score = _check_locked(screenshot)
+                new_locked, new_score = await self.vision.run(
+                    _check_locked, screenshot
+                )
                 if new_locked == should_lock:
                     self.logger.info(
                         f"[爬塔-锁定] 切换成功: " f"{'锁定' if should_lock else '解锁'}"
@@ -876,113 +898,29 @@ class ClimbTowerExecutor(BaseExecutor):
     ) -> bool:
         """快速多次截图检测+点击模式（爬塔专用）。
 
-        与标准 click_template 的区别：检测到模板后不是单次点击，
-        而是快速连续检测 rapid_count 次，每次检测到就点击，确保点击生效。
-
-        流程:
-            Phase 1: wait_for_template(timeout) - 正常等待模板出现
-            Phase 2: settle 等待（仅 Phase 1 找到模板时）
-            Phase 3: rapid_count 次快速截图→检测→点击循环
-                     始终执行全部次数，用于确认/补充点击
-            Phase 4: post_delay（仅至少成功点击一次时）
+        委托共享引擎 rapid_click_template：检测到模板后快速截图→检测→点击，
+        点击后的新帧确认生效（模板消失 / 画面变化）即停止，否则补点，
+        最多 rapid_count 轮。
 
         Returns:
             True 表示至少点击了一次，False 表示从未检测到模板。
         """
-        tag = f"[{label}] " if label else ""
-        kwargs = {"threshold": threshold} if threshold is not None else {}
-
-        # Phase 1: 等待模板出现
-        m = await wait_for_template(
+        result = await rapid_click_template(
             self.adapter,
             self.ui.capture_method,
             template,
             timeout=timeout,
-            interval=0.5,
+            settle=settle,
+            post_delay=post_delay,
             threshold=threshold,
             log=self.logger,
             label=label,
             popup_handler=self.ui.popup_handler,
+            rapid_count=rapid_count,
+            rapid_interval=rapid_interval,
+            wait_interval=0.5,
         )
-
-        # Phase 2: settle（仅模板找到时）
-        if m and settle > 0:
-            await asyncio.sleep(settle)
-
-        # Phase 3: 快速连续检测 + 点击
-        cache_enabled = bool(getattr(settings, "vision_frame_cache_enabled", True))
-        unchanged_skip_max = max(
-            0,
-            int(getattr(settings, "vision_unchanged_skip_max", 2)),
-        )
-        last_frame_fp: Optional[int] = None
-        same_frame_miss_streak = 0
-        same_frame_skip_count = 0
-        clicked_count = 0
-        for i in range(rapid_count):
-            screenshot = await self._capture()
-            if screenshot is None:
-                await asyncio.sleep(rapid_interval)
-                continue
-
-            frame_fp: Optional[int] = None
-            if cache_enabled:
-                frame_fp = compute_frame_fingerprint(screenshot)
-                if frame_fp != last_frame_fp:
-                    last_frame_fp = frame_fp
-                    same_frame_miss_streak = 0
-                elif (
-                    unchanged_skip_max > 0
-                    and same_frame_miss_streak > 0
-                    and same_frame_miss_streak % (unchanged_skip_max + 1) != 0
-                ):
-                    same_frame_miss_streak += 1
-                    same_frame_skip_count += 1
-                    await asyncio.sleep(rapid_interval)
-                    continue
-
-            # 弹窗检查
-            if self.ui.popup_handler:
-                dismissed = await self.ui.popup_handler.check_and_dismiss(screenshot)
-                if dismissed > 0:
-                    last_frame_fp = None
-                    same_frame_miss_streak = 0
-                    await asyncio.sleep(rapid_interval)
-                    continue
-
-            rm = match_template(screenshot, template, **kwargs)
-            if rm:
-                cx, cy = rm.random_point()
-                await self._tap(cx, cy)
-                clicked_count += 1
-                same_frame_miss_streak = 0
-                self.logger.info(
-                    f"{tag}快速点击 ({cx}, {cy}) "
-                    f"(cycle={i + 1}/{rapid_count}, "
-                    f"total_clicks={clicked_count}, "
-                    f"score={rm.score:.3f})"
-                )
-            elif frame_fp is not None:
-                same_frame_miss_streak += 1
-
-            await asyncio.sleep(rapid_interval)
-
-        if clicked_count > 0:
-            self.logger.info(
-                f"{tag}快速检测完成, 共点击{clicked_count}次, "
-                f"same_frame_skips={same_frame_skip_count}"
-            )
-        else:
-            self.logger.warning(
-                f"{tag}快速检测{rapid_count}次均未找到模板, "
-                f"same_frame_skips={same_frame_skip_count}"
-            )
-
-        # Phase 4: post_delay（仅点击成功时）
-        if clicked_count > 0 and post_delay > 0:
-            await asyncio.sleep(post_delay)
-
-        return clicked_count > 0
+        return bool(result)
 
     # ── 通用步骤执行 ──
 
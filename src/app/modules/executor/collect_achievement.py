@@ -6,12 +6,11 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus, TaskType
 from ...core.logger import logger
 from ...core.timeutils import format_beijing_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
@@ -57,7 +56,7 @@ class CollectAchievementExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[领取成就奖励] 准备: account={account.login_id}")
@@ -182,18 +181,9 @@ class CollectAchievementExecutor(BaseExecutor):
             next_time = f"{next_day.isoformat()} 00:01"
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    task_cfg = cfg.get("领取成就奖励", {})
-                    task_cfg["next_time"] = next_time
-                    cfg["领取成就奖励"] = task_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"领取成就奖励": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[领取成就奖励] next_time 更新为 {next_time}")
         except Exception as e:
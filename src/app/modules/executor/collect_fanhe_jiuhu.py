@@ -7,16 +7,14 @@ import asyncio
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus
 from ...core.logger import logger
 from ...core.timeutils import add_hours_to_beijing_time, format_beijing_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
-from ..vision.template import find_all_templates, match_template
 from ..vision.grid_detect import nms_by_distance
 from .base import BaseExecutor
 from .helpers import click_template
@@ -56,7 +54,7 @@ class CollectFanheJiuhuExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[领取饭盒酒壶] 准备: account={account.login_id}")
@@ -177,7 +175,7 @@ class CollectFanheJiuhuExecutor(BaseExecutor):
             self.logger.warning("[领取饭盒酒壶] 截图失败，退出育成补充")
             return
 
-        blanks = find_all_templates(
+        blanks = await self.vision.find_all_templates(
             screenshot, "assets/ui/templates/yucheng_blank.png"
         )
         blanks = nms_by_distance(blanks)
@@ -240,7 +238,7 @@ class CollectFanheJiuhuExecutor(BaseExecutor):
                 screenshot = await self._capture()
 
         if screenshot is not None:
-            jiangli = match_template(screenshot, "assets/ui/templates/jiangli.png")
+            jiangli = await self.vision.match_template(screenshot, "assets/ui/templates/jiangli.png")
             if jiangli:
                 self.logger.info(f"[领取饭盒酒壶] [{step_label}] 检测到奖励弹窗，点击关闭")
             else:
@@ -265,18 +263,9 @@ class CollectFanheJiuhuExecutor(BaseExecutor):
             next_time = add_hours_to_beijing_time(bj_now_str, 8)
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    task_cfg = cfg.get("领取饭盒酒壶", {})
-                    task_cfg["next_time"] = next_time
-                    cfg["领取饭盒酒壶"] = task_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"领取饭盒酒壶": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[领取饭盒酒壶] next_time 更新为 {next_time}")
         except Exception as e:
@@ -7,12 +7,11 @@ import asyncio
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus, TaskType
 from ...core.logger import logger
 from ...core.timeutils import format_beijing_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
@@ -55,7 +54,7 @@ class CollectLoginGiftExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     @staticmethod
     def _extract_anchor_from_debug(
@@ -170,7 +169,6 @@ class CollectLoginGiftExecutor(BaseExecutor):
         await asyncio.sleep(2.0)
 
         self.logger.info("[领取登录礼包] 检测并点击日常按钮")
-        from ..vision.template import match_template
 
         screenshot = await self._capture()
         if screenshot is None:
@@ -191,7 +189,7 @@ class CollectLoginGiftExecutor(BaseExecutor):
                     "timestamp": datetime.utcnow().isoformat(),
                 }
 
-        result = match_template(screenshot, "assets/ui/templates/richang.png")
+        result = await self.vision.match_template(screenshot, "assets/ui/templates/richang.png")
         if result:
             rx, ry = result.random_point()
             await self._tap(rx, ry)
@@ -212,7 +210,7 @@ class CollectLoginGiftExecutor(BaseExecutor):
         # 弹窗检测
         if screenshot2 is not None and await self.ui.popup_handler.check_and_dismiss(screenshot2) > 0:
             screenshot2 = await self._capture()
-        lingqu_result = match_template(screenshot2, "assets/ui/templates/lingqu.png") if screenshot2 is not None else None
+        lingqu_result = await self.vision.match_template(screenshot2, "assets/ui/templates/lingqu.png") if screenshot2 is not None else None
 
         if not lingqu_result:
             # 没有领取按钮 → 今天已经领取过了
@@ -237,7 +235,7 @@ class CollectLoginGiftExecutor(BaseExecutor):
         # 弹窗检测
         if screenshot3 is not None and await self.ui.popup_handler.check_and_dismiss(screenshot3) > 0:
             screenshot3 = await self._capture()
-        jiangli_result = match_template(screenshot3, "assets/ui/templates/jiangli.png") if screenshot3 is not None else None
+        jiangli_result = await self.vision.match_template(screenshot3, "assets/ui/templates/jiangli.png") if screenshot3 is not None else None
 
         if jiangli_result:
             self.logger.info("[领取登录礼包] 检测到奖励弹窗，点击关闭")
@@ -269,18 +267,9 @@ class CollectLoginGiftExecutor(BaseExecutor):
             next_time = f"{tomorrow.isoformat()} 00:01"
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    gift = cfg.get("领取登录礼包", {})
-                    gift["next_time"] = next_time
-                    cfg["领取登录礼包"] = gift
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"领取登录礼包": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[领取登录礼包] next_time 更新为 {next_time}")
         except Exception as e:
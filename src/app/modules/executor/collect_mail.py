@@ -8,12 +8,11 @@ import random
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus
 from ...core.logger import logger
 from ...core.timeutils import now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
@@ -55,7 +54,7 @@ class CollectMailExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[领取邮件] 准备: account={account.login_id}")
@@ -123,7 +122,6 @@ class CollectMailExecutor(BaseExecutor):
         await asyncio.sleep(1.0)
 
         # 3. 截图检测一键领取按钮 (yijianlingqu.png)
-        from ..vision.template import match_template
 
         screenshot = await self._capture()
         if screenshot is None:
@@ -144,7 +142,7 @@ class CollectMailExecutor(BaseExecutor):
                     "timestamp": datetime.utcnow().isoformat(),
                 }
 
-        yijian_result = match_template(screenshot, "assets/ui/templates/yijianlingqu.png")
+        yijian_result = await self.vision.match_template(screenshot, "assets/ui/templates/yijianlingqu.png")
 
         if not yijian_result:
             # 没有一键领取按钮 → 已领取过
@@ -188,7 +186,7 @@ class CollectMailExecutor(BaseExecutor):
 
         handled = False
         if screenshot2 is not None:
-            jiangli_result = match_template(screenshot2, "assets/ui/templates/jiangli.png")
+            jiangli_result = await self.vision.match_template(screenshot2, "assets/ui/templates/jiangli.png")
             if jiangli_result:
                 self.logger.info("[领取邮件] 检测到奖励弹窗，点击关闭")
                 from ..vision.utils import random_point_in_circle
@@ -199,7 +197,7 @@ class CollectMailExecutor(BaseExecutor):
                 handled = True
 
             if not handled:
-                exit_result = match_template(screenshot2, "assets/ui/templates/exit.png")
+                exit_result = await self.vision.match_template(screenshot2, "assets/ui/templates/exit.png")
                 if exit_result:
                     self.logger.info("[领取邮件] 检测到 exit 按钮，点击退出")
                     ex, ey = exit_result.random_point()
@@ -234,18 +232,9 @@ class CollectMailExecutor(BaseExecutor):
             next_time = f"{tomorrow.isoformat()} 15:{random_minute:02d}"
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    mail_cfg = cfg.get("领取邮件", {})
-                    mail_cfg["next_time"] = next_time
-                    cfg["领取邮件"] = mail_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"领取邮件": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[领取邮件] next_time 更新为 {next_time}")
         except Exception as e:
@@ -7,12 +7,11 @@ import asyncio
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus, TaskType
 from ...core.logger import logger
 from ...core.timeutils import format_beijing_time, get_next_fixed_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
@@ -51,7 +50,7 @@ class DelegateHelpExecutor(BaseExecutor):
             instance_id=emu.instance_id,
             activity_name=syscfg.activity_name or ".MainActivity" if syscfg else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         """
@@ -219,16 +218,9 @@ class DelegateHelpExecutor(BaseExecutor):
             next_time = get_next_fixed_time(bj_now, MIZHU_FIXED_TIMES)
 
             with SessionLocal() as db:
-                account = db.query(GameAccount).filter(
-                    GameAccount.id == self.current_account.id
-                ).first()
-                if account:
-                    cfg = account.task_config or {}
-                    mizhu = cfg.get("弥助", {})
-                    mizhu["next_time"] = next_time
-                    cfg["弥助"] = mizhu
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"弥助": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[弥助] next_time 更新为 {next_time}")
         except Exception as e:
@@ -236,7 +228,6 @@ class DelegateHelpExecutor(BaseExecutor):
 
     async def _collect_completed_rewards(self) -> None:
         """检测并领取已完成的委派任务奖励"""
-        from ..vision.template import match_template
         from ..vision.utils import random_point_in_circle
 
         screenshot = await self._capture()
@@ -250,7 +241,7 @@ class DelegateHelpExecutor(BaseExecutor):
                 if screenshot is None:
                     return
 
-        result = match_template(screenshot, "assets/ui/templates/wancheng.png")
+        result = await self.vision.match_template(screenshot, "assets/ui/templates/wancheng.png")
         if not result:
             self.logger.info("[弥助] 未检测到已完成委派，跳过奖励领取")
             return
@@ -269,7 +260,7 @@ class DelegateHelpExecutor(BaseExecutor):
                 if self.ui and await self.ui.popup_handler.check_and_dismiss(screenshot) > 0:
                     screenshot = await self._capture()
                 if screenshot is not None:
-                    wancheng_renwu = match_template(screenshot, "assets/ui/templates/wanchengrenwu.png")
+                    wancheng_renwu = await self.vision.match_template(screenshot, "assets/ui/templates/wanchengrenwu.png")
                 if wancheng_renwu:
                     self.logger.info("[弥助] 检测到完成任务弹窗，对话结束")
                     break
@@ -284,7 +275,7 @@ class DelegateHelpExecutor(BaseExecutor):
             if self.ui and await self.ui.popup_handler.check_and_dismiss(screenshot) > 0:
                 screenshot = await self._capture()
         if screenshot is not None:
-            wr = match_template(screenshot, "assets/ui/templates/wanchengrenwu.png")
+            wr = await self.vision.match_template(screenshot, "assets/ui/templates/wanchengrenwu.png")
             if wr:
                 wrx, wry = wr.random_point()
                 await self._tap(wrx, wry)
@@ -299,7 +290,7 @@ class DelegateHelpExecutor(BaseExecutor):
                 if self.ui and await self.ui.popup_handler.check_and_dismiss(screenshot) > 0:
                     screenshot = await self._capture()
                 if screenshot is not None:
-                    jiangli = match_template(screenshot, "assets/ui/templates/jiangli.png")
+                    jiangli = await self.vision.match_template(screenshot, "assets/ui/templates/jiangli.png")
                 if jiangli:
                     self.logger.info("[弥助] 检测到奖励弹窗")
                     break
@@ -13,9 +13,7 @@ from ...db.base import SessionLocal
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
-from ..ocr.async_recognize import async_ocr_digits
 from ..ui.assets import parse_number
-from ..vision.template import find_all_templates, match_template
 from ..vision.grid_detect import nms_by_distance
 from .base import BaseExecutor
 from .battle import run_battle, VICTORY
@@ -89,7 +87,7 @@ class DiGuiExecutor(BaseExecutor):
             instance_id=emu.instance_id,
             activity_name=syscfg.activity_name or ".MainActivity" if syscfg else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[地鬼] 准备: account={account.login_id}")
@@ -181,7 +179,7 @@ class DiGuiExecutor(BaseExecutor):
         # ── 第二阶段：在探索界面立即检测地鬼是否被锁定 ──
         screenshot = await self._capture()
         if screenshot is not None:
-            lock_match = match_template(screenshot, _TPL_LOCK)
+            lock_match = await self.vision.match_template(screenshot, _TPL_LOCK)
             if lock_match:
                 self.logger.warning(
                     f"[地鬼] 检测到锁定标识(score={lock_match.score:.2f})，等级不足，跳过"
@@ -233,7 +231,7 @@ class DiGuiExecutor(BaseExecutor):
                 await asyncio.sleep(1.0)
                 continue
 
-            raw_matches = find_all_templates(screenshot, _TPL_WEIXUANZE)
+            raw_matches = await self.vision.find_all_templates(screenshot, _TPL_WEIXUANZE)
             unique_matches = nms_by_distance(raw_matches)
             if len(unique_matches) > 0:
                 total_rounds = min(len(unique_matches), MAX_ROUNDS)
@@ -285,7 +283,7 @@ class DiGuiExecutor(BaseExecutor):
                 self.logger.error(f"[地鬼] 第 {round_idx} 轮截图失败")
                 break
 
-            all_matches = find_all_templates(screenshot, _TPL_TIAOZHAN)
+            all_matches = await self.vision.find_all_templates(screenshot, _TPL_TIAOZHAN)
             all_matches = nms_by_distance(all_matches)
             # 按 y 坐标排序（从上到下）
             all_matches.sort(key=lambda m: m.center[1])
@@ -338,7 +336,7 @@ class DiGuiExecutor(BaseExecutor):
                     await asyncio.sleep(0.5)
                     continue
 
-                tuodong_match = match_template(screenshot, _TPL_TUODONG)
+                tuodong_match = await self.vision.match_template(screenshot, _TPL_TUODONG)
                 if tuodong_match:
                     tx, ty = tuodong_match.center
                     await self._swipe(tx, ty, 10, ty, 500)
@@ -358,7 +356,7 @@ class DiGuiExecutor(BaseExecutor):
                 screenshot = await self._capture()
                 if screenshot is None:
                     continue
-                result_ocr = await async_ocr_digits(screenshot, roi=_CHALLENGE_COUNT_ROI)
+                result_ocr = await self.vision.ocr_digits(screenshot, roi=_CHALLENGE_COUNT_ROI)
                 raw = result_ocr.text.strip()
                 count_val = parse_number(raw)
                 self.logger.info(
@@ -11,7 +11,6 @@ from datetime import datetime
 from enum import Enum, auto
 from typing import Any, Dict, Optional
 
-from ...core.config import settings
 from ...core.constants import TaskStatus
 from ...core.logger import logger
 from ...core.timeutils import now_beijing
@@ -19,12 +18,13 @@ from ...db.base import SessionLocal
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
-from ..vision.frame_cache import compute_frame_fingerprint
 from ..vision.grid_detect import nms_by_distance
-from ..vision.template import Match, find_all_templates, match_template
+from ..vision.state_classifier import StateClassifier, StateDef, TemplatePredicate
+from ..vision.template import Match, find_all_templates
 from ..vision.utils import to_gray
 from .base import BaseExecutor
 from .helpers import click_template, wait_for_template
+from .rapid_click import rapid_click_template
 
 # 渠道包名
 PKG_NAME = "com.netease.onmyoji.wyzymnqsd_cps"
@@ -57,6 +57,28 @@ class DuiyiJingcaiExecutor(BaseExecutor):
     _TPL_DY_FINISH_LEFT = "assets/ui/templates/dy/dy_finish_left.png"
     _TPL_DY_FINISH_RIGHT = "assets/ui/templates/dy/dy_finish_right.png"
 
+    # ── 状态分类（优先级从高到低；状态名与 DuiyiState 成员名一致）──
+    _STATE_CLASSIFIER = StateClassifier(
+        [
+            # 奖励 / 金币弹窗遮挡其他元素，最优先
+            StateDef(
+                "DY_JIANGLI",
+                [TemplatePredicate(_TPL_JIANGLI), TemplatePredicate(_TPL_POPUP_JINBI)],
+                priority=50,
+            ),
+            StateDef(
+                "DY_ALREADY_BET",
+                [TemplatePredicate(_TPL_DY_FINISH_LEFT), TemplatePredicate(_TPL_DY_FINISH_RIGHT)],
+                priority=40,
+            ),
+            StateDef("DY_WIN", [TemplatePredicate(_TPL_DY_YING)], priority=30),
+            StateDef("DY_NEXT", [TemplatePredicate(_TPL_DY_NEXT)], priority=20),
+            # 押注界面：只检测 dy_jingcai（最具辨识度）
+            StateDef("DY_BET", [TemplatePredicate(_TPL_DY_JINGCAI)], priority=10),
+        ],
+        name="对弈竞猜",
+    )
+
     # ── 配置常量 ──
     _MAX_STATE_ITERATIONS = 15
     _SCREEN_CENTER_X = 480  # 960x540 屏幕中线，用于按 X 坐标区分左右按钮
@@ -97,7 +119,7 @@ class DuiyiJingcaiExecutor(BaseExecutor):
                 syscfg.activity_name or ".MainActivity" if syscfg else ".MainActivity"
             ),
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     # ── BaseExecutor 生命周期 ──
 
@@ -234,55 +256,20 @@ class DuiyiJingcaiExecutor(BaseExecutor):
     async def _detect_state(self) -> DuiyiState:
         """截图检测当前所处的对弈竞猜状态。
 
-        按优先级从高到低匹配多个模板，不使用 popup_handler（避免
-        jiangli 被自动关闭而状态机无法感知）。
-        截图预转灰度后复用，避免每次 match_template 重复转换。
+        由 _STATE_CLASSIFIER 按优先级分层匹配（计算池中一次执行），
+        不使用 popup_handler（避免 jiangli 被自动关闭而状态机无法感知）。
         """
         screenshot = await self._capture()
         if screenshot is None:
             self.logger.warning("[对弈竞猜] 状态检测: 截图失败")
             return DuiyiState.UNKNOWN
 
-        gray = to_gray(screenshot)  # 只转一次灰度，后续复用
-
-        # 1. 奖励弹窗（遮挡其他元素，最优先）
-        m = match_template(gray, self._TPL_JIANGLI)
-        if m:
-            self.logger.info(f"[对弈竞猜] 状态: DY_JIANGLI (score={m.score:.3f})")
-            return DuiyiState.DY_JIANGLI
-
-        # 1.5 金币弹窗（也属于 JIANGLI 类弹窗，同样关闭处理）
-        m = match_template(gray, self._TPL_POPUP_JINBI)
-        if m:
-            self.logger.info(f"[对弈竞猜] 状态: DY_JIANGLI/popup_jinbi (score={m.score:.3f})")
-            return DuiyiState.DY_JIANGLI
-
-        # 2. 已押注完成（dy_finish_left / dy_finish_right）
-        for finish_tpl in (self._TPL_DY_FINISH_LEFT, self._TPL_DY_FINISH_RIGHT):
-            m = match_template(gray, finish_tpl)
-            if m:
-                self.logger.info(f"[对弈竞猜] 状态: DY_ALREADY_BET (score={m.score:.3f})")
-                return DuiyiState.DY_ALREADY_BET
-
-        # 3. 赢了未领奖
-        m = match_template(gray, self._TPL_DY_YING)
-        if m:
-            self.logger.info(f"[对弈竞猜] 状态: DY_WIN (score={m.score:.3f})")
-            return DuiyiState.DY_WIN
-
-        # 4. 下一局按钮
-        m = match_template(gray, self._TPL_DY_NEXT)
-        if m:
-            self.logger.info(f"[对弈竞猜] 状态: DY_NEXT (score={m.score:.3f})")
-            return DuiyiState.DY_NEXT
-
-        # 5. 押注界面：只检测 dy_jingcai（最具辨识度）
-        m = match_template(gray, self._TPL_DY_JINGCAI)
-        if m:
-            self.logger.info(f"[对弈竞猜] 状态: DY_BET (score={m.score:.3f})")
-            return DuiyiState.DY_BET
+        result = await self._STATE_CLASSIFIER.aclassify(self.vision, screenshot)
+        if result.state is not None:
+            self.logger.info(f"[对弈竞猜] 状态: {result.state} (score={result.score:.3f})")
+            return DuiyiState[result.state]
 
-        # 6. UIDetector 检查是否仍在对弈竞猜界面（可能是加载中的过渡状态）
+        # 无状态命中：UIDetector 检查是否仍在对弈竞猜界面（可能是加载中的过渡状态）
         detect_result = await self._detect_ui(screenshot)
         if detect_result and detect_result.ui == "DUIYI_JINGCAI":
             self.logger.info("[对弈竞猜] 状态: 在对弈界面但无匹配内部状态，返回 UNKNOWN 等待重试")
@@ -391,7 +378,7 @@ class DuiyiJingcaiExecutor(BaseExecutor):
         screenshot = await self._capture()
         if screenshot is not None:
             gray = to_gray(screenshot)
-            m_next = match_template(gray, self._TPL_DY_NEXT)
+            m_next = await self.vision.match_template(gray, self._TPL_DY_NEXT)
             if m_next:
                 cx, cy = m_next.random_point()
                 await self._tap(cx, cy)
@@ -461,7 +448,7 @@ class DuiyiJingcaiExecutor(BaseExecutor):
                 continue
 
             gray = to_gray(screenshot)
-            still_visible = match_template(gray, self._TPL_JIANGLI)
+            still_visible = await self.vision.match_template(gray, self._TPL_JIANGLI)
             if not still_visible:
                 self.logger.info(f"[对弈竞猜] 奖励弹窗已关闭 (尝试 {attempt})")
                 # 检查级联弹窗（插画 chahua 等）
@@ -493,7 +480,7 @@ class DuiyiJingcaiExecutor(BaseExecutor):
                 continue
 
             gray = to_gray(screenshot)
-            has_popup = bool(match_template(gray, self._TPL_JIANGLI))
+            has_popup = bool(await self.vision.match_template(gray, self._TPL_JIANGLI))
 
             if has_popup:
                 saw_popup = True
@@ -630,7 +617,9 @@ class DuiyiJingcaiExecutor(BaseExecutor):
                         elapsed += interval
                         continue
 
-                left_match, right_match = self._find_direction_buttons(screenshot)
+                left_match, right_match = await self.vision.run(
+                    self._find_direction_buttons, screenshot
+                )
                 target_match = left_match if answer == "左" else right_match
                 if target_match:
                     break
@@ -766,7 +755,7 @@ class DuiyiJingcaiExecutor(BaseExecutor):
                 continue
 
             gray = to_gray(screenshot)
-            still_visible = match_template(gray, self._TPL_POPUP_JINBI)
+            still_visible = await self.vision.match_template(gray, self._TPL_POPUP_JINBI)
             if not still_visible:
                 if self.popup_handler:
                     await self.popup_handler.check_and_dismiss(screenshot)
@@ -797,117 +786,29 @@ class DuiyiJingcaiExecutor(BaseExecutor):
     ) -> bool:
         """快速多次截图检测+点击模式。
 
-        与标准 click_template 的区别：检测到模板后不是单次点击，
-        而是快速连续检测 rapid_count 次，每次检测到就点击，确保点击生效。
-
-        流程:
-            Phase 1: wait_for_template(timeout) - 正常等待模板出现
-            Phase 2: settle 等待（仅 Phase 1 找到模板时）
-            Phase 3: rapid_count 次快速截图→检测→点击循环
-                     始终执行全部次数，用于确认/补充点击
-            Phase 4: post_delay（仅至少成功点击一次时）
+        委托共享引擎 rapid_click_template：检测到模板后快速截图→检测→点击，
+        点击后的新帧确认生效（模板消失 / 画面变化）即停止，否则补点，
+        最多 rapid_count 轮。
 
         Returns:
             True 表示至少点击了一次，False 表示从未检测到模板。
         """
-        tag = f"[{label}] " if label else ""
-        kwargs = {"threshold": threshold} if threshold is not None else {}
-
-        # Phase 1: 等待模板出现
-        m = await wait_for_template(
+        result = await rapid_click_template(
             self.adapter,
             self.ui.capture_method,
             template,
             timeout=timeout,
-            interval=wait_interval,
+            settle=settle,
+            post_delay=post_delay,
             threshold=threshold,
             log=self.logger,
             label=label,
             popup_handler=self.popup_handler,
+            rapid_count=rapid_count,
+            rapid_interval=rapid_interval,
+            wait_interval=wait_interval,
         )
-
-        # Phase 2: settle（仅模板找到时）
-        if m and settle > 0:
-            await asyncio.sleep(settle)
-
-        # Phase 3: 快速连续检测 + 点击
-        cache_enabled = bool(getattr(settings, "vision_frame_cache_enabled", True))
-        unchanged_skip_max = max(
-            0,
-            int(getattr(settings, "vision_unchanged_skip_max", 2)),
-        )
-        last_frame_fp: Optional[int] = None
-        same_frame_miss_streak = 0
-        same_frame_skip_count = 0
-        clicked_count = 0
-        for i in range(rapid_count):
-            screenshot = await self._capture()
-            if screenshot is None:
-                await asyncio.sleep(rapid_interval)
-                continue
-
-            frame_fp: Optional[int] = None
-            if cache_enabled:
-                frame_fp = compute_frame_fingerprint(screenshot)
-                if frame_fp != last_frame_fp:
-                    last_frame_fp = frame_fp
-                    same_frame_miss_streak = 0
-                elif (
-                    unchanged_skip_max > 0
-                    and same_frame_miss_streak > 0
-                    and same_frame_miss_streak % (unchanged_skip_max + 1) != 0
-                ):
-                    same_frame_miss_streak += 1
-                    same_frame_skip_count += 1
-                    await asyncio.sleep(rapid_interval)
-                    continue
-
-            # 弹窗检查
-            if self.popup_handler:
-                dismissed = await self.popup_handler.check_and_dismiss(screenshot)
-                if dismissed > 0:
-                    last_frame_fp = None
-                    same_frame_miss_streak = 0
-                    await asyncio.sleep(rapid_interval)
-                    continue
-
-            rm = match_template(
-                to_gray(screenshot) if screenshot.ndim != 2 else screenshot,
-                template,
-                **kwargs,
-            )
-            if rm:
-                cx, cy = rm.random_point()
-                await self._tap(cx, cy)
-                clicked_count += 1
-                same_frame_miss_streak = 0
-                self.logger.info(
-                    f"{tag}快速点击 ({cx}, {cy}) "
-                    f"(cycle={i + 1}/{rapid_count}, "
-                    f"total_clicks={clicked_count}, "
-                    f"score={rm.score:.3f})"
-                )
-            elif frame_fp is not None:
-                same_frame_miss_streak += 1
-
-            await asyncio.sleep(rapid_interval)
-
-        if clicked_count > 0:
-            self.logger.info(
-                f"{tag}快速检测完成, 共点击{clicked_count}次, "
-                f"same_frame_skips={same_frame_skip_count}"
-            )
-        else:
-            self.logger.warning(
-                f"{tag}快速检测{rapid_count}次均未找到模板, "
-                f"same_frame_skips={same_frame_skip_count}"
-            )
-
-        # Phase 4: post_delay（仅点击成功时）
-        if clicked_count > 0 and post_delay > 0:
-            await asyncio.sleep(post_delay)
-
-        return clicked_count > 0
+        return bool(result)
 
     # ── 恢复到对弈竞猜界面 ──
 
@@ -0,0 +1,279 @@
+"""
+任务耗时统计：按任务类型/账号/模拟器维护滚动窗口并计算分位数。
+
+数据来源:
+- WorkerActor 每个 intent 结束时调用 record() 记录实际耗时
+- 启动时从 task_duration_samples 表恢复；表为空时回退读取 TaskRun 历史
+
+调度器通过 estimate() 获取预估耗时（账号 p50 → 任务类型 p50 → 静态默认值）。
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional, Tuple
+
+from ...core.constants import TaskType
+from ...core.logger import logger
+from ...core.thread_pool import run_in_db
+from ...db.base import SessionLocal
+from ...db.models import Task, TaskDurationSample, TaskRun
+from .planner import default_task_duration
+
+_log = logger.bind(module="TaskDurationStats")
+
+
+def _task_key(task_type) -> str:
+    return task_type.value if isinstance(task_type, TaskType) else str(task_type)
+
+
+def _percentile(values: List[float], percentile: int) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return round(ordered[0], 2)
+    rank = (len(ordered) - 1) * (percentile / 100)
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    weight = rank - lower
+    return round(ordered[lower] * (1 - weight) + ordered[upper] * weight, 2)
+
+
+class TaskDurationStats:
+    """任务耗时滚动统计（线程安全）。
+
+    Args:
+        type_window: 每个任务类型保留的样本数
+        scoped_window: 每个 (任务类型, 账号/模拟器) 保留的样本数
+        min_samples: 使用学习值所需的最少样本数
+        retention_days: 持久化样本保留天数
+    """
+
+    def __init__(
+        self,
+        *,
+        type_window: int = 200,
+        scoped_window: int = 20,
+        min_samples: int = 3,
+        retention_days: int = 30,
+    ) -> None:
+        self._type_window = type_window
+        self._scoped_window = scoped_window
+        self._min_samples = min_samples
+        self._retention_days = retention_days
+        self._by_type: Dict[str, Deque[float]] = {}
+        self._by_account: Dict[Tuple[str, int], Deque[float]] = {}
+        self._by_emulator: Dict[Tuple[str, int], Deque[float]] = {}
+        self._failures: Dict[str, int] = {}
+        self._pending_rows: List[dict] = []
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # ── 采样 ──
+
+    def record(
+        self,
+        task_type,
+        duration_sec: float,
+        *,
+        account_id: Optional[int] = None,
+        emulator_id: Optional[int] = None,
+        success: bool = True,
+        finished_at: Optional[datetime] = None,
+        persist: bool = True,
+    ) -> None:
+        """记录一次任务耗时。失败样本只计数并持久化，不参与预估。"""
+        if duration_sec is None or duration_sec < 0:
+            return
+        key = _task_key(task_type)
+        with self._lock:
+            if success:
+                self._append(self._by_type, key, duration_sec, self._type_window)
+                if account_id is not None:
+                    self._append(
+                        self._by_account, (key, int(account_id)),
+                        duration_sec, self._scoped_window,
+                    )
+                if emulator_id is not None:
+                    self._append(
+                        self._by_emulator, (key, int(emulator_id)),
+                        duration_sec, self._scoped_window,
+                    )
+            else:
+                self._failures[key] = self._failures.get(key, 0) + 1
+            if persist:
+                self._pending_rows.append(
+                    {
+                        "task_type": key,
+                        "account_id": account_id,
+                        "emulator_id": emulator_id,
+                        "duration_sec": float(duration_sec),
+                        "success": bool(success),
+                        "finished_at": finished_at or datetime.utcnow(),
+                    }
+                )
+
+    @staticmethod
+    def _append(store: dict, key, value: float, maxlen: int) -> None:
+        bucket = store.get(key)
+        if bucket is None:
+            bucket = deque(maxlen=maxlen)
+            store[key] = bucket
+        bucket.append(float(value))
+
+    # ── 查询 ──
+
+    def estimate(self, task_type, account_id: Optional[int] = None) -> float:
+        """预估任务耗时（秒）：账号 p50 → 任务类型 p50 → 静态默认值。"""
+        key = _task_key(task_type)
+        with self._lock:
+            if account_id is not None:
+                scoped = self._by_account.get((key, int(account_id)))
+                if scoped and len(scoped) >= self._min_samples:
+                    return _percentile(list(scoped), 50)
+            samples = self._by_type.get(key)
+            if samples and len(samples) >= self._min_samples:
+                return _percentile(list(samples), 50)
+        try:
+            return default_task_duration(TaskType(key))
+        except ValueError:
+            return default_task_duration(key)
+
+    def percentiles(self, task_type) -> dict:
+        key = _task_key(task_type)
+        with self._lock:
+            values = list(self._by_type.get(key, ()))
+            failures = self._failures.get(key, 0)
+        return {
+            "task_type": key,
+            "count": len(values),
+            "failures": failures,
+            "p50": _percentile(values, 50),
+            "p90": _percentile(values, 90),
+            "p95": _percentile(values, 95),
+            "estimate_sec": self.estimate(key),
+        }
+
+    def snapshot(
+        self,
+        task_type: Optional[str] = None,
+        *,
+        account_id: Optional[int] = None,
+        emulator_id: Optional[int] = None,
+    ) -> dict:
+        """返回耗时统计（供 API 查询）。可按任务类型/账号/模拟器过滤。"""
+        with self._lock:
+            keys = sorted(set(self._by_type) | set(self._failures))
+            account_rows = {
+                k: list(v) for k, v in self._by_account.items()
+                if account_id is not None and k[1] == int(account_id)
+            }
+            emulator_rows = {
+                k: list(v) for k, v in self._by_emulator.items()
+                if emulator_id is not None and k[1] == int(emulator_id)
+            }
+        if task_type:
+            keys = [k for k in keys if k == task_type]
+        result = {"task_types": [self.percentiles(k) for k in keys]}
+        if account_id is not None:
+            result["account"] = [
+                {"task_type": k[0], "count": len(v),
+                 "p50": _percentile(v, 50), "p90": _percentile(v, 90)}
+                for k, v in sorted(account_rows.items())
+                if not task_type or k[0] == task_type
+            ]
+        if emulator_id is not None:
+            result["emulator"] = [
+                {"task_type": k[0], "count": len(v),
+                 "p50": _percentile(v, 50), "p90": _percentile(v, 90)}
+                for k, v in sorted(emulator_rows.items())
+                if not task_type or k[0] == task_type
+            ]
+        return result
+
+    # ── 持久化 ──
+
+    def load_sync(self) -> int:
+        """从 DB 恢复最近样本；无样本时回退读取 TaskRun 历史。返回加载条数。"""
+        if self._loaded:
+            return 0
+        loaded = 0
+        try:
+            with SessionLocal() as db:
+                rows = (
+                    db.query(TaskDurationSample)
+                    .order_by(TaskDurationSample.finished_at.desc())
+                    .limit(self._type_window * 40)
+                    .all()
+                )
+                for row in reversed(rows):
+                    self.record(
+                        row.task_type, row.duration_sec,
+                        account_id=row.account_id,
+                        emulator_id=row.emulator_id,
+                        success=bool(row.success),
+                        finished_at=row.finished_at,
+                        persist=False,
+                    )
+                    loaded += 1
+
+                if not rows:
+                    runs = (
+                        db.query(Task.type, Task.account_id, TaskRun.emulator_id,
+                                 TaskRun.started_at, TaskRun.finished_at, TaskRun.status)
+                        .join(Task, TaskRun.task_id == Task.id)
+                        .filter(TaskRun.finished_at.isnot(None))
+                        .order_by(TaskRun.finished_at.desc())
+                        .limit(self._type_window * 40)
+                        .all()
+                    )
+                    for task_type, acc_id, emu_id, started, finished, status in reversed(runs):
+                        if not started:
+                            continue
+                        self.record(
+                            task_type, (finished - started).total_seconds(),
+                            account_id=acc_id,
+                            emulator_id=emu_id,
+                            success=status == "succeeded",
+                            finished_at=finished,
+                            persist=False,
+                        )
+                        loaded += 1
+            self._loaded = True
+            _log.info(f"任务耗时统计已加载: samples={loaded}")
+        except Exception as e:
+            _log.warning(f"任务耗时统计加载失败: {e}")
+        return loaded
+
+    def flush_sync(self) -> int:
+        """将待写样本批量写入 DB，并清理过期样本。返回写入条数。"""
+        with self._lock:
+            rows = self._pending_rows
+            self._pending_rows = []
+        if not rows:
+            return 0
+        try:
+            with SessionLocal() as db:
+                db.bulk_insert_mappings(TaskDurationSample, rows)
+                cutoff = datetime.utcnow() - timedelta(days=self._retention_days)
+                db.query(TaskDurationSample).filter(
+                    TaskDurationSample.finished_at < cutoff
+                ).delete(synchronize_session=False)
+                db.commit()
+            return len(rows)
+        except Exception as e:
+            _log.warning(f"任务耗时样本写入失败: {e}")
+            return 0
+
+    async def load(self) -> int:
+        return await run_in_db(self.load_sync)
+
+    async def flush(self) -> int:
+        return await run_in_db(self.flush_sync)
+
+
+duration_stats = TaskDurationStats()
+
+__all__ = ["TaskDurationStats", "duration_stats"]
@@ -29,9 +29,9 @@ from ...core.constants import TaskStatus
 from ...db.base import SessionLocal
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
-from ..ocr.async_recognize import async_ocr_digits
 from ..ui.assets import parse_number, AssetType
 from ..ui.manager import UIManager
+from .account_state import update_account_fields
 from .base import BaseExecutor
 from .battle import run_battle, ManualLineupInfo, VICTORY, DEFEAT, TIMEOUT, ERROR, SCENE
 from .helpers import (
@@ -43,9 +43,8 @@ from .helpers import (
 from ..lineup import get_lineup_for_task
 from ..shikigami import build_manual_lineup_info
 from ..vision.explore_detect import detect_current_chapter
-from ..vision.tupo_detect import detect_tupo_grid, TupoCardState
+from ..vision.tupo_detect import TupoCardState
 from ..vision.color_detect import detect_jiekai_lock
-from ..vision.template import match_template as _match_template
 from .explore_chapter import run_explore_chapter
 
 # 渠道包名
@@ -109,7 +108,7 @@ class ExploreExecutor(BaseExecutor):
                 )
                 time.sleep(0.3)
                 continue
-            result = await async_ocr_digits(screenshot, roi=_TUPO_TICKET_ROI)
+            result = await self.vision.ocr_digits(screenshot, roi=_TUPO_TICKET_ROI)
             raw = result.text.strip()
             value = parse_number(raw)
             self.logger.info(
@@ -138,7 +137,7 @@ class ExploreExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[探索突破] 准备: account={account.login_id}")
@@ -409,7 +408,7 @@ class ExploreExecutor(BaseExecutor):
         screenshot = await self._capture()
         if screenshot is None:
             return
-        m = _match_template(screenshot, _TPL_TANSUO_TANSUO)
+        m = await self.vision.match_template(screenshot, _TPL_TANSUO_TANSUO)
         if m:
             self.logger.info("[探索突破] 检测到难度选择面板，点击退出回到 TANSUO")
             await click_template(
@@ -499,7 +498,7 @@ class ExploreExecutor(BaseExecutor):
                 continue
 
             # 检测 tansuo_tansuo.png 判断是否在难度选择界面
-            tansuo_m = _match_template(screenshot, _TPL_TANSUO_TANSUO)
+            tansuo_m = await self.vision.match_template(screenshot, _TPL_TANSUO_TANSUO)
             if tansuo_m:
                 # 难度选择界面（有"探索"按钮）
                 roi = _STAMINA_ROI_DIFFICULTY
@@ -509,7 +508,7 @@ class ExploreExecutor(BaseExecutor):
                 roi = _STAMINA_ROI_TANSUO
                 ui_label = "TANSUO 界面"
 
-            result = await async_ocr_digits(screenshot, roi=roi)
+            result = await self.vision.ocr_digits(screenshot, roi=roi)
             raw = result.text.strip()
             value = parse_number(raw)
             self.logger.info(
@@ -539,7 +538,7 @@ class ExploreExecutor(BaseExecutor):
                 continue
 
             # 用 tansuo_tansuo.png 判断界面
-            tansuo_m = _match_template(screenshot, _TPL_TANSUO_TANSUO)
+            tansuo_m = await self.vision.match_template(screenshot, _TPL_TANSUO_TANSUO)
             if tansuo_m:
                 roi = _DIFFICULTY_TICKET_ROI
                 ui_label = "难度选择界面"
@@ -547,7 +546,7 @@ class ExploreExecutor(BaseExecutor):
                 roi = _TANSUO_TICKET_ROI
                 ui_label = "TANSUO 界面"
 
-            result = await async_ocr_digits(screenshot, roi=roi)
+            result = await self.vision.ocr_digits(screenshot, roi=roi)
             raw = result.text.strip()
             value = parse_number(raw)
             self.logger.info(
@@ -564,13 +563,7 @@ class ExploreExecutor(BaseExecutor):
     def _update_tupo_ticket_db(self, value: int) -> None:
         """更新突破票数量到数据库。"""
         try:
-            with SessionLocal() as db:
-                acc = db.query(GameAccount).filter(
-                    GameAccount.id == self.current_account.id
-                ).first()
-                if acc:
-                    acc.tupo_ticket = value
-                    db.commit()
+            update_account_fields(self.current_account.id, tupo_ticket=value)
         except Exception as e:
             self.logger.warning(f"[探索突破] 更新突破票到 DB 失败: {e}")
 
@@ -675,7 +668,7 @@ class ExploreExecutor(BaseExecutor):
             self.logger.warning("[结界突破] 截图失败，无法检测锁定状态")
             return False
 
-        lock_state = detect_jiekai_lock(screenshot)
+        lock_state = await self.vision.run(detect_jiekai_lock, screenshot)
         self.logger.info(
             f"[结界突破] 锁定状态: locked={lock_state.locked}, "
             f"score={lock_state.score:.2f}, 期望={'锁定' if should_lock else '解锁'}"
@@ -701,7 +694,7 @@ class ExploreExecutor(BaseExecutor):
             # 验证
             screenshot = await self._capture()
             if screenshot is not None:
-                new_state = detect_jiekai_lock(screenshot)
+                new_state = await self.vision.run(detect_jiekai_lock, screenshot)
                 if new_state.locked == should_lock:
                     self.logger.info(
                         f"[结界突破] 锁定状态切换成功: "
@@ -908,7 +901,9 @@ class ExploreExecutor(BaseExecutor):
         if screenshot is None:
             return False
 
-        grid = detect_tupo_grid(screenshot)
+        grid = await self.vision.detect_tupo_grid(
+            screenshot, emulator=self.adapter.cfg.adb_addr
+        )
         non_defeated = [
             c for c in grid.cards if c.state != TupoCardState.DEFEATED
         ]
@@ -1057,7 +1052,9 @@ class ExploreExecutor(BaseExecutor):
                     await asyncio.sleep(0.5)
                     continue
 
-                grid = detect_tupo_grid(screenshot)
+                grid = await self.vision.detect_tupo_grid(
+                    screenshot, emulator=self.adapter.cfg.adb_addr
+                )
                 if grid.cards:
                     break
                 self.logger.warning(
@@ -1162,7 +1159,9 @@ class ExploreExecutor(BaseExecutor):
             # FAILED 卡片表示上轮战败的对手，重复挑战胜率低，应刷新换新对手
             post_screenshot = await self._capture()
             if post_screenshot is not None:
-                post_grid = detect_tupo_grid(post_screenshot)
+                post_grid = await self.vision.detect_tupo_grid(
+                    post_screenshot, emulator=self.adapter.cfg.adb_addr
+                )
                 if post_grid.failed_count > 0:
                     self.logger.info(
                         f"[结界突破] 本轮结束，存在 {post_grid.failed_count} 张失败卡片，刷新网格"
@@ -13,12 +13,13 @@ import random
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Optional
 
+from ...core.thread_pool import ComputePriority
 from ..vision.color_detect import detect_explore_lock
+from ..vision.context import VisionContext
 from ..vision.explore_detect import (
     ChallengeGlowState,
     detect_challenge_markers,
 )
-from ..vision.template import match_template
 from .battle import ManualLineupInfo, run_battle, VICTORY, DEFEAT
 from .helpers import click_template, wait_for_template, _adapter_capture, _adapter_tap
 
@@ -77,6 +78,7 @@ async def _ensure_explore_lock_state(
     Returns:
         True 表示状态已正确
     """
+    vision = VisionContext.for_adapter(adapter)
     tag = "[探索-锁定]"
     screenshot = await _adapter_capture(adapter, capture_method)
     if screenshot is None:
@@ -84,7 +86,7 @@ async def _ensure_explore_lock_state(
             log.warning(f"{tag} 截图失败")
         return False
 
-    lock_state = detect_explore_lock(screenshot)
+    lock_state = await vision.run(detect_explore_lock, screenshot)
     if log:
         log.info(
             f"{tag} locked={lock_state.locked}, score={lock_state.score:.2f}, "
@@ -104,7 +106,7 @@ async def _ensure_explore_lock_state(
 
         screenshot = await _adapter_capture(adapter, capture_method)
         if screenshot is not None:
-            new_state = detect_explore_lock(screenshot)
+            new_state = await vision.run(detect_explore_lock, screenshot)
             if new_state.locked == should_lock:
                 if log:
                     log.info(
@@ -145,6 +147,7 @@ async def run_explore_chapter(
     Returns:
         ExploreChapterResult
     """
+    vision = VisionContext.for_adapter(adapter)
     tag = "[探索章节]"
     result = ExploreChapterResult()
 
@@ -181,7 +184,7 @@ async def run_explore_chapter(
         # 检测困难是否锁定
         screenshot = await _adapter_capture(adapter, capture_method)
         if screenshot is not None:
-            lock_m = match_template(screenshot, _TPL_NANDU_KUNNAN_LOCK)
+            lock_m = await vision.match_template(screenshot, _TPL_NANDU_KUNNAN_LOCK)
             if lock_m:
                 if log:
                     log.warning(f"{tag} 困难难度已锁定，回退到普通")
@@ -191,7 +194,9 @@ async def run_explore_chapter(
                 # 点击屏幕右侧（困难按钮大致位置）切换到困难
                 # TODO: 补充 nandu_kunnan.png 模板后改为 click_template
                 try:
-                    kunnan_m = match_template(screenshot, "assets/ui/templates/nandu_kunnan.png")
+                    kunnan_m = await vision.match_template(
+                        screenshot, "assets/ui/templates/nandu_kunnan.png"
+                    )
                     if kunnan_m:
                         cx, cy = kunnan_m.random_point()
                         await _adapter_tap(adapter, cx, cy)
@@ -266,7 +271,9 @@ async def run_explore_chapter(
                 log.warning(f"{tag} 截图失败，结束战斗循环")
             break
 
-        detect_result = detect_challenge_markers(screenshot)
+        detect_result = await vision.run(
+            detect_challenge_markers, screenshot, priority=ComputePriority.BULK
+        )
         markers = detect_result.markers
 
         if log:
@@ -285,7 +292,7 @@ async def run_explore_chapter(
 
         if not targets:
             # 回退检测 BOSS 标记
-            boss_m = match_template(screenshot, _TPL_TANSUO_BOSS)
+            boss_m = await vision.match_template(screenshot, _TPL_TANSUO_BOSS)
             if boss_m:
                 if log:
                     log.info(
@@ -408,7 +415,7 @@ async def run_explore_chapter(
                     log.warning(f"{tag} 点击验证截图失败")
                 break
 
-            still_on_map = match_template(verify_shot, _TPL_TANSUO_SHEZHI)
+            still_on_map = await vision.match_template(verify_shot, _TPL_TANSUO_SHEZHI)
             if not still_on_map:
                 if log:
                     log.info(f"{tag} 点击验证通过，已离开探索地图")
@@ -423,7 +430,9 @@ async def run_explore_chapter(
                 )
 
             # 重新检测标记并点击
-            retry_detect = detect_challenge_markers(verify_shot)
+            retry_detect = await vision.run(
+                detect_challenge_markers, verify_shot, priority=ComputePriority.BULK
+            )
             if mode == "glowing_only":
                 retry_targets = retry_detect.get_glowing()
             else:
@@ -447,7 +456,7 @@ async def run_explore_chapter(
             # for 正常结束（未 break），做最终验证
             final_shot = await _adapter_capture(adapter, capture_method)
             if final_shot is not None:
-                still_on_map = match_template(final_shot, _TPL_TANSUO_SHEZHI)
+                still_on_map = await vision.match_template(final_shot, _TPL_TANSUO_SHEZHI)
                 if not still_on_map:
                     marker_click_ok = True
                     if log:
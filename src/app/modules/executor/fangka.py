@@ -11,17 +11,14 @@ from typing import Any, Dict, Optional
 import cv2
 import numpy as np
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus
 from ...core.logger import logger
 from ...core.timeutils import add_hours_to_beijing_time, format_beijing_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
-from ..ocr.async_recognize import async_ocr_digits, async_ocr_text
 from ..ui.manager import UIManager
-from ..vision.template import match_template
 from .base import BaseExecutor
 from .helpers import click_template
 
@@ -86,7 +83,7 @@ class FangkaExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     @staticmethod
     def _classify_4xtg_5xtg(screenshot: np.ndarray, match) -> str:
@@ -206,7 +203,7 @@ class FangkaExecutor(BaseExecutor):
                 "timestamp": datetime.utcnow().isoformat(),
             }
 
-        xiexia_match = match_template(screenshot, "assets/ui/templates/fk_xiexia.png")
+        xiexia_match = await self.vision.match_template(screenshot, "assets/ui/templates/fk_xiexia.png")
         if xiexia_match:
             self.logger.info("[放卡] 检测到已有结界卡，读取倒计时")
             result = await self._handle_existing_card(screenshot)
@@ -377,12 +374,12 @@ class FangkaExecutor(BaseExecutor):
                     tpl_4 = templates.get(4, "")
                     tpl_5 = templates.get(5, "")
                     m4 = (
-                        match_template(screenshot, tpl_4, threshold=0.8)
+                        await self.vision.match_template(screenshot, tpl_4, threshold=0.8)
                         if tpl_4
                         else None
                     )
                     m5 = (
-                        match_template(screenshot, tpl_5, threshold=0.8)
+                        await self.vision.match_template(screenshot, tpl_5, threshold=0.8)
                         if tpl_5
                         else None
                     )
@@ -403,7 +400,7 @@ class FangkaExecutor(BaseExecutor):
                         detected[actual_level] = card_match
                     continue
 
-                card_match = match_template(screenshot, template_path)
+                card_match = await self.vision.match_template(screenshot, template_path)
                 if card_match:
                     detected[level] = card_match
 
@@ -517,10 +514,10 @@ class FangkaExecutor(BaseExecutor):
                 continue
             try:
                 if digits_only:
-                    result = await async_ocr_digits(screenshot, roi=roi)
+                    result = await self.vision.ocr_digits(screenshot, roi=roi)
                     text = (result.text or "").strip()
                 else:
-                    text = await async_ocr_text(screenshot, roi=roi, min_confidence=0.3)
+                    text = await self.vision.ocr_text(screenshot, roi=roi, min_confidence=0.3)
                     text = (text or "").strip()
                 if text:
                     return text
@@ -590,18 +587,9 @@ class FangkaExecutor(BaseExecutor):
             next_time = add_hours_to_beijing_time(bj_now_str, hours)
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    task_cfg = cfg.get("放卡", {})
-                    task_cfg["next_time"] = next_time
-                    cfg["放卡"] = task_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"放卡": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[放卡] next_time 更新为 {next_time}")
         except Exception as e:
@@ -616,18 +604,9 @@ class FangkaExecutor(BaseExecutor):
             next_time = format_beijing_time(bj_now + timedelta(minutes=minutes))
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    task_cfg = cfg.get("放卡", {})
-                    task_cfg["next_time"] = next_time
-                    cfg["放卡"] = task_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"放卡": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[放卡] next_time 更新为 {next_time}（延迟 {minutes} 分钟）")
         except Exception as e:
@@ -10,12 +10,11 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus, TaskType
 from ...core.logger import logger
 from ...core.timeutils import format_beijing_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..emu.adb import AdbError
@@ -23,7 +22,6 @@ from ..ui.manager import UIManager
 from ..vision.template import Match, match_template
 from .base import BaseExecutor
 from .helpers import click_template, discover_template_paths, wait_for_template
-from ..ocr.async_recognize import async_ocr_digits
 import cv2
 import numpy as np
 
@@ -198,7 +196,7 @@ class FosterExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     def _init_available_rewards(self, foster_low_star: bool = False) -> None:
         """初始化可用奖励模板，跳过磁盘上不存在的文件"""
@@ -392,13 +390,13 @@ class FosterExecutor(BaseExecutor):
                 if screenshot is None:
                     return self._fail("截图失败")
 
-        blank_match = match_template(screenshot, _TPL_BLANK)
+        blank_match = await self.vision.match_template(screenshot, _TPL_BLANK)
         if not blank_match:
             # 已在寄养中 → OCR 识别剩余寄养时间
             self.logger.info("[寄养] 当前已在寄养中")
             delta = timedelta(hours=6)  # fallback
             try:
-                ocr_result = await async_ocr_digits(screenshot, roi=_FOSTER_TIME_ROI)
+                ocr_result = await self.vision.ocr_digits(screenshot, roi=_FOSTER_TIME_ROI)
                 raw = ocr_result.text.strip()
                 self.logger.info(f"[寄养] OCR 原始结果: {raw}")
                 # 去除非数字字符（ddddocr 可能把 ':' 识别为 's'、'g'、'8' 等）
@@ -476,7 +474,7 @@ class FosterExecutor(BaseExecutor):
                         pre_screenshot = await self._capture()
 
                 if pre_screenshot is not None:
-                    pre_rewards = self._detect_rewards(pre_screenshot)
+                    pre_rewards = await self.vision.run(self._detect_rewards, pre_screenshot)
                     for reward_type, m in pre_rewards:
                         if reward_type in immediate_set:
                             self.logger.info(
@@ -678,18 +676,18 @@ class FosterExecutor(BaseExecutor):
                     if screenshot is None:
                         continue
 
-            if match_template(screenshot, _TPL_TAG_JIEJIE):
+            if await self.vision.match_template(screenshot, _TPL_TAG_JIEJIE):
                 self.logger.info(f"[寄养] 已回到结界界面 (第 {i + 1} 次检测)")
                 return
 
-            back_match = match_template(screenshot, _TPL_BACK)
+            back_match = await self.vision.match_template(screenshot, _TPL_BACK)
             if back_match:
                 bx, by = back_match.random_point()
                 await self._tap(bx, by)
                 self.logger.info(f"[寄养] 点击返回 back: ({bx}, {by}) (第 {i + 1} 次)")
                 continue
 
-            exit_match = match_template(screenshot, _TPL_EXIT_DARK)
+            exit_match = await self.vision.match_template(screenshot, _TPL_EXIT_DARK)
             if exit_match:
                 ex, ey = exit_match.random_point()
                 await self._tap(ex, ey)
@@ -743,7 +741,7 @@ class FosterExecutor(BaseExecutor):
                         continue
 
             # 识别奖励
-            rewards = self._detect_rewards(screenshot)
+            rewards = await self.vision.run(self._detect_rewards, screenshot)
             for reward_type, m in rewards:
                 cand = FosterCandidate(
                     reward_type=reward_type,
@@ -769,7 +767,7 @@ class FosterExecutor(BaseExecutor):
 
             # 无奖励早停（仅在 record_candidates 阶段启用）
             if early_stop_on_no_rewards and not rewards:
-                if self._detect_any_presence(screenshot):
+                if await self.vision.run(self._detect_any_presence, screenshot):
                     self.logger.debug(
                         f"[寄养] {list_type}未识别到可寄养奖励，但检测到存在感知模板（如太阴），继续扫描"
                     )
@@ -780,13 +778,13 @@ class FosterExecutor(BaseExecutor):
                     break
 
             # 到底检测
-            if self._is_at_bottom(screenshot):
+            if await self.vision.run(self._is_at_bottom, screenshot):
                 self.logger.info(f"[寄养] {list_type}列表已到底部 (scroll={scroll_count})")
                 break
 
             # 无法下拉检测：每下拉3次检测一次
             if scroll_count > 0 and scroll_count % 3 == 0:
-                if self._is_unable_to_scroll(screenshot):
+                if await self.vision.run(self._is_unable_to_scroll, screenshot):
                     self.logger.info(f"[寄养] {list_type}列表无法下拉 (scroll={scroll_count})")
                     break
 
@@ -990,7 +988,7 @@ class FosterExecutor(BaseExecutor):
                 if screenshot is None:
                     return False
 
-        blank_match = match_template(screenshot, _TPL_BLANK)
+        blank_match = await self.vision.match_template(screenshot, _TPL_BLANK)
         if blank_match:
             self.logger.warning(f"[寄养] 验证失败：仍检测到空位，寄养未成功: {reward_type}")
             return False
@@ -1078,7 +1076,9 @@ class FosterExecutor(BaseExecutor):
             # 查找目标奖励（优先找原候选类型，其次找更高优先级）
             best_match: Optional[Tuple[str, Match]] = None
             best_priority = len(priority_list)
-            for reward_type, m in self._detect_rewards(screenshot):
+            for reward_type, m in await self.vision.run(
+                self._detect_rewards, screenshot
+            ):
                 try:
                     idx = priority_list.index(reward_type)
                 except ValueError:
@@ -1180,7 +1180,7 @@ class FosterExecutor(BaseExecutor):
                     if screenshot is None:
                         break
 
-            tongyi_match = match_template(screenshot, _TPL_FRIEND_TONGYI)
+            tongyi_match = await self.vision.match_template(screenshot, _TPL_FRIEND_TONGYI)
             if not tongyi_match:
                 self.logger.info(
                     f"[寄养] 未检测到同意按钮，好友申请处理完毕 (已同意 {accepted_count} 个)"
@@ -1228,7 +1228,7 @@ class FosterExecutor(BaseExecutor):
                         screenshot = await self._capture()
 
                 if screenshot is not None:
-                    jiangli = match_template(screenshot, _TPL_JIANGLI)
+                    jiangli = await self.vision.match_template(screenshot, _TPL_JIANGLI)
                     if jiangli:
                         self.logger.info("[寄养] 检测到奖励弹窗，点击关闭")
 
@@ -1253,18 +1253,9 @@ class FosterExecutor(BaseExecutor):
             next_time = format_beijing_time(bj_now + delta)
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    foster = cfg.get("寄养", {})
-                    foster["next_time"] = next_time
-                    cfg["寄养"] = foster
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"寄养": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[寄养] next_time 更新为 {next_time}")
         except Exception as e:
@@ -12,11 +12,14 @@ import inspect
 import random
 import time
 from typing import TYPE_CHECKING, Any, Optional, Union
-from pathlib import Path
 
 from ...core.config import settings
+from ...core.metrics import metrics
 from ..vision.frame_cache import compute_frame_fingerprint
-from ..vision.template import Match, match_template
+from ..vision.settle import adaptive_settle_enabled, wait_until_settled
+from ..vision.context import VisionContext
+from ..vision.template import Match
+from ..vision.template_bundle import glob_templates
 
 if TYPE_CHECKING:
     from ..emu.adapter import EmulatorAdapter
@@ -38,6 +41,28 @@ _TEXT_CACHE_STATS = {
 }
 
 
+def _collect_wait_cache_stats():
+    """抓取时导出 wait_for_template / wait_for_text 的同帧跳过统计。"""
+    stats = (("wait_for_template", _TEMPLATE_CACHE_STATS), ("wait_for_text", _TEXT_CACHE_STATS))
+    return [
+        (
+            "oas_wait_calls",
+            "counter",
+            "等待类调用次数（开启同帧缓存时）",
+            [({"subsystem": name}, d["calls"]) for name, d in stats],
+        ),
+        (
+            "oas_wait_same_frame_skips",
+            "counter",
+            "等待类轮询中因同帧跳过识别的次数",
+            [({"subsystem": name}, d["same_frame_skips"]) for name, d in stats],
+        ),
+    ]
+
+
+metrics.register_collector(_collect_wait_cache_stats)
+
+
 async def _adapter_capture(
     adapter: "Union[EmulatorAdapter, AsyncEmulatorAdapter]", method: str
 ):
@@ -111,9 +136,7 @@ def discover_template_paths(prefix: str) -> list[str]:
 
     返回排序后的 posix 路径列表；若 glob 未命中，兜底返回 ['{prefix}_1.png']。
     """
-    paths = sorted(
-        p.as_posix() for p in Path("assets/ui/templates").glob(f"{prefix}_*.png")
-    )
+    paths = glob_templates("assets/ui/templates", f"{prefix}_*.png")
     return paths or [f"assets/ui/templates/{prefix}_1.png"]
 
 
@@ -128,6 +151,26 @@ def _vision_cache_options() -> tuple[bool, int, float]:
     return enabled, unchanged_skip_max, min_retry_sleep
 
 
+def _wait_pipeline_enabled() -> bool:
+    return bool(getattr(settings, "vision_wait_pipeline_enabled", True))
+
+
+async def _delayed_capture(adapter: Any, capture_method: str, delay: float):
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return await _adapter_capture(adapter, capture_method)
+
+
+def _discard_prefetch(task: Optional[asyncio.Future]) -> None:
+    """丢弃未使用的预取截图：未完成则取消，已完成则取走异常避免告警。"""
+    if task is None:
+        return
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
+
+
 def _should_skip_same_frame(
     frame_fp: int | None,
     last_frame_fp: int | None,
@@ -213,6 +256,7 @@ async def wait_for_template(
     Returns:
         Match 对象，超时返回 None。
     """
+    vision = VisionContext.for_adapter(adapter)
     tag = f"[{label}] " if label else ""
     elapsed = 0.0
     kwargs = {"threshold": threshold} if threshold is not None else {}
@@ -222,30 +266,47 @@ async def wait_for_template(
     same_frame_miss_streak = 0
     if cache_enabled:
         _TEMPLATE_CACHE_STATS["calls"] = int(_TEMPLATE_CACHE_STATS["calls"]) + 1
-
-    while elapsed < timeout:
-        screenshot = await _adapter_capture(adapter, capture_method)
-        if screenshot is not None:
-            frame_fp: int | None = None
-            if cache_enabled:
-                frame_fp = compute_frame_fingerprint(screenshot)
-                if frame_fp != last_frame_fp:
-                    last_frame_fp = frame_fp
-                    same_frame_miss_streak = 0
-                elif _should_skip_same_frame(
-                    frame_fp, last_frame_fp, same_frame_miss_streak, unchanged_skip_max
-                ):
-                    same_frame_miss_streak += 1
-                    if cache_enabled:
-                        _TEMPLATE_CACHE_STATS["same_frame_skips"] = (
-                            int(_TEMPLATE_CACHE_STATS["same_frame_skips"]) + 1
-                        )
-                    await asyncio.sleep(interval)
-                    elapsed += interval
-                    continue
-            for tpl in templates:
-                m = match_template(screenshot, tpl, **kwargs)
-                if m:
+    # 流水线：当前帧在计算池匹配的同时，下一帧（interval 后）已在模拟器 IO 池截取
+    pipelined = _wait_pipeline_enabled()
+    pending: Optional[asyncio.Future] = None
+
+    try:
+        while elapsed < timeout:
+            if pipelined:
+                if pending is None:
+                    pending = asyncio.ensure_future(
+                        _delayed_capture(adapter, capture_method, 0)
+                    )
+                screenshot = await pending
+                pending = None
+                if elapsed + interval < timeout:
+                    pending = asyncio.ensure_future(
+                        _delayed_capture(adapter, capture_method, interval)
+                    )
+            else:
+                screenshot = await _adapter_capture(adapter, capture_method)
+            if screenshot is not None:
+                frame_fp: int | None = None
+                if cache_enabled:
+                    frame_fp = compute_frame_fingerprint(screenshot)
+                    if frame_fp != last_frame_fp:
+                        last_frame_fp = frame_fp
+                        same_frame_miss_streak = 0
+                    elif _should_skip_same_frame(
+                        frame_fp, last_frame_fp, same_frame_miss_streak, unchanged_skip_max
+                    ):
+                        same_frame_miss_streak += 1
+                        if cache_enabled:
+                            _TEMPLATE_CACHE_STATS["same_frame_skips"] = (
+                                int(_TEMPLATE_CACHE_STATS["same_frame_skips"]) + 1
+                            )
+                        if not pipelined:
+                            await asyncio.sleep(interval)
+                        elapsed += interval
+                        continue
+                hit = await vision.match_first(screenshot, templates, **kwargs)
+                if hit:
+                    tpl, m = hit
                     if log:
                         log.info(
                             f"{tag}检测到模板 {tpl} (score={m.score:.3f}, elapsed={elapsed:.1f}s)"
@@ -254,29 +315,39 @@ async def wait_for_template(
                             log, _TEMPLATE_CACHE_STATS, "wait_for_template"
                         )
                     return m
-            if frame_fp is not None:
-                same_frame_miss_streak += 1
-            # 调试：定期输出未匹配模板的最佳分数（每30秒一次）
-            if log and elapsed > 0 and int(elapsed) % 30 < interval:
-                for tpl in templates:
-                    raw = match_template(screenshot, tpl, threshold=0.0)
-                    score_str = f"{raw.score:.3f}" if raw else "N/A"
-                    log.info(
-                        f"{tag}[debug] 模板 {tpl} 未匹配, "
-                        f"best_score={score_str} (阈值={kwargs.get('threshold', 0.85):.2f}, "
-                        f"elapsed={elapsed:.0f}s)"
-                    )
-            # 所有模板都未匹配时检查弹窗
-            if popup_handler is not None:
-                dismissed = await popup_handler.check_and_dismiss(screenshot)
-                if dismissed > 0:
-                    last_frame_fp = None
-                    same_frame_miss_streak = 0
-                    if min_retry_sleep > 0:
-                        await asyncio.sleep(min_retry_sleep)
-                    continue  # 弹窗关闭后立即重试，不消耗 interval
-        await asyncio.sleep(interval)
-        elapsed += interval
+                if frame_fp is not None:
+                    same_frame_miss_streak += 1
+                # 调试：定期输出未匹配模板的最佳分数（每30秒一次）
+                if log and elapsed > 0 and int(elapsed) % 30 < interval:
+                    for tpl in templates:
+                        raw = await vision.match_template(screenshot, tpl, threshold=0.0)
+                        score_str = f"{raw.score:.3f}" if raw else "N/A"
+                        log.info(
+                            f"{tag}[debug] 模板 {tpl} 未匹配, "
+                            f"best_score={score_str} (阈值={kwargs.get('threshold', 0.85):.2f}, "
+                            f"elapsed={elapsed:.0f}s)"
+                        )
+                # 所有模板都未匹配时检查弹窗
+                if popup_handler is not None:
+                    dismissed = await popup_handler.check_and_dismiss(screenshot)
+                    if dismissed > 0:
+                        last_frame_fp = None
+                        same_frame_miss_streak = 0
+                        if pipelined:
+                            # 预取帧截于弹窗关闭之前，作废后重新截图
+                            _discard_prefetch(pending)
+                            pending = asyncio.ensure_future(
+                                _delayed_capture(adapter, capture_method, min_retry_sleep)
+                            )
+                        elif min_retry_sleep > 0:
+                            await asyncio.sleep(min_retry_sleep)
+                        continue  # 弹窗关闭后立即重试，不消耗 interval
+            if not pipelined:
+                await asyncio.sleep(interval)
+            elapsed += interval
+    finally:
+        # 命中 / 超时 / 异常时取消尚未使用的预取截图
+        _discard_prefetch(pending)
 
     # 超时后尝试点击右上角关闭未知弹窗并重试
     if dismiss_retry > 0:
@@ -329,14 +400,14 @@ async def click_template(
 
     流程:
         1. wait_for_template 等待模板出现
-        2. sleep(settle) 让 UI 完全加载
-        3. 重新截图确认模板仍在，获取最新坐标
+        2. 稳定等待（画面连续无变化即继续，settle 为上限）让 UI 完全加载
+        3. 用稳定后的截图确认模板仍在，获取最新坐标
         4. 点击模板中心
         5. 若 verify_gone=True：检查模板是否消失，仍在则重试
 
     Args:
-        settle: 检测到模板后额外等待秒数，让 UI 完全加载
-        post_delay: 点击后等待秒数，让 UI 过渡
+        settle: 检测到模板后最长额外等待秒数，让 UI 完全加载
+        post_delay: 点击后最长等待秒数，让 UI 过渡（画面变化后稳定即提前返回）
         verify_gone: 点击后是否验证模板消失
         max_clicks: verify_gone 模式下最大点击次数
         gone_interval: 点击后到验证之间的等待秒数
@@ -344,6 +415,7 @@ async def click_template(
     Returns:
         True 表示找到并点击成功，False 表示超时未找到。
     """
+    vision = VisionContext.for_adapter(adapter)
     tag = f"[{label}] " if label else ""
     kwargs = {"threshold": threshold} if threshold is not None else {}
     templates = [template] if isinstance(template, str) else template
@@ -364,25 +436,34 @@ async def click_template(
     if not m:
         return False
 
+    adaptive = adaptive_settle_enabled()
+
+    async def _capture():
+        return await _adapter_capture(adapter, capture_method)
+
     # 2) settle 等待 UI 完全加载
+    settled_frame = None
     if settle > 0:
-        await asyncio.sleep(settle)
+        if adaptive:
+            settled_frame = (await wait_until_settled(_capture, max_wait=settle)).frame
+        else:
+            await asyncio.sleep(settle)
 
     # 3-5) 点击（含重试逻辑）
     for attempt in range(max_clicks):
-        # 重新截图获取最新坐标
-        screenshot = await _adapter_capture(adapter, capture_method)
+        # 首次复用稳定等待的最后一帧，其余重新截图获取最新坐标
+        if settled_frame is not None:
+            screenshot, settled_frame = settled_frame, None
+        else:
+            screenshot = await _adapter_capture(adapter, capture_method)
         if screenshot is None:
             if log:
                 log.warning(f"{tag}截图失败 (attempt={attempt + 1})")
             await asyncio.sleep(gone_interval)
             continue
 
-        m = None
-        for tpl in templates:
-            m = match_template(screenshot, tpl, **kwargs)
-            if m:
-                break
+        hit = await vision.match_first(screenshot, templates, **kwargs)
+        m = hit[1] if hit else None
         if not m:
             # 模板已经不在了（可能之前的操作已生效或 UI 发生变化）
             if log:
@@ -403,11 +484,7 @@ async def click_template(
         await asyncio.sleep(gone_interval)
         screenshot = await _adapter_capture(adapter, capture_method)
         if screenshot is not None:
-            still = None
-            for tpl in templates:
-                still = match_template(screenshot, tpl, **kwargs)
-                if still:
-                    break
+            still = await vision.match_first(screenshot, templates, **kwargs)
             if not still:
                 if log:
                     log.info(f"{tag}验证通过，模板已消失")
@@ -421,7 +498,10 @@ async def click_template(
 
     # 点击后等待 UI 过渡
     if post_delay > 0:
-        await asyncio.sleep(post_delay)
+        if adaptive:
+            await wait_until_settled(_capture, max_wait=post_delay, require_change=True)
+        else:
+            await asyncio.sleep(post_delay)
 
     return True
 
@@ -443,8 +523,6 @@ __all__ = [
 # 二维码等待
 # ---------------------------------------------------------------------------
 
-from ..vision.qrcode_detect import detect_qrcode as _detect_qrcode
-
 
 async def wait_for_qrcode(
     adapter: "EmulatorAdapter",
@@ -470,12 +548,13 @@ async def wait_for_qrcode(
     Returns:
         True 表示检测到二维码，False 表示超时未检测到。
     """
+    vision = VisionContext.for_adapter(adapter)
     tag = f"[{label}] " if label else ""
     elapsed = 0.0
 
     while elapsed < timeout:
         screenshot = await _adapter_capture(adapter, capture_method)
-        if screenshot is not None and _detect_qrcode(screenshot):
+        if screenshot is not None and await vision.detect_qrcode(screenshot):
             if log:
                 log.info(f"{tag}检测到二维码 (elapsed={elapsed:.1f}s)")
             return True
@@ -511,7 +590,6 @@ async def wait_for_qrcode(
 # OCR 辅助函数
 # ---------------------------------------------------------------------------
 
-from ..ocr import async_find_text as _async_find_text
 from ..ocr.types import OcrBox
 
 
@@ -549,6 +627,7 @@ async def wait_for_text(
     Returns:
         OcrBox 对象，超时返回 None。
     """
+    vision = VisionContext.for_adapter(adapter)
     tag = f"[{label}] " if label else ""
     elapsed = 0.0
     cache_enabled, unchanged_skip_max, min_retry_sleep = _vision_cache_options()
@@ -577,7 +656,7 @@ async def wait_for_text(
                     await asyncio.sleep(interval)
                     elapsed += interval
                     continue
-            box = await _async_find_text(
+            box = await vision.find_text(
                 screenshot,
                 keyword,
                 roi=roi,
@@ -664,6 +743,7 @@ async def click_text(
     Returns:
         True 表示找到并点击成功，False 表示超时未找到。
     """
+    vision = VisionContext.for_adapter(adapter)
     tag = f"[{label}] " if label else ""
 
     box = await wait_for_text(
@@ -688,7 +768,7 @@ async def click_text(
     # 重新截图获取最新坐标
     screenshot = await _adapter_capture(adapter, capture_method)
     if screenshot is not None:
-        fresh = await _async_find_text(
+        fresh = await vision.find_text(
             screenshot,
             keyword,
             roi=roi,
@@ -740,13 +820,14 @@ async def check_and_handle_liao_not_joined(
     Returns:
         True 表示检测到未加入寮并已处理，False 表示不是未加入寮的情况。
     """
+    vision = VisionContext.for_adapter(adapter)
     tag = f"[{label}] " if label else ""
 
     screenshot = await _adapter_capture(adapter, capture_method)
     if screenshot is None:
         return False
 
-    m = match_template(screenshot, _TPL_LIAO_YIJIANSHENQING)
+    m = await vision.match_template(screenshot, _TPL_LIAO_YIJIANSHENQING)
     if not m:
         return False
 
@@ -793,12 +874,11 @@ async def _defer_all_liao_tasks(
     """延后指定账号所有寮相关任务的 next_time（offload 到线程池）。"""
     from datetime import timedelta
 
-    from sqlalchemy.orm.attributes import flag_modified
 
     from ...core.thread_pool import run_in_db
     from ...core.timeutils import format_beijing_time, now_beijing
     from ...db.base import SessionLocal
-    from ...db.models import GameAccount
+    from ...db.json_patch import patch_task_config
 
     tag = f"[{label}] " if label else ""
     bj_now = now_beijing()
@@ -809,21 +889,13 @@ async def _defer_all_liao_tasks(
     def _do_defer():
         try:
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount).filter(GameAccount.id == account_id).first()
-                )
-                if not account:
+                updates = {key: {"next_time": new_next_time} for key in liao_config_keys}
+                if not patch_task_config(db, account_id, updates):
                     return
-                cfg = account.task_config or {}
-                for key in liao_config_keys:
-                    task_cfg = cfg.get(key, {})
-                    task_cfg["next_time"] = new_next_time
-                    cfg[key] = task_cfg
-                    if log:
-                        log.info(f"{tag}{key} next_time 延后至 {new_next_time} (未加入寮)")
-                account.task_config = cfg
-                flag_modified(account, "task_config")
                 db.commit()
+                if log:
+                    for key in liao_config_keys:
+                        log.info(f"{tag}{key} next_time 延后至 {new_next_time} (未加入寮)")
         except Exception as e:
             if log:
                 log.error(f"{tag}延后寮任务 next_time 失败: {e}")
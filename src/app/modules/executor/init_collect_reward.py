@@ -9,17 +9,15 @@ import asyncio
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus
 from ...core.logger import logger
 from ...core.timeutils import add_hours_to_beijing_time, format_beijing_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.dialog_detector import detect_dialog
 from ..ui.manager import UIManager
-from ..vision.template import match_template
 from ..vision.utils import random_point_in_circle
 from .base import BaseExecutor
 from .db_logger import emit as db_log
@@ -60,7 +58,7 @@ class InitCollectRewardExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(
@@ -256,7 +254,7 @@ class InitCollectRewardExecutor(BaseExecutor):
                 screenshot = await self._capture()
 
         if screenshot is not None:
-            jiangli_result = match_template(
+            jiangli_result = await self.vision.match_template(
                 screenshot, "assets/ui/templates/jiangli.png"
             )
             if jiangli_result:
@@ -278,7 +276,7 @@ class InitCollectRewardExecutor(BaseExecutor):
         # 关闭 jiangli 后可能出现 chahua.png，同样方式关闭
         screenshot = await self._capture()
         if screenshot is not None:
-            chahua_result = match_template(
+            chahua_result = await self.vision.match_template(
                 screenshot, "assets/ui/templates/chahua.png"
             )
             if chahua_result:
@@ -299,18 +297,9 @@ class InitCollectRewardExecutor(BaseExecutor):
             next_time = add_hours_to_beijing_time(bj_now_str, 24)
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    reward_cfg = cfg.get("起号_领取奖励", {})
-                    reward_cfg["next_time"] = next_time
-                    cfg["起号_领取奖励"] = reward_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"起号_领取奖励": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(
                         f"[起号_领取奖励] next_time 更新为 {next_time}"
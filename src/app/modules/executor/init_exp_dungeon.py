@@ -10,15 +10,13 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus
 from ...core.timeutils import format_beijing_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
-from ..vision.template import match_template
 from .base import BaseExecutor
 from .helpers import click_template, wait_for_template
 from .db_logger import emit as db_log
@@ -74,7 +72,7 @@ class InitExpDungeonExecutor(BaseExecutor):
                 syscfg.activity_name or ".MainActivity" if syscfg else ".MainActivity"
             ),
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(
@@ -198,7 +196,7 @@ class InitExpDungeonExecutor(BaseExecutor):
             # 检查是否战斗失败
             await asyncio.sleep(0.5)
             screenshot = await self._capture()
-            if screenshot is not None and match_template(screenshot, _TPL_SHIBAI):
+            if screenshot is not None and await self.vision.match_template(screenshot, _TPL_SHIBAI):
                 self.logger.warning(
                     f"[起号_经验副本] 第 {round_idx} 轮战斗失败"
                 )
@@ -283,7 +281,7 @@ class InitExpDungeonExecutor(BaseExecutor):
             if await self.ui.popup_handler.check_and_dismiss(screenshot) > 0:
                 continue
 
-            m = match_template(screenshot, _TPL_JINGYANYAOGUAI)
+            m = await self.vision.match_template(screenshot, _TPL_JINGYANYAOGUAI)
             if m:
                 cx, cy = m.random_point()
                 self.logger.info(
@@ -358,7 +356,7 @@ class InitExpDungeonExecutor(BaseExecutor):
 
                 # 优先检测 zhunbei（准备按钮）— 匹配成功的终态
                 for tpl in _TPL_ZHUNBEI_LIST:
-                    m = match_template(screenshot, tpl)
+                    m = await self.vision.match_template(screenshot, tpl)
                     if m:
                         zhunbei_found = True
                         break
@@ -371,7 +369,7 @@ class InitExpDungeonExecutor(BaseExecutor):
 
                 # 检测 dengdai（等待画面）— 匹配中的中间态
                 if state is None:
-                    m = match_template(screenshot, _TPL_JINGYAN_DENGDAI)
+                    m = await self.vision.match_template(screenshot, _TPL_JINGYAN_DENGDAI)
                     if m:
                         state = "dengdai"
                         self.logger.info(
@@ -385,7 +383,7 @@ class InitExpDungeonExecutor(BaseExecutor):
             # 冷却检测：6s 内 dengdai 和 zhunbei 都未出现
             if state is None and elapsed >= cooldown_window:
                 screenshot = await self._capture()
-                if screenshot is not None and match_template(
+                if screenshot is not None and await self.vision.match_template(
                     screenshot, _TPL_ZIDONGPIPEI
                 ):
                     self.logger.info(
@@ -421,7 +419,7 @@ class InitExpDungeonExecutor(BaseExecutor):
             # 检查准备按钮是否仍在
             still_zhunbei = False
             for tpl in _TPL_ZHUNBEI_LIST:
-                m = match_template(screenshot, tpl)
+                m = await self.vision.match_template(screenshot, tpl)
                 if m:
                     cx, cy = m.random_point()
                     self.logger.info(
@@ -459,18 +457,9 @@ class InitExpDungeonExecutor(BaseExecutor):
             next_time = format_beijing_time(bj_now + delta)
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == account_id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    dungeon_cfg = cfg.get("起号_经验副本", {})
-                    dungeon_cfg["next_time"] = next_time
-                    cfg["起号_经验副本"] = dungeon_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, account_id, {"起号_经验副本": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(
                         f"[起号_经验副本] next_time 更新为 {next_time}"
@@ -11,18 +11,17 @@ import re
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus
 from ...core.logger import logger
 from ...core.timeutils import add_hours_to_beijing_time, format_beijing_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.dialog_detector import detect_dialog
 from ..ui.manager import UIManager
-from ..vision.template import match_template
 from ..vision.utils import random_point_in_circle
+from .account_state import update_account_fields
 from .base import BaseExecutor
 from .db_logger import emit as db_log
 from .helpers import click_template, wait_for_template, _adapter_capture, _adapter_tap
@@ -85,7 +84,7 @@ class InitFanheUpgradeExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(
@@ -417,7 +416,7 @@ class InitFanheUpgradeExecutor(BaseExecutor):
         # 如果还在升级弹窗中，可能需要先关闭
         screenshot = await self._capture()
         if screenshot is not None:
-            exit_pink = match_template(
+            exit_pink = await self.vision.match_template(
                 screenshot, "assets/ui/templates/exit_pink.png", threshold=0.7
             )
             if exit_pink:
@@ -460,12 +459,11 @@ class InitFanheUpgradeExecutor(BaseExecutor):
     async def _ocr_level(self) -> Optional[int]:
         """OCR 等级（饭盒/酒壶共用同一 ROI）"""
         try:
-            from ..ocr.async_recognize import async_ocr_digits
 
             screenshot = await self._capture()
             if screenshot is None:
                 return None
-            result = await async_ocr_digits(screenshot, roi=_LEVEL_ROI)
+            result = await self.vision.ocr_digits(screenshot, roi=_LEVEL_ROI)
             raw = result.text.strip() if hasattr(result, "text") else ""
             if not raw and hasattr(result, "boxes") and result.boxes:
                 raw = result.boxes[0].text.strip()
@@ -477,12 +475,11 @@ class InitFanheUpgradeExecutor(BaseExecutor):
     async def _ocr_asset_xunzhang(self) -> Optional[int]:
         """OCR 当前拥有的勋章数"""
         try:
-            from ..ocr.async_recognize import async_ocr_digits
 
             screenshot = await self._capture()
             if screenshot is None:
                 return None
-            result = await async_ocr_digits(screenshot, roi=_ASSET_XUNZHANG_ROI)
+            result = await self.vision.ocr_digits(screenshot, roi=_ASSET_XUNZHANG_ROI)
             raw = result.text.strip() if hasattr(result, "text") else ""
             if not raw and hasattr(result, "boxes") and result.boxes:
                 raw = result.boxes[0].text.strip()
@@ -494,12 +491,11 @@ class InitFanheUpgradeExecutor(BaseExecutor):
     async def _ocr_need_xunzhang(self) -> Optional[int]:
         """OCR 升级所需的勋章数"""
         try:
-            from ..ocr.async_recognize import async_ocr_digits
 
             screenshot = await self._capture()
             if screenshot is None:
                 return None
-            result = await async_ocr_digits(screenshot, roi=_NEED_XUNZHANG_ROI)
+            result = await self.vision.ocr_digits(screenshot, roi=_NEED_XUNZHANG_ROI)
             raw = result.text.strip() if hasattr(result, "text") else ""
             if not raw and hasattr(result, "boxes") and result.boxes:
                 raw = result.boxes[0].text.strip()
@@ -517,17 +513,16 @@ class InitFanheUpgradeExecutor(BaseExecutor):
             (asset_val, need_val) 元组
         """
         try:
-            from ..ocr.async_recognize import async_ocr_digits
 
             # 当前拥有的勋章数
-            result_asset = await async_ocr_digits(screenshot, roi=_ASSET_XUNZHANG_ROI)
+            result_asset = await self.vision.ocr_digits(screenshot, roi=_ASSET_XUNZHANG_ROI)
             raw_asset = result_asset.text.strip() if hasattr(result_asset, "text") else ""
             if not raw_asset and hasattr(result_asset, "boxes") and result_asset.boxes:
                 raw_asset = result_asset.boxes[0].text.strip()
             asset_val = _parse_number(raw_asset)
 
             # 升级所需的勋章数
-            result_need = await async_ocr_digits(screenshot, roi=_NEED_XUNZHANG_ROI)
+            result_need = await self.vision.ocr_digits(screenshot, roi=_NEED_XUNZHANG_ROI)
             raw_need = result_need.text.strip() if hasattr(result_need, "text") else ""
             if not raw_need and hasattr(result_need, "boxes") and result_need.boxes:
                 raw_need = result_need.boxes[0].text.strip()
@@ -545,16 +540,8 @@ class InitFanheUpgradeExecutor(BaseExecutor):
         field = "fanhe_level" if target == "fanhe" else "jiuhu_level"
         label = "饭盒" if target == "fanhe" else "酒壶"
         try:
-            with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    setattr(account, field, level)
-                    db.commit()
-                    self.logger.info(f"[起号_升级饭盒] {label}等级已保存: {level}")
+            update_account_fields(self.current_account.id, **{field: level})
+            self.logger.info(f"[起号_升级饭盒] {label}等级已保存: {level}")
         except Exception as e:
             self.logger.error(f"[起号_升级饭盒] 保存{label}等级失败: {e}")
 
@@ -566,18 +553,9 @@ class InitFanheUpgradeExecutor(BaseExecutor):
         """永久禁用升级饭盒任务（饭盒和酒壶都已满级）"""
         try:
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    fanhe_cfg = cfg.get("起号_升级饭盒", {})
-                    fanhe_cfg["enabled"] = False
-                    cfg["起号_升级饭盒"] = fanhe_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"起号_升级饭盒": {"enabled": False}}
+                ):
                     db.commit()
                     self.logger.info("[起号_升级饭盒] 任务已永久禁用（饭盒和酒壶都已满级）")
         except Exception as e:
@@ -590,18 +568,9 @@ class InitFanheUpgradeExecutor(BaseExecutor):
             next_time = add_hours_to_beijing_time(bj_now_str, 8)
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    fanhe_cfg = cfg.get("起号_升级饭盒", {})
-                    fanhe_cfg["next_time"] = next_time
-                    cfg["起号_升级饭盒"] = fanhe_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"起号_升级饭盒": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(
                         f"[起号_升级饭盒] next_time 更新为 {next_time}"
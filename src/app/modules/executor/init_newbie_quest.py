@@ -8,12 +8,11 @@ import asyncio
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus
 from ...core.logger import logger
 from ...core.timeutils import format_beijing_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from .base import BaseExecutor
 from .db_logger import emit as db_log
@@ -66,18 +65,9 @@ class InitNewbieQuestExecutor(BaseExecutor):
             next_time = format_beijing_time(bj_now + timedelta(hours=1))
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == account_id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    quest_cfg = cfg.get("起号_新手任务", {})
-                    quest_cfg["next_time"] = next_time
-                    cfg["起号_新手任务"] = quest_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, account_id, {"起号_新手任务": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(
                         f"[起号_新手任务] next_time 更新为 {next_time}"
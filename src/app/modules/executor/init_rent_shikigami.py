@@ -16,13 +16,14 @@ from ...core.constants import TaskStatus
 from ...core.logger import logger
 from ...core.timeutils import add_hours_to_beijing_time, format_beijing_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.dialog_detector import detect_dialog
 from ..ui.manager import UIManager
 from ..vision.color_detect import count_purple_gouyu
 from ..vision.grid_detect import nms_by_distance
-from ..vision.template import find_all_templates, match_template
+from ..vision.template import match_template
 from ..vision.utils import load_image, random_point_in_circle
 from .base import BaseExecutor
 from .db_logger import emit as db_log
@@ -87,7 +88,7 @@ class InitRentShikigamiExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(
@@ -235,14 +236,16 @@ class InitRentShikigamiExecutor(BaseExecutor):
             return []
         screenshot = load_image(raw_screenshot)
 
-        blank_matches = find_all_templates(screenshot, TPL_ZUJIE_BLANK, threshold=0.8)
+        blank_matches = await self.vision.find_all_templates(screenshot, TPL_ZUJIE_BLANK, threshold=0.8)
         blank_matches = nms_by_distance(blank_matches)
         blank_count = len(blank_matches)
         self.logger.info(f"[起号_租借式神] 检测到 {blank_count} 个空位")
 
         if blank_count == 0:
             self.logger.info("[起号_租借式神] 没有空位，检测已租借式神")
-            already_rented = self._detect_already_rented(screenshot)
+            already_rented = await self.vision.run(
+                self._detect_already_rented, screenshot
+            )
             if already_rented:
                 self._save_rented_shikigami(already_rented)
                 self.logger.info(
@@ -265,7 +268,7 @@ class InitRentShikigamiExecutor(BaseExecutor):
             return already_rented
 
         # 5. 检测各式神及其星级，构建候选列表
-        candidates = self._detect_candidates(screenshot)
+        candidates = await self.vision.run(self._detect_candidates, screenshot)
 
         if not candidates:
             self.logger.warning("[起号_租借式神] 未检测到可租借式神")
@@ -298,7 +301,7 @@ class InitRentShikigamiExecutor(BaseExecutor):
                 break
 
             # 重新检测该式神位置（截图可能已更新）
-            m = match_template(screenshot, cand["tpl_path"], threshold=0.8)
+            m = await self.vision.match_template(screenshot, cand["tpl_path"], threshold=0.8)
             if not m:
                 self.logger.info(f"[起号_租借式神] 重新检测未找到 {cand['name']}，跳过")
                 continue
@@ -318,7 +321,7 @@ class InitRentShikigamiExecutor(BaseExecutor):
                 continue
             screenshot = load_image(raw_screenshot)
 
-            new_blank_matches = find_all_templates(
+            new_blank_matches = await self.vision.find_all_templates(
                 screenshot, TPL_ZUJIE_BLANK, threshold=0.8
             )
             new_blank_matches = nms_by_distance(new_blank_matches)
@@ -481,18 +484,9 @@ class InitRentShikigamiExecutor(BaseExecutor):
             next_time = add_hours_to_beijing_time(bj_now_str, 24)
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    rent_cfg = cfg.get("起号_租借式神", {})
-                    rent_cfg["next_time"] = next_time
-                    cfg["起号_租借式神"] = rent_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"起号_租借式神": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(
                         f"[起号_租借式神] next_time 更新为 {next_time}"
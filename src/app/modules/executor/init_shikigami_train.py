@@ -13,16 +13,15 @@ from typing import Any, Dict, Optional
 import cv2
 import numpy as np
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus
 from ...core.logger import logger
 from ...core.timeutils import add_hours_to_beijing_time, format_beijing_time, now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_json_column, patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
-from ..vision.template import Match, find_all_templates, match_template
+from ..vision.template import Match
 from .awaken import awaken_shikigami
 from .base import BaseExecutor
 from .db_logger import emit as db_log
@@ -88,7 +87,7 @@ class InitShikigamiTrainExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(
@@ -176,7 +175,7 @@ class InitShikigamiTrainExecutor(BaseExecutor):
         # 5. 确保在列表视图并筛选 R 级
         screenshot = await self._capture()
         if screenshot is not None:
-            m = match_template(screenshot, _TPL_SHISHEN_R)
+            m = await self.vision.match_template(screenshot, _TPL_SHISHEN_R)
             if not m:
                 clicked = await click_template(
                     self.adapter, capture_method, _TPL_SHISHEN_LIEBIAO,
@@ -338,7 +337,7 @@ class InitShikigamiTrainExecutor(BaseExecutor):
         # 5. 统计养成格子总数（记录日志用）
         screenshot = await self._capture()
         if screenshot is not None:
-            all_gezi = find_all_templates(screenshot, _TPL_YANGCHENG_GEZI)
+            all_gezi = await self.vision.find_all_templates(screenshot, _TPL_YANGCHENG_GEZI)
             self.logger.info(
                 f"[起号_式神养成] 技能升级: 养成格子总数={len(all_gezi)}"
             )
@@ -350,7 +349,7 @@ class InitShikigamiTrainExecutor(BaseExecutor):
             if screenshot is None:
                 await asyncio.sleep(0.5)
                 continue
-            m = match_template(screenshot, _TPL_WEIJUEXING_ZUOFU)
+            m = await self.vision.match_template(screenshot, _TPL_WEIJUEXING_ZUOFU)
             if not m:
                 self.logger.info(
                     f"[起号_式神养成] 技能升级: 无更多未觉醒素材，共点击 {click_count} 次"
@@ -465,15 +464,10 @@ class InitShikigamiTrainExecutor(BaseExecutor):
         """更新 shikigami_config 中座敷童子的指定字段。"""
         try:
             with SessionLocal() as db:
-                account = db.query(GameAccount).filter(GameAccount.id == account_id).first()
-                if not account:
+                if not patch_json_column(
+                    db, GameAccount, account_id, "shikigami_config", {"座敷童子": {field: value}}
+                ):
                     return
-                cfg = account.shikigami_config or {}
-                zuofu = cfg.get("座敷童子", {})
-                zuofu[field] = value
-                cfg["座敷童子"] = zuofu
-                account.shikigami_config = cfg
-                flag_modified(account, "shikigami_config")
                 db.commit()
                 self.logger.info(
                     f"[起号_式神养成] 更新 座敷童子.{field}={value} (account={account_id})"
@@ -487,15 +481,8 @@ class InitShikigamiTrainExecutor(BaseExecutor):
         next_time = add_hours_to_beijing_time(bj_now_str, hours)
         try:
             with SessionLocal() as db:
-                account = db.query(GameAccount).filter(GameAccount.id == account_id).first()
-                if not account:
+                if not patch_task_config(db, account_id, {"起号_式神养成": {"next_time": next_time}}):
                     return
-                cfg = account.task_config or {}
-                task_cfg = cfg.get("起号_式神养成", {})
-                task_cfg["next_time"] = next_time
-                cfg["起号_式神养成"] = task_cfg
-                account.task_config = cfg
-                flag_modified(account, "task_config")
                 db.commit()
                 self.logger.info(
                     f"[起号_式神养成] next_time 更新为 {next_time} (account={account_id})"
@@ -597,7 +584,7 @@ class InitShikigamiTrainExecutor(BaseExecutor):
                     if screenshot is None:
                         continue
 
-            m = match_template(screenshot, template_path, **kwargs)
+            m = await self.vision.match_template(screenshot, template_path, **kwargs)
             if m:
                 self.logger.info(
                     f"[起号_式神养成] {label}: 第 {scroll_i} 次滚动后找到模板 "
@@ -8,19 +8,17 @@ import re
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus, TaskType
 from ...core.logger import logger
 from ...core.timeutils import now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
-from ..ocr.async_recognize import async_ocr
-from ..ocr.async_recognize import async_ocr_digits
 from ..ui.assets import parse_number
 from ..ui.manager import UIManager
-from ..vision.template import Match, match_template
+from ..vision.template import Match
+from .account_state import read_account_field, update_account_fields
 from .base import BaseExecutor
 from .helpers import click_template, wait_for_template
 
@@ -74,7 +72,7 @@ class LiaoShopExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[寮商店] 准备: account={account.login_id}")
@@ -111,7 +109,7 @@ class LiaoShopExecutor(BaseExecutor):
 
     async def _read_gongxun(self, screenshot) -> Optional[int]:
         """OCR 读取寮商店界面右上角的功勋值"""
-        result = await async_ocr_digits(screenshot, roi=GONGXUN_ROI)
+        result = await self.vision.ocr_digits(screenshot, roi=GONGXUN_ROI)
         raw = result.text.strip()
         value = parse_number(raw)
         self.logger.info(f"[寮商店] 功勋 OCR: raw='{raw}' → value={value}")
@@ -119,7 +117,7 @@ class LiaoShopExecutor(BaseExecutor):
 
     async def _read_liao_level(self, screenshot) -> Optional[int]:
         """OCR 读取 LIAO_XINXI 界面的寮等级"""
-        result = await async_ocr_digits(screenshot, roi=LIAO_LEVEL_ROI)
+        result = await self.vision.ocr_digits(screenshot, roi=LIAO_LEVEL_ROI)
         raw = result.text.strip()
         value = parse_number(raw)
         self.logger.info(f"[寮商店] 寮等级 OCR: raw='{raw}' → value={value}")
@@ -132,7 +130,7 @@ class LiaoShopExecutor(BaseExecutor):
         roi_y = m.y + m.h
         roi_w = m.w + 60
         roi_h = 30
-        result = await async_ocr(screenshot, roi=(roi_x, roi_y, roi_w, roi_h))
+        result = await self.vision.ocr(screenshot, roi=(roi_x, roi_y, roi_w, roi_h))
         raw = result.text.strip()
         self.logger.info(f"[寮商店] 剩余数量 OCR: raw='{raw}' roi=({roi_x},{roi_y},{roi_w},{roi_h})")
 
@@ -270,7 +268,7 @@ class LiaoShopExecutor(BaseExecutor):
         if await self.ui.popup_handler.check_and_dismiss(screenshot) > 0:
             screenshot = await self._capture()
         # 检测 jiangli.png 奖励画面
-        jiangli_match = match_template(screenshot, "assets/ui/templates/jiangli.png")
+        jiangli_match = await self.vision.match_template(screenshot, "assets/ui/templates/jiangli.png")
         if jiangli_match:
             self.logger.info("[寮商店] 检测到奖励画面，点击关闭")
         else:
@@ -461,7 +459,7 @@ class LiaoShopExecutor(BaseExecutor):
                     screenshot = await self._capture()
                     if screenshot is None:
                         continue
-                heisui_match = match_template(screenshot, "assets/ui/templates/heisui.png")
+                heisui_match = await self.vision.match_template(screenshot, "assets/ui/templates/heisui.png")
                 if heisui_match:
                     heisui_remaining = await self._read_remaining(screenshot, heisui_match)
                     if heisui_remaining is None:
@@ -500,7 +498,7 @@ class LiaoShopExecutor(BaseExecutor):
                     screenshot = await self._capture()
                     if screenshot is None:
                         continue
-                lanpiao_match = match_template(screenshot, "assets/ui/templates/lanpiao.png")
+                lanpiao_match = await self.vision.match_template(screenshot, "assets/ui/templates/lanpiao.png")
                 if lanpiao_match:
                     lanpiao_remaining = await self._read_remaining(screenshot, lanpiao_match)
                     if lanpiao_remaining is None:
@@ -570,45 +568,24 @@ class LiaoShopExecutor(BaseExecutor):
     def _update_gongxun_in_db(self, value: int) -> None:
         """更新 DB 中的功勋值（仅展示用途）"""
         try:
-            with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    account.gongxun = value
-                    db.commit()
+            update_account_fields(self.current_account.id, gongxun=value)
         except Exception as e:
             self.logger.warning(f"[寮商店] 更新功勋到 DB 失败: {e}")
 
     def _save_liao_level(self, level: int) -> None:
         """保存寮等级到数据库"""
         try:
-            with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    account.liao_level = level
-                    db.commit()
-                    self.logger.info(f"[寮商店] 寮等级已保存: {level}")
+            update_account_fields(self.current_account.id, liao_level=level)
+            self.logger.info(f"[寮商店] 寮等级已保存: {level}")
         except Exception as e:
             self.logger.warning(f"[寮商店] 保存寮等级到 DB 失败: {e}")
 
     def _get_cached_liao_level(self) -> Optional[int]:
-        """从数据库读取缓存的寮等级"""
+        """读取缓存的寮等级（批次内取账号状态，否则查询数据库）"""
         try:
-            with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account and account.liao_level and account.liao_level > 0:
-                    return account.liao_level
+            level = read_account_field(self.current_account.id, "liao_level", 0)
+            if level > 0:
+                return level
         except Exception as e:
             self.logger.warning(f"[寮商店] 读取缓存寮等级失败: {e}")
         return None
@@ -635,18 +612,9 @@ class LiaoShopExecutor(BaseExecutor):
                 next_time = retry_dt.strftime("%Y-%m-%d %H:%M")
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    shop = cfg.get("寮商店", {})
-                    shop["next_time"] = next_time
-                    cfg["寮商店"] = shop
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"寮商店": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[寮商店] next_time 更新为 {next_time}")
         except Exception as e:
@@ -9,12 +9,13 @@ from __future__ import annotations
 import asyncio
 from typing import TYPE_CHECKING, Any
 
+from ...core.thread_pool import ComputePriority
+from ..vision.context import VisionContext
 from ..vision.grid_detect import (
     detect_right_column_cells, find_template_in_grid,
     RIGHT_COL_X_START, RIGHT_COL_X_END, RIGHT_COL_Y_START, RIGHT_COL_Y_END,
     GRID_ROI,
 )
-from ..vision.template import match_template
 from .helpers import click_template, wait_for_template, _adapter_capture, _adapter_tap, _adapter_swipe
 
 if TYPE_CHECKING:
@@ -55,6 +56,7 @@ async def switch_lineup(
     Returns:
         True 表示切换成功，False 表示失败。
     """
+    vision = VisionContext.for_adapter(adapter)
     tag = "[阵容切换]"
 
     # 1. 导航到式神界面
@@ -101,7 +103,9 @@ async def switch_lineup(
             log.error(f"{tag} 截图失败")
         return False
 
-    cells = detect_right_column_cells(screenshot)
+    cells = await vision.run(
+        detect_right_column_cells, screenshot, priority=ComputePriority.BULK
+    )
     if not cells:
         if log:
             log.error(f"{tag} 未检测到右侧分组列")
@@ -118,7 +122,9 @@ async def switch_lineup(
         if log:
             log.error(f"{tag} 上划后截图失败")
         return False
-    cells = detect_right_column_cells(screenshot)
+    cells = await vision.run(
+        detect_right_column_cells, screenshot, priority=ComputePriority.BULK
+    )
     if not cells:
         if log:
             log.error(f"{tag} 上划后未检测到分组")
@@ -144,7 +150,10 @@ async def switch_lineup(
             log.error(f"{tag} 截图失败（分组点击后）")
         return False
 
-    positions = find_template_in_grid(screenshot, _TPL_SHISHEN_TIHUAN, threshold=0.80)
+    positions = await vision.run(
+        find_template_in_grid, screenshot, _TPL_SHISHEN_TIHUAN,
+        threshold=0.80, priority=ComputePriority.BULK,
+    )
     if not positions:
         if log:
             log.error(f"{tag} 未检测到阵容行")
@@ -163,7 +172,10 @@ async def switch_lineup(
         if log:
             log.error(f"{tag} 上划后截图失败")
         return False
-    positions = find_template_in_grid(screenshot, _TPL_SHISHEN_TIHUAN, threshold=0.80)
+    positions = await vision.run(
+        find_template_in_grid, screenshot, _TPL_SHISHEN_TIHUAN,
+        threshold=0.80, priority=ComputePriority.BULK,
+    )
     if not positions:
         if log:
             log.error(f"{tag} 上划后未检测到阵容行")
@@ -51,7 +51,7 @@ class MiWenExecutor(BaseExecutor):
             instance_id=emu.instance_id,
             activity_name=syscfg.activity_name or ".MainActivity" if syscfg else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[秘闻] 准备: account={account.login_id}")
@@ -0,0 +1,258 @@
+"""
+BatchPlanner: 跨账号全局批次规划（ExecutorService 的 global 调度模式）
+
+职责:
+- 基于 TASK_PRIORITY 与预估耗时，为所有排队批次计算价值密度并重排
+- 含紧急任务（扫码/寄养/起号等高优先级）的批次始终置顶
+- 未饱和时按耗时降序装箱（LPT），使各模拟器尽量同时完工
+- 队列饱和（预测完工时间超出规划窗口）时，低价值批次让位于高价值批次
+- 模拟按空闲时间贪心分配到各模拟器，给出预测完工时间（makespan）
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from ...core.constants import TASK_PRIORITY, TaskType
+from .types import TaskIntent
+
+# 各任务类型的默认预估耗时（秒），未学习到实际耗时前使用
+DEFAULT_TASK_DURATION_SEC: Dict[TaskType, float] = {
+    TaskType.SCAN_QR: 60,
+    TaskType.FOSTER: 180,
+    TaskType.INIT: 600,
+    TaskType.INIT_COLLECT_REWARD: 120,
+    TaskType.INIT_RENT_SHIKIGAMI: 180,
+    TaskType.INIT_EXP_DUNGEON: 600,
+    TaskType.INIT_NEWBIE_QUEST: 600,
+    TaskType.INIT_COLLECT_JINNANG: 120,
+    TaskType.INIT_SHIKIGAMI_TRAIN: 300,
+    TaskType.INIT_FANHE_UPGRADE: 180,
+    TaskType.COLLECT_ACHIEVEMENT: 90,
+    TaskType.ADD_FRIEND: 90,
+    TaskType.TEAM_YUHUN: 600,
+    TaskType.COOP: 180,
+    TaskType.XUANSHANG: 120,
+    TaskType.DELEGATE_HELP: 90,
+    TaskType.COLLECT_LOGIN_GIFT: 60,
+    TaskType.SIGNIN: 60,
+    TaskType.EXPLORE: 900,
+    TaskType.MIWEN: 300,
+    TaskType.YUHUN: 600,
+    TaskType.COLLECT_MAIL: 60,
+    TaskType.DIGUI: 300,
+    TaskType.LIAO_SHOP: 90,
+    TaskType.FANGKA: 180,
+    TaskType.WEEKLY_SHOP: 90,
+    TaskType.WEEKLY_SHARE: 60,
+    TaskType.SUMMON_GIFT: 60,
+    TaskType.COLLECT_FANHE_JIUHU: 60,
+    TaskType.CLIMB_TOWER: 600,
+    TaskType.DUIYI_JINGCAI: 90,
+}
+
+# 未知任务类型的兜底预估耗时（秒）
+FALLBACK_TASK_DURATION_SEC = 180.0
+
+# 每个批次的固定开销（启动游戏、登录、最终 cleanup），秒
+BATCH_OVERHEAD_SEC = 90.0
+
+
+def default_task_duration(task_type: TaskType, account_id: Optional[int] = None) -> float:
+    """默认耗时预估：查静态表，未命中返回兜底值。"""
+    return float(DEFAULT_TASK_DURATION_SEC.get(task_type, FALLBACK_TASK_DURATION_SEC))
+
+
+@dataclass
+class PlannedBatch:
+    account_id: int
+    est_sec: float
+    value: float
+    top_priority: int
+    score: float
+    wait_sec: float
+    urgent: bool = False
+    deferred: bool = False
+    predicted_start_sec: float = 0.0
+    predicted_finish_sec: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "account_id": self.account_id,
+            "est_sec": round(self.est_sec, 1),
+            "value": round(self.value, 1),
+            "top_priority": self.top_priority,
+            "score": round(self.score, 3),
+            "wait_sec": round(self.wait_sec, 1),
+            "urgent": self.urgent,
+            "deferred": self.deferred,
+            "predicted_start_sec": round(self.predicted_start_sec, 1),
+            "predicted_finish_sec": round(self.predicted_finish_sec, 1),
+        }
+
+
+@dataclass
+class BatchPlan:
+    order: List[PlannedBatch] = field(default_factory=list)
+    makespan_sec: float = 0.0
+    saturated: bool = False
+    worker_count: int = 0
+    planned_at: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def deferred_count(self) -> int:
+        return sum(1 for item in self.order if item.deferred)
+
+    def to_dict(self, limit: int = 20) -> dict:
+        return {
+            "batches": len(self.order),
+            "deferred": self.deferred_count,
+            "saturated": self.saturated,
+            "workers": self.worker_count,
+            "predicted_makespan_sec": round(self.makespan_sec, 1),
+            "planned_at": self.planned_at.isoformat(),
+            "order": [item.to_dict() for item in self.order[:limit]],
+        }
+
+
+class BatchPlanner:
+    """按价值密度（优先级/预估耗时）对排队批次做全局排序。
+
+    Args:
+        duration_of: 耗时预估函数 (task_type, account_id) -> 秒
+        horizon_sec: 规划窗口，预测完工时间超过该值视为队列饱和
+        defer_priority: 饱和时最高优先级低于该值的批次延后
+        urgent_priority: 含优先级不低于该值任务的批次始终置顶
+        aging_sec: 等待老化系数，每等待 aging_sec 秒得分翻倍，防止饿死
+        max_defer_sec: 批次等待超过该时长后不再延后
+    """
+
+    def __init__(
+        self,
+        duration_of: Optional[Callable[[TaskType, Optional[int]], float]] = None,
+        *,
+        horizon_sec: float = 1800.0,
+        defer_priority: int = 40,
+        urgent_priority: int = 100,
+        aging_sec: float = 600.0,
+        max_defer_sec: float = 3600.0,
+        batch_overhead_sec: float = BATCH_OVERHEAD_SEC,
+    ) -> None:
+        self.duration_of = duration_of or default_task_duration
+        self.horizon_sec = float(horizon_sec)
+        self.defer_priority = int(defer_priority)
+        self.urgent_priority = int(urgent_priority)
+        self.aging_sec = max(1.0, float(aging_sec))
+        self.max_defer_sec = float(max_defer_sec)
+        self.batch_overhead_sec = float(batch_overhead_sec)
+
+    def estimate_batch_sec(self, account_id: int, intents: Iterable[TaskIntent]) -> float:
+        total = self.batch_overhead_sec
+        for intent in intents:
+            try:
+                total += max(0.0, float(self.duration_of(intent.task_type, account_id)))
+            except Exception:
+                total += FALLBACK_TASK_DURATION_SEC
+        return total
+
+    def plan(
+        self,
+        batches: Sequence,
+        *,
+        worker_count: int,
+        busy_remaining_sec: Sequence[float] = (),
+        now: Optional[datetime] = None,
+    ) -> BatchPlan:
+        """为排队批次生成执行计划。
+
+        Args:
+            batches: 排队中的 PendingBatch 列表（需含 account_id/intents/enqueue_at）
+            worker_count: 参与调度的 Worker 数
+            busy_remaining_sec: 正在执行批次的预计剩余耗时
+        """
+        now = now or datetime.utcnow()
+        items: List[PlannedBatch] = []
+        for batch in batches:
+            intents = list(batch.intents)
+            if not intents:
+                continue
+            priorities = [TASK_PRIORITY.get(i.task_type, 0) for i in intents]
+            est_sec = self.estimate_batch_sec(batch.account_id, intents)
+            wait_sec = max(0.0, (now - batch.enqueue_at).total_seconds())
+            value = float(sum(priorities))
+            score = value / max(est_sec / 60.0, 1e-6) * (1.0 + wait_sec / self.aging_sec)
+            top = max(priorities)
+            items.append(
+                PlannedBatch(
+                    account_id=batch.account_id,
+                    est_sec=est_sec,
+                    value=value,
+                    top_priority=top,
+                    score=score,
+                    wait_sec=wait_sec,
+                    urgent=top >= self.urgent_priority,
+                )
+            )
+
+        slots = self._initial_slots(worker_count, busy_remaining_sec)
+        total_est = sum(p.est_sec for p in items)
+        saturated = bool(slots) and (min(slots) + total_est / len(slots)) > self.horizon_sec
+
+        if saturated:
+            # 饱和：紧急批次置顶，其余按价值密度降序
+            items.sort(key=lambda p: (not p.urgent, -p.score))
+            for item in items:
+                if (
+                    not item.urgent
+                    and item.top_priority < self.defer_priority
+                    and item.wait_sec < self.max_defer_sec
+                ):
+                    item.deferred = True
+            # 稳定排序：延后批次整体后移，组内保持得分顺序
+            items.sort(key=lambda p: p.deferred)
+        else:
+            # 未饱和：全部批次都能在窗口内完成，按耗时降序（LPT）装箱，
+            # 使各模拟器尽量同时完工、缩短整体完工时间
+            items.sort(key=lambda p: (not p.urgent, -p.est_sec, -p.score))
+
+        makespan = self._simulate(items, slots)
+        return BatchPlan(
+            order=items,
+            makespan_sec=makespan,
+            saturated=saturated,
+            worker_count=worker_count,
+            planned_at=now,
+        )
+
+    @staticmethod
+    def _initial_slots(worker_count: int, busy_remaining_sec: Sequence[float]) -> List[float]:
+        busy = sorted(max(0.0, float(x)) for x in busy_remaining_sec)
+        count = max(int(worker_count), 0)
+        if count == 0:
+            return []
+        busy = busy[:count]
+        return busy + [0.0] * (count - len(busy))
+
+    @staticmethod
+    def _simulate(items: List[PlannedBatch], slots: List[float]) -> float:
+        """贪心列表调度：每个批次分配给最早空闲的 Worker。"""
+        if not slots:
+            return 0.0
+        slots = list(slots)
+        for item in items:
+            idx = min(range(len(slots)), key=slots.__getitem__)
+            item.predicted_start_sec = slots[idx]
+            slots[idx] += item.est_sec
+            item.predicted_finish_sec = slots[idx]
+        return max(slots)
+
+
+__all__ = [
+    "BatchPlanner",
+    "BatchPlan",
+    "PlannedBatch",
+    "DEFAULT_TASK_DURATION_SEC",
+    "BATCH_OVERHEAD_SEC",
+    "default_task_duration",
+]
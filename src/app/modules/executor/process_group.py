@@ -0,0 +1,416 @@
+"""
+多进程 Worker 模式：按组将模拟器的 WorkerActor 放到子进程中运行。
+
+每个子进程拥有独立的 asyncio 事件循环和线程池（识图/OCR 的 Python 胶水代码
+不再共享同一个 GIL）。父进程 ExecutorService 通过 RemoteWorker 代理与子进程
+交互，接口与 WorkerActor 一致（is_idle/submit/stop/current/emulator）。
+
+IPC 协议（multiprocessing.Queue，元组消息）:
+    父 → 子: ("submit", emulator_id, intents, run_mode) | ("stop",)
+    子 → 父: ("ready", group_index, emulator_ids)
+             ("current", emulator_id, account_id, task_type, started_at)
+             ("intent_done", emulator_id, account_id, intent, success)
+             ("batch_done", emulator_id, account_id, success)
+             ("log", level, message, extra, origin)
+             ("stopped", group_index)
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import multiprocessing
+import queue
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from ...core.logger import logger
+from ...db.models import Emulator
+from .durations import duration_stats
+from .types import TaskIntent
+
+if TYPE_CHECKING:
+    from .service import ExecutorService
+
+_log = logger.bind(module="WorkerProcessGroup")
+
+# 子进程状态上报间隔（秒）
+_CURRENT_REPORT_INTERVAL = 1.0
+# 父进程读取子进程消息的超时（秒），超时后检查子进程存活
+_PUMP_POLL_TIMEOUT = 1.0
+# 停止时等待子进程退出的超时（秒）
+_STOP_JOIN_TIMEOUT = 30.0
+
+
+def split_into_groups(rows: Sequence[Emulator], group_count: int) -> List[List[Emulator]]:
+    """将模拟器按顺序均分为 group_count 组（空组会被丢弃）。"""
+    rows = list(rows)
+    if not rows or group_count <= 0:
+        return []
+    size = math.ceil(len(rows) / group_count)
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+class RemoteWorker:
+    """子进程中 WorkerActor 的父进程代理。"""
+
+    def __init__(self, emulator_row: Emulator, group: "WorkerProcessGroup") -> None:
+        self.emulator = emulator_row
+        self.current: Optional[TaskIntent] = None
+        self._group = group
+        self._busy = False
+
+    def is_idle(self) -> bool:
+        return not self._busy and self._group.alive
+
+    async def submit(self, intents: List[TaskIntent]) -> bool:
+        if not self._group.alive:
+            return False
+        self._busy = True
+        if not self._group.send_submit(self.emulator.id, intents):
+            self._busy = False
+            return False
+        return True
+
+    async def stop(self) -> None:
+        await self._group.stop()
+
+
+class WorkerProcessGroup:
+    """父进程侧：管理一个子进程及其 IPC 队列。"""
+
+    def __init__(
+        self,
+        group_index: int,
+        emulator_rows: Sequence[Emulator],
+        service: "ExecutorService",
+    ) -> None:
+        self.group_index = group_index
+        self.workers: Dict[int, RemoteWorker] = {
+            row.id: RemoteWorker(row, self) for row in emulator_rows
+        }
+        self._service = service
+        self._ctx = multiprocessing.get_context("spawn")
+        self._inbox = self._ctx.Queue()
+        self._outbox = self._ctx.Queue()
+        self._process: Optional[multiprocessing.Process] = None
+        self._pump_thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running_accounts: Dict[int, int] = {}
+        self._stopping = False
+        self.alive = False
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._process = self._ctx.Process(
+            target=_group_main,
+            args=(
+                self.group_index,
+                list(self.workers.keys()),
+                self._inbox,
+                self._outbox,
+            ),
+            name=f"worker-group-{self.group_index}",
+            daemon=True,
+        )
+        self._process.start()
+        self.alive = True
+        self._pump_thread = threading.Thread(
+            target=self._pump,
+            name=f"worker-group-{self.group_index}-pump",
+            daemon=True,
+        )
+        self._pump_thread.start()
+        _log.info(
+            f"Worker 子进程已启动: group={self.group_index}, pid={self._process.pid}, "
+            f"emulators={list(self.workers.keys())}"
+        )
+
+    def send_submit(self, emulator_id: int, intents: List[TaskIntent]) -> bool:
+        from ..cloud.runtime import runtime_mode_state
+
+        if intents:
+            self._running_accounts[emulator_id] = intents[0].account_id
+        try:
+            self._inbox.put(
+                ("submit", emulator_id, intents, runtime_mode_state.get_mode())
+            )
+            return True
+        except Exception as e:
+            self._running_accounts.pop(emulator_id, None)
+            _log.error(f"提交批次到子进程失败: group={self.group_index}, error={e}")
+            return False
+
+    async def stop(self) -> None:
+        if self._stopping:
+            return
+        self._stopping = True
+        if self._process is None:
+            return
+        if self.alive:
+            try:
+                self._inbox.put(("stop",))
+            except Exception:
+                pass
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._process.join, _STOP_JOIN_TIMEOUT)
+        if self._process.is_alive():
+            _log.warning(f"Worker 子进程未按时退出，强制终止: group={self.group_index}")
+            self._process.terminate()
+        self.alive = False
+        _log.info(f"Worker 子进程已停止: group={self.group_index}")
+
+    # ── 消息泵（后台线程） ──
+
+    def _pump(self) -> None:
+        while True:
+            try:
+                msg = self._outbox.get(timeout=_PUMP_POLL_TIMEOUT)
+            except queue.Empty:
+                if self._process is not None and not self._process.is_alive():
+                    self._post(("__dead__",))
+                    return
+                continue
+            except (EOFError, OSError):
+                self._post(("__dead__",))
+                return
+            self._post(msg)
+            if msg and msg[0] == "stopped":
+                return
+
+    def _post(self, msg: tuple) -> None:
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._handle, msg)
+        except RuntimeError:
+            pass
+
+    # ── 消息处理（事件循环线程） ──
+
+    def _handle(self, msg: tuple) -> None:
+        kind = msg[0]
+        if kind == "log":
+            _, level, message, extra, origin = msg
+            logger.patch(lambda r: r.update(origin)).bind(**extra).log(level, message)
+        elif kind == "current":
+            _, emulator_id, account_id, task_type, started_at = msg
+            worker = self.workers.get(emulator_id)
+            if worker is None:
+                return
+            if account_id is None:
+                worker.current = None
+            else:
+                worker.current = TaskIntent(
+                    account_id=account_id,
+                    task_type=task_type,
+                    started_at=started_at,
+                )
+        elif kind == "intent_done":
+            _, emulator_id, account_id, intent, success = msg
+            if intent.started_at:
+                elapsed = (datetime.utcnow() - intent.started_at).total_seconds()
+                duration_stats.record(
+                    intent.task_type, elapsed,
+                    account_id=account_id, emulator_id=emulator_id,
+                    success=success, persist=False,
+                )
+            asyncio.ensure_future(
+                self._service.notify_intent_done(account_id, intent, success)
+            )
+        elif kind == "batch_done":
+            _, emulator_id, account_id, success = msg
+            self._finish(emulator_id, account_id, success)
+        elif kind == "ready":
+            _log.info(f"Worker 子进程就绪: group={self.group_index}, emulators={msg[2]}")
+        elif kind in ("stopped", "__dead__"):
+            was_alive = self.alive
+            self.alive = False
+            if kind == "__dead__" and was_alive and not self._stopping:
+                _log.error(f"Worker 子进程异常退出: group={self.group_index}")
+            for emulator_id, account_id in list(self._running_accounts.items()):
+                self._finish(emulator_id, account_id, False)
+
+    def _finish(self, emulator_id: int, account_id: int, success: bool) -> None:
+        self._running_accounts.pop(emulator_id, None)
+        worker = self.workers.get(emulator_id)
+        if worker is not None:
+            worker.current = None
+            worker._busy = False
+        asyncio.ensure_future(self._service._on_task_done(account_id, success))
+
+
+async def start_process_groups(
+    rows: Sequence[Emulator],
+    group_count: int,
+    service: "ExecutorService",
+) -> List[WorkerProcessGroup]:
+    groups = [
+        WorkerProcessGroup(idx, chunk, service)
+        for idx, chunk in enumerate(split_into_groups(rows, group_count))
+    ]
+    for group in groups:
+        group.start()
+    return groups
+
+
+# ── 子进程侧 ──
+
+
+class _QueueLogSink:
+    """子进程 loguru sink：将日志转发给父进程统一写文件。"""
+
+    _SIMPLE_TYPES = (str, int, float, bool, type(None))
+
+    def __init__(self, outbox, group_index: int) -> None:
+        self._outbox = outbox
+        self._group_index = group_index
+
+    def __call__(self, message) -> None:
+        record = message.record
+        extra = {
+            k: v for k, v in record["extra"].items()
+            if isinstance(v, self._SIMPLE_TYPES)
+        }
+        extra["process_group"] = self._group_index
+        try:
+            origin = {
+                "name": record["name"],
+                "function": record["function"],
+                "line": record["line"],
+            }
+            self._outbox.put(
+                ("log", record["level"].name, record["message"], extra, origin)
+            )
+        except Exception:
+            pass
+
+
+class _ChildServiceProxy:
+    """子进程中替代 ExecutorService 引用，转发 per-intent 完成事件。"""
+
+    def __init__(self, outbox, emulator_id: int) -> None:
+        self._outbox = outbox
+        self._emulator_id = emulator_id
+
+    async def notify_intent_done(self, account_id: int, intent: TaskIntent, success: bool) -> None:
+        self._outbox.put(("intent_done", self._emulator_id, account_id, intent, success))
+
+
+def _group_main(group_index: int, emulator_ids: List[int], inbox, outbox) -> None:
+    """子进程入口：重建日志、事件循环和 WorkerActor。"""
+    from ...core.config import settings
+
+    logger.remove()
+    logger.add(
+        _QueueLogSink(outbox, group_index),
+        level=settings.log_level,
+        format="{message}",
+    )
+    try:
+        asyncio.run(_group_loop(group_index, emulator_ids, inbox, outbox))
+    finally:
+        outbox.put(("stopped", group_index))
+
+
+async def _group_loop(group_index: int, emulator_ids: List[int], inbox, outbox) -> None:
+    from ...core.thread_pool import shutdown_pools
+    from ...db.base import SessionLocal
+    from ...db.models import SystemConfig
+    from ..cloud.runtime import runtime_mode_state
+    from ..tasks.feeder import feeder
+    from ..vision.persistent_cache import shutdown_persistent_detect_cache
+    from .worker import WorkerActor
+
+    def _load():
+        with SessionLocal() as db:
+            syscfg = db.query(SystemConfig).first()
+            rows = db.query(Emulator).filter(Emulator.id.in_(emulator_ids)).all()
+            if syscfg:
+                db.expunge(syscfg)
+            for row in rows:
+                db.expunge(row)
+            return syscfg, rows
+
+    syscfg, rows = _load()
+    await duration_stats.load()
+
+    def _make_on_done(emulator_id: int):
+        def _on_done(account_id: int, success: bool) -> None:
+            outbox.put(("batch_done", emulator_id, account_id, success))
+        return _on_done
+
+    def _rescan(account_id: int) -> List[TaskIntent]:
+        try:
+            return feeder.collect_due_tasks_for_account(account_id)
+        except Exception as e:
+            logger.error(f"rescan_account 失败: account={account_id}, error={e}")
+            return []
+
+    actors: Dict[int, WorkerActor] = {}
+    tasks = []
+    for row in rows:
+        actor = WorkerActor(
+            row,
+            system_config=syscfg,
+            on_done=_make_on_done(row.id),
+            rescan_callback=_rescan,
+            executor_service_ref=_ChildServiceProxy(outbox, row.id),
+        )
+        actors[row.id] = actor
+        tasks.append(asyncio.create_task(actor.run_forever()))
+
+    try:
+        from ..ui.detector import UIDetector
+        from ..ui.registry import registry as _global_registry
+        UIDetector(_global_registry).warmup()
+    except Exception as e:
+        logger.warning(f"子进程 UI 模板预加载失败（不影响运行）: {e}")
+
+    outbox.put(("ready", group_index, list(actors.keys())))
+
+    async def _report_current() -> None:
+        last: Dict[int, tuple] = {}
+        while True:
+            await asyncio.sleep(_CURRENT_REPORT_INTERVAL)
+            for emulator_id, actor in actors.items():
+                cur = actor.current
+                state = (
+                    (cur.account_id, cur.task_type, cur.started_at)
+                    if cur and cur.account_id > 0
+                    else (None, None, None)
+                )
+                if last.get(emulator_id) != state:
+                    last[emulator_id] = state
+                    outbox.put(("current", emulator_id, *state))
+
+    reporter = asyncio.create_task(_report_current())
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            msg = await loop.run_in_executor(None, inbox.get)
+            if not msg or msg[0] == "stop":
+                break
+            if msg[0] == "submit":
+                _, emulator_id, intents, run_mode = msg
+                runtime_mode_state.set_mode(run_mode)
+                actor = actors.get(emulator_id)
+                submitted = actor is not None and await actor.submit(intents)
+                if not submitted and intents:
+                    outbox.put(("batch_done", emulator_id, intents[0].account_id, False))
+    finally:
+        reporter.cancel()
+        for actor in actors.values():
+            await actor.stop()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await duration_stats.flush()
+        shutdown_persistent_detect_cache()
+        shutdown_pools()
+
+
+__all__ = [
+    "RemoteWorker",
+    "WorkerProcessGroup",
+    "split_into_groups",
+    "start_process_groups",
+]
@@ -0,0 +1,306 @@
+"""
+快速点击引擎（多执行器共用）
+
+原 ClimbTowerExecutor / DuiyiJingcaiExecutor 各自实现 _rapid_click_template：
+等到模板后固定连续 rapid_count 轮“截图 → 匹配 → 点击 → sleep(rapid_interval)”，
+点击已经生效仍会继续截图、补点。本引擎：
+
+- 流水线：未命中时匹配第 k 帧的同时已在截取第 k+1 帧
+- 点击确认：点击后只采用点击之后才开始截取的帧判断——模板消失或画面明显变化
+  （缩略签名差异）即视为点击已生效，立即停止；画面不变且模板仍在才补点
+- 统计：返回已发点击数 / 实际所需点击数 / 截图数，并累计到进程级统计
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from ...core.config import settings
+from ..vision.context import VisionContext
+from ..vision.frame_cache import (
+    compute_frame_fingerprint,
+    compute_frame_signature,
+    signatures_similar,
+)
+from ..vision.settle import adaptive_settle_enabled, wait_until_settled
+from .helpers import (
+    _adapter_capture,
+    _adapter_tap,
+    _should_skip_same_frame,
+    _vision_cache_options,
+    wait_for_template,
+)
+
+CONFIRM_GONE = "gone"  # 模板消失
+CONFIRM_CHANGED = "changed"  # 画面变化
+CONFIRM_PREDICATE = "predicate"  # 自定义确认条件成立
+
+
+@dataclass
+class RapidClickResult:
+    found: bool = False
+    clicks: int = 0
+    # 首次确认点击生效时已发出的点击数（未确认时等于 clicks）；
+    # 关闭 RAPID_CLICK_CONFIRM_ENABLED 时与 clicks 的差即为多余点击
+    clicks_needed: int = 0
+    captures: int = 0
+    confirmed: Optional[str] = None
+    same_frame_skips: int = 0
+    elapsed: float = 0.0
+
+    def __bool__(self) -> bool:
+        return self.clicks > 0
+
+
+class _Stats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.clicks = 0
+        self.clicks_needed = 0
+        self.captures = 0
+        self.confirmed = 0
+
+    def add(self, result: RapidClickResult) -> None:
+        with self._lock:
+            self.calls += 1
+            self.clicks += result.clicks
+            self.clicks_needed += result.clicks_needed
+            self.captures += result.captures
+            if result.confirmed:
+                self.confirmed += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "clicks": self.clicks,
+                "clicks_needed": self.clicks_needed,
+                "captures": self.captures,
+                "confirmed": self.confirmed,
+            }
+
+
+_stats = _Stats()
+
+
+def rapid_click_stats() -> dict:
+    """进程级累计：调用次数 / 点击数 / 所需点击数 / 截图数 / 确认次数。"""
+    return _stats.snapshot()
+
+
+def rapid_click_confirm_enabled() -> bool:
+    """确认点击生效后是否提前停止（关闭时跑满 rapid_count 轮，仅统计）。"""
+    return bool(getattr(settings, "rapid_click_confirm_enabled", True))
+
+
+async def rapid_click_template(
+    adapter: Any,
+    capture_method: str,
+    template: str,
+    *,
+    timeout: float = 8.0,
+    settle: float = 0.3,
+    post_delay: float = 0.8,
+    threshold: float | None = None,
+    log: Any = None,
+    label: str = "",
+    popup_handler: Any = None,
+    rapid_count: int = 5,
+    rapid_interval: float = 0.3,
+    wait_interval: float = 0.5,
+    confirm: Optional[Callable[[Any], Awaitable[bool]]] = None,
+) -> RapidClickResult:
+    """等待模板出现后快速点击，直到确认点击生效或用完 rapid_count 轮。
+
+    流程:
+        1. wait_for_template(timeout) 等待模板出现
+        2. settle 稳定等待（仅模板找到时）
+        3. 最多 rapid_count 轮：截图 → 弹窗检查 → 匹配 → 点击；
+           点击后的新帧若模板消失 / 画面变化 / confirm(frame) 成立则停止
+        4. post_delay（仅至少点击一次时；已确认时按稳定等待提前返回）
+
+    Returns:
+        RapidClickResult，布尔值为“至少点击了一次”（与旧 _rapid_click_template 一致）。
+    """
+    started = time.monotonic()
+    vision = VisionContext.for_adapter(adapter)
+    tag = f"[{label}] " if label else ""
+    kwargs = {"threshold": threshold} if threshold is not None else {}
+    similarity = float(getattr(settings, "vision_frame_similarity_threshold", 0.8))
+    result = RapidClickResult()
+
+    async def _capture():
+        return await _adapter_capture(adapter, capture_method)
+
+    # 1) 等待模板出现
+    m = await wait_for_template(
+        adapter,
+        capture_method,
+        template,
+        timeout=timeout,
+        interval=wait_interval,
+        threshold=threshold,
+        log=log,
+        label=label,
+        popup_handler=popup_handler,
+    )
+    result.found = m is not None
+
+    # 2) settle（仅模板找到时），稳定后的帧直接作为第一帧
+    first_frame = None
+    if m and settle > 0:
+        if adaptive_settle_enabled():
+            first_frame = (await wait_until_settled(_capture, max_wait=settle)).frame
+        else:
+            await asyncio.sleep(settle)
+
+    # 3) 快速检测 + 点击
+    cache_enabled, unchanged_skip_max, _ = _vision_cache_options()
+    stop_on_confirm = rapid_click_confirm_enabled()
+    pending: Optional[asyncio.Task] = None
+    # 最近一次点击所依据帧的签名；None 表示尚未点击
+    tap_sig = None
+    last_frame_fp: Optional[int] = None
+    miss_streak = 0
+
+    def _start_capture() -> asyncio.Task:
+        return asyncio.ensure_future(_capture())
+
+    def _confirmed(reason: str) -> bool:
+        if result.confirmed is None:
+            result.confirmed = reason
+            result.clicks_needed = result.clicks
+        return stop_on_confirm
+
+    try:
+        for cycle in range(rapid_count):
+            if first_frame is not None:
+                frame, first_frame = first_frame, None
+            else:
+                if pending is None:
+                    pending = _start_capture()
+                try:
+                    frame = await pending
+                except Exception:
+                    frame = None
+                pending = None
+            if frame is None:
+                await asyncio.sleep(rapid_interval)
+                continue
+            result.captures += 1
+
+            # 点击之后开始截取的帧：画面变化 / 自定义条件成立即视为点击生效
+            sig = compute_frame_signature(frame)
+            if tap_sig is not None and result.confirmed is None:
+                if not signatures_similar(sig, tap_sig, mean_abs_threshold=similarity):
+                    if _confirmed(CONFIRM_CHANGED):
+                        break
+                elif confirm is not None and await confirm(frame):
+                    if _confirmed(CONFIRM_PREDICATE):
+                        break
+
+            frame_fp: Optional[int] = None
+            if cache_enabled:
+                frame_fp = compute_frame_fingerprint(frame)
+                if frame_fp != last_frame_fp:
+                    last_frame_fp = frame_fp
+                    miss_streak = 0
+                elif _should_skip_same_frame(
+                    frame_fp, last_frame_fp, miss_streak, unchanged_skip_max
+                ):
+                    miss_streak += 1
+                    result.same_frame_skips += 1
+                    await asyncio.sleep(rapid_interval)
+                    continue
+
+            # 弹窗检查
+            if popup_handler:
+                dismissed = await popup_handler.check_and_dismiss(frame)
+                if dismissed > 0:
+                    last_frame_fp = None
+                    miss_streak = 0
+                    await asyncio.sleep(rapid_interval)
+                    continue
+
+            # 尚未点击时预取下一帧，与本帧匹配并行
+            if tap_sig is None:
+                pending = _start_capture()
+            rm = await vision.match_template(frame, template, **kwargs)
+            if rm is None:
+                if frame_fp is not None:
+                    miss_streak += 1
+                if tap_sig is not None and result.confirmed is None:
+                    if _confirmed(CONFIRM_GONE):
+                        break
+                await asyncio.sleep(rapid_interval)
+                continue
+
+            if pending is not None:
+                # 预取帧截取于点击之前，既不能据其补点也不能据其确认，丢弃
+                try:
+                    await pending
+                except Exception:
+                    pass
+                pending = None
+            cx, cy = rm.random_point()
+            await _adapter_tap(adapter, cx, cy)
+            result.clicks += 1
+            tap_sig = sig
+            miss_streak = 0
+            if log:
+                log.info(
+                    f"{tag}快速点击 ({cx}, {cy}) "
+                    f"(cycle={cycle + 1}/{rapid_count}, "
+                    f"total_clicks={result.clicks}, "
+                    f"score={rm.score:.3f})"
+                )
+            await asyncio.sleep(rapid_interval)
+    finally:
+        if pending is not None:
+            try:
+                await pending
+            except Exception:
+                pass
+
+    if result.confirmed is None:
+        result.clicks_needed = result.clicks
+    result.elapsed = time.monotonic() - started
+    _stats.add(result)
+
+    if log:
+        if result.clicks > 0:
+            log.info(
+                f"{tag}快速检测完成, 共点击{result.clicks}次 "
+                f"(需要{result.clicks_needed}次, 确认={result.confirmed or '无'}), "
+                f"captures={result.captures}, "
+                f"same_frame_skips={result.same_frame_skips}"
+            )
+        else:
+            log.warning(
+                f"{tag}快速检测{rapid_count}次均未找到模板, "
+                f"same_frame_skips={result.same_frame_skips}"
+            )
+
+    # 4) post_delay（仅点击成功时）
+    if result.clicks > 0 and post_delay > 0:
+        if result.confirmed and adaptive_settle_enabled():
+            await wait_until_settled(_capture, max_wait=post_delay)
+        else:
+            await asyncio.sleep(post_delay)
+
+    return result
+
+
+__all__ = [
+    "CONFIRM_CHANGED",
+    "CONFIRM_GONE",
+    "CONFIRM_PREDICATE",
+    "RapidClickResult",
+    "rapid_click_confirm_enabled",
+    "rapid_click_stats",
+    "rapid_click_template",
+]
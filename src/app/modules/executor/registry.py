@@ -0,0 +1,135 @@
+"""
+执行器注册表（按 TaskType 懒加载）
+
+各执行器模块会连带导入 cv2 / OCR / UI 识别等重量级依赖。过去 worker.py 与
+executor/__init__.py 在启动时一次性导入全部执行器，拖慢冷启动。
+注册表只记录 TaskType → (模块, 类名)，首次执行该类型任务时才导入对应模块。
+"""
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Type
+
+from ...core.constants import TaskType
+from ...core.logger import logger
+
+
+class ExecutorSpec(NamedTuple):
+    module: str
+    class_name: str
+    # 构造参数是否包含 emulator_row / system_config
+    with_context: bool = True
+
+
+EXECUTOR_SPECS: Dict[TaskType, ExecutorSpec] = {
+    TaskType.INIT: ExecutorSpec("init_executor", "InitExecutor"),
+    TaskType.INIT_COLLECT_REWARD: ExecutorSpec("init_collect_reward", "InitCollectRewardExecutor"),
+    TaskType.INIT_RENT_SHIKIGAMI: ExecutorSpec("init_rent_shikigami", "InitRentShikigamiExecutor"),
+    TaskType.INIT_NEWBIE_QUEST: ExecutorSpec("init_newbie_quest", "InitNewbieQuestExecutor"),
+    TaskType.INIT_EXP_DUNGEON: ExecutorSpec("init_exp_dungeon", "InitExpDungeonExecutor"),
+    TaskType.INIT_COLLECT_JINNANG: ExecutorSpec("init_collect_jinnang", "InitCollectJinnangExecutor"),
+    TaskType.INIT_SHIKIGAMI_TRAIN: ExecutorSpec("init_shikigami_train", "InitShikigamiTrainExecutor"),
+    TaskType.INIT_FANHE_UPGRADE: ExecutorSpec("init_fanhe_upgrade", "InitFanheUpgradeExecutor"),
+    TaskType.DELEGATE_HELP: ExecutorSpec("delegate_help", "DelegateHelpExecutor"),
+    TaskType.COLLECT_LOGIN_GIFT: ExecutorSpec("collect_login_gift", "CollectLoginGiftExecutor"),
+    TaskType.LIAO_SHOP: ExecutorSpec("liao_shop", "LiaoShopExecutor"),
+    TaskType.COLLECT_MAIL: ExecutorSpec("collect_mail", "CollectMailExecutor"),
+    TaskType.ADD_FRIEND: ExecutorSpec("add_friend", "AddFriendExecutor"),
+    TaskType.DIGUI: ExecutorSpec("digui", "DiGuiExecutor"),
+    TaskType.EXPLORE: ExecutorSpec("explore", "ExploreExecutor"),
+    TaskType.XUANSHANG: ExecutorSpec("xuanshang", "XuanShangExecutor"),
+    TaskType.CLIMB_TOWER: ExecutorSpec("climb_tower", "ClimbTowerExecutor"),
+    TaskType.WEEKLY_SHOP: ExecutorSpec("weekly_shop", "WeeklyShopExecutor"),
+    TaskType.MIWEN: ExecutorSpec("miwen", "MiWenExecutor"),
+    TaskType.SIGNIN: ExecutorSpec("signin", "SigninExecutor"),
+    TaskType.YUHUN: ExecutorSpec("yuhun", "YuHunExecutor"),
+    TaskType.COLLECT_ACHIEVEMENT: ExecutorSpec("collect_achievement", "CollectAchievementExecutor"),
+    TaskType.SUMMON_GIFT: ExecutorSpec("summon_gift", "SummonGiftExecutor"),
+    TaskType.WEEKLY_SHARE: ExecutorSpec("weekly_share", "WeeklyShareExecutor"),
+    TaskType.COLLECT_FANHE_JIUHU: ExecutorSpec("collect_fanhe_jiuhu", "CollectFanheJiuhuExecutor"),
+    TaskType.DUIYI_JINGCAI: ExecutorSpec("duiyi_jingcai", "DuiyiJingcaiExecutor"),
+    TaskType.TEAM_YUHUN: ExecutorSpec("team_yuhun", "TeamYuhunExecutor", with_context=False),
+    TaskType.FOSTER: ExecutorSpec("foster", "FosterExecutor"),
+    TaskType.FANGKA: ExecutorSpec("fangka", "FangkaExecutor"),
+}
+
+# 类名 → 模块（供 executor/__init__.py 的懒导出使用）
+EXECUTOR_MODULES: Dict[str, str] = {
+    spec.class_name: spec.module for spec in EXECUTOR_SPECS.values()
+}
+
+_classes: Dict[TaskType, type] = {}
+_load_ms: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def get_executor_class(task_type: TaskType | str) -> Optional[Type[Any]]:
+    """按任务类型获取执行器类（首次调用时导入模块）；未注册的类型返回 None。"""
+    try:
+        task_type = TaskType(task_type)
+    except ValueError:
+        return None
+    cls = _classes.get(task_type)
+    if cls is not None:
+        return cls
+    spec = EXECUTOR_SPECS.get(task_type)
+    if spec is None:
+        return None
+    with _lock:
+        cls = _classes.get(task_type)
+        if cls is None:
+            started = time.perf_counter()
+            module = importlib.import_module(f"{__package__}.{spec.module}")
+            cls = getattr(module, spec.class_name)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            _classes[task_type] = cls
+            _load_ms[spec.class_name] = round(elapsed_ms, 1)
+            logger.debug("执行器已加载: {} ({:.0f}ms)", spec.class_name, elapsed_ms)
+    return cls
+
+
+def create_executor(
+    task_type: TaskType | str,
+    *,
+    worker_id: int,
+    emulator_id: int,
+    emulator_row: Any = None,
+    system_config: Any = None,
+    **extra: Any,
+):
+    """构造执行器实例；未注册的类型返回 MockExecutor。"""
+    cls = get_executor_class(task_type)
+    if cls is None:
+        from .base import MockExecutor
+
+        return MockExecutor(worker_id=worker_id, emulator_id=emulator_id)
+    kwargs: Dict[str, Any] = {"worker_id": worker_id, "emulator_id": emulator_id}
+    if EXECUTOR_SPECS[TaskType(task_type)].with_context:
+        kwargs["emulator_row"] = emulator_row
+        kwargs["system_config"] = system_config
+    kwargs.update(extra)
+    return cls(**kwargs)
+
+
+def preload_executors(task_types: Optional[List[TaskType]] = None) -> None:
+    """预先导入执行器模块（默认全部），用于启动后后台预热。"""
+    for task_type in task_types or list(EXECUTOR_SPECS):
+        get_executor_class(task_type)
+
+
+def loaded_executors() -> Dict[str, float]:
+    """已加载的执行器及其导入耗时（ms）。"""
+    return dict(_load_ms)
+
+
+__all__ = [
+    "EXECUTOR_MODULES",
+    "EXECUTOR_SPECS",
+    "ExecutorSpec",
+    "create_executor",
+    "get_executor_class",
+    "loaded_executors",
+    "preload_executors",
+]
@@ -8,9 +8,8 @@ from typing import Dict, List, Optional, Tuple
 from loguru import logger
 
 from ...core.constants import TaskType
-from ...db.base import SessionLocal
-from ...db.models import GameAccount
 from ..ui.assets import AssetType, get_asset_def
+from .account_state import update_account_fields
 
 # 任务资源需求注册表：task_type → [(asset_type, min_amount), ...]
 TASK_RESOURCE_REQUIREMENTS: Dict[TaskType, List[Tuple[AssetType, int]]] = {
@@ -84,13 +83,7 @@ def _update_asset_in_db(account_id: int, asset_type: AssetType, value: int) -> N
     if not asset_def:
         return
     try:
-        with SessionLocal() as db:
-            acc = db.query(GameAccount).filter(GameAccount.id == account_id).first()
-            if acc:
-                setattr(acc, asset_def.db_field, value)
-                db.commit()
-                logger.debug(
-                    "DB 更新: account={}, {}={}", account_id, asset_def.db_field, value
-                )
+        update_account_fields(account_id, **{asset_def.db_field: value})
+        logger.debug("DB 更新: account={}, {}={}", account_id, asset_def.db_field, value)
     except Exception as e:
         logger.warning("更新资产到 DB 失败: {}", e)
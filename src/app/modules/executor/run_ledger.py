@@ -0,0 +1,314 @@
+"""
+任务运行流水与时间序列汇总
+
+WorkerActor 每个 intent 结束时调用 record() 记录一条结构化流水（任务类型、账号、
+模拟器、起止时间、结果、错误码、截图 / 识图次数），批次结束时 flush()：
+
+- 流水批量写入 task_run_records（只追加）
+- 同一批数据在内存中按 (分钟, 任务类型) / (小时, 任务类型) 预聚合后，
+  增量累加到 task_run_rollup_minute / task_run_rollup_hour
+
+统计接口只读汇总表：查询区间内整小时部分读小时表，首尾不足一小时的部分读分钟表，
+读取行数只与区间长度 / 任务类型数有关，与流水总量无关。
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from ...core.config import settings
+from ...core.constants import TaskStatus, TaskType
+from ...core.logger import logger
+from ...core.thread_pool import run_in_db
+from ...db.base import SessionLocal
+from ...db.models import TaskRunRecord, TaskRunRollupHour, TaskRunRollupMinute
+
+_log = logger.bind(module="RunLedger")
+
+GRANULARITY_MINUTE = "minute"
+GRANULARITY_HOUR = "hour"
+
+_ROLLUP_MODELS = {
+    GRANULARITY_MINUTE: TaskRunRollupMinute,
+    GRANULARITY_HOUR: TaskRunRollupHour,
+}
+_SUM_FIELDS = ("total", "succeeded", "failed", "duration_sum", "capture_sum", "detect_sum")
+# 过期数据清理的最小间隔（秒），避免每个批次都执行 DELETE
+_PRUNE_INTERVAL_SEC = 3600.0
+
+
+def _task_key(task_type) -> str:
+    return task_type.value if isinstance(task_type, TaskType) else str(task_type)
+
+
+def floor_minute(dt: datetime) -> datetime:
+    return dt.replace(second=0, microsecond=0)
+
+
+def floor_hour(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(dt: datetime) -> datetime:
+    floored = floor_hour(dt)
+    return floored if floored == dt else floored + timedelta(hours=1)
+
+
+def _empty_bucket() -> dict:
+    return {
+        "total": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "duration_sum": 0.0,
+        "duration_max": 0.0,
+        "capture_sum": 0,
+        "detect_sum": 0,
+    }
+
+
+def _accumulate(bucket: dict, other: dict) -> None:
+    for field in _SUM_FIELDS:
+        bucket[field] += other.get(field) or 0
+    bucket["duration_max"] = max(bucket["duration_max"], other.get("duration_max") or 0.0)
+
+
+def aggregate_rows(rows: List[dict], floor) -> Dict[Tuple[datetime, str], dict]:
+    """把流水行按 (floor(started_at), task_type) 预聚合。"""
+    buckets: Dict[Tuple[datetime, str], dict] = {}
+    for row in rows:
+        key = (floor(row["started_at"]), row["task_type"])
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = _empty_bucket()
+        ok = row["outcome"] == TaskStatus.SUCCEEDED.value
+        _accumulate(
+            bucket,
+            {
+                "total": 1,
+                "succeeded": 1 if ok else 0,
+                "failed": 0 if ok else 1,
+                "duration_sum": row["duration_sec"],
+                "duration_max": row["duration_sec"],
+                "capture_sum": row["capture_count"],
+                "detect_sum": row["detect_count"],
+            },
+        )
+    return buckets
+
+
+def _upsert_rollups(db, model, buckets: Dict[Tuple[datetime, str], dict]) -> None:
+    if not buckets:
+        return
+    values = [
+        {"bucket_start": start, "task_type": task_type, **bucket}
+        for (start, task_type), bucket in buckets.items()
+    ]
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+
+        stmt = insert(model).values(values)
+        excluded = stmt.excluded
+        set_ = {field: getattr(model, field) + getattr(excluded, field) for field in _SUM_FIELDS}
+        # SQLite 的双参数 max() 是标量函数
+        set_["duration_max"] = func.max(model.duration_max, excluded.duration_max)
+        db.execute(
+            stmt.on_conflict_do_update(index_elements=["bucket_start", "task_type"], set_=set_)
+        )
+        return
+
+    for value in values:
+        row = (
+            db.query(model)
+            .filter(model.bucket_start == value["bucket_start"], model.task_type == value["task_type"])
+            .with_for_update()
+            .first()
+        )
+        if row is None:
+            db.add(model(**value))
+            continue
+        for field in _SUM_FIELDS:
+            setattr(row, field, (getattr(row, field) or 0) + value[field])
+        row.duration_max = max(row.duration_max or 0.0, value["duration_max"])
+
+
+def _bucket_out(bucket: dict) -> dict:
+    total = bucket["total"]
+    return {
+        **bucket,
+        "duration_sum": round(bucket["duration_sum"], 2),
+        "duration_max": round(bucket["duration_max"], 2),
+        "success_rate": round(bucket["succeeded"] / total * 100, 2) if total else 0,
+        "avg_duration": round(bucket["duration_sum"] / total, 2) if total else 0,
+    }
+
+
+class RunLedger:
+    """任务运行流水缓冲 + 汇总表维护（线程安全）。"""
+
+    def __init__(self) -> None:
+        self._pending: List[dict] = []
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+    # ── 采样 ──
+
+    def record(
+        self,
+        task_type,
+        *,
+        started_at: datetime,
+        finished_at: Optional[datetime] = None,
+        success: bool,
+        account_id: Optional[int] = None,
+        emulator_id: Optional[int] = None,
+        error_code: Optional[str] = None,
+        capture_count: int = 0,
+        detect_count: int = 0,
+    ) -> None:
+        """记录一次 intent 运行结果（UTC 时间），批次结束时由 flush() 落库。"""
+        finished_at = finished_at or datetime.utcnow()
+        row = {
+            "task_type": _task_key(task_type),
+            "account_id": account_id,
+            "emulator_id": emulator_id,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "duration_sec": max(0.0, (finished_at - started_at).total_seconds()),
+            "outcome": (TaskStatus.SUCCEEDED if success else TaskStatus.FAILED).value,
+            "error_code": None if success else (error_code or "unknown")[:50],
+            "capture_count": max(0, int(capture_count)),
+            "detect_count": max(0, int(detect_count)),
+        }
+        with self._lock:
+            self._pending.append(row)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # ── 持久化 ──
+
+    def flush_sync(self) -> int:
+        """流水与两级汇总在一个事务中写入，返回写入的流水条数。"""
+        with self._lock:
+            rows = self._pending
+            self._pending = []
+        if not rows:
+            return 0
+        try:
+            with SessionLocal() as db:
+                db.bulk_insert_mappings(TaskRunRecord, rows)
+                _upsert_rollups(db, TaskRunRollupMinute, aggregate_rows(rows, floor_minute))
+                _upsert_rollups(db, TaskRunRollupHour, aggregate_rows(rows, floor_hour))
+                self._maybe_prune(db)
+                db.commit()
+            return len(rows)
+        except Exception as e:
+            _log.warning(f"任务运行流水写入失败: {e}")
+            return 0
+
+    def _maybe_prune(self, db) -> None:
+        now = time.monotonic()
+        if now - self._last_prune < _PRUNE_INTERVAL_SEC:
+            return
+        self._last_prune = now
+        utcnow = datetime.utcnow()
+        record_days = int(getattr(settings, "run_ledger_retention_days", 90))
+        minute_days = int(getattr(settings, "run_ledger_minute_retention_days", 7))
+        if record_days > 0:
+            db.query(TaskRunRecord).filter(
+                TaskRunRecord.started_at < utcnow - timedelta(days=record_days)
+            ).delete(synchronize_session=False)
+        if minute_days > 0:
+            db.query(TaskRunRollupMinute).filter(
+                TaskRunRollupMinute.bucket_start < utcnow - timedelta(days=minute_days)
+            ).delete(synchronize_session=False)
+
+    async def flush(self) -> int:
+        return await run_in_db(self.flush_sync)
+
+    # ── 查询 ──
+
+    @staticmethod
+    def _query_buckets(db, model, since, until, task_type):
+        query = db.query(model).filter(model.bucket_start >= since, model.bucket_start < until)
+        if task_type:
+            query = query.filter(model.task_type == task_type)
+        return query.order_by(model.bucket_start.asc()).all()
+
+    def summary(
+        self,
+        db,
+        since: datetime,
+        until: Optional[datetime] = None,
+        *,
+        task_type: Optional[str] = None,
+    ) -> dict:
+        """区间 [since, until) 内按任务类型汇总（UTC，精确到分钟）。"""
+        until = until or datetime.utcnow() + timedelta(minutes=1)
+        since, until = floor_minute(since), floor_minute(until)
+        hour_start, hour_end = _ceil_hour(since), floor_hour(until)
+        if hour_start >= hour_end:
+            spans = [(TaskRunRollupMinute, since, until)]
+        else:
+            spans = [
+                (TaskRunRollupMinute, since, hour_start),
+                (TaskRunRollupHour, hour_start, hour_end),
+                (TaskRunRollupMinute, hour_end, until),
+            ]
+        by_type: Dict[str, dict] = {}
+        for model, start, end in spans:
+            if start >= end:
+                continue
+            for row in self._query_buckets(db, model, start, end, task_type):
+                bucket = by_type.setdefault(row.task_type, _empty_bucket())
+                _accumulate(bucket, {f: getattr(row, f) for f in (*_SUM_FIELDS, "duration_max")})
+        overall = _empty_bucket()
+        for bucket in by_type.values():
+            _accumulate(overall, bucket)
+        return {
+            "since": since.isoformat(),
+            "until": until.isoformat(),
+            "overall": _bucket_out(overall),
+            "task_types": {k: _bucket_out(v) for k, v in sorted(by_type.items())},
+        }
+
+    def timeseries(
+        self,
+        db,
+        granularity: str,
+        since: datetime,
+        until: Optional[datetime] = None,
+        *,
+        task_type: Optional[str] = None,
+    ) -> List[dict]:
+        """按分钟 / 小时返回区间内的汇总序列（多个任务类型合并到同一时间桶）。"""
+        model = _ROLLUP_MODELS.get(granularity)
+        if model is None:
+            raise ValueError(f"不支持的粒度: {granularity}")
+        until = until or datetime.utcnow() + timedelta(minutes=1)
+        floor = floor_minute if granularity == GRANULARITY_MINUTE else floor_hour
+        series: Dict[datetime, dict] = {}
+        for row in self._query_buckets(db, model, floor(since), until, task_type):
+            bucket = series.setdefault(row.bucket_start, _empty_bucket())
+            _accumulate(bucket, {f: getattr(row, f) for f in (*_SUM_FIELDS, "duration_max")})
+        return [
+            {"bucket_start": start.isoformat(), **_bucket_out(bucket)}
+            for start, bucket in sorted(series.items())
+        ]
+
+
+run_ledger = RunLedger()
+
+__all__ = [
+    "GRANULARITY_HOUR",
+    "GRANULARITY_MINUTE",
+    "RunLedger",
+    "aggregate_rows",
+    "run_ledger",
+]
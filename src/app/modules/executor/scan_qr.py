@@ -16,10 +16,10 @@ import numpy as np
 from ...core.logger import logger
 from ...db.models import Emulator, SystemConfig
 from ..cloud.scan_poller import ScanCancelledException
-from ..emu.adapter import AdapterConfig, EmulatorAdapter
+from ..emu.adapter import AdapterConfig
 from ..emu.async_adapter import AsyncEmulatorAdapter
+from ..emu.registry import adapter_registry
 from ..emu.adb import Adb
-from ..vision.qrcode_detect import detect_qrcode
 
 
 PKG_NAME = "com.netease.onmyoji.wyzymnqsd_cps"
@@ -101,8 +101,7 @@ class ScanQRExecutor:
             instance_id=getattr(self.emulator_row, "instance_id", None),
             activity_name=(syscfg.activity_name if syscfg else None) or ".MainActivity",
         )
-        raw_adapter = EmulatorAdapter(cfg)
-        self.adapter = AsyncEmulatorAdapter(raw_adapter)
+        self.adapter = AsyncEmulatorAdapter(adapter_registry.acquire(cfg))
         self.log.info("Adapter 初始化完成")
 
     async def _update_phase(self, phase: str, screenshot_key: str = None, screenshot_b64: str = None) -> None:
@@ -200,7 +199,9 @@ class ScanQRExecutor:
         if template is None:
             return None
 
-        result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        result = await self.vision.run(
+            cv2.matchTemplate, image, template, cv2.TM_CCOEFF_NORMED
+        )
         _, max_val, _, max_loc = cv2.minMaxLoc(result)
 
         if max_val >= 0.8:  # 匹配阈值
@@ -288,7 +289,7 @@ class ScanQRExecutor:
         for _ in range(60):  # 最多等120秒
             await self._heartbeat()
             img = await self._capture_ndarray()
-            if img is not None and detect_qrcode(img):
+            if img is not None and await self.vision.detect_qrcode(img):
                 qr_found = True
                 break
             await asyncio.sleep(2)
@@ -541,3 +542,5 @@ class ScanQRExecutor:
             self.log.info("登录数据已清理")
         except Exception as e:
             self.log.warning(f"清理登录数据失败: {e}")
+
+        adapter_registry.release(self.adapter.sync)
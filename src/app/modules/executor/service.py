@@ -6,6 +6,7 @@ Responsibilities:
 - Deduplicate by account_id (one batch per account in queue)
 - Dispatch batches to idle workers (one worker per Emulator)
 - Same account's tasks execute consecutively on the same worker
+- Optional global mode: plan across all queued batches by value density
 """
 from __future__ import annotations
 
@@ -14,14 +15,26 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Callable, Dict, List, Optional, Set, Tuple
 
+from ...core.config import settings
 from ...core.constants import TASK_PRIORITY, TaskType, WorkerRole
 from ...core.logger import logger
-from ...core.thread_pool import emulator_io_pool_stats
+from ...core.loop_monitor import loop_monitor
+from ...core.metrics import metrics
+from ...core.process_pool import get_process_pool, process_pool_stats
+from ...core.thread_pool import compute_pool_stats, emulator_io_pool_stats, run_in_io
 from ...db.base import SessionLocal
 from ...db.models import Emulator, SystemConfig
+from .durations import duration_stats
+from .planner import BatchPlan, BatchPlanner
+from .registry import loaded_executors, preload_executors
 from .types import TaskIntent
 from .worker import WorkerActor
 
+SCHEDULER_MODE_FIFO = "fifo"
+SCHEDULER_MODE_GLOBAL = "global"
+# 只读查询（predict_drain / metrics_snapshot，UI 轮询）复用最近一次规划的最长时间（秒）
+PLAN_CACHE_TTL_SEC = 5.0
+
 
 @dataclass
 class PendingBatch:
@@ -40,6 +53,7 @@ class ExecutorService:
         self._running_accounts: Set[int] = set()
         self._running_batches: Dict[int, PendingBatch] = {}
         self._workers: Dict[int, WorkerActor] = {}
+        self._process_groups: list = []
         self._dispatcher_task: Optional[asyncio.Task] = None
         self._started = False
         self._have_items = asyncio.Event()
@@ -55,6 +69,17 @@ class ExecutorService:
         self._intent_done_listeners: List[
             Callable[[int, "TaskIntent", bool], object]
         ] = []
+        self._scheduler_mode = (
+            str(settings.executor_scheduler_mode or SCHEDULER_MODE_FIFO).strip().lower()
+        )
+        self._planner = BatchPlanner(
+            duration_of=duration_stats.estimate,
+            horizon_sec=settings.executor_plan_horizon_sec,
+            defer_priority=settings.executor_plan_defer_priority,
+            max_defer_sec=settings.executor_plan_max_defer_sec,
+        )
+        self._last_plan: Optional[BatchPlan] = None
+        self._last_plan_key: Optional[tuple] = None
         self._metrics = {
             "dispatch_attempt": 0,
             "dispatch_success": 0,
@@ -62,6 +87,7 @@ class ExecutorService:
             "dispatch_retry": 0,
             "batch_succeeded": 0,
             "batch_failed": 0,
+            "plan_merged_intents": 0,
         }
         self._last_dispatch_at: Optional[datetime] = None
         self._log = logger.bind(module="ExecutorService")
@@ -110,10 +136,12 @@ class ExecutorService:
         if self._started:
             return
         self._log.info("Starting ExecutorService ...")
+        await duration_stats.load()
         with SessionLocal() as db:
             syscfg = db.query(SystemConfig).first()
             rows: List[Emulator] = db.query(Emulator).all()
 
+        eligible: List[Emulator] = []
         for row in rows:
             if row.id in self._workers:
                 continue
@@ -121,6 +149,21 @@ class ExecutorService:
             if row.role == WorkerRole.SCAN.value:
                 self._log.info(f"跳过 scan 模拟器: {row.name} (id={row.id})")
                 continue
+            eligible.append(row)
+
+        group_count = int(settings.executor_process_groups or 0)
+        if group_count > 0 and eligible:
+            # 多进程模式：各组模拟器的 WorkerActor 运行在独立子进程中
+            from .process_group import start_process_groups
+
+            self._process_groups = await start_process_groups(
+                eligible, group_count, self
+            )
+            for group in self._process_groups:
+                self._workers.update(group.workers)
+            eligible = []
+
+        for row in eligible:
             actor = WorkerActor(
                 row,
                 system_config=syscfg,
@@ -145,6 +188,22 @@ class ExecutorService:
         except Exception as e:
             self._log.warning("UI 模板预加载失败（不影响运行）: {}", e)
 
+        # 模板就绪后再创建计算进程池，使子进程 initializer 能预加载模板
+        try:
+            get_process_pool()
+        except Exception as e:
+            self._log.warning("计算进程池创建失败，重识图任务回退线程池: {}", e)
+
+        # 执行器模块按 TaskType 懒加载；在 I/O 线程中预先导入，避免首个任务在事件循环上同步导入
+        asyncio.create_task(self._preload_executors())
+
+    async def _preload_executors(self) -> None:
+        try:
+            await run_in_io(preload_executors)
+            self._log.info("执行器模块预加载完成: {} 个", len(loaded_executors()))
+        except Exception as e:
+            self._log.warning("执行器模块预加载失败（首次执行时再加载）: {}", e)
+
     async def stop(self) -> None:
         if not self._started:
             return
@@ -161,6 +220,7 @@ class ExecutorService:
             await worker.stop()
 
         self._workers.clear()
+        self._process_groups = []
         self._started = False
         self._pending.clear()
         self._queued_keys.clear()
@@ -282,6 +342,9 @@ class ExecutorService:
             return False
 
     def _pick_dispatchable_index(self) -> Optional[int]:
+        if self._scheduler_mode == SCHEDULER_MODE_GLOBAL:
+            return self._pick_planned_index()
+
         window = min(self._dispatch_window, len(self._pending))
         for idx in range(window):
             if self._pending[idx].state == "queued":
@@ -292,6 +355,72 @@ class ExecutorService:
                 return idx
         return None
 
+    def _pick_planned_index(self) -> Optional[int]:
+        """global 模式：按全局规划顺序选取第一个可分发批次。"""
+        plan = self._build_plan()
+        index_by_account = {
+            item.account_id: idx
+            for idx, item in enumerate(self._pending)
+            if item.state == "queued"
+        }
+        for planned in plan.order:
+            idx = index_by_account.get(planned.account_id)
+            if idx is not None:
+                return idx
+        return None
+
+    def _build_plan(self) -> BatchPlan:
+        now = datetime.utcnow()
+        queued = [b for b in self._pending if b.state == "queued"]
+        busy_remaining: List[float] = []
+        for batch in self._running_batches.values():
+            started = [i.started_at for i in batch.intents if i.started_at]
+            elapsed = (now - min(started)).total_seconds() if started else 0.0
+            est = self._planner.estimate_batch_sec(batch.account_id, batch.intents)
+            busy_remaining.append(max(0.0, est - elapsed))
+        plan = self._planner.plan(
+            queued,
+            worker_count=len(self._workers),
+            busy_remaining_sec=busy_remaining,
+            now=now,
+        )
+        self._last_plan = plan
+        self._last_plan_key = self._plan_state_key()
+        return plan
+
+    def _plan_state_key(self) -> tuple:
+        return (
+            tuple((b.account_id, len(b.intents)) for b in self._pending if b.state == "queued"),
+            tuple(self._running_batches),
+            len(self._workers),
+        )
+
+    def _current_plan(self) -> BatchPlan:
+        """只读查询用的规划：排队 / 执行中批次与 Worker 数未变且未过期时复用 _last_plan。
+
+        global 模式下分发时已刷新 _last_plan；fifo 模式只在查询时按需重建。
+        """
+        plan = self._last_plan
+        if (
+            plan is not None
+            and self._last_plan_key == self._plan_state_key()
+            and (datetime.utcnow() - plan.planned_at).total_seconds() < PLAN_CACHE_TTL_SEC
+        ):
+            return plan
+        return self._build_plan()
+
+    def predict_drain(self) -> dict:
+        """基于耗时统计预测当前队列全部执行完毕所需时间。"""
+        plan = self._current_plan()
+        drain_sec = round(plan.makespan_sec, 1)
+        eta = datetime.utcnow() + timedelta(seconds=drain_sec)
+        return {
+            "drain_sec": drain_sec,
+            "eta": eta.isoformat(),
+            "batches": len(plan.order),
+            "workers": plan.worker_count,
+        }
+
     def _remove_pending_batch(self, account_id: int) -> None:
         for idx, item in enumerate(self._pending):
             if item.account_id == account_id:
@@ -411,6 +540,8 @@ class ExecutorService:
         if account_id in self._running_accounts:
             return False
         if account_id in self._queued_accounts:
+            if self._scheduler_mode == SCHEDULER_MODE_GLOBAL:
+                return self._merge_into_queued(account_id, intents)
             return False
 
         intents.sort(key=lambda i: TASK_PRIORITY.get(i.task_type, 0), reverse=True)
@@ -426,6 +557,31 @@ class ExecutorService:
         )
         return True
 
+    def _merge_into_queued(self, account_id: int, intents: List[TaskIntent]) -> bool:
+        """global 模式：将新到期任务合并进该账号尚未分发的排队批次。"""
+        for batch in self._pending:
+            if batch.account_id != account_id or batch.state != "queued":
+                continue
+            fresh = [
+                i for i in intents
+                if (i.account_id, i.task_type) not in self._queued_keys
+            ]
+            if not fresh:
+                return False
+            batch.intents.extend(fresh)
+            batch.intents.sort(
+                key=lambda i: TASK_PRIORITY.get(i.task_type, 0), reverse=True
+            )
+            for intent in fresh:
+                self._queued_keys.add((intent.account_id, intent.task_type))
+            self._metrics["plan_merged_intents"] += len(fresh)
+            self._have_items.set()
+            self._log.info(
+                f"批次合并: account={account_id}, 新增任务={[i.task_type.value for i in fresh]}"
+            )
+            return True
+        return False
+
     def queue_info(self) -> List[dict]:
         result: List[dict] = []
         for batch in list(self._pending):
@@ -476,6 +632,10 @@ class ExecutorService:
         throughput_1m = sum(1 for ts in self._batch_done_samples if ts >= cutoff_1m)
         throughput_5m = sum(1 for ts in self._batch_done_samples if ts >= cutoff_5m)
         io_stats = emulator_io_pool_stats()
+        plan = self._current_plan()
+        plan_info = {"mode": self._scheduler_mode}
+        if self._scheduler_mode == SCHEDULER_MODE_GLOBAL:
+            plan_info.update(plan.to_dict())
         return {
             "engine": "feeder_executor",
             "queue": {
@@ -483,6 +643,7 @@ class ExecutorService:
                 "wait_ms_p50": queue_wait_p50,
                 "wait_ms_p95": queue_wait_p95,
                 "failed_pool_size": len(self._failed_batches),
+                "predicted_drain_sec": round(plan.makespan_sec, 1),
             },
             "running": {
                 "count": len(self._running_accounts),
@@ -502,6 +663,18 @@ class ExecutorService:
                 "emulator_pools": io_stats.get("pool_count", 0),
                 "active_keys": io_stats.get("active_keys", 0),
             },
+            "compute": compute_pool_stats(),
+            "compute_processes": process_pool_stats(),
+            "loop": loop_monitor.snapshot(top=5),
+            "process_groups": [
+                {
+                    "group": group.group_index,
+                    "alive": group.alive,
+                    "emulators": list(group.workers.keys()),
+                }
+                for group in self._process_groups
+            ],
+            "plan": plan_info,
             "last_dispatch_at": self._last_dispatch_at.isoformat()
             if self._last_dispatch_at
             else None,
@@ -524,4 +697,19 @@ class ExecutorService:
 
 executor_service = ExecutorService()
 
+
+def _collect_executor_metrics():
+    """抓取时导出执行队列深度与运行中账号数。"""
+    svc = executor_service
+    return [
+        ("oas_executor_queue_depth", "gauge", "执行器待派发批次数", [({}, len(svc._pending))]),
+        ("oas_executor_failed_pool", "gauge", "执行器失败重试池批次数", [({}, len(svc._failed_batches))]),
+        ("oas_executor_running_accounts", "gauge", "正在执行的账号数", [({}, len(svc._running_accounts))]),
+        ("oas_executor_workers", "gauge", "WorkerActor 数", [({}, len(svc._workers))]),
+    ]
+
+
+metrics.register_collector(_collect_executor_metrics)
+
+
 __all__ = ["executor_service", "ExecutorService", "TaskIntent"]
@@ -6,11 +6,10 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus
 from ...core.timeutils import now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
@@ -53,7 +52,7 @@ class SigninExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[签到] 准备: account={account.login_id}")
@@ -146,18 +145,9 @@ class SigninExecutor(BaseExecutor):
             next_time = f"{tomorrow.isoformat()} 18:00"
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    signin_cfg = cfg.get("签到", {})
-                    signin_cfg["next_time"] = next_time
-                    cfg["签到"] = signin_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"签到": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[签到] next_time 更新为 {next_time}")
         except Exception as e:
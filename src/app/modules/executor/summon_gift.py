@@ -9,15 +9,15 @@ from typing import Any, Dict, Optional
 
 import cv2  # type: ignore
 import numpy as np
-from sqlalchemy.orm.attributes import flag_modified
 
 from ...core.constants import TaskStatus, TaskType
 from ...core.timeutils import now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
-from ..vision.template import Match, match_template
+from ..vision.template import Match
 from ..vision.utils import ImageLike, load_image, random_point_in_circle
 from .base import BaseExecutor
 
@@ -166,7 +166,7 @@ class SummonGiftExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[召唤礼包] 准备: account={account.login_id}")
@@ -253,7 +253,7 @@ class SummonGiftExecutor(BaseExecutor):
                     "timestamp": datetime.utcnow().isoformat(),
                 }
 
-        shangdian_match = match_template(
+        shangdian_match = await self.vision.match_template(
             screenshot, "assets/ui/templates/zhaohuan_shangdian.png"
         )
         if not shangdian_match:
@@ -292,7 +292,7 @@ class SummonGiftExecutor(BaseExecutor):
                     "error": "截图失败",
                     "timestamp": datetime.utcnow().isoformat(),
                 }
-            libao_tag = match_template(screenshot, "assets/ui/templates/libao_tag.png")
+            libao_tag = await self.vision.match_template(screenshot, "assets/ui/templates/libao_tag.png")
             if libao_tag:
                 break
             self.logger.warning(f"[召唤礼包] 未进入召唤礼包界面，重试 ({attempt + 1}/3)")
@@ -323,7 +323,7 @@ class SummonGiftExecutor(BaseExecutor):
                 screenshot = await self._capture()
 
             if screenshot is not None:
-                mianfei_match = match_template(
+                mianfei_match = await self.vision.match_template(
                     screenshot, "assets/ui/templates/zhaohuan_mianfei.png"
                 )
                 if mianfei_match:
@@ -342,7 +342,7 @@ class SummonGiftExecutor(BaseExecutor):
                         if ss is None:
                             await asyncio.sleep(0.5)
                             continue
-                        queren_match = match_template(
+                        queren_match = await self.vision.match_template(
                             ss, "assets/ui/templates/queren_mianfei.png"
                         )
                         if queren_match:
@@ -411,7 +411,7 @@ class SummonGiftExecutor(BaseExecutor):
         self.logger.info("[召唤礼包] 点击返回召唤界面")
         screenshot = await self._capture()
         if screenshot is not None:
-            back_match = match_template(screenshot, "assets/ui/templates/back.png")
+            back_match = await self.vision.match_template(screenshot, "assets/ui/templates/back.png")
             if back_match:
                 bx, by = back_match.random_point()
                 await self._tap(bx, by)
@@ -437,7 +437,7 @@ class SummonGiftExecutor(BaseExecutor):
                 screenshot = await self._capture()
 
         if screenshot is not None:
-            jiangli_result = match_template(
+            jiangli_result = await self.vision.match_template(
                 screenshot, "assets/ui/templates/jiangli.png"
             )
             if jiangli_result:
@@ -459,7 +459,7 @@ class SummonGiftExecutor(BaseExecutor):
         # 关闭可能出现的插画弹窗 (chahua.png)
         screenshot = await self._capture()
         if screenshot is not None:
-            chahua_result = match_template(
+            chahua_result = await self.vision.match_template(
                 screenshot, "assets/ui/templates/chahua.png"
             )
             if chahua_result:
@@ -478,18 +478,9 @@ class SummonGiftExecutor(BaseExecutor):
             next_time = f"{tomorrow.isoformat()} 00:01"
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    gift_cfg = cfg.get("召唤礼包", {})
-                    gift_cfg["next_time"] = next_time
-                    cfg["召唤礼包"] = gift_cfg
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"召唤礼包": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[召唤礼包] next_time 更新为 {next_time}")
         except Exception as e:
@@ -12,7 +12,6 @@ from ...db.base import SessionLocal
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
-from ..vision.template import match_template
 from .base import BaseExecutor
 from .helpers import click_template, wait_for_qrcode, wait_for_template
 
@@ -60,7 +59,7 @@ class WeeklyShareExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[每周分享] 准备: account={account.login_id}")
@@ -234,7 +233,7 @@ class WeeklyShareExecutor(BaseExecutor):
                 if screenshot is None:
                     return
 
-        jiangli = match_template(screenshot, _TPL_JIANGLI)
+        jiangli = await self.vision.match_template(screenshot, _TPL_JIANGLI)
         if jiangli:
             self.logger.info("[每周分享] 检测到奖励弹窗，点击关闭")
         else:
@@ -295,7 +294,7 @@ class WeeklyShareExecutor(BaseExecutor):
                 screenshot = await self._capture()
                 if screenshot is None:
                     continue
-                m = match_template(screenshot, tpl)
+                m = await self.vision.match_template(screenshot, tpl)
                 if m:
                     cx, cy = m.random_point()
                     await self._tap(cx, cy)
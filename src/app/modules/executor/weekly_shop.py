@@ -8,19 +8,17 @@ import re
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy.orm.attributes import flag_modified
-
 from ...core.constants import TaskStatus, TaskType
 from ...core.logger import logger
 from ...core.timeutils import now_beijing
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
-from ..ocr.async_recognize import async_ocr
-from ..ocr.async_recognize import async_ocr_digits
 from ..ui.assets import parse_number
 from ..ui.manager import UIManager
-from ..vision.template import Match, match_template
+from ..vision.template import Match
+from .account_state import update_account_fields
 from .base import BaseExecutor
 from .helpers import click_template, wait_for_template
 
@@ -75,7 +73,7 @@ class WeeklyShopExecutor(BaseExecutor):
             if syscfg
             else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[每周商店] 准备: account={account.login_id}")
@@ -112,7 +110,7 @@ class WeeklyShopExecutor(BaseExecutor):
 
     async def _read_xunzhang(self, screenshot) -> Optional[int]:
         """OCR 读取勋章商店界面的勋章值"""
-        result = await async_ocr_digits(screenshot, roi=XUNZHANG_ROI)
+        result = await self.vision.ocr_digits(screenshot, roi=XUNZHANG_ROI)
         raw = result.text.strip()
         value = parse_number(raw)
         self.logger.info(f"[每周商店] 勋章 OCR: raw='{raw}' → value={value}")
@@ -125,7 +123,7 @@ class WeeklyShopExecutor(BaseExecutor):
         roi_y = max(0, m.y - 65)
         roi_w = m.w + 120
         roi_h = 60
-        result = await async_ocr(screenshot, roi=(roi_x, roi_y, roi_w, roi_h))
+        result = await self.vision.ocr(screenshot, roi=(roi_x, roi_y, roi_w, roi_h))
         raw = result.text.strip()
         self.logger.info(
             f"[每周商店] 剩余数量 OCR: raw='{raw}' roi=({roi_x},{roi_y},{roi_w},{roi_h})"
@@ -206,7 +204,7 @@ class WeeklyShopExecutor(BaseExecutor):
                 return
 
         # 仅在检测到 jiangli.png 奖励画面时才点击关闭
-        jiangli_match = match_template(screenshot, "assets/ui/templates/jiangli.png")
+        jiangli_match = await self.vision.match_template(screenshot, "assets/ui/templates/jiangli.png")
         if not jiangli_match:
             self.logger.info("[每周商店] 未检测到奖励画面，跳过关闭点击")
             return
@@ -363,7 +361,7 @@ class WeeklyShopExecutor(BaseExecutor):
                     screenshot = await self._capture()
                     if screenshot is None:
                         continue
-                item_match = match_template(
+                item_match = await self.vision.match_template(
                     screenshot, f"assets/ui/templates/{template_name}.png"
                 )
                 if item_match:
@@ -434,15 +432,7 @@ class WeeklyShopExecutor(BaseExecutor):
     def _update_xunzhang_in_db(self, value: int) -> None:
         """更新 DB 中的勋章值（仅展示用途）"""
         try:
-            with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    account.xunzhang = value
-                    db.commit()
+            update_account_fields(self.current_account.id, xunzhang=value)
         except Exception as e:
             self.logger.warning(f"[每周商店] 更新勋章到 DB 失败: {e}")
 
@@ -468,18 +458,9 @@ class WeeklyShopExecutor(BaseExecutor):
                 next_time = retry_dt.strftime("%Y-%m-%d %H:%M")
 
             with SessionLocal() as db:
-                account = (
-                    db.query(GameAccount)
-                    .filter(GameAccount.id == self.current_account.id)
-                    .first()
-                )
-                if account:
-                    cfg = account.task_config or {}
-                    shop = cfg.get("每周商店", {})
-                    shop["next_time"] = next_time
-                    cfg["每周商店"] = shop
-                    account.task_config = cfg
-                    flag_modified(account, "task_config")
+                if patch_task_config(
+                    db, self.current_account.id, {"每周商店": {"next_time": next_time}}
+                ):
                     db.commit()
                     self.logger.info(f"[每周商店] next_time 更新为 {next_time}")
         except Exception as e:
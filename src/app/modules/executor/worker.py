@@ -6,13 +6,15 @@ from __future__ import annotations
 
 import asyncio
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any, Awaitable, Callable, List, Optional, Tuple
 
 from sqlalchemy.orm.attributes import flag_modified
 
+from ...core.config import settings
 from ...core.constants import AccountStatus, TaskStatus, TaskType
 from ...core.logger import logger
+from ...core.metrics import metrics
 from ...core.thread_pool import (
     get_emulator_io_pool,
     run_in_db,
@@ -26,42 +28,20 @@ from ...core.timeutils import (
     parse_beijing_time,
 )
 from ...db.base import SessionLocal
+from ...db.json_patch import TaskConfigPatch, patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
+from ...db.system_config_cache import system_config_cache
 from ..ui.manager import AccountExpiredException, CangbaogeListedException
 from ..ui.popups import JihaoPopupException
 from ..emu.adapter import EmulatorAdapter
 from ..emu.async_adapter import AsyncEmulatorAdapter
-from .base import MockExecutor
-from .collect_login_gift import CollectLoginGiftExecutor
-from .collect_mail import CollectMailExecutor
-from .delegate_help import DelegateHelpExecutor
-from .liao_shop import LiaoShopExecutor
-from .add_friend import AddFriendExecutor
-from .init_executor import InitExecutor
-from .init_collect_reward import InitCollectRewardExecutor
-from .init_rent_shikigami import InitRentShikigamiExecutor
-from .init_newbie_quest import InitNewbieQuestExecutor
-from .init_exp_dungeon import InitExpDungeonExecutor
-from .init_collect_jinnang import InitCollectJinnangExecutor
-from .init_shikigami_train import InitShikigamiTrainExecutor
-from .init_fanhe_upgrade import InitFanheUpgradeExecutor
-from .digui import DiGuiExecutor
-from .explore import ExploreExecutor
-from .xuanshang import XuanShangExecutor
-from .climb_tower import ClimbTowerExecutor
-from .weekly_shop import WeeklyShopExecutor
-from .miwen import MiWenExecutor
-from .signin import SigninExecutor
-from .yuhun import YuHunExecutor
-from .collect_achievement import CollectAchievementExecutor
-from .summon_gift import SummonGiftExecutor
-from .weekly_share import WeeklyShareExecutor
-from .collect_fanhe_jiuhu import CollectFanheJiuhuExecutor
-from .duiyi_jingcai import DuiyiJingcaiExecutor
-from .team_yuhun import TeamYuhunExecutor
-from .foster import FosterExecutor
-from .fangka import FangkaExecutor
+from ..emu.frame_ring import write_frames_async
+from ..vision.context import VisionContext
+from .account_state import close_account_state, get_account_state, open_account_state
 from .db_logger import emit as db_log
+from .durations import duration_stats
+from .registry import create_executor
+from .run_ledger import run_ledger
 from .types import TaskIntent
 
 # 各任务类型的 next_time 更新策略（已有自己 _update_next_time 的执行器不在此列）
@@ -95,6 +75,13 @@ _GOUXIE_FIXED_TIMES = ["18:00", "21:00"]
 # 对弈竞猜固定时间窗口（10:00 起，每 2 小时一个窗口）
 _DUIYI_FIXED_TIMES = ["10:00", "12:00", "14:00", "16:00", "18:00", "20:00", "22:00"]
 
+_TASK_SECONDS = metrics.histogram(
+    "oas_task_seconds",
+    "单个 intent 执行耗时（秒）",
+    ["emulator", "task_type", "outcome"],
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600),
+)
+
 
 class WorkerActor:
     _MAX_RESCAN_ROUNDS = 3  # re-scan 最大轮次
@@ -195,15 +182,8 @@ class WorkerActor:
                         db.expunge(acc)
                     return acc
 
-            def _load_syscfg():
-                with SessionLocal() as db:
-                    cfg = db.query(SystemConfig).first()
-                    if cfg:
-                        db.expunge(cfg)
-                    return cfg
-
-            # 重新加载系统配置（确保 capture_method 等配置实时生效）
-            fresh_syscfg = await run_in_db(_load_syscfg)
+            # 重新获取系统配置（版本化缓存，系统设置修改后即失效，确保 capture_method 等配置实时生效）
+            fresh_syscfg = await run_in_db(system_config_cache.get)
             if fresh_syscfg is not None:
                 self.syscfg = fresh_syscfg
 
@@ -213,118 +193,123 @@ class WorkerActor:
                 self._log.warning(f"Account not found: {account_id}")
                 overall_success = False
             else:
-                # 判断是否为云端任务（由 CloudTaskPoller 注入 cloud_job_id）
-                is_cloud_job = bool(
-                    batch[0].payload.get("cloud_job_id") if batch[0].payload else None
-                )
+                # 批次内账号状态：执行器对体力 / 资产 / 等级等字段的写入先落在内存
+                if getattr(settings, "account_state_cache_enabled", True):
+                    open_account_state(account)
 
-                # === Merge cloud task_config into local account (once per batch) ===
-                cloud_tc = batch[0].payload.get("cloud_task_config") if batch[0].payload else None
-                if cloud_tc:
-                    if is_cloud_job:
-                        # 云端任务：仅合并到内存中的 account 对象（不持久化到本地 DB）
-                        # 使执行器能读取云端配置（如寄养扩展字段、探索中断白名单等）
-                        local_tc = dict(account.task_config or {})
-                        for task_name, task_cfg in cloud_tc.items():
-                            if isinstance(task_cfg, dict):
-                                existing = local_tc.get(task_name, {})
-                                if isinstance(existing, dict):
-                                    existing.update(task_cfg)
-                                    local_tc[task_name] = existing
-                                else:
-                                    local_tc[task_name] = task_cfg
-                        account.task_config = local_tc
-                        self._log.info(f"云端任务已合并 task_config 到内存: account={account_id}")
-                    else:
-                        # 非云端任务：持久化合并到本地 DB
-                        def _merge_cloud_task_config(aid: int, ctc: dict):
+                try:
+                    # 判断是否为云端任务（由 CloudTaskPoller 注入 cloud_job_id）
+                    is_cloud_job = bool(
+                        batch[0].payload.get("cloud_job_id") if batch[0].payload else None
+                    )
+
+                    # === Merge cloud task_config into local account (once per batch) ===
+                    cloud_tc = batch[0].payload.get("cloud_task_config") if batch[0].payload else None
+                    if cloud_tc:
+                        if is_cloud_job:
+                            # 云端任务：仅合并到内存中的 account 对象（不持久化到本地 DB）
+                            # 使执行器能读取云端配置（如寄养扩展字段、探索中断白名单等）
+                            local_tc = dict(account.task_config or {})
+                            for task_name, task_cfg in cloud_tc.items():
+                                if isinstance(task_cfg, dict):
+                                    existing = local_tc.get(task_name, {})
+                                    if isinstance(existing, dict):
+                                        existing.update(task_cfg)
+                                        local_tc[task_name] = existing
+                                    else:
+                                        local_tc[task_name] = task_cfg
+                            account.task_config = local_tc
+                            self._log.info(f"云端任务已合并 task_config 到内存: account={account_id}")
+                        else:
+                            # 非云端任务：持久化合并到本地 DB
+                            def _merge_cloud_task_config(aid: int, ctc: dict):
+                                updates = {k: v for k, v in ctc.items() if isinstance(v, dict)}
+                                with SessionLocal() as db:
+                                    if patch_task_config(db, aid, updates):
+                                        db.commit()
+
+                            await run_in_db(_merge_cloud_task_config, account_id, cloud_tc)
+                            self._log.info(f"已合并云端 task_config: account={account_id}")
+
+                    # === Merge cloud lineup_config into local account (once per batch) ===
+                    cloud_lineup = batch[0].payload.get("lineup_config") if batch[0].payload else None
+                    if cloud_lineup and isinstance(cloud_lineup, dict):
+                        def _merge_cloud_lineup(aid: int, cfg: dict):
                             with SessionLocal() as db:
                                 acc = db.query(GameAccount).filter(GameAccount.id == aid).first()
                                 if acc:
-                                    local_tc = dict(acc.task_config or {})
-                                    for task_name, task_cfg in ctc.items():
-                                        if isinstance(task_cfg, dict):
-                                            existing = local_tc.get(task_name, {})
-                                            if isinstance(existing, dict):
-                                                existing.update(task_cfg)
-                                                local_tc[task_name] = existing
-                                            else:
-                                                local_tc[task_name] = task_cfg
-                                    acc.task_config = local_tc
-                                    flag_modified(acc, "task_config")
+                                    acc.lineup_config = cfg
+                                    flag_modified(acc, "lineup_config")
                                     db.commit()
-
-                        await run_in_db(_merge_cloud_task_config, account_id, cloud_tc)
-                        self._log.info(f"已合并云端 task_config: account={account_id}")
-
-                # === Merge cloud lineup_config into local account (once per batch) ===
-                cloud_lineup = batch[0].payload.get("lineup_config") if batch[0].payload else None
-                if cloud_lineup and isinstance(cloud_lineup, dict):
-                    def _merge_cloud_lineup(aid: int, cfg: dict):
-                        with SessionLocal() as db:
-                            acc = db.query(GameAccount).filter(GameAccount.id == aid).first()
-                            if acc:
-                                acc.lineup_config = cfg
-                                flag_modified(acc, "lineup_config")
-                                db.commit()
-                    await run_in_db(_merge_cloud_lineup, account_id, cloud_lineup)
-                    account.lineup_config = cloud_lineup
-                    self._log.info(f"已合并云端 lineup_config: account={account_id}")
-
-                # === 主循环：batch 执行 + re-scan ===
-                current_batch = batch
-                abort = False
-
-                while current_batch and not abort:
-                    batch_success, shared_adapter, shared_ui, abort = (
-                        await self._execute_batch_tasks(
-                            current_batch, account,
-                            shared_adapter=shared_adapter,
-                            shared_ui=shared_ui,
+                        await run_in_db(_merge_cloud_lineup, account_id, cloud_lineup)
+                        account.lineup_config = cloud_lineup
+                        self._log.info(f"已合并云端 lineup_config: account={account_id}")
+
+                    # === 主循环：batch 执行 + re-scan ===
+                    current_batch = batch
+                    abort = False
+
+                    while current_batch and not abort:
+                        batch_success, shared_adapter, shared_ui, abort = (
+                            await self._execute_batch_tasks(
+                                current_batch, account,
+                                shared_adapter=shared_adapter,
+                                shared_ui=shared_ui,
+                            )
                         )
-                    )
 
-                    if not batch_success:
-                        overall_success = False
+                        if not batch_success:
+                            overall_success = False
+
+                        # 中断判断
+                        if abort or self._stop.is_set():
+                            break
+
+                        # 云端任务不做 re-scan：云端模式下由云端调度器决定任务
+                        if is_cloud_job:
+                            break
 
-                    # 中断判断
-                    if abort or self._stop.is_set():
-                        break
+                        # re-scan：检查是否有新到期任务
+                        rescan_round += 1
+                        if rescan_round > self._MAX_RESCAN_ROUNDS:
+                            self._log.info(
+                                f"达到 re-scan 上限 ({self._MAX_RESCAN_ROUNDS}), "
+                                f"account={account_id}"
+                            )
+                            break
 
-                    # 云端任务不做 re-scan：云端模式下由云端调度器决定任务
-                    if is_cloud_job:
-                        break
+                        new_intents = await self._do_rescan(account_id)
+                        if not new_intents:
+                            break
 
-                    # re-scan：检查是否有新到期任务
-                    rescan_round += 1
-                    if rescan_round > self._MAX_RESCAN_ROUNDS:
+                        new_task_names = ", ".join(
+                            i.task_type.value if isinstance(i.task_type, TaskType)
+                            else str(i.task_type)
+                            for i in new_intents
+                        )
                         self._log.info(
-                            f"达到 re-scan 上限 ({self._MAX_RESCAN_ROUNDS}), "
-                            f"account={account_id}"
+                            f"re-scan 发现 {len(new_intents)} 个新任务: "
+                            f"account={account_id}, tasks=[{new_task_names}]"
                         )
-                        break
-
-                    new_intents = await self._do_rescan(account_id)
-                    if not new_intents:
-                        break
+                        db_log(
+                            account_id,
+                            f"re-scan 追加 {len(new_intents)} 个新到期任务: {new_task_names}",
+                        )
+                        current_batch = new_intents
 
-                    new_task_names = ", ".join(
-                        i.task_type.value if isinstance(i.task_type, TaskType)
-                        else str(i.task_type)
-                        for i in new_intents
-                    )
-                    self._log.info(
-                        f"re-scan 发现 {len(new_intents)} 个新任务: "
-                        f"account={account_id}, tasks=[{new_task_names}]"
-                    )
-                    db_log(
-                        account_id,
-                        f"re-scan 追加 {len(new_intents)} 个新到期任务: {new_task_names}",
-                    )
-                    current_batch = new_intents
+                    # === 所有轮次完成，最终 cleanup ===
+                    await self._final_cleanup(shared_adapter)
+                finally:
+                    # 批次结束（含异常 / 停止时取消）：写回账号状态剩余脏字段并移除，
+                    # 避免状态残留导致批次外的写入只落在内存
+                    await close_account_state(account_id)
 
-                # === 所有轮次完成，最终 cleanup ===
-                await self._final_cleanup(shared_adapter)
+            # 批次结束后批量落库本批次的耗时样本与运行流水
+            try:
+                await duration_stats.flush()
+            except Exception as e:
+                self._log.warning(f"耗时样本落库失败: {e}")
+            await run_ledger.flush()
 
             self.current = None
             if self.on_done:
@@ -362,138 +347,186 @@ class WorkerActor:
         batch_success = True
         abort = False
         account_id = account.id
+        # 批次内的 next_time 变更累积后一次写入（每个账号一条 UPDATE）
+        next_time_ops: List[Tuple[str, str, Optional[str]]] = []
 
-        for intent in batch:
-            if self._stop.is_set():
-                abort = True
-                break
-            self.current = intent
-            intent.started_at = datetime.utcnow()
-            try:
-                intent_task = asyncio.create_task(
-                    self._run_intent(
-                        intent, account,
-                        shared_adapter=shared_adapter,
-                        shared_ui=shared_ui,
-                        skip_cleanup=True,
+        try:
+            for intent in batch:
+                if self._stop.is_set():
+                    abort = True
+                    break
+                self.current = intent
+                intent.started_at = datetime.utcnow()
+                intent_t0 = time.monotonic()
+                intent_ok = False
+                error_code: Optional[str] = None
+                captures0 = EmulatorAdapter.get_capture_count(self.emulator.adb_addr)
+                detects0 = VisionContext.get_detect_count(self.emulator.adb_addr)
+                try:
+                    intent_task = asyncio.create_task(
+                        self._run_intent(
+                            intent, account,
+                            shared_adapter=shared_adapter,
+                            shared_ui=shared_ui,
+                            skip_cleanup=True,
+                        )
+                    )
+                    ok = await self._wait_with_stale_timeout(
+                        intent_task, self._stale_timeout_sec
+                    )
+                    if ok:
+                        intent_ok = True
+                        op = self._build_success_next_time_op(intent)
+                        if op:
+                            next_time_ops.append(op)
+                        task_name = intent.task_type.value if isinstance(intent.task_type, TaskType) else str(intent.task_type)
+                        db_log(account_id, f"{task_name}任务执行成功")
+                        # per-intent 完成回调
+                        if self._executor_service:
+                            await self._executor_service.notify_intent_done(account_id, intent, True)
+                    else:
+                        batch_success = False
+                        task_name = intent.task_type.value if isinstance(intent.task_type, TaskType) else str(intent.task_type)
+                        db_log(account_id, f"{task_name}任务执行失败", level="WARNING")
+                        # per-intent 完成回调
+                        if self._executor_service:
+                            await self._executor_service.notify_intent_done(account_id, intent, False)
+                        op = self._build_failure_next_time_op(intent)
+                        if op:
+                            next_time_ops.append(op)
+                        error_code = "task_failed"
+                        await self._save_fail_screenshot(
+                            intent, shared_adapter, reason="task_failed"
+                        )
+                    # 提取 adapter/ui 供后续任务复用
+                    if not shared_adapter and hasattr(self, '_last_executor_adapter'):
+                        shared_adapter = self._last_executor_adapter
+                    if not shared_ui and hasattr(self, '_last_executor_ui'):
+                        shared_ui = self._last_executor_ui
+                except asyncio.TimeoutError:
+                    batch_success = False
+                    self._log.error(
+                        f"Intent stale timeout: account={intent.account_id}, "
+                        f"task={intent.task_type}, stale_limit={self._stale_timeout_sec}s"
                     )
-                )
-                ok = await self._wait_with_stale_timeout(
-                    intent_task, self._stale_timeout_sec
-                )
-                if ok:
-                    op = self._build_success_next_time_op(intent)
-                    if op:
-                        await self._flush_next_time_updates(account_id, [op])
                     task_name = intent.task_type.value if isinstance(intent.task_type, TaskType) else str(intent.task_type)
-                    db_log(account_id, f"{task_name}任务执行成功")
+                    db_log(intent.account_id, f"{task_name}任务空闲超时 ({self._stale_timeout_sec}s 无活动)", level="ERROR")
                     # per-intent 完成回调
                     if self._executor_service:
-                        await self._executor_service.notify_intent_done(account_id, intent, True)
-                else:
+                        await self._executor_service.notify_intent_done(account_id, intent, False)
+                    op = self._build_failure_next_time_op(intent)
+                    if op:
+                        next_time_ops.append(op)
+                    error_code = "stale_timeout"
+                    await self._save_fail_screenshot(
+                        intent, shared_adapter, reason="stale_timeout"
+                    )
+                except JihaoPopupException:
+                    if not shared_adapter and hasattr(self, '_last_executor_adapter') and self._last_executor_adapter:
+                        shared_adapter = self._last_executor_adapter
+                    batch_success = False
+                    abort = True
+                    self._log.warning(f"检测到祭号弹窗，关闭游戏并批量延后任务: account={intent.account_id}")
+                    db_log(intent.account_id, "检测到祭号弹窗，关闭游戏并批量延后任务", level="WARNING")
+                    # per-intent 完成回调
+                    if self._executor_service:
+                        await self._executor_service.notify_intent_done(account_id, intent, False)
+                    error_code = "jihao_popup"
+                    await self._save_fail_screenshot(
+                        intent, shared_adapter, reason="jihao_popup"
+                    )
+                    # 先写入已完成任务的 next_time，避免被批量延后覆盖
+                    await self._flush_next_time_updates(account_id, next_time_ops)
+                    next_time_ops = []
+                    await self._delay_all_tasks_on_jihao(account_id)
+                    if shared_adapter:
+                        try:
+                            await self._force_stop_game(shared_adapter)
+                        except Exception as e:
+                            self._log.error(f"祭号弹窗关闭游戏失败: {e}")
+                    break
+                except AccountExpiredException:
+                    if not shared_adapter and hasattr(self, '_last_executor_adapter') and self._last_executor_adapter:
+                        shared_adapter = self._last_executor_adapter
+                    batch_success = False
+                    abort = True
+                    self._log.warning(f"账号失效: account={intent.account_id}")
+                    await self._mark_account_invalid(intent.account_id)
+                    db_log(intent.account_id, "账号登录失效，已标记为无效", level="ERROR")
+                    # per-intent 完成回调
+                    if self._executor_service:
+                        await self._executor_service.notify_intent_done(account_id, intent, False)
+                    error_code = "account_expired"
+                    await self._save_fail_screenshot(
+                        intent, shared_adapter, reason="account_expired"
+                    )
+                    break
+                except CangbaogeListedException:
+                    if not shared_adapter and hasattr(self, '_last_executor_adapter') and self._last_executor_adapter:
+                        shared_adapter = self._last_executor_adapter
+                    batch_success = False
+                    abort = True
+                    self._log.warning(f"检测到藏宝阁界面，关闭游戏并标记账号: account={intent.account_id}")
+                    await self._mark_account_cangbaoge(intent.account_id)
+                    db_log(intent.account_id, "检测到账号已上架藏宝阁，已标记状态", level="WARNING")
+                    # per-intent 完成回调
+                    if self._executor_service:
+                        await self._executor_service.notify_intent_done(account_id, intent, False)
+                    error_code = "cangbaoge_listed"
+                    await self._save_fail_screenshot(
+                        intent, shared_adapter, reason="cangbaoge_listed"
+                    )
+                    if shared_adapter:
+                        try:
+                            await self._force_stop_game(shared_adapter)
+                        except Exception as e:
+                            self._log.error(f"藏宝阁关闭游戏失败: {e}")
+                    break
+                except Exception as exc:
                     batch_success = False
+                    self._log.error(f"Intent error: {exc}")
                     task_name = intent.task_type.value if isinstance(intent.task_type, TaskType) else str(intent.task_type)
-                    db_log(account_id, f"{task_name}任务执行失败", level="WARNING")
+                    db_log(intent.account_id, f"{task_name}任务异常: {str(exc)[:200]}", level="ERROR")
                     # per-intent 完成回调
                     if self._executor_service:
                         await self._executor_service.notify_intent_done(account_id, intent, False)
                     op = self._build_failure_next_time_op(intent)
                     if op:
-                        await self._flush_next_time_updates(account_id, [op])
+                        next_time_ops.append(op)
+                    error_code = type(exc).__name__
                     await self._save_fail_screenshot(
-                        intent, shared_adapter, reason="task_failed"
+                        intent, shared_adapter, reason=str(exc)[:50]
                     )
-                # 提取 adapter/ui 供后续任务复用
-                if not shared_adapter and hasattr(self, '_last_executor_adapter'):
-                    shared_adapter = self._last_executor_adapter
-                if not shared_ui and hasattr(self, '_last_executor_ui'):
-                    shared_ui = self._last_executor_ui
-            except asyncio.TimeoutError:
-                batch_success = False
-                self._log.error(
-                    f"Intent stale timeout: account={intent.account_id}, "
-                    f"task={intent.task_type}, stale_limit={self._stale_timeout_sec}s"
-                )
-                task_name = intent.task_type.value if isinstance(intent.task_type, TaskType) else str(intent.task_type)
-                db_log(intent.account_id, f"{task_name}任务空闲超时 ({self._stale_timeout_sec}s 无活动)", level="ERROR")
-                # per-intent 完成回调
-                if self._executor_service:
-                    await self._executor_service.notify_intent_done(account_id, intent, False)
-                op = self._build_failure_next_time_op(intent)
-                if op:
-                    await self._flush_next_time_updates(account_id, [op])
-                await self._save_fail_screenshot(
-                    intent, shared_adapter, reason="stale_timeout"
-                )
-            except JihaoPopupException:
-                if not shared_adapter and hasattr(self, '_last_executor_adapter') and self._last_executor_adapter:
-                    shared_adapter = self._last_executor_adapter
-                batch_success = False
-                abort = True
-                self._log.warning(f"检测到祭号弹窗，关闭游戏并批量延后任务: account={intent.account_id}")
-                db_log(intent.account_id, "检测到祭号弹窗，关闭游戏并批量延后任务", level="WARNING")
-                # per-intent 完成回调
-                if self._executor_service:
-                    await self._executor_service.notify_intent_done(account_id, intent, False)
-                await self._save_fail_screenshot(
-                    intent, shared_adapter, reason="jihao_popup"
-                )
-                await self._delay_all_tasks_on_jihao(account_id)
-                if shared_adapter:
-                    try:
-                        await self._force_stop_game(shared_adapter)
-                    except Exception as e:
-                        self._log.error(f"祭号弹窗关闭游戏失败: {e}")
-                break
-            except AccountExpiredException:
-                if not shared_adapter and hasattr(self, '_last_executor_adapter') and self._last_executor_adapter:
-                    shared_adapter = self._last_executor_adapter
-                batch_success = False
-                abort = True
-                self._log.warning(f"账号失效: account={intent.account_id}")
-                await self._mark_account_invalid(intent.account_id)
-                db_log(intent.account_id, "账号登录失效，已标记为无效", level="ERROR")
-                # per-intent 完成回调
-                if self._executor_service:
-                    await self._executor_service.notify_intent_done(account_id, intent, False)
-                await self._save_fail_screenshot(
-                    intent, shared_adapter, reason="account_expired"
-                )
-                break
-            except CangbaogeListedException:
-                if not shared_adapter and hasattr(self, '_last_executor_adapter') and self._last_executor_adapter:
-                    shared_adapter = self._last_executor_adapter
-                batch_success = False
-                abort = True
-                self._log.warning(f"检测到藏宝阁界面，关闭游戏并标记账号: account={intent.account_id}")
-                await self._mark_account_cangbaoge(intent.account_id)
-                db_log(intent.account_id, "检测到账号已上架藏宝阁，已标记状态", level="WARNING")
-                # per-intent 完成回调
-                if self._executor_service:
-                    await self._executor_service.notify_intent_done(account_id, intent, False)
-                await self._save_fail_screenshot(
-                    intent, shared_adapter, reason="cangbaoge_listed"
-                )
-                if shared_adapter:
-                    try:
-                        await self._force_stop_game(shared_adapter)
-                    except Exception as e:
-                        self._log.error(f"藏宝阁关闭游戏失败: {e}")
-                break
-            except Exception as exc:
-                batch_success = False
-                self._log.error(f"Intent error: {exc}")
-                task_name = intent.task_type.value if isinstance(intent.task_type, TaskType) else str(intent.task_type)
-                db_log(intent.account_id, f"{task_name}任务异常: {str(exc)[:200]}", level="ERROR")
-                # per-intent 完成回调
-                if self._executor_service:
-                    await self._executor_service.notify_intent_done(account_id, intent, False)
-                op = self._build_failure_next_time_op(intent)
-                if op:
-                    await self._flush_next_time_updates(account_id, [op])
-                await self._save_fail_screenshot(
-                    intent, shared_adapter, reason=str(exc)[:50]
-                )
+                finally:
+                    intent_elapsed = time.monotonic() - intent_t0
+                    _TASK_SECONDS.labels(
+                        emulator=self.emulator.adb_addr,
+                        task_type=getattr(intent.task_type, "value", intent.task_type),
+                        outcome="succeeded" if intent_ok else "failed",
+                    ).observe(intent_elapsed)
+                    duration_stats.record(
+                        intent.task_type,
+                        intent_elapsed,
+                        account_id=account_id,
+                        emulator_id=self.emulator.id,
+                        success=intent_ok,
+                    )
+                    run_ledger.record(
+                        intent.task_type,
+                        started_at=intent.started_at,
+                        success=intent_ok,
+                        account_id=account_id,
+                        emulator_id=self.emulator.id,
+                        error_code=error_code,
+                        capture_count=EmulatorAdapter.get_capture_count(self.emulator.adb_addr) - captures0,
+                        detect_count=VisionContext.get_detect_count(self.emulator.adb_addr) - detects0,
+                    )
+                    # intent 边界：账号状态脏字段一次写回
+                    state = get_account_state(account_id)
+                    if state is not None:
+                        await state.aflush()
+        finally:
+            await self._flush_next_time_updates(account_id, next_time_ops)
 
         return batch_success, shared_adapter, shared_ui, abort
 
@@ -627,111 +660,18 @@ class WorkerActor:
             status="pending",
         )
 
-        if intent.task_type == TaskType.INIT:
-            executor = InitExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.INIT_COLLECT_REWARD:
-            executor = InitCollectRewardExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.INIT_RENT_SHIKIGAMI:
-            executor = InitRentShikigamiExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.INIT_NEWBIE_QUEST:
-            executor = InitNewbieQuestExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.INIT_EXP_DUNGEON:
-            executor = InitExpDungeonExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.INIT_COLLECT_JINNANG:
-            executor = InitCollectJinnangExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.INIT_SHIKIGAMI_TRAIN:
-            executor = InitShikigamiTrainExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.INIT_FANHE_UPGRADE:
-            executor = InitFanheUpgradeExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.DELEGATE_HELP:
-            executor = DelegateHelpExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.COLLECT_LOGIN_GIFT:
-            executor = CollectLoginGiftExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.LIAO_SHOP:
-            executor = LiaoShopExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.COLLECT_MAIL:
-            executor = CollectMailExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.ADD_FRIEND:
-            executor = AddFriendExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.DIGUI:
-            executor = DiGuiExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.EXPLORE:
-            executor = ExploreExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
+        extra = {}
+        if intent.task_type == TaskType.DUIYI_JINGCAI:
+            extra["answer"] = intent.payload.get("answer") if intent.payload else None
+        executor = create_executor(
+            intent.task_type,
+            worker_id=self.emulator.id,
+            emulator_id=self.emulator.id,
+            emulator_row=self.emulator,
+            system_config=self.syscfg,
+            **extra,
+        )
+        if intent.task_type == TaskType.EXPLORE:
             # 从 task_config 读取允许中断的任务白名单
             explore_cfg = (account.task_config or {}).get("探索突破", {})
             allowed_interrupts = explore_cfg.get("allowed_interrupts", ["寄养"])
@@ -739,107 +679,6 @@ class WorkerActor:
             executor.interrupt_callback = self._make_interrupt_callback(
                 account, executor, allowed_task_names=allowed_interrupts
             )
-        elif intent.task_type == TaskType.XUANSHANG:
-            executor = XuanShangExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.CLIMB_TOWER:
-            executor = ClimbTowerExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.WEEKLY_SHOP:
-            executor = WeeklyShopExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.MIWEN:
-            executor = MiWenExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.SIGNIN:
-            executor = SigninExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.YUHUN:
-            executor = YuHunExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.COLLECT_ACHIEVEMENT:
-            executor = CollectAchievementExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.SUMMON_GIFT:
-            executor = SummonGiftExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.WEEKLY_SHARE:
-            executor = WeeklyShareExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.COLLECT_FANHE_JIUHU:
-            executor = CollectFanheJiuhuExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.DUIYI_JINGCAI:
-            executor = DuiyiJingcaiExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-                answer=intent.payload.get("answer") if intent.payload else None,
-            )
-        elif intent.task_type == TaskType.TEAM_YUHUN:
-            executor = TeamYuhunExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-            )
-        elif intent.task_type == TaskType.FOSTER:
-            executor = FosterExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        elif intent.task_type == TaskType.FANGKA:
-            executor = FangkaExecutor(
-                worker_id=self.emulator.id,
-                emulator_id=self.emulator.id,
-                emulator_row=self.emulator,
-                system_config=self.syscfg,
-            )
-        else:
-            executor = MockExecutor(
-                worker_id=self.emulator.id, emulator_id=self.emulator.id
-            )
 
         # 传递批次上下文
         if shared_adapter:
@@ -893,7 +732,7 @@ class WorkerActor:
         account_id: int,
         ops: List[Tuple[str, str, Optional[str]]],
     ) -> None:
-        """批量刷新 next_time 更新，单次 DB 读写完成。"""
+        """批量刷新 next_time 更新：只读 task_config 列，单条局部 UPDATE 写回。"""
         if not ops:
             return
 
@@ -906,11 +745,15 @@ class WorkerActor:
         def _do_update():
             try:
                 with SessionLocal() as db:
-                    account = db.query(GameAccount).filter(GameAccount.id == account_id).first()
-                    if not account:
+                    row = (
+                        db.query(GameAccount.task_config)
+                        .filter(GameAccount.id == account_id)
+                        .first()
+                    )
+                    if row is None:
                         return
-                    cfg = account.task_config or {}
-                    changed = False
+                    cfg = row[0] if isinstance(row[0], dict) else {}
+                    patch = TaskConfigPatch()
                     bj_now = now_beijing()
                     for action, config_key, value in ops_copy:
                         task_cfg = cfg.get(config_key, {})
@@ -922,7 +765,7 @@ class WorkerActor:
                                 continue
                             task_cfg["next_time"] = value
                             cfg[config_key] = task_cfg
-                            changed = True
+                            patch.set(account_id, config_key, "next_time", task_cfg["next_time"])
                             self._log.info(
                                 f"[{config_key}] next_time 更新为 {value} (account={account_id})"
                             )
@@ -937,7 +780,7 @@ class WorkerActor:
                             )
                             task_cfg["next_time"] = new_next_time
                             cfg[config_key] = task_cfg
-                            changed = True
+                            patch.set(account_id, config_key, "next_time", task_cfg["next_time"])
                             self._log.info(
                                 f"[{config_key}] 任务失败，next_time 延后 {int(fail_delay)} 分钟至 {new_next_time} (account={account_id})"
                             )
@@ -964,15 +807,14 @@ class WorkerActor:
                             )
                             task_cfg["next_time"] = new_next_time
                             cfg[config_key] = task_cfg
-                            changed = True
+                            patch.set(account_id, config_key, "next_time", task_cfg["next_time"])
                             self._log.info(
                                 f"[{config_key}] 安全延迟: next_time 延后 {int(fail_delay)} 分钟"
                                 f"至 {new_next_time} (account={account_id})"
                             )
 
-                    if changed:
-                        account.task_config = cfg
-                        flag_modified(account, "task_config")
+                    if patch:
+                        patch.flush(db)
                         db.commit()
             except Exception as e:
                 self._log.error(f"批量更新 next_time 失败: account={account_id}, error={e}")
@@ -1006,12 +848,16 @@ class WorkerActor:
         def _do_delay():
             try:
                 with SessionLocal() as db:
-                    account = db.query(GameAccount).filter(GameAccount.id == account_id).first()
-                    if not account:
+                    row = (
+                        db.query(GameAccount.task_config)
+                        .filter(GameAccount.id == account_id)
+                        .first()
+                    )
+                    if row is None or not isinstance(row[0], dict):
                         return
-                    cfg = account.task_config or {}
+                    cfg = row[0]
                     bj_now = now_beijing()
-                    updated_count = 0
+                    patch = TaskConfigPatch()
                     for task_name, task_cfg in cfg.items():
                         if not isinstance(task_cfg, dict):
                             continue
@@ -1030,11 +876,10 @@ class WorkerActor:
                         deadline = bj_now + timedelta(minutes=fail_delay)
                         if current_next <= deadline:
                             new_next_time = format_beijing_time(bj_now + timedelta(minutes=fail_delay))
-                            task_cfg["next_time"] = new_next_time
-                            updated_count += 1
-                    if updated_count > 0:
-                        account.task_config = cfg
-                        flag_modified(account, "task_config")
+                            patch.set(account_id, task_name, "next_time", new_next_time)
+                    if patch:
+                        updated_count = len(patch.updates(account_id))
+                        patch.flush(db)
                         db.commit()
                         self._log.info(f"祭号弹窗: 已延后 {updated_count} 个任务 (account={account_id})")
             except Exception as e:
@@ -1048,8 +893,12 @@ class WorkerActor:
         shared_adapter,
         reason: str = "",
     ) -> None:
-        """任务失败时尝试保存模拟器截图。
+        """任务失败时保存模拟器截图。
 
+        优先取帧环形缓冲中的最近帧（失败瞬间的画面，无需额外截图），
+        并附带之前的若干历史帧。缓冲按模拟器跨任务 / 账号共享，只取本任务开始之后的帧；
+        没有（如启动 / 登录阶段就失败）时重新截图，避免存成上一个账号的画面。
+        PNG 编码与写盘提交到 I/O 线程池，不等待完成。
         截图保存失败不影响主流程，所有异常静默捕获。
         """
         if not self.syscfg or not getattr(self.syscfg, 'save_fail_screenshot', False):
@@ -1058,19 +907,21 @@ class WorkerActor:
             self._log.debug("无法保存失败截图：adapter 未初始化")
             return
         try:
-            from pathlib import Path
-
-            capture_method = getattr(self.syscfg, 'capture_method', None) or 'adb'
-            if isinstance(shared_adapter, AsyncEmulatorAdapter):
-                png_data = await shared_adapter.capture(method=capture_method)
-            else:
-                adb_addr = shared_adapter.cfg.adb_addr
-                png_data = await run_in_emulator_io(
-                    adb_addr,
-                    shared_adapter.capture,
-                    capture_method,
-                )
-            if not png_data:
+            started = (intent.started_at or datetime.utcnow()).replace(tzinfo=timezone.utc)
+            since = started.timestamp()
+            records = shared_adapter.frame_ring.snapshot(since=since)
+            if not records:
+                capture_method = getattr(self.syscfg, 'capture_method', None) or 'adb'
+                if isinstance(shared_adapter, AsyncEmulatorAdapter):
+                    await shared_adapter.capture_ndarray(method=capture_method)
+                else:
+                    await run_in_emulator_io(
+                        shared_adapter.cfg.adb_addr,
+                        shared_adapter.capture_ndarray,
+                        capture_method,
+                    )
+                records = shared_adapter.frame_ring.snapshot(since=since)
+            if not records:
                 self._log.warning("保存失败截图：截图数据为空")
                 return
 
@@ -1082,27 +933,20 @@ class WorkerActor:
             ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
             safe_reason = reason.replace(" ", "_").replace("/", "_").replace("\\", "_")[:50] if reason else "fail"
 
-            fail_dir = Path("fail_screenshots")
-            fail_dir.mkdir(parents=True, exist_ok=True)
-
-            filename = f"{intent.account_id}_{task_name}_{ts}_{safe_reason}.png"
-            filepath = fail_dir / filename
-
-            # png_data 可能是 bytes(PNG) 或 ndarray(BGR)
-            import numpy as np
-            if isinstance(png_data, np.ndarray):
-                import cv2
-                ok, buf = cv2.imencode('.png', png_data)
-                if not ok:
-                    self._log.warning("保存失败截图：PNG 编码失败")
-                    return
-                with open(filepath, "wb") as f:
-                    f.write(buf.tobytes())
-            else:
-                with open(filepath, "wb") as f:
-                    f.write(png_data)
+            stem = f"{intent.account_id}_{task_name}_{ts}_{safe_reason}"
+            filepath = f"fail_screenshots/{stem}.png"
+            history = max(0, int(getattr(settings, "fail_screenshot_history_frames", 4)))
+            records = records[-(history + 1):]
+            write_frames_async(
+                records,
+                filepath,
+                history_dir=f"fail_screenshots/{stem}" if history else None,
+            )
 
-            self._log.info(f"失败截图已保存: {filepath}")
+            self._log.info(
+                f"失败截图已提交保存: {filepath} "
+                f"(帧龄 {records[-1].age_ms:.0f}ms, 历史 {len(records) - 1} 帧)"
+            )
         except Exception as exc:
             self._log.warning(f"保存失败截图异常（不影响主流程）: {exc}")
 
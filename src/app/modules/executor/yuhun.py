@@ -9,11 +9,11 @@ from typing import Any, Dict, List, Optional
 
 import cv2
 import numpy as np
-from sqlalchemy.orm.attributes import flag_modified
 
 from ...core.constants import TaskStatus
 from ...core.logger import logger
 from ...db.base import SessionLocal
+from ...db.json_patch import patch_task_config
 from ...db.models import Emulator, GameAccount, SystemConfig, Task
 from ..emu.adapter import AdapterConfig, EmulatorAdapter
 from ..ui.manager import UIManager
@@ -77,7 +77,7 @@ class YuHunExecutor(BaseExecutor):
             instance_id=emu.instance_id,
             activity_name=syscfg.activity_name or ".MainActivity" if syscfg else ".MainActivity",
         )
-        return EmulatorAdapter(cfg)
+        return self._acquire_adapter(cfg)
 
     async def prepare(self, task: Task, account: GameAccount) -> bool:
         self.logger.info(f"[御魂] 准备: account={account.login_id}")
@@ -629,17 +629,10 @@ class YuHunExecutor(BaseExecutor):
         """更新数据库中的御魂解锁进度。"""
         try:
             with SessionLocal() as db:
-                account = db.query(GameAccount).filter(
-                    GameAccount.id == self.current_account.id
-                ).first()
-                if not account:
+                if not patch_task_config(
+                    db, self.current_account.id, {"御魂": {"unlocked_count": count}}
+                ):
                     return
-                cfg = account.task_config or {}
-                yuhun_cfg = cfg.get("御魂", {})
-                yuhun_cfg["unlocked_count"] = count
-                cfg["御魂"] = yuhun_cfg
-                account.task_config = cfg
-                flag_modified(account, "task_config")
                 db.commit()
                 self.logger.info(
                     f"[御魂] unlocked_count 更新为 {count}/{_TOTAL_LEVELS}"
@@ -656,13 +649,11 @@ class YuHunExecutor(BaseExecutor):
                 ).first()
                 if not account:
                     return
-                cfg = account.task_config or {}
-                yuhun_cfg = cfg.get("御魂", {})
+                yuhun_cfg = (account.task_config or {}).get("御魂", {})
                 current = yuhun_cfg.get("remaining_count", 0)
-                yuhun_cfg["remaining_count"] = max(0, current - 1)
-                cfg["御魂"] = yuhun_cfg
-                account.task_config = cfg
-                flag_modified(account, "task_config")
+                patch_task_config(
+                    db, account.id, {"御魂": {"remaining_count": max(0, current - 1)}}
+                )
                 db.commit()
                 self.logger.info(
                     f"[御魂] remaining_count: {current} → {max(0, current - 1)}"
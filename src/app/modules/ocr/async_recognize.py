@@ -7,14 +7,19 @@ ddddocr 仍需推理锁，逻辑不变。
 from __future__ import annotations
 
 import functools
+import time
 from typing import List, Optional, Tuple
 
+from ...core.metrics import metrics
 from ...core.thread_pool import run_in_compute
 from ..vision.utils import ImageLike
 from .types import OcrBox, OcrResult
 
 Roi = Tuple[int, int, int, int]
 
+# 与 recognize.py 注册的是同一个指标（同名注册返回已有实例）
+_OCR_SECONDS = metrics.histogram("oas_ocr_seconds", "OCR 耗时（秒，含推理锁等待）", ["engine"])
+
 
 def _sync_ocr(
     image: ImageLike,
@@ -32,6 +37,7 @@ def _sync_ocr(
     from ...core.config import settings
     from ..vision.utils import load_image
 
+    start = time.perf_counter()
     img = load_image(image)
 
     offset_x, offset_y = 0, 0
@@ -66,6 +72,7 @@ def _sync_ocr(
             box=[(x1, y1), (x2, y1), (x2, y2), (x1, y2)],
         ))
 
+    _OCR_SECONDS.labels(engine="tesseract").observe(time.perf_counter() - start)
     return OcrResult(boxes=boxes)
 
 
@@ -79,6 +86,7 @@ def _sync_ocr_digits_with_lock(
     from ..vision.utils import load_image
     import cv2
 
+    start = time.perf_counter()
     engine, lock = acquire_digit_ocr()
     img = load_image(image)
 
@@ -95,6 +103,7 @@ def _sync_ocr_digits_with_lock(
     if text:
         boxes.append(OcrBox(text=text, confidence=1.0, box=[]))
 
+    _OCR_SECONDS.labels(engine="ddddocr").observe(time.perf_counter() - start)
     return OcrResult(boxes=boxes)
 
 
@@ -1,18 +1,24 @@
 """核心 OCR 识别函数。"""
 from __future__ import annotations
 
+import time
 from typing import List, Optional, Tuple
 
 import cv2
 
+from ...core.metrics import metrics
 from ..vision.utils import ImageLike, load_image
+from ..vision.loop_guard import off_loop
 from .engine import acquire_digit_ocr
 from .types import OcrBox, OcrResult
 
 # ROI 类型：(x, y, w, h)，与 TemplateDef.roi 格式一致
 Roi = Tuple[int, int, int, int]
 
+_OCR_SECONDS = metrics.histogram("oas_ocr_seconds", "OCR 耗时（秒，含推理锁等待）", ["engine"])
 
+
+@off_loop
 def ocr(
     image: ImageLike,
     *,
@@ -32,6 +38,7 @@ def ocr(
     import pytesseract
     from ...core.config import settings
 
+    start = time.perf_counter()
     img = load_image(image)
 
     # ROI 裁剪
@@ -68,9 +75,11 @@ def ocr(
         box = [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
         boxes.append(OcrBox(text=text, confidence=confidence, box=box))
 
+    _OCR_SECONDS.labels(engine="tesseract").observe(time.perf_counter() - start)
     return OcrResult(boxes=boxes)
 
 
+@off_loop
 def ocr_digits(
     image: ImageLike,
     *,
@@ -88,6 +97,7 @@ def ocr_digits(
     Returns:
         OcrResult，包含识别结果
     """
+    start = time.perf_counter()
     engine, lock = acquire_digit_ocr()
     img = load_image(image)
 
@@ -104,6 +114,7 @@ def ocr_digits(
     if text:
         boxes.append(OcrBox(text=text, confidence=1.0, box=[]))
 
+    _OCR_SECONDS.labels(engine="ddddocr").observe(time.perf_counter() - start)
     return OcrResult(boxes=boxes)
 
 
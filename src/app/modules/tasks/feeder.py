@@ -13,6 +13,7 @@ from typing import Dict, List, Optional, Tuple
 
 from ...core.constants import DEFAULT_TASK_CONFIG, DEFAULT_INIT_TASK_CONFIG, TASK_PRIORITY, TaskType
 from ...core.logger import logger
+from ...core.metrics import metrics
 from ...core.thread_pool import run_in_db
 from ...core.timeutils import is_time_reached, now_beijing
 from ...db.base import SessionLocal
@@ -688,4 +689,19 @@ class Feeder:
 
 feeder = Feeder()
 
+
+def _collect_feeder_metrics():
+    """抓取时导出 Feeder 扫描延迟。"""
+    snapshot = feeder.metrics_snapshot()
+    scan = snapshot["scan"]
+    return [
+        ("oas_feeder_lag_ms", "gauge", "距上次扫描的毫秒数", [({}, snapshot["feeder_lag_ms"])]),
+        ("oas_feeder_scan_last_ms", "gauge", "上次扫描耗时（毫秒）", [({}, scan["last_ms"])]),
+        ("oas_feeder_scans", "counter", "扫描次数", [({}, scan["count"])]),
+    ]
+
+
+metrics.register_collector(_collect_feeder_metrics)
+
+
 __all__ = ["feeder"]
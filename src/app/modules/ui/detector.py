@@ -5,7 +5,7 @@ from typing import List, Optional, Sequence, Tuple
 
 from ..vision import match_template, DEFAULT_THRESHOLD
 from ..vision.utils import load_image, pixel_match, to_gray
-from ..vision.template import _GRAY_TEMPLATE_CACHE
+from ..vision.template import _gray_template
 from .registry import TemplateDef, UIDef, UIRegistry
 from .types import UIDetectResult
 
@@ -21,9 +21,7 @@ class UIDetector:
             for tpl in ui.templates:
                 if tpl.path and isinstance(tpl.path, str):
                     try:
-                        img = load_image(tpl.path)
-                        gray = to_gray(img)
-                        _GRAY_TEMPLATE_CACHE[tpl.path] = gray
+                        _gray_template(tpl.path)
                     except Exception:
                         pass
 
@@ -36,6 +34,7 @@ class UIDetector:
         threshold: Optional[float] = None,
         hints: Sequence[str] | None = None,
         anchors: bool = True,
+        staged: bool = False,
     ) -> UIDetectResult:
         """两阶段 UI 检测。
 
@@ -47,6 +46,8 @@ class UIDetector:
             threshold: 检测阈值
             hints: 优先检测的 UI id 列表（如上次 UI、目标 UI），排在扫描前面
             anchors: 是否执行 Phase 2 提取锚点（轮询场景传 False 跳过）
+            staged: 为 True 时 hints 作为第一级候选：任一达到阈值即返回，
+                全部未命中才扫描其余界面（ScreenTracker 预测场景）
         """
         thr = threshold or self.default_threshold
 
@@ -55,36 +56,43 @@ class UIDetector:
         big_gray = to_gray(big)
 
         # ── Phase 1: Tag-only 快速识别 ──
-        best_ui_id = "UNKNOWN"
-        best_score = 0.0
-        best_ui_def: UIDef | None = None
-
         ui_list = self._ordered_ui_list(hints)
+        stage = "full"
+        if staged and hints:
+            # 分级检测：先只扫描预测界面，全部未达阈值才升级到完整注册表
+            hint_set = set(hints)
+            predicted = [ui for ui in ui_list if ui.id in hint_set]
+            best_ui_def, best_score, evaluated = self._scan_tags(big, big_gray, predicted, thr)
+            if best_score >= thr:
+                stage = "predicted"
+            else:
+                rest = [ui for ui in ui_list if ui.id not in hint_set]
+                rest_def, rest_score, rest_evaluated = self._scan_tags(big, big_gray, rest, thr)
+                evaluated += rest_evaluated
+                if rest_score > best_score:
+                    best_ui_def, best_score = rest_def, rest_score
+        else:
+            best_ui_def, best_score, evaluated = self._scan_tags(big, big_gray, ui_list, thr)
 
-        for ui in ui_list:
-            s = self._match_tag_only(big_gray, ui, thr)
-
-            # 像素校验（如有）
-            if s >= thr and ui.pixels:
-                if not self._check_pixels(big, ui):
-                    s = 0.0
-
-            if s > best_score:
-                best_score = s
-                best_ui_id = ui.id
-                best_ui_def = ui
-            if best_score >= 0.95:
-                break
-
-        if best_score < thr:
-            return UIDetectResult(ui="UNKNOWN", score=best_score, debug={"threshold": thr})
+        if best_score < thr or best_ui_def is None:
+            return UIDetectResult(
+                ui="UNKNOWN",
+                score=best_score,
+                debug={"threshold": thr, "templates_evaluated": evaluated, "stage": stage},
+            )
+        best_ui_id = best_ui_def.id
 
         # ── Phase 2: 仅对赢家 UI 提取锚点 ──
         anchor_dict: dict = {}
         if anchors and best_ui_def is not None:
             anchor_dict = self._extract_anchors(big_gray, best_ui_def, thr)
 
-        debug = {"anchors": anchor_dict, "threshold": thr}
+        debug = {
+            "anchors": anchor_dict,
+            "threshold": thr,
+            "templates_evaluated": evaluated,
+            "stage": stage,
+        }
         return UIDetectResult(ui=best_ui_id, score=best_score, debug=debug)
 
     async def async_detect(
@@ -94,14 +102,38 @@ class UIDetector:
         threshold: Optional[float] = None,
         hints: Sequence[str] | None = None,
         anchors: bool = True,
+        staged: bool = False,
+        emulator: str = "",
+        backend: str = "thread",
     ) -> UIDetectResult:
-        """异步版本的 detect，将整个检测 offload 到计算线程池。"""
-        from ...core.thread_pool import run_in_compute
+        """异步版本的 detect，将整个检测 offload 到计算池（交互优先级）。
+
+        backend="process" 仅对全局注册表生效：子进程使用自身导入的
+        全局注册表执行检测，自定义注册表仍走计算线程池。
+        """
+        from ...core.thread_pool import ComputePriority, run_in_compute
+        from .registry import registry as _global_registry
+
+        if backend == "process" and self.registry is _global_registry:
+            return await run_in_compute(
+                functools.partial(
+                    detect_with_global_registry, image,
+                    threshold=threshold or self.default_threshold,
+                    hints=list(hints) if hints else None,
+                    anchors=anchors,
+                    staged=staged,
+                ),
+                emulator=emulator,
+                priority=ComputePriority.INTERACTIVE,
+                backend=backend,
+            )
         return await run_in_compute(
             functools.partial(
                 self.detect, image,
-                threshold=threshold, hints=hints, anchors=anchors,
-            )
+                threshold=threshold, hints=hints, anchors=anchors, staged=staged,
+            ),
+            emulator=emulator,
+            priority=ComputePriority.INTERACTIVE,
         )
 
     # ── 内部方法 ──
@@ -124,23 +156,48 @@ class UIDetector:
         priority.sort(key=lambda u: list(hints).index(u.id) if u.id in hints else 999)
         return priority + rest
 
-    def _match_tag_only(self, big_gray, ui: UIDef, thr: float) -> float:
-        """Phase 1: 只匹配 tag 模板返回分数。无 tag 的 UI 匹配所有模板取最大值。"""
+    def _scan_tags(
+        self, big, big_gray, uis: Sequence[UIDef], thr: float
+    ) -> Tuple[Optional[UIDef], float, int]:
+        """依次匹配各 UI 的 tag 模板，返回 (得分最高的 UI, 分数, 已匹配模板数)。"""
+        best_ui_def: UIDef | None = None
+        best_score = 0.0
+        evaluated = 0
+        for ui in uis:
+            s, n = self._match_tag_only(big_gray, ui, thr)
+            evaluated += n
+
+            # 像素校验（如有）
+            if s >= thr and ui.pixels:
+                if not self._check_pixels(big, ui):
+                    s = 0.0
+
+            if s > best_score:
+                best_score = s
+                best_ui_def = ui
+            if best_score >= 0.95:
+                break
+        return best_ui_def, best_score, evaluated
+
+    def _match_tag_only(self, big_gray, ui: UIDef, thr: float) -> Tuple[float, int]:
+        """Phase 1: 只匹配 tag 模板，返回 (分数, 匹配模板数)。无 tag 的 UI 匹配所有模板取最大值。"""
         if ui._tag_templates:
             score = 0.0
+            n = 0
             for tpl in ui._tag_templates:
                 s = self._match_one_template(big_gray, tpl, thr)
+                n += 1
                 score = max(score, s)
                 if score >= 0.95:
                     break
-            return score
+            return score, n
 
         # 无 tag（如 SHIXIAO）：匹配所有模板取最大值
         score = 0.0
         for tpl in ui.templates:
             s = self._match_one_template(big_gray, tpl, thr)
             score = max(score, s)
-        return score
+        return score, len(ui.templates)
 
     def _match_one_template(self, big_gray, tpl: TemplateDef, thr: float) -> float:
         """匹配单个模板，返回分数。"""
@@ -196,4 +253,27 @@ class UIDetector:
         return True
 
 
+_process_detector: Optional[UIDetector] = None
+
+
+def detect_with_global_registry(
+    image,
+    *,
+    threshold: Optional[float] = None,
+    hints: Sequence[str] | None = None,
+    anchors: bool = True,
+    staged: bool = False,
+) -> UIDetectResult:
+    """计算进程池入口：使用本进程的全局注册表执行 UIDetector.detect。"""
+    global _process_detector
+    if _process_detector is None:
+        from .. import ui as _ui  # noqa: F401  触发界面注册
+        from .registry import registry as _global_registry
+
+        _process_detector = UIDetector(_global_registry)
+    return _process_detector.detect(
+        image, threshold=threshold, hints=hints, anchors=anchors, staged=staged,
+    )
+
+
 __all__ = ["UIDetector"]
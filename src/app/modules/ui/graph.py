@@ -1,10 +1,24 @@
 from __future__ import annotations
 
+import heapq
 import inspect
+import threading
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 import asyncio
 
+from ..vision.settle import adaptive_settle_enabled, wait_until_settled
+
+# 先验耗时估计（ms）：未观测过的边按动作静态估算
+_TAP_COST_MS = 150.0
+_SETTLE_COST_MS = 300.0
+# 观测值 EWMA 系数
+_COST_ALPHA = 0.3
+# 期望耗时相对变化超过该比例时使已缓存路线失效
+_REPLAN_RATIO = 0.2
+# 成功率下限（避免期望耗时发散）
+_MIN_SUCCESS = 0.05
+
 
 @dataclass
 class Action:
@@ -18,18 +32,171 @@ class Edge:
     dst: str
     actions: List[Action] = field(default_factory=list)
 
+    @property
+    def key(self) -> Hashable:
+        """边的稳定标识（跨 UIGraph 实例一致，用于共享观测统计）。"""
+        return (self.src, self.dst, tuple((a.type, tuple(a.args)) for a in self.actions))
+
+
+def estimate_edge_cost(edge: Edge) -> float:
+    """按动作静态估算一条边的耗时（ms），作为学习前的先验。"""
+    cost = _SETTLE_COST_MS
+    for act in edge.actions:
+        if act.type == "sleep" and act.args:
+            cost += float(act.args[0])
+        elif act.type == "swipe" and len(act.args) >= 5:
+            cost += float(act.args[4]) + _TAP_COST_MS
+        elif act.type in ("tap", "tap_anchor"):
+            cost += _TAP_COST_MS
+    return cost
+
+
+@dataclass
+class _EdgeStats:
+    latency_ms: float
+    success: float = 1.0
+    samples: int = 0
+    failures: int = 0
+    planned_cost: float = 0.0
+
+    @property
+    def expected_ms(self) -> float:
+        # 失败后需重走该边：期望耗时 = 单次耗时 / 成功率（几何分布）
+        return self.latency_ms / max(self.success, _MIN_SUCCESS)
+
+
+class EdgeCostModel:
+    """UI 跳转边的耗时 / 失败率学习模型（进程内共享，线程安全）。
+
+    每次 apply_edge 执行后记录「动作开始 → 界面变化」的耗时与是否到达目标界面，
+    以 EWMA 平滑；期望耗时变化明显时递增 version，使各 UIGraph 的路线缓存失效。
+    """
+
+    def __init__(self, alpha: float = _COST_ALPHA) -> None:
+        self.alpha = alpha
+        self.version = 0
+        self._stats: Dict[Hashable, _EdgeStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, edge: Edge) -> _EdgeStats:
+        key = edge.key
+        stats = self._stats.get(key)
+        if stats is None:
+            prior = estimate_edge_cost(edge)
+            stats = self._stats[key] = _EdgeStats(latency_ms=prior, planned_cost=prior)
+        return stats
+
+    def cost(self, edge: Edge) -> float:
+        with self._lock:
+            stats = self._get(edge)
+            stats.planned_cost = stats.expected_ms
+            return stats.planned_cost
+
+    def record(self, edge: Edge, latency_ms: float, success: bool) -> None:
+        with self._lock:
+            stats = self._get(edge)
+            a = self.alpha
+            stats.latency_ms = (1 - a) * stats.latency_ms + a * max(0.0, float(latency_ms))
+            stats.success = (1 - a) * stats.success + a * (1.0 if success else 0.0)
+            stats.samples += 1
+            if not success:
+                stats.failures += 1
+            planned = stats.planned_cost or stats.expected_ms
+            if abs(stats.expected_ms - planned) > planned * _REPLAN_RATIO:
+                self.version += 1
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "src": key[0],
+                    "dst": key[1],
+                    "latency_ms": round(st.latency_ms, 1),
+                    "success_rate": round(st.success, 3),
+                    "expected_ms": round(st.expected_ms, 1),
+                    "samples": st.samples,
+                    "failures": st.failures,
+                }
+                for key, st in self._stats.items()
+                if st.samples
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self.version += 1
+
+
+# 进程内共享：UIManager 每个批次都会新建 UIGraph，观测统计不随之丢失
+edge_cost_model = EdgeCostModel()
+
 
 class UIGraph:
-    def __init__(self) -> None:
+    def __init__(self, cost_model: Optional[EdgeCostModel] = None) -> None:
         self._adj: Dict[str, List[Edge]] = {}
+        self.cost_model = cost_model or edge_cost_model
+        # source -> (target -> 路线)，按 Dijkstra 单源结果缓存
+        self._routes: Dict[str, Dict[str, List[Edge]]] = {}
+        self._routes_version = -1
 
     def add_edge(self, edge: Edge) -> None:
         self._adj.setdefault(edge.src, []).append(edge)
+        self._routes.clear()
 
     def edges_from(self, ui: str) -> List[Edge]:
         return self._adj.get(ui, [])
 
+    def record_edge(self, edge: Edge, latency_ms: float, success: bool) -> None:
+        """记录一次边执行的耗时与结果（是否到达 edge.dst）。"""
+        self.cost_model.record(edge, latency_ms, success)
+
+    def _shortest_routes(self, source: str) -> Dict[str, List[Edge]]:
+        """单源 Dijkstra（按期望耗时），返回到各可达界面的最优路线。"""
+        if self._routes_version != self.cost_model.version:
+            self._routes.clear()
+            self._routes_version = self.cost_model.version
+        routes = self._routes.get(source)
+        if routes is not None:
+            return routes
+
+        dist: Dict[str, float] = {source: 0.0}
+        prev: Dict[str, Edge] = {}
+        heap: List[Tuple[float, int, str]] = [(0.0, 0, source)]
+        seq = 0
+        while heap:
+            d, _, node = heapq.heappop(heap)
+            if d > dist.get(node, float("inf")):
+                continue
+            for e in self.edges_from(node):
+                nd = d + self.cost_model.cost(e)
+                if nd < dist.get(e.dst, float("inf")):
+                    dist[e.dst] = nd
+                    prev[e.dst] = e
+                    seq += 1
+                    heapq.heappush(heap, (nd, seq, e.dst))
+
+        routes = {}
+        for target in prev:
+            path: List[Edge] = []
+            node = target
+            while node != source:
+                e = prev[node]
+                path.append(e)
+                node = e.src
+            routes[target] = path[::-1]
+        self._routes[source] = routes
+        return routes
+
     def find_path(self, source: str, target: str, max_steps: int = 8) -> Optional[List[Edge]]:
+        """按期望耗时最短的路线（非最少跳数）；超出 max_steps 跳时回退最少跳数路线。"""
+        path = self._shortest_routes(source).get(target)
+        if path is None:
+            return None
+        if len(path) <= max_steps + 1:
+            return list(path)
+        return self._bfs_path(source, target, max_steps)
+
+    def _bfs_path(self, source: str, target: str, max_steps: int) -> Optional[List[Edge]]:
         # Simple BFS by edges count
         from collections import deque
 
@@ -70,9 +237,23 @@ async def _call_detect_fn(detect_fn):
     return result
 
 
-async def apply_edge(adapter, edge: Edge, detect_result: Any | None = None, detect_fn=None) -> None:
-    # Execute actions sequentially; minimal implementation
-    for act in edge.actions:
+async def apply_edge(
+    adapter,
+    edge: Edge,
+    detect_result: Any | None = None,
+    detect_fn=None,
+    *,
+    capture_fn=None,
+    target_fn=None,
+) -> None:
+    """依次执行边上的动作。
+
+    提供 capture_fn 时 sleep 动作改为自适应稳定等待（原时长作为上限）：
+    画面稳定即继续；最后一个 sleep 还会在 target_fn 判定目标界面出现时提前返回。
+    """
+    adaptive = capture_fn is not None and adaptive_settle_enabled()
+    last_index = len(edge.actions) - 1
+    for index, act in enumerate(edge.actions):
         t = act.type
         if t == "tap":
             x, y = act.args
@@ -117,12 +298,29 @@ async def apply_edge(adapter, edge: Edge, detect_result: Any | None = None, dete
             await _do_swipe(adapter, int(x1), int(y1), int(x2), int(y2), int(dur))
         elif t == "sleep":
             ms = act.args[0]
-            await asyncio.sleep(ms / 1000.0)
+            if adaptive:
+                prev_type = edge.actions[index - 1].type if index > 0 else ""
+                await wait_until_settled(
+                    capture_fn,
+                    max_wait=ms / 1000.0,
+                    target=target_fn if index == last_index else None,
+                    require_change=prev_type in ("tap", "tap_anchor", "swipe"),
+                )
+            else:
+                await asyncio.sleep(ms / 1000.0)
         elif t == "re_detect":
             # 重新截图检测，更新 detect_result 以获取最新锚点坐标
             if detect_fn is not None:
                 detect_result = await _call_detect_fn(detect_fn)
 
 
-__all__ = ["Action", "Edge", "UIGraph", "apply_edge"]
+__all__ = [
+    "Action",
+    "Edge",
+    "EdgeCostModel",
+    "UIGraph",
+    "apply_edge",
+    "edge_cost_model",
+    "estimate_edge_cost",
+]
 
@@ -8,19 +8,27 @@ from typing import TYPE_CHECKING, Optional, Sequence, Union
 from loguru import logger
 
 from ...core.config import settings
+from ...core.process_pool import COMPUTE_BACKEND_PROCESS
 from ..emu.adapter import EmulatorAdapter
 from ..emu.async_adapter import AsyncEmulatorAdapter
 from ..vision import DEFAULT_THRESHOLD
 from ..vision.frame_cache import (
     compute_frame_signature,
+    dhash_from_signature,
     fingerprint_from_signature,
     is_cache_fresh,
+    record_cache_hit,
+    record_cache_lookup,
     signatures_similar,
 )
+from ..vision.context import VisionContext
+from ..vision.frame_index import FrameHashIndex, new_shared_frame_index
+from ..vision.persistent_cache import KIND_UI, get_persistent_detect_cache
 from ..vision.template import match_template
 from .registry import UIRegistry, registry as _global_registry
 from .detector import UIDetector
 from .graph import UIGraph, apply_edge
+from .tracker import ScreenTracker, get_screen_tracker
 from .default_graph import build_default_graph
 from .types import UIDetectResult, UIManagerProtocol
 
@@ -56,8 +64,8 @@ class CangbaogeListedException(Exception):
 
 
 class UIManager(UIManagerProtocol):
-    # 跨模拟器共享缓存（同进程）：(hint_key, anchors) -> [{fp, sig, result, ts}, ...]
-    _shared_detect_cache: dict = {}
+    # 跨模拟器共享缓存（同进程）：按 (hint_key, anchors) + dHash 检索 UIDetectResult
+    _shared_detect_cache: FrameHashIndex = new_shared_frame_index()
 
     def __init__(
         self,
@@ -71,6 +79,7 @@ class UIManager(UIManagerProtocol):
         popup_handler: Optional["PopupHandler"] = None,
     ) -> None:
         self.adapter = adapter
+        self.vision = VisionContext.for_adapter(adapter)
         self.capture_method = capture_method
         self.registry = registry or _global_registry
         self.graph = graph or build_default_graph()
@@ -82,6 +91,12 @@ class UIManager(UIManagerProtocol):
         self.cross_emulator_cache_enabled = bool(cross_emulator_cache_enabled)
         self._popup_handler = popup_handler
         self._last_ui: str | None = None  # 上下文感知：记住上一次检测到的 UI
+        # 界面转移追踪（按模拟器共享，跨批次保留学习结果）
+        self.tracker: Optional[ScreenTracker] = (
+            get_screen_tracker(self.vision.emulator)
+            if getattr(settings, "ui_tracker_enabled", True)
+            else None
+        )
         self._detect_cache_fp: int | None = None
         self._detect_cache_sig = None
         self._detect_cache_key: tuple[tuple[str, ...], bool] | None = None
@@ -90,13 +105,11 @@ class UIManager(UIManagerProtocol):
         self._detect_cache_calls: int = 0
         self._detect_cache_hits: int = 0
         self._detect_cache_shared_hits: int = 0
+        self._detect_cache_persistent_hits: int = 0
         self._detect_cache_last_log_ts: float = 0.0
         self._detect_cache_log_interval_sec: float = float(
             max(1, int(getattr(settings, "vision_cache_stats_interval_sec", 10)))
         )
-        self._shared_cache_bucket_size: int = max(
-            1, int(getattr(settings, "vision_cross_emulator_shared_bucket_size", 8))
-        )
 
     @property
     def _is_async(self) -> bool:
@@ -152,32 +165,6 @@ class UIManager(UIManagerProtocol):
         self._detect_cache_result = None
         self._detect_cache_ts = 0.0
 
-    @staticmethod
-    def _normalize_shared_bucket(
-        shared_value: object,
-    ) -> list[dict]:
-        """兼容旧结构：dict -> [dict]，并返回可修改 bucket。"""
-        if isinstance(shared_value, list):
-            return [entry for entry in shared_value if isinstance(entry, dict)]
-        if isinstance(shared_value, dict):
-            return [shared_value]
-        return []
-
-    def _get_shared_bucket(self, cache_key: tuple[tuple[str, ...], bool]) -> list[dict]:
-        return self._normalize_shared_bucket(
-            UIManager._shared_detect_cache.get(cache_key)
-        )
-
-    def _set_shared_bucket(
-        self, cache_key: tuple[tuple[str, ...], bool], bucket: list[dict]
-    ) -> None:
-        if bucket:
-            UIManager._shared_detect_cache[cache_key] = bucket[
-                : self._shared_cache_bucket_size
-            ]
-        else:
-            UIManager._shared_detect_cache.pop(cache_key, None)
-
     def _maybe_log_detect_cache_stats(
         self, *, now: float | None = None, force: bool = False
     ) -> None:
@@ -193,6 +180,7 @@ class UIManager(UIManagerProtocol):
             return
         hits = self._detect_cache_hits
         shared_hits = self._detect_cache_shared_hits
+        persistent_hits = self._detect_cache_persistent_hits
         misses = calls - hits
         hit_rate = (hits / calls) * 100.0
         ttl_ms = int(getattr(settings, "vision_frame_cache_ttl_ms", 5000))
@@ -201,16 +189,17 @@ class UIManager(UIManagerProtocol):
         )
         self._detect_cache_last_log_ts = current
         logger.info(
-            "detect_ui cache stats: calls={} hits={} shared_hits={} misses={} hit_rate={:.1f}% ttl_ms={} sim_thr={:.2f} shared={} shared_bucket={}",
+            "detect_ui cache stats: calls={} hits={} shared_hits={} persistent_hits={} misses={} hit_rate={:.1f}% ttl_ms={} sim_thr={:.2f} shared={} shared_entries={}",
             calls,
             hits,
             shared_hits,
+            persistent_hits,
             misses,
             hit_rate,
             ttl_ms,
             similarity_thr,
             self.cross_emulator_cache_enabled,
-            self._shared_cache_bucket_size,
+            len(UIManager._shared_detect_cache),
         )
 
     def log_cache_stats(self, *, force: bool = True) -> None:
@@ -237,9 +226,15 @@ class UIManager(UIManagerProtocol):
     # ── 上下文感知 ──
 
     def _build_hints(self, target: str | None = None) -> list[str]:
-        """基于上下文构建优先检测列表。"""
+        """基于上下文构建优先检测列表。
+
+        启用界面转移追踪时返回 top-k 预测界面（作为分级检测的第一级）。
+        """
         hints: list[str] = []
-        if self._last_ui:
+        if self.tracker is not None and self.tracker.last:
+            neighbors = [e.dst for e in self.graph.edges_from(self.tracker.last)]
+            hints = self.tracker.predict(neighbors=neighbors)
+        elif self._last_ui:
             hints.append(self._last_ui)
             # 添加相邻 UI（通过 graph 可达的目的地）
             for edge in self.graph.edges_from(self._last_ui):
@@ -269,6 +264,7 @@ class UIManager(UIManagerProtocol):
 
         if getattr(settings, "vision_frame_cache_enabled", True):
             self._detect_cache_calls += 1
+            record_cache_lookup("detect_ui", self.adapter.cfg.adb_addr)
             frame_sig = compute_frame_signature(image)
             frame_fp = fingerprint_from_signature(frame_sig)
             cache_key = (hint_key, bool(anchors))
@@ -296,91 +292,123 @@ class UIManager(UIManagerProtocol):
             ):
                 result = self._detect_cache_result
                 self._detect_cache_hits += 1
+                record_cache_hit("detect_ui", self.adapter.cfg.adb_addr, "local")
                 self._maybe_log_detect_cache_stats(now=now)
                 if result.ui != "UNKNOWN":
                     self._last_ui = result.ui
                 return result
 
+            frame_hash = dhash_from_signature(frame_sig)
             if self.cross_emulator_cache_enabled:
-                shared_bucket = self._get_shared_bucket(cache_key)
-                if shared_bucket:
-                    fresh_bucket: list[dict] = []
-                    hit_index: int | None = None
-                    for idx, entry in enumerate(shared_bucket):
-                        if not is_cache_fresh(entry.get("ts", 0.0), ttl_ms, now=now):
-                            continue
-                        fresh_bucket.append(entry)
-                        shared_same_frame = entry.get("fp") == frame_fp
-                        if (
-                            hit_index is None
-                            and not shared_same_frame
-                            and entry.get("sig") is not None
-                            and signatures_similar(
-                                frame_sig,
-                                entry["sig"],
-                                mean_abs_threshold=similarity_thr,
-                            )
-                        ):
-                            shared_same_frame = True
-                        if hit_index is None and shared_same_frame:
-                            hit_index = len(fresh_bucket) - 1
-
-                    if hit_index is not None:
-                        hit_entry = fresh_bucket.pop(hit_index)
-                        fresh_bucket.insert(0, hit_entry)
-                        self._set_shared_bucket(cache_key, fresh_bucket)
-                        result = hit_entry["result"]
-                        self._detect_cache_hits += 1
-                        self._detect_cache_shared_hits += 1
-                        self._detect_cache_fp = frame_fp
-                        self._detect_cache_sig = frame_sig
-                        self._detect_cache_key = cache_key
-                        self._detect_cache_result = result
-                        self._detect_cache_ts = now
-                        self._maybe_log_detect_cache_stats(now=now)
-                        if result.ui != "UNKNOWN":
-                            self._last_ui = result.ui
-                        return result
-
-                    if len(fresh_bucket) != len(shared_bucket):
-                        self._set_shared_bucket(cache_key, fresh_bucket)
-            result = await self.detector.async_detect(
-                image,
-                hints=effective_hints,
-                anchors=anchors,
-            )
+                result = UIManager._shared_detect_cache.lookup(
+                    cache_key,
+                    frame_hash,
+                    fp=frame_fp,
+                    signature=frame_sig,
+                    ttl_ms=ttl_ms,
+                    similarity=similarity_thr,
+                    now=now,
+                )
+                if result is not None:
+                    self._detect_cache_hits += 1
+                    self._detect_cache_shared_hits += 1
+                    record_cache_hit("detect_ui", self.adapter.cfg.adb_addr, "shared")
+                    self._detect_cache_fp = frame_fp
+                    self._detect_cache_sig = frame_sig
+                    self._detect_cache_key = cache_key
+                    self._detect_cache_result = result
+                    self._detect_cache_ts = now
+                    self._maybe_log_detect_cache_stats(now=now)
+                    if result.ui != "UNKNOWN":
+                        self._last_ui = result.ui
+                    return result
+
+            store = get_persistent_detect_cache()
+            if store is not None:
+                cached = store.lookup(
+                    KIND_UI,
+                    cache_key,
+                    frame_hash,
+                    fp=frame_fp,
+                    signature=frame_sig,
+                    similarity=similarity_thr,
+                )
+                if cached is not None:
+                    result = UIDetectResult(**cached)
+                    self._detect_cache_hits += 1
+                    self._detect_cache_persistent_hits += 1
+                    record_cache_hit("detect_ui", self.adapter.cfg.adb_addr, "persistent")
+                    self._detect_cache_fp = frame_fp
+                    self._detect_cache_sig = frame_sig
+                    self._detect_cache_key = cache_key
+                    self._detect_cache_result = result
+                    self._detect_cache_ts = now
+                    if self.cross_emulator_cache_enabled:
+                        UIManager._shared_detect_cache.put(
+                            cache_key,
+                            frame_hash,
+                            result,
+                            fp=frame_fp,
+                            signature=frame_sig,
+                            ttl_ms=ttl_ms,
+                            now=now,
+                        )
+                    self._maybe_log_detect_cache_stats(now=now)
+                    if result.ui != "UNKNOWN":
+                        self._last_ui = result.ui
+                    return result
+
+            result = await self._detect_fresh(image, effective_hints, anchors)
             self._detect_cache_fp = frame_fp
             self._detect_cache_sig = frame_sig
             self._detect_cache_key = cache_key
             self._detect_cache_result = result
             self._detect_cache_ts = now
             if self.cross_emulator_cache_enabled:
-                shared_bucket = self._get_shared_bucket(cache_key)
-                shared_bucket = [
-                    entry for entry in shared_bucket if entry.get("fp") != frame_fp
-                ]
-                shared_bucket.insert(
-                    0,
-                    {
-                        "fp": frame_fp,
-                        "sig": frame_sig,
-                        "result": result,
-                        "ts": now,
-                    },
+                UIManager._shared_detect_cache.put(
+                    cache_key,
+                    frame_hash,
+                    result,
+                    fp=frame_fp,
+                    signature=frame_sig,
+                    ttl_ms=ttl_ms,
+                    now=now,
+                )
+            if store is not None:
+                store.put(
+                    KIND_UI,
+                    cache_key,
+                    frame_hash,
+                    {"ui": result.ui, "score": result.score, "debug": result.debug},
+                    fp=frame_fp,
+                    signature=frame_sig,
                 )
-                self._set_shared_bucket(cache_key, shared_bucket)
             self._maybe_log_detect_cache_stats(now=now)
         else:
-            result = await self.detector.async_detect(
-                image,
-                hints=effective_hints,
-                anchors=anchors,
-            )
+            result = await self._detect_fresh(image, effective_hints, anchors)
         # 更新上下文
         if result.ui != "UNKNOWN":
             self._last_ui = result.ui
         return result
 
+    async def _detect_fresh(
+        self, image, hints: Sequence[str], anchors: bool
+    ) -> UIDetectResult:
+        """执行实际识别（未命中缓存），并更新界面转移追踪。"""
+        staged = self.tracker is not None
+        result = await self.detector.async_detect(
+            image,
+            hints=hints,
+            anchors=anchors,
+            staged=staged,
+            emulator=self.adapter.cfg.adb_addr,
+            backend=COMPUTE_BACKEND_PROCESS,
+        )
+        if self.tracker is not None:
+            self.tracker.record_detect(result.debug)
+            self.tracker.observe(result.ui)
+        return result
+
     async def _try_click_exit_or_back(self, image: bytes) -> bool:
         """尝试在截图中匹配 exit/back 按钮并点击。
 
@@ -390,7 +418,7 @@ class UIManager(UIManagerProtocol):
             True 表示找到并点击了按钮，False 表示未找到。
         """
         for label, tpl_path in [("exit", EXIT_TEMPLATE), ("back", BACK_TEMPLATE)]:
-            m = match_template(image, tpl_path)
+            m = await self.vision.match_template(image, tpl_path)
             if m is not None:
                 cx, cy = m.random_point()
                 logger.info(
@@ -403,7 +431,7 @@ class UIManager(UIManagerProtocol):
                 await self._tap(cx, cy)
                 return True
         # 检查 exit_dark（ENTER→庭院过渡期间可能出现的中间界面）
-        m = match_template(image, EXIT_DARK_TEMPLATE)
+        m = await self.vision.match_template(image, EXIT_DARK_TEMPLATE)
         if m is not None:
             cx = random.randint(424, 533)
             cy = random.randint(439, 461)
@@ -452,6 +480,19 @@ class UIManager(UIManagerProtocol):
         """预加载所有模板到缓存。"""
         self.detector.warmup()
 
+    def _settle_target(self, ui_id: str):
+        """导航边稳定等待的目标判定：目标界面的 tag 模板命中即视为已到达。"""
+        ui = self.registry.get(ui_id)
+        if ui is None or not ui._tag_templates:
+            return None
+        paths = [tpl.path for tpl in ui._tag_templates]
+        threshold = ui.threshold or self.detector.default_threshold
+
+        async def _hit(image) -> bool:
+            return await self.vision.match_first(image, paths, threshold=threshold) is not None
+
+        return _hit
+
     async def ensure_ui(
         self,
         target: str,
@@ -510,7 +551,16 @@ class UIManager(UIManagerProtocol):
 
             # execute one edge then poll for UI change
             old_ui = cur.ui
-            await apply_edge(self.adapter, path[0], cur, detect_fn=self.detect_ui)
+            edge = path[0]
+            edge_started = time.perf_counter()
+            await apply_edge(
+                self.adapter,
+                edge,
+                cur,
+                detect_fn=self.detect_ui,
+                capture_fn=self._capture,
+                target_fn=self._settle_target(edge.dst),
+            )
 
             # 导航轮询优化：无锚点快速检测 + 只关注 target 和 old_ui
             poll_interval = 0.3
@@ -527,6 +577,11 @@ class UIManager(UIManagerProtocol):
             if cur.ui != "UNKNOWN" and cur.ui != old_ui:
                 cur = await self.detect_ui(hints=[cur.ui, target])
 
+            # 学习边的实际耗时与失败率，后续路线按期望耗时规划
+            self.graph.record_edge(
+                edge, (time.perf_counter() - edge_started) * 1000, cur.ui == edge.dst
+            )
+
             if cur.ui == target:
                 return True
         return False
@@ -563,7 +618,7 @@ class UIManager(UIManagerProtocol):
             image = await self._capture()
 
             # 藏宝阁检测（ENTER→庭院过渡中最先检查）
-            self._check_cangbaoge(image)
+            await self.vision.run(self._check_cangbaoge, image)
 
             # 弹窗检查（复用截图）
             dismissed = await self.popup_handler.check_and_dismiss(image=image)
@@ -571,7 +626,7 @@ class UIManager(UIManagerProtocol):
                 continue
 
             # 启动阶段检测 accept 弹窗（用户协议等），出现则点击
-            accept_match = match_template(image, ACCEPT_TEMPLATE)
+            accept_match = await self.vision.match_template(image, ACCEPT_TEMPLATE)
             if accept_match is not None:
                 cx, cy = accept_match.random_point()
                 logger.info(
@@ -584,7 +639,7 @@ class UIManager(UIManagerProtocol):
                 continue
 
             # 启动阶段检测 accept_1 弹窗，出现则点击自身关闭
-            accept_1_match = match_template(image, ACCEPT_1_TEMPLATE)
+            accept_1_match = await self.vision.match_template(image, ACCEPT_1_TEMPLATE)
             if accept_1_match is not None:
                 cx, cy = accept_1_match.random_point()
                 logger.info(
@@ -610,7 +665,7 @@ class UIManager(UIManagerProtocol):
                 return True
 
             if result.ui == "ENTER":
-                self._check_shixiao_on_enter(image)
+                await self.vision.run(self._check_shixiao_on_enter, image)
                 logger.info(
                     "launch_game: 检测到 ENTER 界面，点击固定坐标 ({}, {})",
                     ENTER_TAP_X,
@@ -644,7 +699,7 @@ class UIManager(UIManagerProtocol):
             image = await self._capture()
 
             # 藏宝阁检测（ENTER→庭院过渡中最先检查）
-            self._check_cangbaoge(image)
+            await self.vision.run(self._check_cangbaoge, image)
 
             # 弹窗检查（复用截图）
             dismissed = await self.popup_handler.check_and_dismiss(image=image)
@@ -665,7 +720,7 @@ class UIManager(UIManagerProtocol):
                 return True
 
             if result.ui == "ENTER":
-                self._check_shixiao_on_enter(image)
+                await self.vision.run(self._check_shixiao_on_enter, image)
                 logger.info(
                     "go_to_tingyuan: 检测到 ENTER，点击固定坐标 ({}, {})",
                     ENTER_TAP_X,
@@ -807,7 +862,7 @@ class UIManager(UIManagerProtocol):
                         else asset_def.wait_template
                     )
                     for tpl in templates:
-                        if match_template(screenshot, tpl) is not None:
+                        if await self.vision.match_template(screenshot, tpl) is not None:
                             already_visible = True
                             logger.debug("read_asset: 模板 {} 已可见，跳过展开点击", tpl)
                             break
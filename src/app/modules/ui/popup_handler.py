@@ -19,10 +19,15 @@ from loguru import logger
 from ...core.config import settings
 from ..vision.frame_cache import (
     compute_frame_signature,
+    dhash_from_signature,
     fingerprint_from_signature,
     is_cache_fresh,
+    record_cache_hit,
+    record_cache_lookup,
     signatures_similar,
 )
+from ..vision.frame_index import FrameHashIndex, new_shared_frame_index
+from ..vision.persistent_cache import KIND_POPUP, get_persistent_detect_cache
 from ..vision.template import match_template
 from ..vision.async_template import async_match_template
 from ..vision.utils import ImageLike, load_image, to_gray
@@ -39,11 +44,14 @@ if TYPE_CHECKING:
     from ..emu.async_adapter import AsyncEmulatorAdapter
 
 
+_NO_POPUP_KEY = "no_popup"
+
+
 class PopupHandler:
     """弹窗处理器：检测并关闭游戏中的意外弹窗"""
 
-    # 跨模拟器共享“无弹窗”缓存（同进程）: [{fp, sig, ts}, ...]
-    _shared_no_popup_cache: list[dict] = []
+    # 跨模拟器共享“无弹窗”缓存（同进程）：按 dHash 检索近似帧的“无弹窗”判定
+    _shared_no_popup_cache: FrameHashIndex = new_shared_frame_index()
 
     def __init__(
         self,
@@ -68,13 +76,11 @@ class PopupHandler:
         self._scan_cache_calls: int = 0
         self._scan_cache_hits: int = 0
         self._scan_cache_shared_hits: int = 0
+        self._scan_cache_persistent_hits: int = 0
         self._scan_cache_last_log_ts: float = 0.0
         self._scan_cache_log_interval_sec: float = float(
             max(1, int(getattr(settings, "vision_cache_stats_interval_sec", 10)))
         )
-        self._shared_cache_bucket_size: int = max(
-            1, int(getattr(settings, "vision_cross_emulator_shared_bucket_size", 8))
-        )
 
     # ── 异步适配辅助方法 ──
 
@@ -108,16 +114,6 @@ class PopupHandler:
         self._last_scan_popup_id = None
         self._last_scan_ts = 0.0
 
-    @staticmethod
-    def _normalize_shared_no_popup_cache(shared_value: object) -> list[dict]:
-        if isinstance(shared_value, list):
-            return [entry for entry in shared_value if isinstance(entry, dict)]
-        if isinstance(shared_value, dict):
-            entry = shared_value.get("no_popup")
-            if isinstance(entry, dict):
-                return [entry]
-        return []
-
     def _maybe_log_scan_cache_stats(
         self, *, now: float | None = None, force: bool = False
     ) -> None:
@@ -133,6 +129,7 @@ class PopupHandler:
             return
         hits = self._scan_cache_hits
         shared_hits = self._scan_cache_shared_hits
+        persistent_hits = self._scan_cache_persistent_hits
         misses = calls - hits
         hit_rate = (hits / calls) * 100.0
         ttl_ms = int(getattr(settings, "vision_frame_cache_ttl_ms", 5000))
@@ -141,16 +138,17 @@ class PopupHandler:
         )
         self._scan_cache_last_log_ts = current
         self._log.info(
-            "scan cache stats: calls={} hits={} shared_hits={} misses={} hit_rate={:.1f}% ttl_ms={} sim_thr={:.2f} shared={} shared_bucket={}",
+            "scan cache stats: calls={} hits={} shared_hits={} persistent_hits={} misses={} hit_rate={:.1f}% ttl_ms={} sim_thr={:.2f} shared={} shared_entries={}",
             calls,
             hits,
             shared_hits,
+            persistent_hits,
             misses,
             hit_rate,
             ttl_ms,
             similarity_thr,
             self.cross_emulator_cache_enabled,
-            self._shared_cache_bucket_size,
+            len(PopupHandler._shared_no_popup_cache),
         )
 
     def log_cache_stats(self, *, force: bool = True) -> None:
@@ -193,12 +191,23 @@ class PopupHandler:
                 continue
         return None
 
+    def _compute_opts(self) -> dict:
+        """弹窗相关的计算任务统一按本模拟器、弹窗优先级提交。"""
+        from ...core.thread_pool import ComputePriority
+
+        return {
+            "emulator": self.adapter.cfg.adb_addr,
+            "priority": ComputePriority.POPUP,
+        }
+
     async def async_scan(self, image: ImageLike) -> Optional[PopupDef]:
         """异步版 scan，将 CPU 密集的模板匹配 offload 到计算线程池。"""
         import functools
         from ...core.thread_pool import run_in_compute
 
-        return await run_in_compute(functools.partial(self.scan, image))
+        return await run_in_compute(
+            functools.partial(self.scan, image), **self._compute_opts()
+        )
 
     async def dismiss(self, popup: PopupDef) -> bool:
         """执行弹窗关闭动作序列。
@@ -248,7 +257,8 @@ class PopupHandler:
                         rx, ry, rw, rh = action.template_roi
                         roi_img = big[ry : ry + rh, rx : rx + rw]
                         m = await async_match_template(
-                            roi_img, action.template_path, **kwargs
+                            roi_img, action.template_path,
+                            **kwargs, **self._compute_opts(),
                         )
                         if m:
                             # 坐标需要加回 ROI 偏移
@@ -262,7 +272,8 @@ class PopupHandler:
                             )
                     else:
                         m = await async_match_template(
-                            ss, action.template_path, **kwargs
+                            ss, action.template_path,
+                            **kwargs, **self._compute_opts(),
                         )
                         if m:
                             await self._adb_tap(addr, *m.random_point())
@@ -290,7 +301,9 @@ class PopupHandler:
                 if ss is not None:
                     tpl = popup.detect_template
                     threshold = tpl.threshold or 0.85
-                    m = await async_match_template(ss, tpl.path, threshold=threshold)
+                    m = await async_match_template(
+                        ss, tpl.path, threshold=threshold, **self._compute_opts()
+                    )
                     if m:
                         await self._adb_tap(addr, *m.random_point())
 
@@ -332,9 +345,13 @@ class PopupHandler:
                 big = load_image(ss)
                 rx, ry, rw, rh = roi
                 roi_img = big[ry : ry + rh, rx : rx + rw]
-                m = await async_match_template(roi_img, template_path, **kwargs)
+                m = await async_match_template(
+                    roi_img, template_path, **kwargs, **self._compute_opts()
+                )
             else:
-                m = await async_match_template(ss, template_path, **kwargs)
+                m = await async_match_template(
+                    ss, template_path, **kwargs, **self._compute_opts()
+                )
 
             if m is None:
                 self._log.info("弹窗 {} 模板已消失 ({}ms)", label, elapsed)
@@ -363,6 +380,7 @@ class PopupHandler:
         dismissed = 0
         cache_enabled = bool(getattr(settings, "vision_frame_cache_enabled", True))
         shared_enabled = cache_enabled and self.cross_emulator_cache_enabled
+        store = get_persistent_detect_cache() if cache_enabled else None
         ttl_ms = int(getattr(settings, "vision_frame_cache_ttl_ms", 5000))
         similarity_thr = float(
             getattr(settings, "vision_frame_similarity_threshold", 0.8)
@@ -377,11 +395,14 @@ class PopupHandler:
 
             frame_fp: int | None = None
             frame_sig = None
+            frame_hash = 0
             if cache_enabled:
                 if round_idx == 0:
                     self._scan_cache_calls += 1
+                    record_cache_lookup("popup_scan", self.adapter.cfg.adb_addr)
                 frame_sig = compute_frame_signature(image)
                 frame_fp = fingerprint_from_signature(frame_sig)
+                frame_hash = dhash_from_signature(frame_sig)
                 now = time.monotonic()
                 same_frame = self._last_scan_fp == frame_fp
                 if (
@@ -401,56 +422,50 @@ class PopupHandler:
                     and is_cache_fresh(self._last_scan_ts, ttl_ms, now=now)
                 ):
                     self._scan_cache_hits += 1
+                    record_cache_hit("popup_scan", self.adapter.cfg.adb_addr, "local")
                     self._maybe_log_scan_cache_stats(now=now)
                     return dismissed
 
                 if round_idx == 0 and shared_enabled:
-                    shared_bucket = self._normalize_shared_no_popup_cache(
-                        PopupHandler._shared_no_popup_cache
+                    no_popup = PopupHandler._shared_no_popup_cache.lookup(
+                        _NO_POPUP_KEY,
+                        frame_hash,
+                        fp=frame_fp,
+                        signature=frame_sig,
+                        ttl_ms=ttl_ms,
+                        similarity=similarity_thr,
+                        now=now,
+                    )
+                    if no_popup:
+                        self._scan_cache_hits += 1
+                        self._scan_cache_shared_hits += 1
+                        record_cache_hit("popup_scan", self.adapter.cfg.adb_addr, "shared")
+                        self._last_scan_fp = frame_fp
+                        self._last_scan_sig = frame_sig
+                        self._last_scan_popup_id = None
+                        self._last_scan_ts = now
+                        self._maybe_log_scan_cache_stats(now=now)
+                        return dismissed
+
+                if round_idx == 0 and store is not None:
+                    no_popup = store.lookup(
+                        KIND_POPUP,
+                        _NO_POPUP_KEY,
+                        frame_hash,
+                        fp=frame_fp,
+                        signature=frame_sig,
+                        similarity=similarity_thr,
                     )
-                    if shared_bucket:
-                        fresh_bucket: list[dict] = []
-                        hit_index: int | None = None
-                        for entry in shared_bucket:
-                            if not is_cache_fresh(
-                                entry.get("ts", 0.0), ttl_ms, now=now
-                            ):
-                                continue
-                            fresh_bucket.append(entry)
-                            shared_same_frame = entry.get("fp") == frame_fp
-                            if (
-                                hit_index is None
-                                and not shared_same_frame
-                                and entry.get("sig") is not None
-                                and signatures_similar(
-                                    frame_sig,
-                                    entry["sig"],
-                                    mean_abs_threshold=similarity_thr,
-                                )
-                            ):
-                                shared_same_frame = True
-                            if hit_index is None and shared_same_frame:
-                                hit_index = len(fresh_bucket) - 1
-
-                        if hit_index is not None:
-                            hit_entry = fresh_bucket.pop(hit_index)
-                            fresh_bucket.insert(0, hit_entry)
-                            PopupHandler._shared_no_popup_cache = fresh_bucket[
-                                : self._shared_cache_bucket_size
-                            ]
-                            self._scan_cache_hits += 1
-                            self._scan_cache_shared_hits += 1
-                            self._last_scan_fp = frame_fp
-                            self._last_scan_sig = frame_sig
-                            self._last_scan_popup_id = None
-                            self._last_scan_ts = now
-                            self._maybe_log_scan_cache_stats(now=now)
-                            return dismissed
-
-                        if len(fresh_bucket) != len(shared_bucket):
-                            PopupHandler._shared_no_popup_cache = fresh_bucket[
-                                : self._shared_cache_bucket_size
-                            ]
+                    if no_popup:
+                        self._scan_cache_hits += 1
+                        self._scan_cache_persistent_hits += 1
+                        record_cache_hit("popup_scan", self.adapter.cfg.adb_addr, "persistent")
+                        self._last_scan_fp = frame_fp
+                        self._last_scan_sig = frame_sig
+                        self._last_scan_popup_id = None
+                        self._last_scan_ts = now
+                        self._maybe_log_scan_cache_stats(now=now)
+                        return dismissed
 
             popup = await self.async_scan(image)
             if frame_fp is not None:
@@ -460,18 +475,24 @@ class PopupHandler:
                 self._last_scan_popup_id = popup.id if popup is not None else None
                 self._last_scan_ts = now
                 if popup is None and shared_enabled:
-                    shared_bucket = self._normalize_shared_no_popup_cache(
-                        PopupHandler._shared_no_popup_cache
+                    PopupHandler._shared_no_popup_cache.put(
+                        _NO_POPUP_KEY,
+                        frame_hash,
+                        True,
+                        fp=frame_fp,
+                        signature=frame_sig,
+                        ttl_ms=ttl_ms,
+                        now=now,
                     )
-                    shared_bucket = [
-                        entry for entry in shared_bucket if entry.get("fp") != frame_fp
-                    ]
-                    shared_bucket.insert(
-                        0, {"fp": frame_fp, "sig": frame_sig, "ts": now}
+                if popup is None and store is not None:
+                    store.put(
+                        KIND_POPUP,
+                        _NO_POPUP_KEY,
+                        frame_hash,
+                        True,
+                        fp=frame_fp,
+                        signature=frame_sig,
                     )
-                    PopupHandler._shared_no_popup_cache = shared_bucket[
-                        : self._shared_cache_bucket_size
-                    ]
             if popup is None:
                 if cache_enabled and round_idx == 0:
                     self._maybe_log_scan_cache_stats(now=time.monotonic())
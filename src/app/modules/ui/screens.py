@@ -8,18 +8,18 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from ..vision.template_bundle import glob_templates
 from .registry import UIDef, TemplateDef, registry
 
 
 def _discover_templates(prefix: str) -> list[TemplateDef]:
     """自动发现 {prefix}_x 系列模板（如 tansuo_1.png、shangdian_1.png）。"""
-    templates_dir = Path("assets/ui/templates")
     items: list[TemplateDef] = []
-    for template_path in sorted(templates_dir.glob(f"{prefix}_*.png")):
+    for template_path in glob_templates("assets/ui/templates", f"{prefix}_*.png"):
         items.append(
             TemplateDef(
-                name=template_path.stem,
-                path=template_path.as_posix(),
+                name=Path(template_path).stem,
+                path=template_path,
             )
         )
     # 兼容兜底：即使 glob 未命中，也保留 {prefix}_1 约定路径
@@ -0,0 +1,218 @@
+"""
+界面转移追踪（按模拟器学习的转移矩阵）
+
+detect_ui 过去只把上一界面及其图邻居排在前面，未命中 0.95 时仍扫描完整注册表。
+ScreenTracker 按模拟器记录实际观测到的界面序列，维护 P(next | last)：
+
+- 先验：停留在当前界面 + UI 跳转图的相邻界面
+- 观测：每次完成检测后累加 last → current 计数（定期衰减，适应任务阶段变化）
+- 预测：取 top-k 界面作为分级检测的第一级，只匹配它们的 tag 模板，
+  全部未达阈值才升级到完整注册表（UIDetector.detect(staged=True)）
+
+基准测试（回放按时间顺序命名的截图目录，对比每次检测平均匹配的模板数）::
+
+    python -m app.modules.ui.tracker replay <截图目录> [--top-k 3]
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from ...core.config import settings
+
+# 先验权重：停留在当前界面 / 跳转图相邻界面
+_STAY_PRIOR = 2.0
+_NEIGHBOR_PRIOR = 1.0
+# 单行计数超过该值时整体减半
+_DECAY_TOTAL = 200.0
+
+
+class ScreenTracker:
+    """单个模拟器的界面转移模型（线程安全）。"""
+
+    def __init__(self, *, top_k: int = 3) -> None:
+        self.top_k = max(1, int(top_k))
+        self._counts: Dict[str, Dict[str, float]] = {}
+        self._last: Optional[str] = None
+        self._lock = threading.Lock()
+        self._detects = 0
+        self._predicted_hits = 0
+        self._escalations = 0
+        self._templates = 0
+
+    @property
+    def last(self) -> Optional[str]:
+        return self._last
+
+    def observe(self, ui: str) -> None:
+        """记录一次检测结果（UNKNOWN 不计入，也不打断序列）。"""
+        if not ui or ui == "UNKNOWN":
+            return
+        with self._lock:
+            prev = self._last
+            self._last = ui
+            if prev is None:
+                return
+            row = self._counts.setdefault(prev, {})
+            row[ui] = row.get(ui, 0.0) + 1.0
+            if sum(row.values()) > _DECAY_TOTAL:
+                for key in list(row):
+                    row[key] /= 2.0
+
+    def predict(
+        self, k: Optional[int] = None, *, neighbors: Iterable[str] = ()
+    ) -> List[str]:
+        """按 P(next | last) 返回最可能的 k 个界面。"""
+        limit = self.top_k if k is None else max(1, int(k))
+        with self._lock:
+            last = self._last
+            if last is None:
+                return []
+            scores: Dict[str, float] = {last: _STAY_PRIOR}
+            for ui in neighbors:
+                scores[ui] = scores.get(ui, 0.0) + _NEIGHBOR_PRIOR
+            for ui, count in self._counts.get(last, {}).items():
+                scores[ui] = scores.get(ui, 0.0) + count
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        return [ui for ui, _ in ranked[:limit]]
+
+    def record_detect(self, debug: Optional[dict]) -> None:
+        """累计分级检测统计（UIDetector.detect 返回的 debug）。"""
+        if not isinstance(debug, dict) or "templates_evaluated" not in debug:
+            return
+        with self._lock:
+            self._detects += 1
+            self._templates += int(debug.get("templates_evaluated") or 0)
+            if debug.get("stage") == "predicted":
+                self._predicted_hits += 1
+            else:
+                self._escalations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            detects = self._detects
+            return {
+                "last": self._last,
+                "states": len(self._counts),
+                "detects": detects,
+                "predicted_hits": self._predicted_hits,
+                "escalations": self._escalations,
+                "avg_templates": round(self._templates / detects, 2) if detects else 0.0,
+            }
+
+
+_trackers: Dict[str, ScreenTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_screen_tracker(emulator: str) -> ScreenTracker:
+    """获取模拟器的界面追踪器（进程内按 adb 地址共享，跨 UIManager 实例保留）。"""
+    tracker = _trackers.get(emulator)
+    if tracker is None:
+        with _trackers_lock:
+            tracker = _trackers.get(emulator)
+            if tracker is None:
+                tracker = _trackers[emulator] = ScreenTracker(
+                    top_k=int(getattr(settings, "ui_tracker_top_k", 3))
+                )
+    return tracker
+
+
+def tracker_stats() -> Dict[str, dict]:
+    with _trackers_lock:
+        items = list(_trackers.items())
+    return {emulator: tracker.stats() for emulator, tracker in items}
+
+
+# ── 基准测试 ──
+
+
+def replay_session(
+    detector: Any,
+    frames: Iterable[Any],
+    *,
+    graph: Any = None,
+    top_k: int = 3,
+) -> dict:
+    """回放一段截图序列，对比旧的 hints 排序检测与分级预测检测。
+
+    返回两种方式每次检测的平均模板匹配数，以及结果不一致的帧数。
+    """
+    tracker = ScreenTracker(top_k=top_k)
+    baseline_last: Optional[str] = None
+    totals = {"baseline": 0, "staged": 0}
+    frames_count = 0
+    mismatches = 0
+
+    def _neighbors(ui: Optional[str]) -> List[str]:
+        if graph is None or ui is None:
+            return []
+        return [e.dst for e in graph.edges_from(ui)]
+
+    for frame in frames:
+        frames_count += 1
+        hints: List[str] = []
+        if baseline_last:
+            hints = [baseline_last] + [u for u in _neighbors(baseline_last) if u != baseline_last]
+        base = detector.detect(frame, hints=hints or None, anchors=False)
+        totals["baseline"] += int(base.debug.get("templates_evaluated", 0))
+        if base.ui != "UNKNOWN":
+            baseline_last = base.ui
+
+        predicted = tracker.predict(neighbors=_neighbors(tracker.last))
+        staged = detector.detect(frame, hints=predicted or None, anchors=False, staged=True)
+        totals["staged"] += int(staged.debug.get("templates_evaluated", 0))
+        tracker.record_detect(staged.debug)
+        tracker.observe(staged.ui)
+        if staged.ui != base.ui:
+            mismatches += 1
+
+    n = max(1, frames_count)
+    return {
+        "frames": frames_count,
+        "avg_templates_baseline": round(totals["baseline"] / n, 2),
+        "avg_templates_staged": round(totals["staged"] / n, 2),
+        "mismatches": mismatches,
+        "tracker": tracker.stats(),
+    }
+
+
+def _load_frames(directory: str) -> Iterable[Any]:
+    from pathlib import Path
+
+    from ..vision.utils import load_image
+
+    for path in sorted(Path(directory).glob("*.png")) + sorted(Path(directory).glob("*.jpg")):
+        yield load_image(str(path))
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="界面转移追踪基准测试")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    replay = sub.add_parser("replay", help="回放截图目录（按文件名排序）")
+    replay.add_argument("directory")
+    replay.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    from .. import ui as _ui  # noqa: F401  触发界面注册
+    from .default_graph import build_default_graph
+    from .detector import UIDetector
+    from .registry import registry
+
+    result = replay_session(
+        UIDetector(registry),
+        _load_frames(args.directory),
+        graph=build_default_graph(),
+        top_k=args.top_k,
+    )
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
+
+
+__all__ = ["ScreenTracker", "get_screen_tracker", "replay_session", "tracker_stats"]
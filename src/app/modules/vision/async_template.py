@@ -1,15 +1,19 @@
 """异步模板匹配包装器。
 
 将同步的 match_template / find_all_templates offload 到计算线程池，
-避免阻塞事件循环。
+避免阻塞事件循环。结界突破网格、战斗阵容等纯 Python 逻辑较重的检测
+默认走计算进程池（未启用时自动回退线程池）。
 """
 from __future__ import annotations
 
 import functools
 from typing import List, Optional
 
-from ...core.thread_pool import run_in_compute
+from ...core.process_pool import COMPUTE_BACKEND_PROCESS
+from ...core.thread_pool import ComputePriority, run_in_compute
+from .battle_lineup_detect import BattleCellInfo, detect_battle_lineups
 from .template import Match, match_template as _sync_match, find_all_templates as _sync_find_all
+from .tupo_detect import TupoGridResult, detect_tupo_grid
 from .utils import ImageLike
 
 
@@ -18,10 +22,14 @@ async def async_match_template(
     template: ImageLike,
     *,
     threshold: Optional[float] = None,
+    emulator: str = "",
+    priority: ComputePriority = ComputePriority.INTERACTIVE,
 ) -> Optional[Match]:
     """异步版本的 match_template，在计算线程池中执行。"""
     return await run_in_compute(
-        functools.partial(_sync_match, image, template, threshold=threshold)
+        functools.partial(_sync_match, image, template, threshold=threshold),
+        emulator=emulator,
+        priority=priority,
     )
 
 
@@ -30,11 +38,46 @@ async def async_find_all_templates(
     template: ImageLike,
     *,
     threshold: Optional[float] = None,
+    emulator: str = "",
+    priority: ComputePriority = ComputePriority.BULK,
 ) -> List[Match]:
     """异步版本的 find_all_templates，在计算线程池中执行。"""
     return await run_in_compute(
-        functools.partial(_sync_find_all, image, template, threshold=threshold)
+        functools.partial(_sync_find_all, image, template, threshold=threshold),
+        emulator=emulator,
+        priority=priority,
     )
 
 
-__all__ = ["async_match_template", "async_find_all_templates"]
+async def async_detect_tupo_grid(
+    image: ImageLike,
+    *,
+    emulator: str = "",
+    backend: str = COMPUTE_BACKEND_PROCESS,
+) -> TupoGridResult:
+    """异步版本的 detect_tupo_grid，默认在计算进程池中执行。"""
+    return await run_in_compute(
+        detect_tupo_grid, image,
+        emulator=emulator, priority=ComputePriority.BULK, backend=backend,
+    )
+
+
+async def async_detect_battle_lineups(
+    image: ImageLike,
+    *,
+    emulator: str = "",
+    backend: str = COMPUTE_BACKEND_PROCESS,
+) -> List[BattleCellInfo]:
+    """异步版本的 detect_battle_lineups，默认在计算进程池中执行。"""
+    return await run_in_compute(
+        detect_battle_lineups, image,
+        emulator=emulator, priority=ComputePriority.BULK, backend=backend,
+    )
+
+
+__all__ = [
+    "async_match_template",
+    "async_find_all_templates",
+    "async_detect_tupo_grid",
+    "async_detect_battle_lineups",
+]
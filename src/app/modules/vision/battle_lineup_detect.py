@@ -18,6 +18,7 @@ import cv2
 import numpy as np
 
 from .utils import ImageLike, load_image, to_gray
+from .loop_guard import off_loop
 
 # ── 分组格子 ROI（左侧窄列，960×540 分辨率）──
 # 分组区域 x≈24-122，暗色分隔线在 y≈168-177, y≈223-224, y≈270+
@@ -155,6 +156,7 @@ def detect_battle_column_cells(
     return cells
 
 
+@off_loop
 def detect_battle_groups(image: ImageLike) -> List[BattleCellInfo]:
     """检测预设面板左侧的分组格子。
 
@@ -173,6 +175,7 @@ def detect_battle_groups(image: ImageLike) -> List[BattleCellInfo]:
     )
 
 
+@off_loop
 def detect_battle_lineups(image: ImageLike) -> List[BattleCellInfo]:
     """检测预设面板右侧的阵容格子。
 
@@ -0,0 +1,187 @@
+"""
+异步识图门面
+
+VisionContext 绑定到单个模拟器（adb_addr），所有识图 / OCR 方法都在计算池中执行，
+并按模拟器公平调度，执行器协程中不再直接调用同步识图函数。
+
+用法::
+
+    m = await self.vision.match_template(screenshot, tpl, threshold=0.8)
+    grid = await self.vision.detect_tupo_grid(screenshot)
+    # 组合多次识图的同步辅助函数整体 offload，只切换一次线程
+    rewards = await self.vision.run(self._detect_rewards, screenshot)
+"""
+from __future__ import annotations
+
+import functools
+from typing import Any, List, Optional, Sequence, Tuple
+
+from ...core.process_pool import COMPUTE_BACKEND_PROCESS, COMPUTE_BACKEND_THREAD
+from ...core.thread_pool import ComputePriority, run_in_compute
+from ..ocr.async_recognize import _sync_ocr, _sync_ocr_digits_with_lock
+from ..ocr.types import OcrBox, OcrResult
+from .battle_lineup_detect import BattleCellInfo, detect_battle_groups, detect_battle_lineups
+from .qrcode_detect import detect_qrcode
+from .template import Match, find_all_templates, match_template
+from .tupo_detect import TupoGridResult, detect_tupo_grid
+from .utils import ImageLike, load_image, to_gray
+
+Roi = Tuple[int, int, int, int]
+
+
+def _match_first(
+    image: ImageLike,
+    templates: Sequence[str],
+    *,
+    threshold: Optional[float] = None,
+) -> Optional[Tuple[str, Match]]:
+    img = load_image(image)
+    gray = img if img.ndim == 2 else to_gray(img)
+    for tpl in templates:
+        m = match_template(gray, tpl, threshold=threshold)
+        if m:
+            return tpl, m
+    return None
+
+
+class VisionContext:
+    """绑定到单个模拟器的异步识图门面。"""
+
+    # 识图调用计数：emulator -> 累计次数（WorkerActor 按 intent 取差值写入运行流水）
+    _detect_counts: dict = {}
+
+    def __init__(self, emulator: str = "") -> None:
+        self.emulator = str(emulator or "")
+
+    @staticmethod
+    def get_detect_count(emulator: str) -> int:
+        return VisionContext._detect_counts.get(str(emulator or ""), 0)
+
+    @classmethod
+    def for_adapter(cls, adapter: Any) -> "VisionContext":
+        """按 adapter 的 adb_addr 构建（adapter 为空时使用全局队列）。"""
+        cfg = getattr(adapter, "cfg", None)
+        return cls(getattr(cfg, "adb_addr", "") if cfg is not None else "")
+
+    async def run(
+        self,
+        func,
+        *args,
+        priority: ComputePriority = ComputePriority.INTERACTIVE,
+        backend: str = COMPUTE_BACKEND_THREAD,
+        **kwargs,
+    ):
+        """在计算池中执行任意同步识图函数（或组合多次识图的辅助函数）。"""
+        if kwargs:
+            func = functools.partial(func, **kwargs)
+        counts = VisionContext._detect_counts
+        counts[self.emulator] = counts.get(self.emulator, 0) + 1
+        return await run_in_compute(
+            func, *args,
+            emulator=self.emulator, priority=priority, backend=backend,
+        )
+
+    # ── 模板匹配 ──
+
+    async def match_template(
+        self,
+        image: ImageLike,
+        template: ImageLike,
+        *,
+        threshold: Optional[float] = None,
+        priority: ComputePriority = ComputePriority.INTERACTIVE,
+    ) -> Optional[Match]:
+        return await self.run(
+            match_template, image, template, threshold=threshold, priority=priority,
+        )
+
+    async def match_first(
+        self,
+        image: ImageLike,
+        templates: Sequence[str],
+        *,
+        threshold: Optional[float] = None,
+        priority: ComputePriority = ComputePriority.INTERACTIVE,
+    ) -> Optional[Tuple[str, Match]]:
+        """按顺序匹配多个模板，返回首个命中的 (模板, Match)；整组只切换一次线程。"""
+        return await self.run(
+            _match_first, image, tuple(templates), threshold=threshold, priority=priority,
+        )
+
+    async def find_all_templates(
+        self,
+        image: ImageLike,
+        template: ImageLike,
+        *,
+        threshold: Optional[float] = None,
+        priority: ComputePriority = ComputePriority.BULK,
+    ) -> List[Match]:
+        return await self.run(
+            find_all_templates, image, template, threshold=threshold, priority=priority,
+        )
+
+    # ── 专用检测器 ──
+
+    async def detect_tupo_grid(self, image: ImageLike) -> TupoGridResult:
+        return await self.run(
+            detect_tupo_grid, image,
+            priority=ComputePriority.BULK, backend=COMPUTE_BACKEND_PROCESS,
+        )
+
+    async def detect_battle_lineups(self, image: ImageLike) -> List[BattleCellInfo]:
+        return await self.run(
+            detect_battle_lineups, image,
+            priority=ComputePriority.BULK, backend=COMPUTE_BACKEND_PROCESS,
+        )
+
+    async def detect_battle_groups(self, image: ImageLike) -> List[BattleCellInfo]:
+        return await self.run(
+            detect_battle_groups, image,
+            priority=ComputePriority.BULK, backend=COMPUTE_BACKEND_PROCESS,
+        )
+
+    async def detect_qrcode(self, image: ImageLike) -> bool:
+        return await self.run(detect_qrcode, image)
+
+    # ── OCR ──
+
+    async def ocr(
+        self,
+        image: ImageLike,
+        *,
+        roi: Optional[Roi] = None,
+        min_confidence: float = 0.6,
+    ) -> OcrResult:
+        return await self.run(_sync_ocr, image, roi=roi, min_confidence=min_confidence)
+
+    async def ocr_digits(
+        self,
+        image: ImageLike,
+        *,
+        roi: Optional[Roi] = None,
+    ) -> OcrResult:
+        return await self.run(_sync_ocr_digits_with_lock, image, roi=roi)
+
+    async def ocr_text(
+        self,
+        image: ImageLike,
+        *,
+        roi: Optional[Roi] = None,
+        min_confidence: float = 0.6,
+    ) -> str:
+        result = await self.ocr(image, roi=roi, min_confidence=min_confidence)
+        return result.text
+
+    async def find_text(
+        self,
+        image: ImageLike,
+        keyword: str,
+        *,
+        roi: Optional[Roi] = None,
+        min_confidence: float = 0.6,
+    ) -> Optional[OcrBox]:
+        result = await self.ocr(image, roi=roi, min_confidence=min_confidence)
+        return result.find(keyword)
+
+
+__all__ = ["VisionContext"]
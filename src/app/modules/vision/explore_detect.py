@@ -176,9 +176,12 @@ def update_explore_progress(
         chapter: 章节编号（1-28）
         difficulty: "simple" 或 "hard"
     """
+    from copy import deepcopy
+
     from ...db.base import SessionLocal
     from ...db.models import GameAccount
     from ...core.constants import build_default_explore_progress
+    from ..executor.account_state import get_account_state
     from sqlalchemy.orm.attributes import flag_modified
 
     if difficulty not in ("simple", "hard"):
@@ -186,6 +189,14 @@ def update_explore_progress(
     if not (1 <= chapter <= 28):
         return
 
+    # 批次内：修改内存中的账号状态，由 Worker 在 intent 结束时统一写回
+    state = get_account_state(account_id)
+    if state is not None:
+        progress = deepcopy(state.get("explore_progress") or build_default_explore_progress())
+        progress.setdefault(str(chapter), {"simple": False, "hard": False})[difficulty] = True
+        state.set("explore_progress", progress)
+        return
+
     with SessionLocal() as db:
         acc = db.query(GameAccount).filter(
             GameAccount.id == account_id
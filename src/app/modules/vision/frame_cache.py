@@ -6,8 +6,19 @@ import zlib
 import cv2
 import numpy as np
 
+from ...core.metrics import metrics
 from .utils import ImageLike, load_image
 
+# 识别结果缓存（detect_ui / popup_scan）的查询与分层命中计数，未命中数 = lookups - hits
+_CACHE_LOOKUPS = metrics.counter(
+    "oas_vision_cache_lookups", "识别结果缓存查询次数", ["subsystem", "emulator"]
+)
+_CACHE_HITS = metrics.counter(
+    "oas_vision_cache_hits",
+    "识别结果缓存命中次数（tier: local / shared / persistent）",
+    ["subsystem", "emulator", "tier"],
+)
+
 
 def compute_frame_signature(
     image: ImageLike,
@@ -30,6 +41,13 @@ def fingerprint_from_signature(signature: np.ndarray) -> int:
     return zlib.crc32(memoryview(signature).tobytes()) & 0xFFFFFFFF
 
 
+def dhash_from_signature(signature: np.ndarray) -> int:
+    """根据缩略签名计算 64 位 dHash（相邻像素水平梯度），用于近似帧的汉明距离检索。"""
+    small = cv2.resize(signature, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
 def compute_frame_fingerprint(
     image: ImageLike,
     *,
@@ -60,3 +78,13 @@ def is_cache_fresh(timestamp: float, ttl_ms: int, *, now: float | None = None) -
         return False
     current = time.monotonic() if now is None else now
     return (current - timestamp) * 1000.0 <= float(ttl_ms)
+
+
+def record_cache_lookup(subsystem: str, emulator: str) -> None:
+    """记录一次识别结果缓存查询（导出到 /metrics）。"""
+    _CACHE_LOOKUPS.labels(subsystem=subsystem, emulator=emulator).inc()
+
+
+def record_cache_hit(subsystem: str, emulator: str, tier: str = "local") -> None:
+    """记录一次识别结果缓存命中；tier 为 local / shared / persistent。"""
+    _CACHE_HITS.labels(subsystem=subsystem, emulator=emulator, tier=tier).inc()
@@ -0,0 +1,218 @@
+"""
+跨模拟器共享帧索引
+
+以 64 位 dHash 为键的近似帧检索表，供 UIManager / PopupHandler 的跨模拟器
+共享缓存使用：
+
+- 多索引汉明检索：64 位哈希切分为 max_distance + 1 段，距离 ≤ max_distance
+  的两个哈希至少有一段完全相同（抽屉原理），查询只需检查各段桶内的候选
+- 候选再经缩略签名 absdiff 复核（signatures_similar），保持原有的同帧判定精度
+- 插入顺序即时间顺序：过期条目从队首淘汰，超出容量时淘汰最旧条目
+- 线程安全（多进程 Worker 组各自持有独立实例）
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ...core.config import settings
+from .frame_cache import is_cache_fresh, signatures_similar
+
+_HASH_BITS = 64
+
+
+@dataclass
+class _Entry:
+    key: Hashable
+    dhash: int
+    fp: Optional[int]
+    signature: Optional[np.ndarray]
+    value: Any
+    ts: float
+
+
+def _split_bands(max_distance: int) -> List[Tuple[int, int]]:
+    """将 64 位切分为 max_distance + 1 段，返回 [(shift, mask), ...]。"""
+    bands = max(1, min(_HASH_BITS, max_distance + 1))
+    base, extra = divmod(_HASH_BITS, bands)
+    result: List[Tuple[int, int]] = []
+    shift = 0
+    for i in range(bands):
+        width = base + (1 if i < extra else 0)
+        result.append((shift, (1 << width) - 1))
+        shift += width
+    return result
+
+
+def hamming64(lhs: int, rhs: int) -> int:
+    return (lhs ^ rhs).bit_count()
+
+
+class FrameHashIndex:
+    """按 (key, dHash) 检索近似帧的共享缓存。"""
+
+    def __init__(self, *, max_entries: int = 4096, max_distance: int = 3) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.max_distance = max(0, int(max_distance))
+        self._bands = _split_bands(self.max_distance)
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._tables: List[Dict[Tuple[Hashable, int], Set[int]]] = [
+            {} for _ in self._bands
+        ]
+        self._by_fp: Dict[Tuple[Hashable, int], int] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._lookups = 0
+        self._hits = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ── 内部索引维护（调用方持锁）──
+
+    def _band_keys(self, key: Hashable, dhash: int) -> List[Tuple[Hashable, int]]:
+        return [(key, (dhash >> shift) & mask) for shift, mask in self._bands]
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for table, band_key in zip(self._tables, self._band_keys(entry.key, entry.dhash)):
+            ids = table.get(band_key)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    table.pop(band_key, None)
+        if entry.fp is not None and self._by_fp.get((entry.key, entry.fp)) == entry_id:
+            self._by_fp.pop((entry.key, entry.fp), None)
+
+    def _purge(self, ttl_ms: int, now: float) -> None:
+        while self._entries:
+            entry_id, entry = next(iter(self._entries.items()))
+            if is_cache_fresh(entry.ts, ttl_ms, now=now):
+                break
+            self._remove(entry_id)
+            self._evictions += 1
+
+    # ── 公共接口 ──
+
+    def lookup(
+        self,
+        key: Hashable,
+        dhash: int,
+        *,
+        fp: Optional[int] = None,
+        signature: Optional[np.ndarray] = None,
+        ttl_ms: Optional[int] = None,
+        similarity: float = 0.8,
+        now: Optional[float] = None,
+    ) -> Optional[Any]:
+        """查找同 key 下的近似帧，返回缓存值；未命中返回 None。
+
+        ttl_ms 为 None 时不做过期淘汰（仅按容量淘汰）。
+        """
+        current = time.monotonic() if now is None else now
+        with self._lock:
+            self._lookups += 1
+            if ttl_ms is not None:
+                self._purge(ttl_ms, current)
+
+            if fp is not None:
+                entry = self._entries.get(self._by_fp.get((key, fp), -1))
+                if entry is not None:
+                    self._hits += 1
+                    return entry.value
+
+            candidates: Set[int] = set()
+            for table, band_key in zip(self._tables, self._band_keys(key, dhash)):
+                ids = table.get(band_key)
+                if ids:
+                    candidates.update(ids)
+
+            best: Optional[_Entry] = None
+            best_distance = self.max_distance + 1
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                distance = hamming64(dhash, entry.dhash)
+                if distance >= best_distance:
+                    continue
+                if (
+                    signature is not None
+                    and entry.signature is not None
+                    and not signatures_similar(
+                        signature, entry.signature, mean_abs_threshold=similarity
+                    )
+                ):
+                    continue
+                best, best_distance = entry, distance
+            if best is None:
+                return None
+            self._hits += 1
+            return best.value
+
+    def put(
+        self,
+        key: Hashable,
+        dhash: int,
+        value: Any,
+        *,
+        fp: Optional[int] = None,
+        signature: Optional[np.ndarray] = None,
+        ttl_ms: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        """写入一条缓存；同 key 同指纹的旧条目被替换。"""
+        current = time.monotonic() if now is None else now
+        with self._lock:
+            if ttl_ms is not None:
+                self._purge(ttl_ms, current)
+            if fp is not None:
+                old_id = self._by_fp.get((key, fp))
+                if old_id is not None:
+                    self._remove(old_id)
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+            self._seq += 1
+            entry_id = self._seq
+            self._entries[entry_id] = _Entry(key, dhash, fp, signature, value, current)
+            for table, band_key in zip(self._tables, self._band_keys(key, dhash)):
+                table.setdefault(band_key, set()).add(entry_id)
+            if fp is not None:
+                self._by_fp[(key, fp)] = entry_id
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for table in self._tables:
+                table.clear()
+            self._by_fp.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "max_distance": self.max_distance,
+                "lookups": self._lookups,
+                "hits": self._hits,
+                "evictions": self._evictions,
+            }
+
+
+def new_shared_frame_index() -> FrameHashIndex:
+    """按配置创建跨模拟器共享帧索引。"""
+    return FrameHashIndex(
+        max_entries=int(getattr(settings, "vision_shared_index_max_entries", 4096)),
+        max_distance=int(getattr(settings, "vision_shared_index_max_hamming", 3)),
+    )
+
+
+__all__ = ["FrameHashIndex", "hamming64", "new_shared_frame_index"]
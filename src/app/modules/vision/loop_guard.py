@@ -0,0 +1,82 @@
+"""
+识图事件循环守卫
+
+同步识图函数（match_template、find_all_templates、detect_tupo_grid 等）在
+事件循环线程中执行时会阻塞所有模拟器的 WorkerActor。守卫按 VISION_LOOP_GUARD
+配置检查调用线程：
+
+- off：不检查（默认）
+- warn：每个调用位置记录一次警告
+- raise：抛出 VisionOnLoopError，便于开发期定位遗漏的调用点
+
+计算线程池 / 进程池中没有运行中的事件循环，经 VisionContext 调用不受影响。
+"""
+from __future__ import annotations
+
+import functools
+import sys
+import threading
+from asyncio import events
+from typing import Callable, Set, Tuple, TypeVar
+
+from ...core.config import settings
+from ...core.logger import logger
+
+LOOP_GUARD_OFF = "off"
+LOOP_GUARD_WARN = "warn"
+LOOP_GUARD_RAISE = "raise"
+
+_F = TypeVar("_F", bound=Callable)
+
+_warned: Set[Tuple[str, str, int]] = set()
+_warned_lock = threading.Lock()
+
+
+class VisionOnLoopError(RuntimeError):
+    """同步识图函数在事件循环线程中被调用。"""
+
+
+def check_off_loop(name: str) -> None:
+    """若当前线程正在运行事件循环，按守卫模式告警或抛错。"""
+    mode = settings.vision_loop_guard
+    if mode == LOOP_GUARD_OFF or events._get_running_loop() is None:
+        return
+    if mode == LOOP_GUARD_RAISE:
+        raise VisionOnLoopError(
+            f"同步识图函数 {name} 在事件循环线程中执行，请改用 VisionContext"
+        )
+    # 跳过守卫自身和被装饰函数两层栈帧，定位真实调用方
+    frame = sys._getframe(2)
+    site = (name, frame.f_code.co_filename, frame.f_lineno)
+    with _warned_lock:
+        if site in _warned:
+            return
+        _warned.add(site)
+    logger.warning(
+        "同步识图函数 {} 在事件循环线程中执行: {}:{}",
+        name,
+        frame.f_code.co_filename,
+        frame.f_lineno,
+    )
+
+
+def off_loop(func: _F) -> _F:
+    """装饰同步识图函数：调用前执行 check_off_loop。"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        check_off_loop(name)
+        return func(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+__all__ = [
+    "LOOP_GUARD_OFF",
+    "LOOP_GUARD_WARN",
+    "LOOP_GUARD_RAISE",
+    "VisionOnLoopError",
+    "check_off_loop",
+    "off_loop",
+]
@@ -0,0 +1,363 @@
+"""
+持久化识图缓存（SQLite）
+
+UIManager / PopupHandler 的帧缓存都在内存中，每次重启后从零开始，
+机群重启的前几分钟全部走整表扫描。本模块将「帧指纹 + hint key → 识别结果」
+持久化到独立的 SQLite 文件：
+
+- ui 结果：界面 id、分数、锚点（UNKNOWN 不持久化，过渡帧没有复用价值）
+- popup 结果：「无弹窗」判定
+- 版本号为 assets/ui/templates 下所有 PNG 的内容哈希，任何模板增删改都会
+  使旧缓存整体失效
+- 查询只访问内存中的 FrameHashIndex（启动时后台从 SQLite 加载），写入由
+  后台线程批量落盘，事件循环上不做磁盘 I/O
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+from ...core.config import settings
+from ...core.logger import logger
+from .frame_index import FrameHashIndex
+
+KIND_UI = "ui"
+KIND_POPUP = "popup"
+
+TEMPLATE_DIR = "assets/ui/templates"
+
+# 缩略签名形状（与 compute_frame_signature 默认参数一致）
+_SIG_SHAPE = (36, 64)
+_FLUSH_BATCH = 64
+_FLUSH_INTERVAL_SEC = 2.0
+
+
+def compute_template_set_hash(template_dir: str = TEMPLATE_DIR) -> str:
+    """计算模板目录下所有 PNG 的内容哈希（含相对路径）。"""
+    root = Path(template_dir)
+    digest = hashlib.sha1()
+    if root.is_dir():
+        for path in sorted(root.rglob("*.png")):
+            digest.update(path.relative_to(root).as_posix().encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _key_text(key: Hashable) -> str:
+    return json.dumps(key, ensure_ascii=False, separators=(",", ":"))
+
+
+class PersistentDetectCache:
+    """按模板集版本持久化的识图结果缓存。"""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        template_dir: str = TEMPLATE_DIR,
+        max_entries: int = 5000,
+        max_distance: int = 3,
+    ) -> None:
+        self.path = path
+        self.template_dir = template_dir
+        self.max_entries = max(1, int(max_entries))
+        self._index = FrameHashIndex(max_entries=self.max_entries, max_distance=max_distance)
+        self._version: Optional[str] = None
+        self._loaded = threading.Event()
+        self._load_started = False
+        self._load_lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded.is_set()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._version
+
+    # ── 加载 ──
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS detect_cache (
+                kind TEXT NOT NULL,
+                cache_key TEXT NOT NULL,
+                fp INTEGER NOT NULL,
+                dhash INTEGER NOT NULL,
+                signature BLOB,
+                ui TEXT,
+                score REAL,
+                debug TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (kind, cache_key, fp)
+            )
+            """
+        )
+        return conn
+
+    def load(self) -> None:
+        """同步加载（在 I/O 线程中调用）：校验模板版本并把已有条目装入内存索引。"""
+        with self._load_lock:
+            if self._loaded.is_set():
+                return
+            started = time.perf_counter()
+            version = compute_template_set_hash(self.template_dir)
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT value FROM meta WHERE key = 'template_version'"
+                ).fetchone()
+                if row is None or row[0] != version:
+                    conn.execute("DELETE FROM detect_cache")
+                    conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('template_version', ?)",
+                        (version,),
+                    )
+                    conn.commit()
+                    if row is not None:
+                        logger.info("持久化识图缓存: 模板集已变更，旧缓存已清空")
+                rows = conn.execute(
+                    "SELECT kind, cache_key, fp, dhash, signature, ui, score, debug "
+                    "FROM detect_cache ORDER BY updated_at DESC LIMIT ?",
+                    (self.max_entries,),
+                ).fetchall()
+            finally:
+                conn.close()
+
+            # 最旧的先插入，使容量淘汰顺序与写入时间一致
+            for kind, key_text, fp, dhash, sig_blob, ui, score, debug in reversed(rows):
+                signature = None
+                if sig_blob:
+                    signature = np.frombuffer(sig_blob, dtype=np.uint8).reshape(_SIG_SHAPE)
+                value = self._decode(kind, ui, score, debug)
+                self._index.put(
+                    (kind, key_text), int(dhash) & 0xFFFFFFFFFFFFFFFF, value,
+                    fp=int(fp), signature=signature,
+                )
+            self._version = version
+            self._writer = threading.Thread(
+                target=self._writer_main, name="vision-cache-writer", daemon=True
+            )
+            self._writer.start()
+            self._loaded.set()
+            logger.info(
+                "持久化识图缓存已加载: entries={}, version={}, elapsed={:.0f}ms",
+                len(rows),
+                version[:12],
+                (time.perf_counter() - started) * 1000,
+            )
+
+    def ensure_loading(self) -> None:
+        """未加载时在 I/O 线程池中后台加载（不阻塞调用方）。"""
+        if self._loaded.is_set() or self._load_started:
+            return
+        with self._load_lock:
+            if self._load_started:
+                return
+            self._load_started = True
+        from ...core.thread_pool import get_io_pool
+
+        def _load_safely() -> None:
+            try:
+                self.load()
+            except Exception as e:
+                logger.warning("持久化识图缓存加载失败（已禁用）: {}", e)
+
+        get_io_pool().submit(_load_safely)
+
+    # ── 编解码 ──
+
+    @staticmethod
+    def _decode(kind: str, ui: Optional[str], score: Optional[float], debug: Optional[str]) -> Any:
+        if kind == KIND_POPUP:
+            return True
+        return {
+            "ui": ui or "UNKNOWN",
+            "score": float(score or 0.0),
+            "debug": json.loads(debug) if debug else None,
+        }
+
+    # ── 查询 / 写入 ──
+
+    def lookup(
+        self,
+        kind: str,
+        key: Hashable,
+        dhash: int,
+        *,
+        fp: int,
+        signature: Optional[np.ndarray],
+        similarity: float,
+    ) -> Optional[Any]:
+        """查询内存索引；未加载完成时返回 None。"""
+        if not self._loaded.is_set():
+            self.ensure_loading()
+            return None
+        return self._index.lookup(
+            (kind, _key_text(key)), dhash,
+            fp=fp, signature=signature, similarity=similarity,
+        )
+
+    def put(
+        self,
+        kind: str,
+        key: Hashable,
+        dhash: int,
+        value: Any,
+        *,
+        fp: int,
+        signature: Optional[np.ndarray],
+    ) -> None:
+        """写入内存索引并排队落盘。
+
+        ui 结果为 {"ui", "score", "debug"} 字典，ui 为 UNKNOWN 时忽略；
+        popup 结果固定为 True（无弹窗）。
+        """
+        if not self._loaded.is_set():
+            self.ensure_loading()
+            return
+        if kind == KIND_UI:
+            if value.get("ui", "UNKNOWN") == "UNKNOWN":
+                return
+            ui, score = value["ui"], float(value.get("score") or 0.0)
+            debug = value.get("debug")
+            debug = json.dumps(debug, ensure_ascii=False) if debug else None
+        else:
+            ui, score, debug = None, None, None
+        key_text = _key_text(key)
+        self._index.put((kind, key_text), dhash, value, fp=fp, signature=signature)
+        sig_blob = signature.astype(np.uint8).tobytes() if signature is not None else None
+        # SQLite INTEGER 为有符号 64 位
+        signed_hash = dhash - (1 << 64) if dhash >= (1 << 63) else dhash
+        self._queue.put(
+            (kind, key_text, int(fp), signed_hash, sig_blob, ui, score, debug, time.time())
+        )
+
+    # ── 后台写入 ──
+
+    def _writer_main(self) -> None:
+        conn: Optional[sqlite3.Connection] = None
+        pending: List[tuple] = []
+        stop = False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=_FLUSH_INTERVAL_SEC)
+                if item is None:
+                    stop = True
+                else:
+                    pending.append(item)
+                    while len(pending) < _FLUSH_BATCH:
+                        try:
+                            item = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if item is None:
+                            stop = True
+                            break
+                        pending.append(item)
+            except queue.Empty:
+                pass
+            if not pending:
+                continue
+            try:
+                if conn is None:
+                    conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO detect_cache "
+                    "(kind, cache_key, fp, dhash, signature, ui, score, debug, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    pending,
+                )
+                conn.execute(
+                    "DELETE FROM detect_cache WHERE rowid IN ("
+                    "SELECT rowid FROM detect_cache ORDER BY updated_at DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                conn.commit()
+            except Exception as e:
+                logger.warning("持久化识图缓存写入失败: {}", e)
+            pending = []
+        if conn is not None:
+            conn.close()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """停止后台写入线程并落盘剩余条目。"""
+        writer = self._writer
+        if writer is None:
+            return
+        self._queue.put(None)
+        writer.join(timeout)
+        self._writer = None
+        self._loaded.clear()
+        self._load_started = False
+
+    def stats(self) -> dict:
+        data = self._index.stats()
+        data.update(
+            {
+                "enabled": True,
+                "loaded": self.loaded,
+                "version": self._version,
+                "path": self.path,
+            }
+        )
+        return data
+
+
+_store: Optional[PersistentDetectCache] = None
+_store_lock = threading.Lock()
+
+
+def get_persistent_detect_cache() -> Optional[PersistentDetectCache]:
+    """获取持久化识图缓存；未启用（VISION_PERSISTENT_CACHE_ENABLED=false）时返回 None。"""
+    global _store
+    if not settings.vision_persistent_cache_enabled:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PersistentDetectCache(
+                    settings.vision_persistent_cache_path,
+                    max_entries=settings.vision_persistent_cache_max_entries,
+                    max_distance=int(getattr(settings, "vision_shared_index_max_hamming", 3)),
+                )
+    return _store
+
+
+def shutdown_persistent_detect_cache() -> None:
+    global _store
+    with _store_lock:
+        store = _store
+        _store = None
+    if store is not None:
+        store.flush()
+
+
+__all__ = [
+    "KIND_POPUP",
+    "KIND_UI",
+    "PersistentDetectCache",
+    "compute_template_set_hash",
+    "get_persistent_detect_cache",
+    "shutdown_persistent_detect_cache",
+]
@@ -6,7 +6,10 @@ from typing import Union
 import cv2
 import numpy as np
 
+from .loop_guard import off_loop
 
+
+@off_loop
 def detect_qrcode(image: Union[np.ndarray, bytes]) -> bool:
     """检测图像中是否存在二维码。
 
@@ -0,0 +1,124 @@
+"""
+自适应稳定等待
+
+点击后的固定 sleep（导航边的 800~1500ms、click_template 的 settle/post_delay）
+按最慢设备取值，快设备被迫等满。wait_until_settled 以较短间隔截图：
+
+- 连续 stable_frames 帧缩略签名无变化 → 画面已稳定，提前返回
+- target 回调命中（如目标界面的 tag 模板出现）→ 提前返回
+- 原 sleep 时长作为上限，超时返回（最坏情况与原行为一致）
+
+require_change=True 用于点击之后：须先观察到画面相对起始帧发生变化，
+再判定稳定，避免点击尚未生效时的静止画面被误判为“已稳定”。
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+import numpy as np
+
+from ...core.config import settings
+from .frame_cache import compute_frame_signature, signatures_similar
+
+SETTLE_STABLE = "stable"
+SETTLE_TARGET = "target"
+SETTLE_TIMEOUT = "timeout"
+
+
+@dataclass
+class SettleResult:
+    reason: str
+    waited: float
+    frame: Optional[np.ndarray] = None
+    captures: int = 0
+
+
+def adaptive_settle_enabled() -> bool:
+    return bool(getattr(settings, "ui_adaptive_settle_enabled", True))
+
+
+async def wait_until_settled(
+    capture: Callable[[], Awaitable[Any]],
+    *,
+    max_wait: float,
+    target: Optional[Callable[[np.ndarray], Awaitable[bool]]] = None,
+    require_change: bool = False,
+    interval: Optional[float] = None,
+    stable_frames: Optional[int] = None,
+    similarity: Optional[float] = None,
+) -> SettleResult:
+    """等待画面稳定或目标出现，最长 max_wait 秒。
+
+    Args:
+        capture: 异步截图函数，返回 BGR ndarray 或 None
+        max_wait: 等待上限（即原固定 sleep 时长）
+        target: 可选，对最新帧判断目标是否已出现
+        require_change: 是否须先观察到画面变化再判定稳定
+        interval: 截图间隔（默认 UI_SETTLE_INTERVAL_MS）
+        stable_frames: 连续无变化帧数（默认 UI_SETTLE_STABLE_FRAMES）
+        similarity: 同帧判定阈值（默认 VISION_FRAME_SIMILARITY_THRESHOLD）
+    """
+    if interval is None:
+        interval = int(getattr(settings, "ui_settle_interval_ms", 150)) / 1000.0
+    if stable_frames is None:
+        stable_frames = int(getattr(settings, "ui_settle_stable_frames", 2))
+    if similarity is None:
+        similarity = float(getattr(settings, "vision_frame_similarity_threshold", 0.8))
+    stable_frames = max(1, stable_frames)
+
+    start = time.monotonic()
+    deadline = start + max(0.0, max_wait)
+    baseline = None
+    prev_sig = None
+    changed = not require_change
+    stable = 0
+    captures = 0
+    frame = None
+
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            return SettleResult(SETTLE_TIMEOUT, now - start, frame, captures)
+        tick = now
+        try:
+            image = await capture()
+        except Exception:
+            image = None
+        if image is not None:
+            captures += 1
+            frame = image
+            if target is not None and await target(image):
+                return SettleResult(SETTLE_TARGET, time.monotonic() - start, frame, captures)
+            sig = compute_frame_signature(image)
+            if baseline is None:
+                baseline = sig
+            elif not changed and not signatures_similar(
+                sig, baseline, mean_abs_threshold=similarity
+            ):
+                changed = True
+            if prev_sig is not None and signatures_similar(
+                sig, prev_sig, mean_abs_threshold=similarity
+            ):
+                stable += 1
+            else:
+                stable = 0
+            prev_sig = sig
+            if changed and stable >= stable_frames:
+                return SettleResult(SETTLE_STABLE, time.monotonic() - start, frame, captures)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            continue
+        await asyncio.sleep(min(remaining, max(0.0, interval - (time.monotonic() - tick))))
+
+
+__all__ = [
+    "SETTLE_STABLE",
+    "SETTLE_TARGET",
+    "SETTLE_TIMEOUT",
+    "SettleResult",
+    "adaptive_settle_enabled",
+    "wait_until_settled",
+]
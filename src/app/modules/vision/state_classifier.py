@@ -0,0 +1,302 @@
+"""
+声明式多模板状态分类器
+
+执行器状态机（对弈竞猜、爬塔 ...）过去逐个 await match_template 手写优先级链：
+每个模板一次计算池往返，且都在整帧上串行匹配。StateClassifier 将状态声明为
+模板 / ROI / 像素谓词 + 优先级，编译为批量评估计划：
+
+- 同一模板（路径 + ROI + 阈值）在多个状态间只匹配一次，灰度图每帧只转换一次
+- 整个计划在计算池中一次执行（aclassify），不再逐模板切换线程
+- classify 按优先级分层评估，命中即停；同一优先级内按历史命中次数自调整顺序，
+  多模板状态内部也按命中次数调整模板顺序
+- evaluate / classify(full=True) 返回所有状态的分数，便于调试与基准对比
+
+用法::
+
+    classifier = StateClassifier([
+        StateDef("popup", [TemplatePredicate("assets/.../jiangli.png")], priority=100),
+        StateDef("bet", [TemplatePredicate("assets/.../jingcai.png", roi=(0, 400, 960, 140))]),
+    ], name="对弈竞猜")
+    result = await classifier.aclassify(self.vision, screenshot)
+    if result.state == "popup": ...
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import cv2  # type: ignore
+import numpy as np
+
+from .template import DEFAULT_THRESHOLD, Match, _gray_template, _observe_match
+from .utils import ImageLike, load_image, to_gray
+
+Roi = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class TemplatePredicate:
+    """模板谓词：在 roi（x, y, w, h，缺省整帧）内匹配模板，分数 ≥ threshold 视为命中。"""
+
+    path: str
+    roi: Optional[Roi] = None
+    threshold: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class PixelPredicate:
+    """像素谓词：(x, y) 处颜色与 rgb 的逐通道差值均不超过 tolerance。"""
+
+    x: int
+    y: int
+    rgb: Tuple[int, int, int]
+    tolerance: int = 0
+
+
+Predicate = Union[TemplatePredicate, PixelPredicate]
+
+
+@dataclass
+class StateDef:
+    """状态声明。mode="any" 任一谓词命中即可；"all" 需全部命中。
+
+    多个状态可同时命中时取 priority 最高者（如遮挡其它元素的弹窗）。
+    """
+
+    name: str
+    predicates: Sequence[Predicate]
+    priority: int = 0
+    mode: str = "any"
+
+
+@dataclass
+class StateResult:
+    state: Optional[str]
+    score: float = 0.0
+    match: Optional[Match] = None
+    # 已评估状态的分数（full=True 时为全部状态）
+    scores: Dict[str, float] = field(default_factory=dict)
+    templates_evaluated: int = 0
+
+
+class _FrameEval:
+    """单帧评估上下文：缓存灰度图与谓词结果，保证同一谓词只计算一次。"""
+
+    def __init__(self, image: ImageLike, default_threshold: float = DEFAULT_THRESHOLD) -> None:
+        self.image = load_image(image)
+        self.default_threshold = default_threshold
+        self._gray: Optional[np.ndarray] = None
+        self._results: Dict[Predicate, Tuple[float, Optional[Match]]] = {}
+        self.templates = 0
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            self._gray = self.image if self.image.ndim == 2 else to_gray(self.image)
+        return self._gray
+
+    def score(self, pred: Predicate) -> Tuple[float, Optional[Match]]:
+        cached = self._results.get(pred)
+        if cached is None:
+            if isinstance(pred, TemplatePredicate):
+                cached = self._match(pred)
+                self.templates += 1
+            else:
+                cached = (self._pixel(pred), None)
+            self._results[pred] = cached
+        return cached
+
+    def _match(self, pred: TemplatePredicate) -> Tuple[float, Optional[Match]]:
+        start = time.perf_counter()
+        tpl = _gray_template(pred.path)
+        big = self.gray
+        ox = oy = 0
+        if pred.roi:
+            x, y, w, h = pred.roi
+            big = big[y : y + h, x : x + w]
+            ox, oy = x, y
+        th, tw = tpl.shape[:2]
+        if th > big.shape[0] or tw > big.shape[1]:
+            return 0.0, None
+        res = cv2.matchTemplate(big, tpl, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(res)
+        score = float(max_val)
+        match = Match(x=max_loc[0] + ox, y=max_loc[1] + oy, w=tw, h=th, score=score)
+        # 与 match_template 计入同一耗时指标 / 模板画像
+        _observe_match(
+            pred.path,
+            time.perf_counter() - start,
+            op="classifier",
+            score=score,
+            hit=score >= _threshold(pred, self.default_threshold),
+            box=(match.x, match.y, tw, th),
+            frame=self.gray.shape[:2],
+            roi=tuple(pred.roi) if pred.roi else None,
+        )
+        return score, match
+
+    def _pixel(self, pred: PixelPredicate) -> float:
+        img = self.image
+        h, w = img.shape[:2]
+        if not (0 <= pred.x < w and 0 <= pred.y < h):
+            return 0.0
+        if img.ndim == 2:
+            v = int(img[pred.y, pred.x])
+            bgr = (v, v, v)
+        else:
+            b, g, r = img[pred.y, pred.x][:3]
+            bgr = (int(b), int(g), int(r))
+        r, g, b = pred.rgb
+        ok = all(abs(a - e) <= pred.tolerance for a, e in zip(bgr, (b, g, r)))
+        return 1.0 if ok else 0.0
+
+
+def _threshold(pred: Predicate, default: float) -> float:
+    if isinstance(pred, TemplatePredicate):
+        return default if pred.threshold is None else float(pred.threshold)
+    return 1.0
+
+
+class StateClassifier:
+    """按优先级分层、命中率自调整的多状态分类器（线程安全）。"""
+
+    def __init__(
+        self,
+        states: Sequence[StateDef],
+        *,
+        name: str = "",
+        default_threshold: float = DEFAULT_THRESHOLD,
+        adaptive: bool = True,
+    ) -> None:
+        names = [s.name for s in states]
+        if len(set(names)) != len(names):
+            raise ValueError(f"重复的状态名: {names}")
+        self.name = name
+        self.default_threshold = default_threshold
+        self.adaptive = adaptive
+        self._states: Dict[str, StateDef] = {s.name: s for s in states}
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {n: 0 for n in names}
+        self._pred_hits: Dict[Tuple[str, int], int] = {}
+        self._frames = 0
+        self._misses = 0
+        self._templates = 0
+        # 评估计划：[(priority, [state, ...]), ...]，优先级从高到低
+        self._plan: List[Tuple[int, List[str]]] = []
+        self._compile()
+
+    @property
+    def states(self) -> List[str]:
+        return list(self._states)
+
+    def _compile(self) -> None:
+        """按优先级分层；同层按命中次数降序（稳定排序保持声明顺序）。"""
+        tiers: Dict[int, List[str]] = {}
+        for state in self._states.values():
+            tiers.setdefault(state.priority, []).append(state.name)
+        plan = []
+        for priority in sorted(tiers, reverse=True):
+            names = tiers[priority]
+            if self.adaptive:
+                names = sorted(names, key=lambda n: -self._hits[n])
+            plan.append((priority, names))
+        self._plan = plan
+
+    def _ordered_predicates(self, state: StateDef) -> List[Tuple[int, Predicate]]:
+        indexed = list(enumerate(state.predicates))
+        if self.adaptive and state.mode == "any":
+            indexed.sort(key=lambda ip: -self._pred_hits.get((state.name, ip[0]), 0))
+        return indexed
+
+    def _eval_state(
+        self, frame: _FrameEval, state: StateDef
+    ) -> Tuple[bool, float, Optional[Match], Optional[int]]:
+        best_score = 0.0
+        best_match: Optional[Match] = None
+        hit_index: Optional[int] = None
+        all_hit = True
+        for index, pred in self._ordered_predicates(state):
+            score, match = frame.score(pred)
+            hit = score >= _threshold(pred, self.default_threshold)
+            if score > best_score:
+                best_score, best_match = score, match
+            if hit:
+                if hit_index is None:
+                    hit_index = index
+                if state.mode == "any":
+                    return True, score, match, index
+            else:
+                all_hit = False
+                if state.mode == "all":
+                    return False, best_score, best_match, None
+        if state.mode == "all":
+            return all_hit, best_score, best_match, hit_index
+        return False, best_score, best_match, None
+
+    def classify(self, image: ImageLike, *, full: bool = False) -> StateResult:
+        """同步分类（在计算池线程中调用）。full=True 时评估全部状态。"""
+        frame = _FrameEval(image, self.default_threshold)
+        with self._lock:
+            plan = [(p, list(names)) for p, names in self._plan]
+        result = StateResult(state=None)
+        hit_pred: Optional[int] = None
+        for _, names in plan:
+            for name in names:
+                state = self._states[name]
+                hit, score, match, pred_index = self._eval_state(frame, state)
+                result.scores[name] = round(score, 4)
+                if hit and result.state is None:
+                    result.state, result.score, result.match = name, score, match
+                    hit_pred = pred_index
+                    if not full:
+                        break
+            if result.state is not None and not full:
+                break
+        result.templates_evaluated = frame.templates
+        self._record(result, hit_pred)
+        return result
+
+    def evaluate(self, image: ImageLike) -> StateResult:
+        """评估全部状态并返回各状态分数（调试 / 基准）。"""
+        return self.classify(image, full=True)
+
+    async def aclassify(self, vision: Any, image: ImageLike, *, full: bool = False) -> StateResult:
+        """经 VisionContext 在计算池中一次执行整个评估计划。"""
+        return await vision.run(self.classify, image, full=full)
+
+    def _record(self, result: StateResult, hit_pred: Optional[int]) -> None:
+        with self._lock:
+            self._frames += 1
+            self._templates += result.templates_evaluated
+            if result.state is None:
+                self._misses += 1
+                return
+            self._hits[result.state] += 1
+            if hit_pred is not None:
+                key = (result.state, hit_pred)
+                self._pred_hits[key] = self._pred_hits.get(key, 0) + 1
+            if self.adaptive:
+                self._compile()
+
+    def stats(self) -> dict:
+        with self._lock:
+            frames = self._frames
+            return {
+                "name": self.name,
+                "frames": frames,
+                "misses": self._misses,
+                "hits": dict(self._hits),
+                "avg_templates": round(self._templates / frames, 2) if frames else 0.0,
+                "order": [name for _, names in self._plan for name in names],
+            }
+
+
+__all__ = [
+    "PixelPredicate",
+    "StateClassifier",
+    "StateDef",
+    "StateResult",
+    "TemplatePredicate",
+]
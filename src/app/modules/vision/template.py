@@ -11,17 +11,85 @@ from __future__ import annotations
 
 import random
 import threading
+import time
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
 import cv2  # type: ignore
 import numpy as np
 
+from ...core.metrics import metrics
+from .loop_guard import off_loop
+from .template_profile import template_profiler
 from .utils import ImageLike, load_image, to_gray
 
 
 DEFAULT_THRESHOLD = 0.85
 _GRAY_TEMPLATE_CACHE: dict[str, np.ndarray] = {}
 _CACHE_LOCK = threading.Lock()
+# 常开指标只按 op 区分；逐模板明细由 template_profiler 按需统计（避免 模板数 × op × 分桶 的序列膨胀）
+_MATCH_SECONDS = metrics.histogram(
+    "oas_match_seconds", "模板匹配耗时（秒，含灰度转换）", ["op"]
+)
+
+
+Roi = Tuple[int, int, int, int]
+
+
+def _crop_origin(arr: np.ndarray) -> Tuple[Tuple[int, int], Optional[Roi]]:
+    """推断 ndarray 在原图中的位置，返回 (原图 (h, w), 裁剪 ROI 或 None)。
+
+    检测器 / 弹窗处理等按 ROI 切片后再调用 match_template，切片与原图共享内存，
+    据此换算回整帧坐标（只用于性能画像；无法推断时视为整帧）。
+    """
+    h, w = arr.shape[:2]
+    base = arr.base
+    if (
+        not isinstance(base, np.ndarray)
+        or base.ndim != arr.ndim
+        or base.shape[:2] == (h, w)
+        or arr.strides[:2] != base.strides[:2]
+    ):
+        return (h, w), None
+    offset = arr.__array_interface__["data"][0] - base.__array_interface__["data"][0]
+    if offset < 0:
+        return (h, w), None
+    oy, rem = divmod(offset, base.strides[0])
+    ox = rem // base.strides[1]
+    if oy + h > base.shape[0] or ox + w > base.shape[1]:
+        return (h, w), None
+    return (int(base.shape[0]), int(base.shape[1])), (int(ox), int(oy), w, h)
+
+
+def _observe_match(
+    template: ImageLike,
+    elapsed: float,
+    *,
+    op: str,
+    score: float,
+    hit: bool,
+    box: Roi,
+    frame: Tuple[int, int],
+    roi: Optional[Roi] = None,
+) -> None:
+    """记录匹配耗时指标与模板画像；box / roi 为整帧坐标，frame 为整帧 (h, w)。"""
+    _MATCH_SECONDS.labels(op=op).observe(elapsed)
+    if template_profiler.enabled and isinstance(template, str):
+        template_profiler.record(
+            template, elapsed, score=score, hit=hit, frame=frame, box=box, roi=roi
+        )
+
+
+def _observe_image_match(
+    template: ImageLike, elapsed: float, image: np.ndarray, *, op: str, score: float, hit: bool, box: Roi
+) -> None:
+    roi = None
+    frame = image.shape[:2]
+    # 画像关闭时只有这一次属性检查，不做 ROI 反推 / 坐标换算
+    if template_profiler.enabled and isinstance(template, str):
+        frame, roi = _crop_origin(image)
+        if roi is not None:
+            box = (box[0] + roi[0], box[1] + roi[1], box[2], box[3])
+    _observe_match(template, elapsed, op=op, score=score, hit=hit, box=box, frame=frame, roi=roi)
 
 
 @dataclass
@@ -46,6 +114,24 @@ class Match:
         return (rx, ry)
 
 
+def _gray_template(path: str) -> np.ndarray:
+    """按路径获取灰度模板：进程内缓存 → 模板资源包（内存映射）→ 解码 PNG。"""
+    tpl = _GRAY_TEMPLATE_CACHE.get(path)
+    if tpl is not None:
+        return tpl
+    with _CACHE_LOCK:
+        tpl = _GRAY_TEMPLATE_CACHE.get(path)
+        if tpl is None:
+            from .template_bundle import get_template_bundle
+
+            bundle = get_template_bundle()
+            tpl = bundle.gray(path) if bundle is not None else None
+            if tpl is None:
+                tpl = to_gray(load_image(path))
+            _GRAY_TEMPLATE_CACHE[path] = tpl
+    return tpl
+
+
 def _ensure_sizes(big: np.ndarray, small: np.ndarray) -> None:
     hb, wb = big.shape[:2]
     hs, ws = small.shape[:2]
@@ -53,6 +139,7 @@ def _ensure_sizes(big: np.ndarray, small: np.ndarray) -> None:
         raise ValueError(f"Template larger than image: template {ws}x{hs}, image {wb}x{hb}")
 
 
+@off_loop
 def match_template(
     image: ImageLike,
     template: ImageLike,
@@ -71,17 +158,12 @@ def match_template(
     Returns:
         Match or None if best score is below threshold.
     """
+    start = time.perf_counter()
     thr = DEFAULT_THRESHOLD if threshold is None else float(threshold)
     loaded = load_image(image)
     img = loaded if loaded.ndim == 2 else to_gray(loaded)
     if isinstance(template, str):
-        tpl = _GRAY_TEMPLATE_CACHE.get(template)
-        if tpl is None:
-            with _CACHE_LOCK:
-                tpl = _GRAY_TEMPLATE_CACHE.get(template)
-                if tpl is None:
-                    tpl = to_gray(load_image(template))
-                    _GRAY_TEMPLATE_CACHE[template] = tpl
+        tpl = _gray_template(template)
     else:
         tpl_loaded = load_image(template)
         tpl = tpl_loaded if tpl_loaded.ndim == 2 else to_gray(tpl_loaded)
@@ -99,11 +181,16 @@ def match_template(
         x, y = max_loc
 
     h, w = tpl.shape[:2]
+    _observe_image_match(
+        template, time.perf_counter() - start, loaded,
+        op="best", score=score, hit=score >= thr, box=(x, y, w, h),
+    )
     if score < thr:
         return None
     return Match(x=x, y=y, w=w, h=h, score=score)
 
 
+@off_loop
 def find_all_templates(
     image: ImageLike,
     template: ImageLike,
@@ -115,17 +202,12 @@ def find_all_templates(
 
     Returns matches sorted by score (desc).
     """
+    start = time.perf_counter()
     thr = DEFAULT_THRESHOLD if threshold is None else float(threshold)
     loaded = load_image(image)
     img = loaded if loaded.ndim == 2 else to_gray(loaded)
     if isinstance(template, str):
-        tpl = _GRAY_TEMPLATE_CACHE.get(template)
-        if tpl is None:
-            with _CACHE_LOCK:
-                tpl = _GRAY_TEMPLATE_CACHE.get(template)
-                if tpl is None:
-                    tpl = to_gray(load_image(template))
-                    _GRAY_TEMPLATE_CACHE[template] = tpl
+        tpl = _gray_template(template)
     else:
         tpl_loaded = load_image(template)
         tpl = tpl_loaded if tpl_loaded.ndim == 2 else to_gray(tpl_loaded)
@@ -151,6 +233,21 @@ def find_all_templates(
 
     # Sort by score descending
     matches.sort(key=lambda m: m.score, reverse=True)
+    elapsed = time.perf_counter() - start
+    score, box = 0.0, (0, 0, w, h)
+    if matches:
+        best = matches[0]
+        score, box = best.score, (best.x, best.y, w, h)
+    elif template_profiler.enabled:
+        # 未命中时画像也需要最佳得分（得分分布 / 最高分）
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
+        sqdiff = method in (cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED)
+        score = 1.0 - float(min_val) if sqdiff else float(max_val)
+        loc = min_loc if sqdiff else max_loc
+        box = (loc[0], loc[1], w, h)
+    _observe_image_match(
+        template, elapsed, loaded, op="all", score=score, hit=bool(matches), box=box
+    )
     return matches
 
 
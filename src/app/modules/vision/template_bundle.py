@@ -0,0 +1,314 @@
+"""
+模板资源包（内存映射）
+
+构建步骤把 assets/ui 下所有 PNG 预解码为 BGR + 灰度数组，连同索引写入单个
+二进制文件；运行时用 np.memmap 只读映射：
+
+- 启动时不再逐个 cv2.imread 解码数百张 PNG
+- 多个进程（计算进程池、多进程 Worker 组）映射同一文件，共享页缓存
+- _discover_templates 等模板自动发现改为查询包索引，不再 glob 文件系统
+
+文件格式::
+
+    MAGIC(8) | header_len(8, little-endian) | header(JSON) | 对齐填充 | data
+
+header 记录构建时源目录每个 PNG 的 (大小, mtime) 清单与逐文件内容哈希。运行时先比对
+相对路径集合与大小，只对 mtime 不一致的文件重新计算哈希（复制 / 解压 / 重新 checkout
+只会改变 mtime），PNG 增删改后包自动失效，回退到按路径加载。
+
+构建::
+
+    python -m app.modules.vision.template_bundle build [--src assets/ui] [--out PATH]
+"""
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2  # type: ignore
+import numpy as np
+
+from ...core.config import settings
+from ...core.logger import logger
+
+MAGIC = b"OASTPL01"
+BUNDLE_SOURCE_DIR = "assets/ui"
+_ALIGN = 64
+_FORMAT_VERSION = 1
+
+
+def normalize_path(path: str) -> str:
+    """统一路径写法（反斜杠、./ 前缀），作为包内索引键。"""
+    normalized = str(path).replace("\\", "/")
+    while normalized.startswith("./"):
+        normalized = normalized[2:]
+    return normalized
+
+
+def _source_pngs(src_dir: str) -> List[Path]:
+    root = Path(src_dir)
+    if not root.is_dir():
+        return []
+    return sorted(root.rglob("*.png"))
+
+
+def compute_source_hash(src_dir: str = BUNDLE_SOURCE_DIR) -> str:
+    """计算源目录下所有 PNG 的内容哈希（含相对路径）。"""
+    root = Path(src_dir)
+    digest = hashlib.sha1()
+    for path in _source_pngs(src_dir):
+        digest.update(path.relative_to(root).as_posix().encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _file_digest(path: Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def compute_source_digests(src_dir: str = BUNDLE_SOURCE_DIR) -> Dict[str, str]:
+    """源目录下每个 PNG 的内容哈希（键为相对路径），build 时记录。"""
+    root = Path(src_dir)
+    return {path.relative_to(root).as_posix(): _file_digest(path) for path in _source_pngs(src_dir)}
+
+
+def compute_source_manifest(src_dir: str = BUNDLE_SOURCE_DIR) -> Dict[str, List[int]]:
+    """源目录下每个 PNG 的 [大小, mtime_ns]（键为相对路径），运行时新鲜度校验只 stat 不读文件。"""
+    root = Path(src_dir)
+    manifest: Dict[str, List[int]] = {}
+    for path in _source_pngs(src_dir):
+        st = path.stat()
+        manifest[path.relative_to(root).as_posix()] = [st.st_size, st.st_mtime_ns]
+    return manifest
+
+
+# ── 构建 ──
+
+
+def build_bundle(src_dir: str = BUNDLE_SOURCE_DIR, out_path: Optional[str] = None) -> dict:
+    """编译模板资源包，返回 header。"""
+    out = Path(out_path or settings.vision_template_bundle_path)
+    entries: Dict[str, dict] = {}
+    blobs: List[np.ndarray] = []
+    offset = 0
+
+    def _append(arr: np.ndarray) -> List[int]:
+        nonlocal offset
+        arr = np.ascontiguousarray(arr, dtype=np.uint8)
+        pad = (-offset) % _ALIGN
+        if pad:
+            blobs.append(np.zeros(pad, dtype=np.uint8))
+            offset += pad
+        start = offset
+        blobs.append(arr.reshape(-1))
+        offset += arr.nbytes
+        return [start, *arr.shape]
+
+    skipped = 0
+    for path in _source_pngs(src_dir):
+        bgr = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if bgr is None:
+            skipped += 1
+            continue
+        gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        key = normalize_path(path.as_posix())
+        entries[key] = {"bgr": _append(bgr), "gray": _append(gray)}
+
+    header = {
+        "format": _FORMAT_VERSION,
+        "source_dir": normalize_path(src_dir),
+        "source_hash": compute_source_hash(src_dir),
+        "source_manifest": compute_source_manifest(src_dir),
+        "source_digests": compute_source_digests(src_dir),
+        "entries": entries,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    prefix_len = len(MAGIC) + 8 + len(header_bytes)
+    data_start = prefix_len + ((-prefix_len) % _ALIGN)
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (data_start - prefix_len))
+        for blob in blobs:
+            f.write(blob.tobytes())
+    tmp.replace(out)
+    logger.info(
+        "模板资源包已生成: {} (模板 {} 个, 数据 {:.1f}MB, 跳过 {})",
+        out, len(entries), offset / 1024 / 1024, skipped,
+    )
+    return header
+
+
+# ── 运行时 ──
+
+
+def _is_fresh(header: dict, source_dir: str) -> bool:
+    """源目录与包内清单是否一致：路径集合与大小必须相同，mtime 不同的文件按内容哈希确认。"""
+    recorded = header.get("source_manifest")
+    digests = header.get("source_digests") or {}
+    if not isinstance(recorded, dict):
+        return False
+    current = compute_source_manifest(source_dir)
+    if current.keys() != recorded.keys():
+        return False
+    root = Path(source_dir)
+    for rel, (size, mtime_ns) in current.items():
+        rec_size, rec_mtime_ns = recorded[rel]
+        if size != rec_size:
+            return False
+        if mtime_ns != rec_mtime_ns and digests.get(rel) != _file_digest(root / rel):
+            return False
+    return True
+
+
+class TemplateBundle:
+    """只读内存映射的模板资源包。"""
+
+    def __init__(self, path: str, header: dict, data: np.memmap) -> None:
+        self.path = path
+        self.header = header
+        self._entries: Dict[str, dict] = header.get("entries", {})
+        self._data = data
+
+    @classmethod
+    def open(cls, path: str) -> "TemplateBundle":
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是模板资源包: {path}")
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        if header.get("format") != _FORMAT_VERSION:
+            raise ValueError(f"模板资源包格式不兼容: {header.get('format')}")
+        prefix_len = len(MAGIC) + 8 + header_len
+        data_start = prefix_len + ((-prefix_len) % _ALIGN)
+        data = np.memmap(path, dtype=np.uint8, mode="r", offset=data_start)
+        return cls(path, header, data)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, str) and normalize_path(path) in self._entries
+
+    def _view(self, spec: List[int]) -> np.ndarray:
+        start, *shape = spec
+        size = int(np.prod(shape))
+        return self._data[start:start + size].reshape(shape)
+
+    def bgr(self, path: str) -> Optional[np.ndarray]:
+        entry = self._entries.get(normalize_path(path))
+        return self._view(entry["bgr"]) if entry else None
+
+    def gray(self, path: str) -> Optional[np.ndarray]:
+        entry = self._entries.get(normalize_path(path))
+        return self._view(entry["gray"]) if entry else None
+
+    def paths(self) -> List[str]:
+        return sorted(self._entries)
+
+    def glob(self, directory: str, pattern: str) -> List[str]:
+        """在包索引中按 directory/pattern 匹配（不递归子目录，与 Path.glob 一致）。"""
+        prefix = normalize_path(directory).rstrip("/") + "/"
+        result = []
+        for key in self._entries:
+            if not key.startswith(prefix):
+                continue
+            name = key[len(prefix):]
+            if "/" not in name and fnmatch.fnmatchcase(name, pattern):
+                result.append(key)
+        return sorted(result)
+
+
+_bundle: Optional[TemplateBundle] = None
+_bundle_checked = False
+_bundle_lock = threading.Lock()
+
+
+def get_template_bundle() -> Optional[TemplateBundle]:
+    """获取已校验的模板资源包；未启用、不存在或已过期时返回 None（回退按路径加载）。"""
+    global _bundle, _bundle_checked
+    if _bundle_checked:
+        return _bundle
+    with _bundle_lock:
+        if _bundle_checked:
+            return _bundle
+        _bundle_checked = True
+        if not settings.vision_template_bundle_enabled:
+            return None
+        path = settings.vision_template_bundle_path
+        if not Path(path).is_file():
+            return None
+        try:
+            bundle = TemplateBundle.open(path)
+        except Exception as e:
+            logger.warning("模板资源包加载失败，回退按路径加载: {}", e)
+            return None
+        source_dir = bundle.header.get("source_dir", BUNDLE_SOURCE_DIR)
+        if Path(source_dir).is_dir():
+            if not _is_fresh(bundle.header, source_dir):
+                logger.warning(
+                    "模板资源包已过期（{} 下 PNG 有增删改，或包内缺少文件清单），回退按路径加载；"
+                    "请重新执行 python -m app.modules.vision.template_bundle build",
+                    source_dir,
+                )
+                return None
+        _bundle = bundle
+        logger.info("模板资源包已映射: {} (模板 {} 个)", path, len(bundle))
+        return _bundle
+
+
+def reset_template_bundle() -> None:
+    """丢弃已映射的资源包，下次访问时重新校验（测试 / 重新构建后使用）。"""
+    global _bundle, _bundle_checked
+    with _bundle_lock:
+        _bundle = None
+        _bundle_checked = False
+
+
+def glob_templates(directory: str, pattern: str) -> List[str]:
+    """模板自动发现：优先查询资源包索引，未启用时 glob 文件系统。返回排序后的 posix 路径。"""
+    bundle = get_template_bundle()
+    if bundle is not None:
+        return bundle.glob(directory, pattern)
+    return sorted(p.as_posix() for p in Path(directory).glob(pattern))
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="模板资源包工具")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    build = sub.add_parser("build", help="编译 assets/ui 下的 PNG 为内存映射资源包")
+    build.add_argument("--src", default=BUNDLE_SOURCE_DIR)
+    build.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+    if args.cmd == "build":
+        header = build_bundle(args.src, args.out)
+        print(f"templates={len(header['entries'])} source_hash={header['source_hash'][:12]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
+
+
+__all__ = [
+    "TemplateBundle",
+    "build_bundle",
+    "compute_source_digests",
+    "compute_source_hash",
+    "compute_source_manifest",
+    "get_template_bundle",
+    "glob_templates",
+    "normalize_path",
+    "reset_template_bundle",
+]
@@ -0,0 +1,305 @@
+"""
+模板匹配性能画像（按需开启）
+
+assets/ui 下有数百张模板，检测器逐个盲目匹配。开启后 match_template /
+find_all_templates / StateClassifier 每次匹配按模板路径累计：
+
+- 调用次数、累计 / 最大耗时
+- 命中次数（score >= 阈值）与最佳得分分布（0.1 一档，共 10 档）
+- 整帧搜索的面积与命中位置的外接框（整帧坐标），用于判断是否值得加 ROI；
+  在 ROI 内搜索的调用（检测器 / 弹窗 / 状态分类器按 ROI 切片）只计次数
+
+report() 输出三类清单，用于裁剪 / 限制最耗 CPU 的模板集合：
+
+- expensive：累计耗时最高的模板
+- never_matched：被调用过但从未命中的模板（unused：assets/ui 中从未被调用的模板）
+- roi_candidates：只在整帧上搜索（从未带 ROI）、命中位置却集中在一小块区域的模板，
+  给出整帧坐标的建议 ROI
+
+开启方式：VISION_TEMPLATE_PROFILE_ENABLED=true，或运行时调用
+POST /api/executor/template-profile/enable。画像定期写入 JSON 快照，离线查看::
+
+    python -m app.modules.vision.template_profile report [--file PATH] [--top 20]
+
+只统计主进程内的匹配；compute backend=process 时进程池中执行的匹配不计入。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ...core.config import settings
+from ...core.logger import logger
+from .template_bundle import BUNDLE_SOURCE_DIR, normalize_path
+
+SCORE_BINS = 10
+# ROI 建议：命中框四周留白（像素）
+ROI_MARGIN = 16
+# ROI 建议：调用 / 命中次数下限，样本太少时不给建议
+ROI_MIN_CALLS = 20
+ROI_MIN_HITS = 3
+# ROI 建议：建议区域占平均搜索面积的比例上限
+ROI_MAX_AREA_RATIO = 0.25
+
+_IS_MAIN_PROCESS = multiprocessing.parent_process() is None
+
+
+def _empty_stats() -> dict:
+    return {
+        "calls": 0,
+        "hits": 0,
+        "total_sec": 0.0,
+        "max_sec": 0.0,
+        "best_score": None,
+        "score_bins": [0] * SCORE_BINS,
+        "roi_calls": 0,
+        "frame_area_sum": 0,
+        "frame_max": [0, 0],
+        "hit_box": None,
+    }
+
+
+def _score_bin(score: float) -> int:
+    return min(SCORE_BINS - 1, max(0, int(score * SCORE_BINS)))
+
+
+class TemplateProfiler:
+    """按模板路径累计匹配开销（线程安全；未开启时 record 不会被调用）。"""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = bool(enabled) and _IS_MAIN_PROCESS
+        self._stats: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._since = datetime.utcnow()
+        self._last_save = time.monotonic()
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.enabled = bool(enabled) and _IS_MAIN_PROCESS
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._since = datetime.utcnow()
+
+    def record(
+        self,
+        template: str,
+        elapsed: float,
+        *,
+        score: float,
+        hit: bool,
+        frame: Tuple[int, int],
+        box: Tuple[int, int, int, int],
+        roi: Optional[Tuple[int, int, int, int]] = None,
+    ) -> None:
+        """记录一次匹配：frame 为整帧 (h, w)，box 为最佳位置 (x, y, w, h)，roi 为搜索区域。
+
+        box / roi 均为整帧坐标；roi 为 None 表示在整帧上搜索。
+        """
+        key = normalize_path(template)
+        frame_h, frame_w = int(frame[0]), int(frame[1])
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _empty_stats()
+            stats["calls"] += 1
+            stats["total_sec"] += elapsed
+            if elapsed > stats["max_sec"]:
+                stats["max_sec"] = elapsed
+            if stats["best_score"] is None or score > stats["best_score"]:
+                stats["best_score"] = score
+            stats["score_bins"][_score_bin(score)] += 1
+            if hit:
+                stats["hits"] += 1
+            if roi is not None:
+                stats["roi_calls"] += 1
+            else:
+                stats["frame_area_sum"] += frame_w * frame_h
+                stats["frame_max"] = [max(stats["frame_max"][0], frame_w), max(stats["frame_max"][1], frame_h)]
+                if hit:
+                    x, y, w, h = box
+                    prev = stats["hit_box"]
+                    if prev is None:
+                        stats["hit_box"] = [x, y, x + w, y + h]
+                    else:
+                        stats["hit_box"] = [min(prev[0], x), min(prev[1], y), max(prev[2], x + w), max(prev[3], y + h)]
+        self._maybe_save()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            templates = {k: {**v, "score_bins": list(v["score_bins"])} for k, v in self._stats.items()}
+            since = self._since
+        return {"since": since.isoformat(), "templates": templates}
+
+    # ── 快照持久化 ──
+
+    def save(self, path: Optional[str] = None) -> str:
+        path = path or settings.vision_template_profile_path
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.snapshot(), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, target)
+        return str(target)
+
+    def _maybe_save(self) -> None:
+        interval = float(getattr(settings, "vision_template_profile_save_interval_sec", 60))
+        now = time.monotonic()
+        if interval <= 0 or now - self._last_save < interval:
+            return
+        self._last_save = now
+        try:
+            self.save()
+        except Exception as e:
+            logger.warning("模板画像快照写入失败: {}", e)
+
+    def report(self, *, top: int = 20, source_dir: Optional[str] = BUNDLE_SOURCE_DIR) -> dict:
+        return build_report(self.snapshot(), top=top, source_dir=source_dir)
+
+
+def _suggest_roi(stats: dict) -> Optional[dict]:
+    # 已有调用方带 ROI 搜索的模板不再建议；命中 / 面积只统计整帧搜索
+    if stats.get("roi_calls", 0) > 0 or stats["hit_box"] is None:
+        return None
+    full_calls = stats["calls"]
+    if full_calls < ROI_MIN_CALLS or stats["hits"] < ROI_MIN_HITS:
+        return None
+    frame_w, frame_h = stats["frame_max"]
+    x0, y0, x1, y1 = stats["hit_box"]
+    x0, y0 = max(0, x0 - ROI_MARGIN), max(0, y0 - ROI_MARGIN)
+    x1, y1 = min(frame_w, x1 + ROI_MARGIN), min(frame_h, y1 + ROI_MARGIN)
+    mean_area = stats["frame_area_sum"] / full_calls
+    if mean_area <= 0:
+        return None
+    ratio = (x1 - x0) * (y1 - y0) / mean_area
+    if ratio > ROI_MAX_AREA_RATIO:
+        return None
+    return {
+        "roi": [x0, y0, x1 - x0, y1 - y0],
+        "area_ratio": round(ratio, 3),
+        # matchTemplate 开销近似与搜索面积成正比
+        "est_saving_ms": round(stats["total_sec"] * (1 - ratio) * 1000, 1),
+    }
+
+
+def _row(path: str, stats: dict) -> dict:
+    calls = stats["calls"]
+    return {
+        "template": path,
+        "calls": calls,
+        "hits": stats["hits"],
+        "hit_rate": round(stats["hits"] / calls, 4) if calls else 0.0,
+        "total_ms": round(stats["total_sec"] * 1000, 1),
+        "avg_ms": round(stats["total_sec"] / calls * 1000, 3) if calls else 0.0,
+        "max_ms": round(stats["max_sec"] * 1000, 3),
+        "best_score": None if stats["best_score"] is None else round(stats["best_score"], 4),
+        "score_bins": stats["score_bins"],
+    }
+
+
+def build_report(snapshot: dict, *, top: int = 20, source_dir: Optional[str] = BUNDLE_SOURCE_DIR) -> dict:
+    """根据画像快照生成报告（live 画像与 JSON 快照共用）。"""
+    templates: Dict[str, dict] = snapshot.get("templates") or {}
+    rows = [_row(path, stats) for path, stats in templates.items()]
+    expensive = sorted(rows, key=lambda r: r["total_ms"], reverse=True)[: max(0, top)]
+    never_matched = sorted(
+        (r for r in rows if r["hits"] == 0), key=lambda r: r["total_ms"], reverse=True
+    )
+    roi_candidates = []
+    for path, stats in templates.items():
+        suggestion = _suggest_roi(stats)
+        if suggestion is not None:
+            roi_candidates.append({"template": path, "calls": stats["calls"], "hits": stats["hits"], **suggestion})
+    roi_candidates.sort(key=lambda r: r["est_saving_ms"], reverse=True)
+
+    unused: Optional[List[str]] = None
+    if source_dir and Path(source_dir).is_dir():
+        seen = set(templates)
+        unused = [
+            p for p in (normalize_path(png.as_posix()) for png in sorted(Path(source_dir).rglob("*.png")))
+            if p not in seen
+        ]
+
+    total_sec = sum(s["total_sec"] for s in templates.values())
+    return {
+        "since": snapshot.get("since"),
+        "templates": len(templates),
+        "total_calls": sum(s["calls"] for s in templates.values()),
+        "total_ms": round(total_sec * 1000, 1),
+        "expensive": expensive,
+        "never_matched": never_matched,
+        "unused": unused,
+        "roi_candidates": roi_candidates,
+    }
+
+
+template_profiler = TemplateProfiler(
+    enabled=bool(getattr(settings, "vision_template_profile_enabled", False))
+)
+
+
+def _print_report(report: dict) -> None:
+    print(
+        f"since={report['since']} templates={report['templates']} "
+        f"calls={report['total_calls']} total_ms={report['total_ms']}"
+    )
+    print("\n[expensive]")
+    for r in report["expensive"]:
+        print(
+            f"  {r['total_ms']:>10.1f}ms  calls={r['calls']:<6} avg={r['avg_ms']:.3f}ms "
+            f"hit_rate={r['hit_rate']:.2%}  {r['template']}"
+        )
+    print(f"\n[never_matched] {len(report['never_matched'])}")
+    for r in report["never_matched"]:
+        print(f"  calls={r['calls']:<6} best_score={r['best_score']}  {r['template']}")
+    if report["unused"] is not None:
+        print(f"\n[unused] {len(report['unused'])}")
+        for path in report["unused"]:
+            print(f"  {path}")
+    print(f"\n[roi_candidates] {len(report['roi_candidates'])}")
+    for r in report["roi_candidates"]:
+        print(
+            f"  roi={tuple(r['roi'])} area_ratio={r['area_ratio']} "
+            f"est_saving={r['est_saving_ms']}ms  {r['template']}"
+        )
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="模板匹配性能画像报告")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    rep = sub.add_parser("report", help="读取画像快照并输出报告")
+    rep.add_argument("--file", default=None, help="画像快照路径（默认 VISION_TEMPLATE_PROFILE_PATH）")
+    rep.add_argument("--top", type=int, default=20)
+    rep.add_argument("--src", default=BUNDLE_SOURCE_DIR, help="模板目录（用于列出从未调用的模板）")
+    rep.add_argument("--json", action="store_true", help="输出 JSON")
+    args = parser.parse_args(argv)
+    if args.cmd == "report":
+        path = Path(args.file or settings.vision_template_profile_path)
+        if not path.is_file():
+            print(f"画像快照不存在: {path}（需开启 VISION_TEMPLATE_PROFILE_ENABLED 并运行一段时间）")
+            return 1
+        snapshot = json.loads(path.read_text(encoding="utf-8"))
+        report = build_report(snapshot, top=args.top, source_dir=args.src)
+        if args.json:
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+        else:
+            _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
+
+
+__all__ = [
+    "TemplateProfiler",
+    "build_report",
+    "template_profiler",
+]
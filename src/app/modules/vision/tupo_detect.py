@@ -17,6 +17,7 @@ import cv2
 import numpy as np
 
 from .template import match_template
+from .loop_guard import off_loop
 from .utils import ImageLike, load_image
 
 
@@ -125,6 +126,7 @@ def _build_card_layouts() -> List[dict]:
 _CARD_LAYOUTS = _build_card_layouts()
 
 
+@off_loop
 def detect_tupo_grid(
     image: ImageLike,
     *,
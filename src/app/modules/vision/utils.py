@@ -19,7 +19,8 @@ _IMAGE_PATH_CACHE: dict[str, np.ndarray] = {}
 def load_image(img: ImageLike) -> np.ndarray:
     """Load an image into a BGR numpy array.
 
-    - str: treated as a file path and loaded via cv2.imread
+    - str: treated as a file path; served from the memory-mapped template
+      bundle when present, otherwise loaded via cv2.imread
     - bytes: decoded via cv2.imdecode
     - np.ndarray: returned as-is (assumed BGR or single-channel)
     """
@@ -32,6 +33,13 @@ def load_image(img: ImageLike) -> np.ndarray:
             raise ValueError("Failed to decode image bytes")
         return mat
     if isinstance(img, str):
+        from .template_bundle import get_template_bundle
+
+        bundle = get_template_bundle()
+        if bundle is not None:
+            mat = bundle.bgr(img)
+            if mat is not None:
+                return mat
         if not os.path.isfile(img):
             raise FileNotFoundError(f"Image file not found: {img}")
         if img in _IMAGE_PATH_CACHE:
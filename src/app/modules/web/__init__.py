@@ -3,7 +3,7 @@ Web API模块
 """
 from fastapi import FastAPI
 from .routers import accounts, tasks, dashboard, emulators, coop
-from .routers import emulators_test, system, executor, account_pull, auth
+from .routers import emulators_test, system, executor, account_pull, auth, metrics
 
 
 def register_routers(app: FastAPI):
@@ -18,6 +18,7 @@ def register_routers(app: FastAPI):
     app.include_router(system.router)
     app.include_router(executor.router)
     app.include_router(account_pull.router)
+    app.include_router(metrics.router)
 
 
 __all__ = ["register_routers"]
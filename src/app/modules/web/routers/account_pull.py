@@ -16,7 +16,8 @@ from ....core.config import settings
 from copy import deepcopy
 from ....core.constants import AccountStatus, DEFAULT_INIT_TASK_CONFIG, build_default_task_config, build_default_explore_progress
 from ...emu.adb import Adb
-from ...emu.adapter import AdapterConfig, EmulatorAdapter
+from ...emu.adapter import AdapterConfig
+from ...emu.registry import adapter_registry
 
 
 router = APIRouter(prefix="/api/account-pull", tags=["account-pull"])
@@ -227,8 +228,8 @@ async def push_account_data(
     )
 
     try:
-        adapter = EmulatorAdapter(cfg)
-        ok = adapter.push_login_data(req.account_id, data_dir=base_dir)
+        with adapter_registry.lease(cfg) as adapter:
+            ok = adapter.push_login_data(req.account_id, data_dir=base_dir)
         if not ok:
             return PushResponse(
                 success=False,
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta, time
 import random
 
 from ....db.base import get_db
+from ....db.json_patch import merge_json_updates, patch_task_config
 from sqlalchemy import or_
 from ....db.models import (
     GameAccount,
@@ -172,6 +173,22 @@ def _merge_task_config_with_defaults(task_config: Any, fail_delays: dict = None,
     return merged_config
 
 
+def _task_config_fill_updates(task_config: Any, normalized: Dict[str, Any]) -> Dict[str, Any]:
+    """计算 task_config 规范化时需要补写的字段（缺失的任务 / 任务内缺失的字段）。"""
+    if not isinstance(task_config, dict):
+        return normalized
+    updates: Dict[str, Any] = {}
+    for key, value in normalized.items():
+        current = task_config.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            missing = {f: v for f, v in value.items() if f not in current}
+            if missing:
+                updates[key] = missing
+        elif key not in task_config:
+            updates[key] = value
+    return updates
+
+
 @router.get("")
 async def get_accounts(db: Session = Depends(get_db)):
     """
@@ -187,9 +204,10 @@ async def get_accounts(db: Session = Depends(get_db)):
         normalized_task_config = _merge_task_config_with_defaults(
             account.task_config, fail_delays=fail_delays, progress=account.progress
         )
-        if account.task_config != normalized_task_config:
-            account.task_config = normalized_task_config
-            account.updated_at = datetime.utcnow()
+        fill_updates = _task_config_fill_updates(account.task_config, normalized_task_config)
+        if fill_updates:
+            # 只补写缺失的默认字段，不整块回写（避免覆盖 Worker 并发更新的 next_time）
+            patch_task_config(db, account.id, fill_updates)
             need_commit = True
 
         rc = account.rest_config
@@ -385,21 +403,10 @@ async def update_task_config(
         logger.warning(f"更新账号 {account.login_id} 任务配置：请求体为空，忽略本次更新")
         return {"message": "任务配置未变更", "config": merged_config}
 
-    # 合并更新字段
-    for key, value in update_dict.items():
-        if value is None:
-            continue
-        if isinstance(value, dict):
-            base_value = merged_config.get(key, {})
-            if not isinstance(base_value, dict):
-                base_value = {}
-            base_value.update(value)
-            merged_config[key] = base_value
-        else:
-            merged_config[key] = value
-
-    account.task_config = merged_config
-    account.updated_at = datetime.utcnow()
+    # 只写入显式传入的字段：数据库端局部更新，不覆盖 Worker 并发写入的 next_time 等字段
+    updates = {key: value for key, value in update_dict.items() if value is not None}
+    merged_config = merge_json_updates(merged_config, updates)
+    patch_task_config(db, account_id, updates)
     db.commit()
 
     logger.info(f"更新账号 {account.login_id} 任务配置")
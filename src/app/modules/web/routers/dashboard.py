@@ -259,6 +259,7 @@ async def get_dashboard(db: Session = Depends(get_db)):
         "mode": mode,
         "engine": "cloud_poller_executor" if mode == "cloud" else "feeder_executor",
         "feeder": feeder.metrics_snapshot(),
+        "queue_drain": executor_service.predict_drain(),
         "cloud_jobs_preview": cloud_jobs_preview,
     }
 
@@ -9,6 +9,7 @@ from pydantic import BaseModel
 from ....db.base import get_db
 from ....db.models import Emulator
 from ....core.logger import logger
+from ...emu.registry import adapter_registry
 
 
 router = APIRouter(prefix="/api/emulators", tags=["emulators"])
@@ -106,6 +107,8 @@ async def update_emulator(
             detail="模拟器不存在"
         )
     
+    old_addr = emulator.adb_addr
+
     # 更新字段
     if update.name is not None:
         emulator.name = update.name
@@ -119,6 +122,9 @@ async def update_emulator(
         emulator.state = update.state
     
     db.commit()
+    # 地址 / 实例变更后旧连接不再有效
+    if old_addr and (update.adb_addr is not None or update.instance_id is not None):
+        adapter_registry.invalidate(old_addr)
     
     logger.info(f"更新模拟器: {emulator.name}")
     
@@ -142,6 +148,8 @@ async def delete_emulator(
     
     db.delete(emulator)
     db.commit()
+    if emulator.adb_addr:
+        adapter_registry.invalidate(emulator.adb_addr)
     
     logger.info(f"删除模拟器: {emulator.name}")
     
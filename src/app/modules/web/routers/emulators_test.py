@@ -12,9 +12,12 @@ from ....db.base import get_db
 from ....db.models import Emulator
 from ....core.config import settings
 from ....core.logger import logger
+from ....core.thread_pool import run_in_emulator_io, run_in_io
 from ....db.models import SystemConfig
 from ...emu.adapter import EmulatorAdapter, AdapterConfig
 from ...emu.adb import AdbError
+from ...emu.frame_ring import encode_png, get_frame_ring, latest_frame
+from ...emu.registry import adapter_registry
 from ...emu.manager import MuMuManagerError
 from ...emu.ipc import IpcNotConfigured
 import os
@@ -128,13 +131,35 @@ async def refresh_emulator_status(db: Session = Depends(get_db)):
     }
 
 
+def _png_response(record) -> StreamingResponse:
+    return StreamingResponse(
+        io.BytesIO(encode_png(record.image)),
+        media_type="image/png",
+        headers={
+            "X-Frame-Seq": str(record.seq),
+            "X-Frame-Age-Ms": f"{record.age_ms:.0f}",
+        },
+    )
+
+
 @router.get("/{emulator_id}/screenshot")
-async def emulator_screenshot(emulator_id: int, method: str = "adb", db: Session = Depends(get_db)):
+async def emulator_screenshot(
+    emulator_id: int,
+    method: str = "adb",
+    max_age_ms: int = 0,
+    db: Session = Depends(get_db),
+):
     """获取截图（PNG）。支持 method=adb|ipc（ipc 需配置 DLL）。
+    max_age_ms > 0 时优先返回帧环形缓冲中不超过该时长的最近帧（不额外截图，
+    不与运行中的任务争抢截图），编码在 I/O 线程池执行。
     按你的要求，不捕获异常，直接将错误抛出，配合 FastAPI debug=True 便于直接看到堆栈。
     同时：如果在 DB 配置了 python_path，则自动追加到 sys.path，方便导入本地 module.base。
     """
     emu = _get_emulator_or_404(db, emulator_id)
+    if max_age_ms > 0:
+        record = latest_frame(emu.adb_addr, max_age_ms=max_age_ms)
+        if record is not None:
+            return await run_in_io(_png_response, record)
     syscfg = db.query(SystemConfig).first()
     # 动态扩展 Python 搜索路径（可在系统配置中填写 D:\multi 等）
     if syscfg and getattr(syscfg, "python_path", None):
@@ -153,11 +178,29 @@ async def emulator_screenshot(emulator_id: int, method: str = "adb", db: Session
         instance_id=getattr(emu, "instance_id", None),
         activity_name=(syscfg.activity_name if syscfg and syscfg.activity_name else settings.activity_name),
     )
-    adapter = EmulatorAdapter(cfg)
-    out = adapter.capture(method=method)
+    with adapter_registry.lease(cfg) as adapter:
+        out = await run_in_emulator_io(emu.adb_addr, adapter.capture, method)
     return StreamingResponse(io.BytesIO(out), media_type="image/png")
 
 
+@router.get("/{emulator_id}/frames")
+async def emulator_frames(emulator_id: int, db: Session = Depends(get_db)):
+    """列出帧环形缓冲中的最近帧（时间戳、帧龄、截图后执行的操作）。"""
+    emu = _get_emulator_or_404(db, emulator_id)
+    records = get_frame_ring(emu.adb_addr).snapshot()
+    return {"adb_addr": emu.adb_addr, "frames": [r.meta() for r in records]}
+
+
+@router.get("/{emulator_id}/frames/{seq}")
+async def emulator_frame(emulator_id: int, seq: int, db: Session = Depends(get_db)):
+    """按序号取环形缓冲中的一帧（PNG），已被覆盖时返回 404。"""
+    emu = _get_emulator_or_404(db, emulator_id)
+    for record in get_frame_ring(emu.adb_addr).snapshot():
+        if record.seq == seq:
+            return await run_in_io(_png_response, record)
+    raise HTTPException(status_code=404, detail="帧已不在缓冲中")
+
+
 @router.post("/{emulator_id}/click")
 async def emulator_click(emulator_id: int, body: ClickRequest, db: Session = Depends(get_db)):
     """通过 ADB 向设备注入点击。"""
@@ -175,9 +218,9 @@ async def emulator_click(emulator_id: int, body: ClickRequest, db: Session = Dep
         instance_id=getattr(emu, "instance_id", None),
         activity_name=(sys.activity_name if sys and sys.activity_name else settings.activity_name),
     )
-    adapter = EmulatorAdapter(cfg)
     try:
-        adapter.tap(body.x, body.y)
+        with adapter_registry.lease(cfg) as adapter:
+            await run_in_emulator_io(emu.adb_addr, adapter.tap, body.x, body.y)
     except AdbError as e:
         logger.error(f"ADB 点击失败: {e}")
         raise HTTPException(status_code=502, detail="ADB 点击失败")
@@ -352,8 +395,8 @@ async def emulator_ocr(emulator_id: int, body: OcrRequest, db: Session = Depends
         instance_id=getattr(emu, "instance_id", None),
         activity_name=(syscfg.activity_name if syscfg and syscfg.activity_name else settings.activity_name),
     )
-    adapter = EmulatorAdapter(cfg)
-    screenshot = adapter.capture(method=body.method)
+    with adapter_registry.lease(cfg) as adapter:
+        screenshot = await run_in_emulator_io(emu.adb_addr, adapter.capture, body.method)
 
     roi = (body.x, body.y, body.w, body.h) if body.w > 0 and body.h > 0 else None
 
@@ -1,10 +1,16 @@
 """
 Executor status API
 """
-from fastapi import APIRouter
+from typing import Optional
 
+from fastapi import APIRouter, Query
+
+from ....core.loop_monitor import loop_monitor
+from ....core.thread_pool import run_in_io
+from ...executor.durations import duration_stats
 from ...executor.service import executor_service
 from ...tasks.feeder import feeder
+from ...vision.template_profile import template_profiler
 
 
 router = APIRouter(prefix="/api/executor", tags=["executor"])
@@ -27,3 +33,54 @@ async def get_executor_metrics():
         "executor": executor_service.metrics_snapshot(),
         "feeder": feeder.metrics_snapshot(),
     }
+
+
+@router.get("/durations")
+async def get_executor_durations(
+    task_type: Optional[str] = Query(None, description="任务类型"),
+    account_id: Optional[int] = Query(None, description="账号ID"),
+    emulator_id: Optional[int] = Query(None, description="模拟器ID"),
+):
+    return {
+        "durations": duration_stats.snapshot(
+            task_type, account_id=account_id, emulator_id=emulator_id
+        ),
+        "drain": executor_service.predict_drain(),
+    }
+
+
+@router.get("/loop")
+async def get_executor_loop(
+    top: int = Query(20, ge=1, le=200, description="返回的阻塞调用位置数"),
+):
+    """事件循环调度延迟与阻塞调用排行（按累计阻塞时长降序）。"""
+    return loop_monitor.snapshot(top=top)
+
+
+@router.post("/loop/reset")
+async def reset_executor_loop():
+    loop_monitor.reset()
+    return {"ok": True}
+
+
+@router.get("/template-profile")
+async def get_template_profile(
+    top: int = Query(20, ge=1, le=500, description="最耗时模板返回条数"),
+):
+    """模板匹配性能画像：最耗时模板、从未命中 / 从未调用的模板、ROI 建议。"""
+    report = await run_in_io(lambda: template_profiler.report(top=top))
+    return {"enabled": template_profiler.enabled, **report}
+
+
+@router.post("/template-profile/enable")
+async def enable_template_profile(
+    enabled: bool = Query(True, description="是否开启模板画像"),
+):
+    template_profiler.set_enabled(enabled)
+    return {"ok": True, "enabled": template_profiler.enabled}
+
+
+@router.post("/template-profile/reset")
+async def reset_template_profile():
+    template_profiler.reset()
+    return {"ok": True}
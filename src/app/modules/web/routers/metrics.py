@@ -0,0 +1,23 @@
+"""
+Prometheus 指标导出
+"""
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from ....core.config import settings
+from ....core.metrics import metrics
+# 导入以注册执行器 / Feeder 的抓取回调
+from ...executor import service as _executor_service  # noqa: F401
+from ...tasks import feeder as _feeder  # noqa: F401
+
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    if not getattr(settings, "metrics_endpoint_enabled", False):
+        raise HTTPException(status_code=404, detail="指标导出未开启")
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
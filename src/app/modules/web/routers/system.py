@@ -179,7 +179,9 @@ async def update_settings(body: SystemSettingsUpdate, db: Session = Depends(get_
 async def benchmark_capture_method(body: CaptureBenchmarkRequest, db: Session = Depends(get_db)):
     """检测选中模拟器截图延迟并自动选择最优方式（全局）。"""
     from ....db.models import Emulator
-    from ...emu.adapter import AdapterConfig, EmulatorAdapter
+    from ...emu.adapter import AdapterConfig
+    from ...emu.registry import adapter_registry
+    from ....core.thread_pool import run_in_emulator_io
 
     emulator = db.query(Emulator).filter(Emulator.id == body.emulator_id).first()
     if not emulator:
@@ -200,38 +202,39 @@ async def benchmark_capture_method(body: CaptureBenchmarkRequest, db: Session =
         instance_id=getattr(emulator, "instance_id", None),
         activity_name=(syscfg.activity_name if syscfg and syscfg.activity_name else settings.activity_name),
     )
-    adapter = EmulatorAdapter(cfg)
-
     candidates = ["adb"]
     if cfg.ipc_dll_path and cfg.nemu_folder and cfg.instance_id is not None:
         candidates.append("ipc")
 
-    metrics = {}
-    for method in candidates:
-        latencies = []
-        errors = []
-        for _ in range(rounds):
-            t0 = time.perf_counter()
-            try:
-                data = adapter.capture(method=method)
-                if not data:
-                    raise RuntimeError("empty image")
-                elapsed_ms = (time.perf_counter() - t0) * 1000.0
-                latencies.append(elapsed_ms)
-            except Exception as e:
-                errors.append(str(e))
-
-        sorted_l = sorted(latencies)
-        p50 = sorted_l[int(0.5 * (len(sorted_l) - 1))] if sorted_l else None
-        p95 = sorted_l[int(0.95 * (len(sorted_l) - 1))] if sorted_l else None
-        metrics[method] = {
-            "success": len(latencies),
-            "failed": len(errors),
-            "success_rate": (len(latencies) / rounds) if rounds else 0.0,
-            "p50_ms": round(p50, 2) if p50 is not None else None,
-            "p95_ms": round(p95, 2) if p95 is not None else None,
-            "errors": errors[:3],
-        }
+    # 复用注册表中的长期 adapter：IPC 连接已建立时测得的是运行期的真实延迟；
+    # lease 保证异常 / 取消时也会归还引用
+    with adapter_registry.lease(cfg) as adapter:
+        metrics = {}
+        for method in candidates:
+            latencies = []
+            errors = []
+            for _ in range(rounds):
+                t0 = time.perf_counter()
+                try:
+                    data = await run_in_emulator_io(emulator.adb_addr, adapter.capture, method)
+                    if not data:
+                        raise RuntimeError("empty image")
+                    elapsed_ms = (time.perf_counter() - t0) * 1000.0
+                    latencies.append(elapsed_ms)
+                except Exception as e:
+                    errors.append(str(e))
+
+            sorted_l = sorted(latencies)
+            p50 = sorted_l[int(0.5 * (len(sorted_l) - 1))] if sorted_l else None
+            p95 = sorted_l[int(0.95 * (len(sorted_l) - 1))] if sorted_l else None
+            metrics[method] = {
+                "success": len(latencies),
+                "failed": len(errors),
+                "success_rate": (len(latencies) / rounds) if rounds else 0.0,
+                "p50_ms": round(p50, 2) if p50 is not None else None,
+                "p95_ms": round(p95, 2) if p95 is not None else None,
+                "errors": errors[:3],
+            }
 
     ranked = sorted(
         candidates,
@@ -1,20 +1,24 @@
 """
 任务管理API
 """
+import asyncio
 import json
 from collections import deque
 from typing import Optional
 from pathlib import Path
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, WebSocket, WebSocketDisconnect, status
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy import desc
 from datetime import datetime, timedelta
 
 from ....db.base import get_db
-from ....db.models import Task, GameAccount, TaskRun
-from ....core.constants import TaskStatus
+from ....db.models import GameAccount, TaskRunRecord
 from ....core.config import settings
+from ....core.runtime_log import RUNTIME_MODULES, RuntimeLogFilter, get_runtime_log_store
+from ....core.thread_pool import run_in_io
+from ....core.timeutils import beijing_to_utc, now_beijing
 from ...tasks.feeder import feeder
+from ...executor.run_ledger import GRANULARITY_HOUR, GRANULARITY_MINUTE, run_ledger
 from ...executor.service import executor_service
 from ...cloud import cloud_task_poller, scan_task_poller, runtime_mode_state, CloudApiError
 
@@ -49,60 +53,55 @@ async def get_task_history(
     db: Session = Depends(get_db),
 ):
     """
-    获取执行历史
+    获取执行历史（任务运行流水，日期按北京时间）
     """
-    query = (
-        db.query(
-            TaskRun,
-            Task,
-            GameAccount.login_id.label("account_login_id"),
-        )
-        .join(Task, TaskRun.task_id == Task.id)
-        .outerjoin(GameAccount, GameAccount.id == Task.account_id)
-    )
+    query = db.query(
+        TaskRunRecord,
+        GameAccount.login_id.label("account_login_id"),
+    ).outerjoin(GameAccount, GameAccount.id == TaskRunRecord.account_id)
 
     # 应用过滤条件
     if account_id:
-        query = query.filter(Task.account_id == account_id)
+        query = query.filter(TaskRunRecord.account_id == account_id)
     if task_type:
-        query = query.filter(Task.type == task_type)
+        query = query.filter(TaskRunRecord.task_type == task_type)
     if status:
-        query = query.filter(TaskRun.status == status)
+        query = query.filter(TaskRunRecord.outcome == status)
     if start_date:
-        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-        query = query.filter(TaskRun.started_at >= start_dt)
+        start_dt = beijing_to_utc(datetime.strptime(start_date, "%Y-%m-%d"))
+        query = query.filter(TaskRunRecord.started_at >= start_dt)
     if end_date:
-        end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
-        query = query.filter(TaskRun.started_at < end_dt)
+        end_dt = beijing_to_utc(datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1))
+        query = query.filter(TaskRunRecord.started_at < end_dt)
 
     # 统计总数
     total = query.count()
 
     # 查询结果
     task_runs = (
-        query.order_by(desc(TaskRun.started_at)).limit(limit).offset(offset).all()
+        query.order_by(desc(TaskRunRecord.started_at)).limit(limit).offset(offset).all()
     )
 
     # 构建返回数据
     result = []
-    for run, task, account_login_id in task_runs:
+    for run, account_login_id in task_runs:
         result.append(
             {
                 "run_id": run.id,
-                "task_id": task.id,
-                "account_id": task.account_id,
+                "task_id": None,
+                "account_id": run.account_id,
                 "account_login_id": account_login_id,
-                "task_type": task.type,
+                "emulator_id": run.emulator_id,
+                "task_type": run.task_type,
                 "started_at": run.started_at.isoformat() if run.started_at else None,
                 "finished_at": run.finished_at.isoformat() if run.finished_at else None,
-                "status": run.status,
-                "duration": (
-                    (run.finished_at - run.started_at).total_seconds()
-                    if run.finished_at and run.started_at
-                    else None
-                ),
+                "status": run.outcome,
+                "duration": run.duration_sec,
                 "error_code": run.error_code,
-                "artifacts": run.artifacts,
+                "artifacts": {
+                    "capture_count": run.capture_count,
+                    "detect_count": run.detect_count,
+                },
             }
         )
 
@@ -112,36 +111,27 @@ async def get_task_history(
 @router.get("/stats")
 async def get_task_stats(db: Session = Depends(get_db)):
     """
-    获取任务统计信息
+    获取任务统计信息（今日数据读取运行流水的汇总表，北京时间自然日）
     """
-    today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-
-    status_rows = (
-        db.query(TaskRun.status, func.count(TaskRun.id))
-        .filter(TaskRun.started_at >= today_start)
-        .group_by(TaskRun.status)
-        .all()
+    today_start = beijing_to_utc(
+        now_beijing().replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
     )
-    status_map = {status: count for status, count in status_rows}
-    total = sum(status_map.values())
-
-    today_stats = {
-        "total": total,
-        "succeeded": int(status_map.get(TaskStatus.SUCCEEDED, 0)),
-        "failed": int(status_map.get(TaskStatus.FAILED, 0)),
-        "running": int(status_map.get(TaskStatus.RUNNING, 0)),
-    }
-
-    if today_stats["total"] > 0:
-        today_stats["success_rate"] = round(
-            today_stats["succeeded"] / today_stats["total"] * 100, 2
-        )
-    else:
-        today_stats["success_rate"] = 0
+    summary = run_ledger.summary(db, today_start)
+    overall = summary["overall"]
 
     queue_size = len(executor_service.queue_info())
     running_count = len(executor_service.running_info())
 
+    today_stats = {
+        "total": overall["total"],
+        "succeeded": overall["succeeded"],
+        "failed": overall["failed"],
+        "running": running_count,
+        "success_rate": overall["success_rate"],
+        "avg_duration": overall["avg_duration"],
+        "by_task_type": summary["task_types"],
+    }
+
     mode = runtime_mode_state.get_mode()
     return {
         "today": today_stats,
@@ -152,6 +142,25 @@ async def get_task_stats(db: Session = Depends(get_db)):
     }
 
 
+@router.get("/stats/timeseries")
+async def get_task_stats_timeseries(
+    granularity: str = Query(GRANULARITY_HOUR, description="粒度: minute|hour"),
+    hours: int = Query(24, ge=1, le=24 * 90, description="最近 N 小时"),
+    task_type: Optional[str] = Query(None, description="任务类型"),
+    db: Session = Depends(get_db),
+):
+    """
+    获取任务运行时间序列（bucket_start 为 UTC）
+    """
+    if granularity not in (GRANULARITY_MINUTE, GRANULARITY_HOUR):
+        raise HTTPException(status_code=400, detail="granularity 仅支持 minute / hour")
+    if granularity == GRANULARITY_MINUTE:
+        hours = min(hours, 24)
+    since = datetime.utcnow() - timedelta(hours=hours)
+    series = run_ledger.timeseries(db, granularity, since, task_type=task_type)
+    return {"granularity": granularity, "hours": hours, "series": series}
+
+
 @router.post("/scheduler/start")
 async def start_scheduler(scheduler_type: str = Query("all")):
     """
@@ -323,59 +332,19 @@ def _format_runtime_cursor(timestamp_value: float) -> str:
     return f"{timestamp_value:.6f}"
 
 
-@router.get("/runtime-logs")
-async def get_runtime_logs(
-    limit: int = Query(80, ge=1, le=500, description="返回条数"),
-    level: Optional[str] = Query(None, description="日志级别过滤（INFO/WARNING/ERROR）"),
-    module: Optional[str] = Query(None, description="模块关键字过滤"),
-    keyword: Optional[str] = Query(None, description="消息关键字过滤"),
-    emulator_id: Optional[int] = Query(None, description="按模拟器ID过滤"),
-    since_ts: Optional[str] = Query(None, description="仅返回大于该时间戳的日志（Unix秒）"),
-    cursor: Optional[str] = Query(None, description="增量游标，优先级高于 since_ts"),
-):
-    """读取运行时详细日志（含 UI 跳转、启动流程等），支持增量游标。"""
+def _scan_runtime_log_files(flt: RuntimeLogFilter, threshold: Optional[float], limit: int):
+    """运行日志存储未启用时的回退：倒序扫描 app_*.log（需 LOG_FILE_FORMAT=json）。"""
     log_dir = Path(settings.log_path)
     if not log_dir.exists():
-        return {
-            "total": 0,
-            "limit": limit,
-            "logs": [],
-            "next_cursor": cursor or since_ts,
-            "has_more": False,
-        }
+        return [], False
 
     app_logs = sorted(
         log_dir.glob("app_*.log"),
         key=lambda p: p.stat().st_mtime,
         reverse=True,
     )
-    if not app_logs:
-        return {
-            "total": 0,
-            "limit": limit,
-            "logs": [],
-            "next_cursor": cursor or since_ts,
-            "has_more": False,
-        }
-
-    runtime_modules = (
-        "app.modules.executor",
-        "app.modules.ui",
-        "app.modules.emu",
-        "app.modules.tasks.feeder",
-    )
-
-    filter_level = level.upper() if level else None
-    filter_module = module.lower() if module else None
-    filter_keyword = keyword.lower() if keyword else None
-    filter_emulator_id = str(emulator_id) if emulator_id is not None else None
-
-    threshold = _parse_runtime_cursor(cursor)
-    if threshold is None:
-        threshold = _parse_runtime_cursor(since_ts)
 
     entries = []
-    max_seen_ts = threshold or 0.0
     scan_budget = max(limit * 60, 2000)
     has_more = False
 
@@ -398,8 +367,6 @@ async def get_runtime_logs(
 
             record = payload.get("record") or {}
             name = record.get("name") or ""
-            msg = record.get("message") or ""
-            level_name = (record.get("level") or {}).get("name") or ""
             extra = record.get("extra") or {}
             time_info = record.get("time") or {}
             ts_value = time_info.get("timestamp")
@@ -410,38 +377,24 @@ async def get_runtime_logs(
 
             if threshold is not None and ts_epoch <= threshold:
                 continue
-            if not name.startswith(runtime_modules):
-                continue
-            if filter_level and level_name.upper() != filter_level:
+            if not name.startswith(RUNTIME_MODULES):
                 continue
-            if (
-                filter_module
-                and filter_module not in name.lower()
-                and filter_module not in str(extra).lower()
-            ):
-                continue
-            if filter_keyword and filter_keyword not in msg.lower():
-                continue
-            if (
-                filter_emulator_id is not None
-                and str(extra.get("emulator_id")) != filter_emulator_id
-            ):
+            entry = {
+                "timestamp": (time_info.get("repr") or ""),
+                "timestamp_epoch": ts_epoch,
+                "level": (record.get("level") or {}).get("name") or "",
+                "module": name,
+                "function": record.get("function"),
+                "message": record.get("message") or "",
+                "worker_id": extra.get("worker_id"),
+                "emulator_id": extra.get("emulator_id"),
+                "account_id": extra.get("account_id"),
+                "extra": extra,
+            }
+            if not flt.match_entry(entry):
                 continue
-
-            max_seen_ts = max(max_seen_ts, ts_epoch)
-            entries.append(
-                {
-                    "timestamp": (time_info.get("repr") or ""),
-                    "timestamp_epoch": ts_epoch,
-                    "level": level_name,
-                    "module": name,
-                    "function": record.get("function"),
-                    "message": msg,
-                    "worker_id": extra.get("worker_id"),
-                    "emulator_id": extra.get("emulator_id"),
-                    "account_id": extra.get("account_id"),
-                }
-            )
+            entry.pop("extra")
+            entries.append(entry)
 
             if len(entries) >= limit:
                 has_more = True
@@ -451,11 +404,41 @@ async def get_runtime_logs(
             break
 
     entries.sort(key=lambda x: x.get("timestamp_epoch") or 0.0)
-    next_cursor = (
-        _format_runtime_cursor(max_seen_ts)
-        if (entries or threshold is not None)
-        else None
+    return entries, has_more
+
+
+def _query_runtime_logs(flt: RuntimeLogFilter, threshold: Optional[float], limit: int):
+    store = get_runtime_log_store()
+    if store is None:
+        return _scan_runtime_log_files(flt, threshold, limit)
+    return store.query(flt, after_ts=threshold, limit=limit)
+
+
+@router.get("/runtime-logs")
+async def get_runtime_logs(
+    limit: int = Query(80, ge=1, le=500, description="返回条数"),
+    level: Optional[str] = Query(None, description="日志级别过滤（INFO/WARNING/ERROR）"),
+    module: Optional[str] = Query(None, description="模块关键字过滤"),
+    keyword: Optional[str] = Query(None, description="消息关键字过滤"),
+    emulator_id: Optional[int] = Query(None, description="按模拟器ID过滤"),
+    since_ts: Optional[str] = Query(None, description="仅返回大于该时间戳的日志（Unix秒）"),
+    cursor: Optional[str] = Query(None, description="增量游标，优先级高于 since_ts"),
+):
+    """读取运行时详细日志（含 UI 跳转、启动流程等），支持增量游标。"""
+    threshold = _parse_runtime_cursor(cursor)
+    if threshold is None:
+        threshold = _parse_runtime_cursor(since_ts)
+
+    flt = RuntimeLogFilter(level=level, module=module, keyword=keyword, emulator_id=emulator_id)
+    entries, has_more = await run_in_io(_query_runtime_logs, flt, threshold, limit)
+
+    max_seen_ts = max(
+        [threshold or 0.0] + [e.get("timestamp_epoch") or 0.0 for e in entries]
     )
+    if entries or threshold is not None:
+        next_cursor = _format_runtime_cursor(max_seen_ts)
+    else:
+        next_cursor = cursor or since_ts
 
     return {
         "total": len(entries),
@@ -464,3 +447,52 @@ async def get_runtime_logs(
         "next_cursor": next_cursor,
         "has_more": has_more,
     }
+
+
+@router.websocket("/runtime-logs/ws")
+async def tail_runtime_logs(
+    websocket: WebSocket,
+    token: str = Query("", description="JWT（WebSocket 不经过 HTTP 认证中间件）"),
+    level: Optional[str] = Query(None),
+    module: Optional[str] = Query(None),
+    keyword: Optional[str] = Query(None),
+    emulator_id: Optional[int] = Query(None),
+    limit: int = Query(80, ge=0, le=500, description="连接时先推送的最近日志条数"),
+):
+    """实时推送运行时日志：先发送最近 limit 条（snapshot），之后逐条推送（log）。"""
+    from .auth import verify_jwt_token
+
+    if not verify_jwt_token(token):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    store = get_runtime_log_store()
+    if store is None:
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR, reason="运行日志存储未启用")
+        return
+
+    await websocket.accept()
+    flt = RuntimeLogFilter(level=level, module=module, keyword=keyword, emulator_id=emulator_id)
+    # 先订阅再取快照，避免两者之间产生的日志丢失；重复项按时间戳去掉
+    sub = store.subscribe(flt)
+    try:
+        snapshot = []
+        if limit:
+            snapshot, _ = await run_in_io(lambda: store.query(flt, limit=limit))
+        snapshot_ts = snapshot[-1]["timestamp_epoch"] if snapshot else None
+        await websocket.send_json({"type": "snapshot", "logs": snapshot})
+        while True:
+            try:
+                entry = await asyncio.wait_for(sub.queue.get(), timeout=30.0)
+            except asyncio.TimeoutError:
+                # 心跳：及时发现已断开的连接并释放订阅
+                await websocket.send_json({"type": "ping"})
+                continue
+            if snapshot_ts is not None:
+                if (entry.get("timestamp_epoch") or 0.0) <= snapshot_ts:
+                    continue
+                snapshot_ts = None
+            await websocket.send_json({"type": "log", "log": entry, "dropped": sub.dropped})
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        store.unsubscribe(sub)
@@ -1,7 +1,18 @@
+import atexit
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC_DIR = ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
+
+# 导入 app.core.logger 即会 setup_logger（运行日志存储默认开启），测试日志写到临时目录，
+# 不落到仓库的 logs/、logs/runtime
+if "LOG_PATH" not in os.environ:
+    _TEST_LOG_DIR = tempfile.mkdtemp(prefix="oas-test-logs-")
+    os.environ["LOG_PATH"] = _TEST_LOG_DIR
+    atexit.register(shutil.rmtree, _TEST_LOG_DIR, ignore_errors=True)
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.loop_monitor import LoopMonitor
+
+
+def _blocking_step():
+    time.sleep(0.12)
+
+
+async def _stalling_worker():
+    await asyncio.sleep(0)
+    _blocking_step()
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_attributes_slow_step_to_blocking_call_site():
+    monitor = LoopMonitor()
+    monitor.start(interval_ms=20, slow_ms=50)
+    try:
+        await asyncio.sleep(0.05)
+        await asyncio.create_task(_stalling_worker())
+        await asyncio.sleep(0.05)
+        snapshot = monitor.snapshot(top=5)
+    finally:
+        await monitor.stop()
+
+    assert snapshot["slow_callbacks"] >= 1
+    assert snapshot["lag"]["max_ms"] >= 50
+    top = snapshot["top_offenders"][0]
+    assert "_blocking_step" in top["site"]
+    assert top["callback"].endswith("_stalling_worker")
+    assert top["max_ms"] >= 100
+    assert any("time.sleep" in line for line in top["stack"])
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_stop_restores_handle_run_and_reset_clears():
+    original = asyncio.events.Handle._run
+    monitor = LoopMonitor()
+    monitor.start(interval_ms=20, slow_ms=20)
+    assert asyncio.events.Handle._run is not original
+    await asyncio.create_task(_stalling_worker())
+    await monitor.stop()
+
+    assert asyncio.events.Handle._run is original
+    assert monitor.snapshot()["slow_callbacks"] >= 1
+    monitor.reset()
+    snapshot = monitor.snapshot()
+    assert snapshot["slow_callbacks"] == 0
+    assert snapshot["top_offenders"] == []
+    assert snapshot["enabled"] is False
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from app.core.metrics import MetricsRegistry
+
+
+def test_counter_gauge_histogram_render():
+    reg = MetricsRegistry()
+    captures = reg.counter("oas_test_captures", "截图次数", ["emulator", "method"])
+    depth = reg.gauge("oas_test_depth", "队列深度")
+    latency = reg.histogram("oas_test_seconds", "耗时", ["engine"], buckets=(0.1, 1.0))
+
+    captures.labels(emulator="127.0.0.1:16384", method="adb").inc()
+    captures.labels(emulator="127.0.0.1:16384", method="adb").inc(2)
+    depth.set(7)
+    for value in (0.05, 0.5, 3.0):
+        latency.labels(engine="ddddocr").observe(value)
+
+    text = reg.render()
+    assert "# TYPE oas_test_captures_total counter" in text
+    assert 'oas_test_captures_total{emulator="127.0.0.1:16384",method="adb"} 3' in text
+    assert "oas_test_depth 7" in text
+    assert 'oas_test_seconds_bucket{engine="ddddocr",le="0.1"} 1' in text
+    assert 'oas_test_seconds_bucket{engine="ddddocr",le="1"} 2' in text
+    assert 'oas_test_seconds_bucket{engine="ddddocr",le="+Inf"} 3' in text
+    assert 'oas_test_seconds_count{engine="ddddocr"} 3' in text
+    assert 'oas_test_seconds_sum{engine="ddddocr"} 3.55' in text
+    assert text.endswith("\n")
+
+
+def test_registry_reuse_label_escape_and_collectors():
+    reg = MetricsRegistry()
+    first = reg.counter("oas_test_hits", "命中", ["template"])
+    assert reg.counter("oas_test_hits", "命中", ["template"]) is first
+    with pytest.raises(ValueError):
+        reg.gauge("oas_test_hits", "命中")
+    with pytest.raises(ValueError):
+        first.labels(template="a").inc(-1)
+
+    first.labels(template='assets\\ui\\"x".png').inc()
+
+    def collector():
+        return [("oas_test_queue", "gauge", "排队", [({"priority": "high"}, 4)])]
+
+    def broken():
+        raise RuntimeError("boom")
+
+    reg.register_collector(collector)
+    reg.register_collector(collector)
+    reg.register_collector(broken)
+    text = reg.render()
+    assert 'oas_test_hits_total{template="assets\\\\ui\\\\\\"x\\".png"} 1' in text
+    assert text.count('oas_test_queue{priority="high"} 4') == 1
+
+
+def test_concurrent_increments_are_not_lost():
+    reg = MetricsRegistry()
+    counter = reg.counter("oas_test_concurrent", "并发", ["emulator"])
+    latency = reg.histogram("oas_test_concurrent_seconds", "并发耗时", ["emulator"])
+
+    def work(idx):
+        for _ in range(2000):
+            counter.labels(emulator=f"emu-{idx % 2}").inc()
+            latency.labels(emulator=f"emu-{idx % 2}").observe(0.01)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    text = reg.render()
+    assert 'oas_test_concurrent_total{emulator="emu-0"} 8000' in text
+    assert 'oas_test_concurrent_total{emulator="emu-1"} 8000' in text
+    assert 'oas_test_concurrent_seconds_count{emulator="emu-0"} 8000' in text
+
+
+def test_type_lines_use_sample_family_names():
+    reg = MetricsRegistry()
+    reg.counter("oas_test_failures", "失败次数").inc()
+    reg.gauge("oas_test_level", "水位").set(1)
+    reg.histogram("oas_test_wait_seconds", "等待", buckets=(1.0,)).observe(0.5)
+    reg.register_collector(lambda: [("oas_test_done", "counter", "完成", [({}, 2)])])
+
+    lines = reg.render().splitlines()
+    typed = {}
+    for idx, line in enumerate(lines):
+        if line.startswith("# TYPE "):
+            _, _, family, kind = line.split(" ")
+            typed[family] = kind
+            # 紧随其后的样本名必须属于该 family
+            sample = lines[idx + 1].split("{")[0].split(" ")[0]
+            assert sample == family or sample.startswith(family + "_"), (family, sample)
+    assert typed == {
+        "oas_test_failures_total": "counter",
+        "oas_test_level": "gauge",
+        "oas_test_wait_seconds": "histogram",
+        "oas_test_done_total": "counter",
+    }
+    assert "oas_test_failures_total 1" in lines
+    assert "oas_test_done_total 2" in lines
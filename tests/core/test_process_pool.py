@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from app.core import process_pool
+from app.core.process_pool import (
+    COMPUTE_BACKEND_PROCESS,
+    _attach_frame,
+    process_pool_stats,
+    release_frame,
+    share_frame,
+)
+from app.core.thread_pool import run_in_compute, shutdown_pools
+from app.modules.vision.template import _GRAY_TEMPLATE_CACHE, match_template
+
+
+@pytest.fixture(autouse=True)
+def _reset_pools():
+    shutdown_pools()
+    yield
+    shutdown_pools()
+
+
+def test_share_frame_roundtrip_ndarray_and_bytes():
+    frame = np.random.randint(0, 255, (540, 960, 3), dtype=np.uint8)
+    handle, shm = share_frame(frame)
+    try:
+        view, attached = _attach_frame(handle)
+        assert view.shape == frame.shape
+        assert np.array_equal(view, frame)
+        del view
+        attached.close()
+    finally:
+        release_frame(shm)
+
+    payload = b"\x89PNG" + bytes(100_000)
+    handle, shm = share_frame(payload)
+    try:
+        data, attached = _attach_frame(handle)
+        assert data == payload
+        attached.close()
+    finally:
+        release_frame(shm)
+
+
+@pytest.mark.asyncio
+async def test_process_backend_falls_back_to_threads_when_disabled(monkeypatch):
+    monkeypatch.setattr(process_pool.settings, "compute_process_pool_size", 0)
+    frame = np.zeros((200, 200), dtype=np.uint8)
+
+    result = await run_in_compute(np.count_nonzero, frame, backend=COMPUTE_BACKEND_PROCESS)
+
+    assert result == 0
+    assert process_pool_stats()["max_workers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_process_backend_uses_shared_frames_and_preloaded_templates(monkeypatch):
+    monkeypatch.setattr(process_pool.settings, "compute_process_pool_size", 1)
+    key = "__preloaded__/marker.png"
+    tpl = np.zeros((20, 20), dtype=np.uint8)
+    tpl[5:15, 5:15] = 255
+    monkeypatch.setitem(_GRAY_TEMPLATE_CACHE, key, tpl)
+
+    frame = np.zeros((540, 960, 3), dtype=np.uint8)
+    frame[105:115, 305:315] = 255
+    before = process_pool_stats()
+
+    match = await run_in_compute(match_template, frame, key, backend=COMPUTE_BACKEND_PROCESS)
+
+    after = process_pool_stats()
+    assert match is not None and (match.x, match.y) == (300, 100)
+    assert after["jobs"] == before["jobs"] + 1
+    assert after["shared_frames"] == before["shared_frames"] + 1
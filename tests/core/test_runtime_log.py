@@ -0,0 +1,98 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from loguru import logger
+
+from app.core.runtime_log import RuntimeLogFilter, RuntimeLogStore
+
+
+def _entry(ts, message, *, module="app.modules.executor.worker", level="INFO", emulator_id=None):
+    return {
+        "timestamp": str(ts),
+        "timestamp_epoch": ts,
+        "level": level,
+        "module": module,
+        "function": "run",
+        "message": message,
+        "worker_id": None,
+        "emulator_id": emulator_id,
+        "account_id": None,
+        "extra": {"emulator_id": str(emulator_id)},
+    }
+
+
+def _append(store, ts, message, *, day=date(2024, 5, 2), level_no=20, **kwargs):
+    store.append(_entry(ts, message, **kwargs), level_no=level_no, day=day)
+
+
+def test_cursor_query_and_indexed_filters(tmp_path):
+    store = RuntimeLogStore(tmp_path, retention_days=0)
+    _append(store, 100.0, "older day", day=date(2024, 5, 1))
+    for i in range(10):
+        _append(
+            store, 200.0 + i, f"msg {i}",
+            emulator_id=i % 2,
+            level="WARNING" if i == 7 else "INFO",
+            level_no=30 if i == 7 else 20,
+            module="app.modules.ui.manager" if i == 3 else "app.modules.executor.worker",
+        )
+    # 乱序到达的记录按上一条时间戳入索引，游标之后仍能查到
+    _append(store, 205.5, "late arrival")
+    store.close()
+
+    logs, has_more = store.query(RuntimeLogFilter(), after_ts=207.0, limit=10)
+    assert [e["message"] for e in logs] == ["msg 8", "msg 9", "late arrival"]
+    assert not has_more
+
+    logs, has_more = store.query(RuntimeLogFilter(), limit=3)
+    assert [e["message"] for e in logs] == ["msg 8", "msg 9", "late arrival"]
+    assert has_more
+
+    logs, _ = store.query(RuntimeLogFilter(), after_ts=0.0, limit=100)
+    assert logs[0]["message"] == "older day" and len(logs) == 12
+    assert "extra" not in logs[0]
+
+    assert [e["message"] for e in store.query(RuntimeLogFilter(level="warning"))[0]] == ["msg 7"]
+    assert [e["message"] for e in store.query(RuntimeLogFilter(module="ui.man"))[0]] == ["msg 3"]
+    emu1 = store.query(RuntimeLogFilter(emulator_id=1, keyword="MSG"))[0]
+    assert [e["message"] for e in emu1] == ["msg 1", "msg 3", "msg 5", "msg 7", "msg 9"]
+
+
+def test_reopen_appends_and_prunes_old_segments(tmp_path):
+    store = RuntimeLogStore(tmp_path, retention_days=2)
+    today = date.today()
+    _append(store, 10.0, "old", day=today - timedelta(days=5))
+    _append(store, 20.0, "first", day=today)
+    store.close()
+
+    reopened = RuntimeLogStore(tmp_path, retention_days=2)
+    _append(reopened, 15.0, "second", day=today)
+    logs, _ = reopened.query(RuntimeLogFilter(), after_ts=19.0)
+    assert [e["message"] for e in logs] == ["first", "second"]
+    assert not list(tmp_path.glob(f"runtime_{(today - timedelta(days=5)).isoformat()}.*"))
+
+
+@pytest.mark.asyncio
+async def test_sink_filters_runtime_modules_and_publishes(tmp_path):
+    store = RuntimeLogStore(tmp_path)
+    sub = store.subscribe(RuntimeLogFilter(emulator_id=3))
+    sink_id = logger.add(store.sink, level="INFO", filter=lambda r: r["extra"].get("rt_test"))
+    try:
+        log = logger.bind(rt_test=True, emulator_id=3)
+        log.patch(lambda r: r.update(name="app.modules.executor.worker")).info("hello")
+        log.patch(lambda r: r.update(name="app.modules.web.routers.tasks")).info("web")
+        logger.bind(rt_test=True, emulator_id=4).patch(
+            lambda r: r.update(name="app.modules.emu.adapter")
+        ).info("other emulator")
+    finally:
+        logger.remove(sink_id)
+
+    entry = await asyncio.wait_for(sub.queue.get(), timeout=1.0)
+    assert entry["message"] == "hello" and "extra" not in entry
+    assert sub.queue.empty()
+    store.unsubscribe(sub)
+
+    logs, _ = store.query(RuntimeLogFilter())
+    assert [e["message"] for e in logs] == ["hello", "other emulator"]
+    store.close()
@@ -0,0 +1,38 @@
+import sys
+import time
+
+from app.core.startup_profiler import StartupProfiler
+
+
+def test_import_tracking_attributes_self_and_cumulative_time(tmp_path, monkeypatch):
+    pkg = tmp_path / "slowpkg_for_profiler"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("import time\ntime.sleep(0.02)\nfrom . import child\n")
+    (pkg / "child.py").write_text("import time\ntime.sleep(0.03)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profiler = StartupProfiler()
+    profiler.enable_import_tracking()
+    try:
+        import slowpkg_for_profiler  # noqa: F401
+    finally:
+        profiler.disable_import_tracking()
+        sys.modules.pop("slowpkg_for_profiler", None)
+        sys.modules.pop("slowpkg_for_profiler.child", None)
+
+    rows = {r["module"]: r for r in profiler.report(top=100)["imports"]["top_self"]}
+    parent, child = rows["slowpkg_for_profiler"], rows["slowpkg_for_profiler.child"]
+    assert child["self_ms"] >= 25
+    assert parent["cumulative_ms"] >= parent["self_ms"] + child["cumulative_ms"] - 1
+    assert parent["self_ms"] >= 15
+
+
+def test_phases_are_recorded_in_order():
+    profiler = StartupProfiler()
+    with profiler.phase("init_db"):
+        time.sleep(0.005)
+    profiler.record_phase("register_routers", 12.5)
+    names = [p["name"] for p in profiler.report()["phases"]]
+    assert names == ["init_db", "register_routers"]
+    assert profiler.phase_summary().startswith("init_db=")
+    assert "[阶段]" in profiler.format_report()
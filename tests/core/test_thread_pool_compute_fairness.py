@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.thread_pool import (
+    ComputePriority,
+    FairComputeScheduler,
+    compute_pool_stats,
+    run_in_compute,
+    shutdown_pools,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_pools():
+    shutdown_pools()
+    yield
+    shutdown_pools()
+
+
+def _blocked_scheduler(**kwargs):
+    """单线程调度器：先提交一个阻塞任务占住线程，便于观察排队顺序。"""
+    pool = ThreadPoolExecutor(max_workers=1)
+    scheduler = FairComputeScheduler(pool, 1, **kwargs)
+    gate = threading.Event()
+    blocker = scheduler.submit(gate.wait, (), key="emu-0", priority=ComputePriority.BULK)
+    return pool, scheduler, gate, blocker
+
+
+def test_round_robin_across_emulators_within_priority():
+    pool, scheduler, gate, blocker = _blocked_scheduler()
+    order = []
+    futures = [
+        scheduler.submit(order.append, (name,), key=key, priority=ComputePriority.BULK)
+        for key, name in [("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1"), ("b", "b2")]
+    ]
+    gate.set()
+    for f in [blocker, *futures]:
+        f.result(timeout=2)
+    pool.shutdown()
+
+    assert order == ["a1", "b1", "a2", "b2", "a3"]
+
+
+def test_priority_classes_and_weights():
+    pool, scheduler, gate, blocker = _blocked_scheduler()
+    scheduler.set_weight("a", 2)
+    order = []
+    futures = [
+        scheduler.submit(order.append, ("bulk",), key="a", priority=ComputePriority.BULK),
+        scheduler.submit(order.append, ("popup",), key="b", priority=ComputePriority.POPUP),
+        scheduler.submit(order.append, ("a1",), key="a", priority=ComputePriority.INTERACTIVE),
+        scheduler.submit(order.append, ("a2",), key="a", priority=ComputePriority.INTERACTIVE),
+        scheduler.submit(order.append, ("a3",), key="a", priority=ComputePriority.INTERACTIVE),
+        scheduler.submit(order.append, ("b1",), key="b", priority=ComputePriority.INTERACTIVE),
+    ]
+    stats = scheduler.stats()
+    assert stats["queued"] == 6
+    assert stats["by_priority"]["interactive"]["queued"] == 4
+    assert stats["by_emulator"] == {"a": 4, "b": 2}
+
+    gate.set()
+    for f in [blocker, *futures]:
+        f.result(timeout=2)
+    pool.shutdown()
+
+    assert order == ["a1", "a2", "b1", "a3", "popup", "bulk"]
+
+
+def test_aging_prevents_bulk_starvation():
+    pool, scheduler, gate, blocker = _blocked_scheduler(aging_sec=0.0001)
+    order = []
+    first = scheduler.submit(order.append, ("bulk",), key="a", priority=ComputePriority.BULK)
+    threading.Event().wait(0.01)
+    second = scheduler.submit(order.append, ("ui",), key="b", priority=ComputePriority.INTERACTIVE)
+    gate.set()
+    for f in (blocker, first, second):
+        f.result(timeout=2)
+    pool.shutdown()
+
+    assert order == ["bulk", "ui"]
+
+
+@pytest.mark.asyncio
+async def test_run_in_compute_routes_through_scheduler():
+    results = await asyncio.gather(
+        run_in_compute(sum, [1, 2], emulator="emu-1"),
+        run_in_compute(sum, [3, 4], emulator="emu-2", priority=ComputePriority.BULK),
+    )
+
+    assert results == [3, 7]
+    stats = compute_pool_stats()
+    assert stats["completed"] == 2
+    assert stats["queued"] == 0
@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.json_patch import TaskConfigPatch, merge_json_updates, patch_task_config
+from app.db.models import GameAccount
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def _account(db, task_config):
+    account = GameAccount(login_id="acc", task_config=task_config)
+    db.add(account)
+    db.commit()
+    return account.id
+
+
+def test_patch_merges_fields_without_touching_other_keys(db_session):
+    aid = _account(
+        db_session,
+        {"签到": {"enabled": True, "next_time": "2020-01-01 00:00"}, "寄养": {"enabled": False}},
+    )
+
+    assert patch_task_config(
+        db_session,
+        aid,
+        {"签到": {"next_time": "2024-01-02 18:00"}, "新任务": {"enabled": True}, "flag": [1, "二"]},
+    )
+    db_session.commit()
+
+    cfg = db_session.get(GameAccount, aid).task_config
+    assert cfg == {
+        "签到": {"enabled": True, "next_time": "2024-01-02 18:00"},
+        "寄养": {"enabled": False},
+        "新任务": {"enabled": True},
+        "flag": [1, "二"],
+    }
+    # 与 ORM 写入的键名编码一致，不会产生重复键
+    raw = db_session.execute(text("SELECT task_config FROM game_accounts")).scalar()
+    assert raw.count("next_time") == 1
+
+
+def test_patch_resets_non_object_and_null_config(db_session):
+    aid = _account(db_session, None)
+    db_session.execute(text("UPDATE game_accounts SET task_config = NULL"))
+    assert patch_task_config(db_session, aid, {"a": {"x": 1}})
+    assert patch_task_config(db_session, aid, {"a": "str"})
+    assert patch_task_config(db_session, aid, {"a": {"y": 2}})
+    db_session.commit()
+
+    assert db_session.get(GameAccount, aid).task_config == {"a": {"y": 2}}
+    assert not patch_task_config(db_session, 999, {"a": {"x": 1}})
+
+
+def test_batch_flush_one_update_per_account_and_expires_loaded_rows(db_session):
+    aid = _account(db_session, {"弥助": {"next_time": "old", "fail_delay": 30}})
+    loaded = db_session.get(GameAccount, aid)
+    assert loaded.task_config["弥助"]["next_time"] == "old"
+
+    batch = TaskConfigPatch()
+    batch.set(aid, "弥助", "next_time", "t1").set(aid, "弥助", "next_time", "t2")
+    batch.set(aid, "寄养", "next_time", "t3")
+    assert len(batch) == 1
+    assert batch.flush(db_session) == 1
+    db_session.commit()
+
+    assert loaded.task_config == {
+        "弥助": {"next_time": "t2", "fail_delay": 30},
+        "寄养": {"next_time": "t3"},
+    }
+    assert not batch
+
+
+def test_merge_json_updates_matches_sql_semantics():
+    assert merge_json_updates(
+        {"a": {"x": 1}, "b": 3}, {"a": {"y": 2}, "b": {"z": 1}, "c": None}
+    ) == {"a": {"x": 1, "y": 2}, "b": {"z": 1}, "c": None}
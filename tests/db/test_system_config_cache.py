@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db import system_config_cache as cache_module
+from app.db.base import Base
+from app.db.models import SystemConfig
+
+
+@pytest.fixture()
+def cache(monkeypatch):
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        db.add(SystemConfig(capture_method="adb"))
+        db.commit()
+    cache = cache_module.SystemConfigCache(factory)
+    # 提交事件使全局缓存失效，这里让测试实例接收同样的失效通知
+    monkeypatch.setattr(cache_module, "system_config_cache", cache)
+    monkeypatch.setattr(settings, "system_config_cache_ttl_sec", 3600.0)
+    cache.factory = factory
+    yield cache
+    engine.dispose()
+
+
+def test_cached_until_committed_write(cache):
+    assert cache.get().capture_method == "adb"
+    assert cache.get().capture_method == "adb"
+    assert cache.loads == 1
+
+    with cache.factory() as db:
+        row = db.query(SystemConfig).first()
+        row.capture_method = "ipc"
+        db.commit()
+
+    assert cache.version == 1
+    assert cache.get().capture_method == "ipc"
+    assert cache.loads == 2
+
+
+def test_rollback_and_reads_do_not_invalidate(cache, monkeypatch):
+    cache.get()
+    with cache.factory() as db:
+        db.query(SystemConfig).first()
+        db.commit()
+        row = db.query(SystemConfig).first()
+        row.capture_method = "ipc"
+        db.flush()
+        db.rollback()
+    assert cache.version == 0
+    assert cache.get().capture_method == "adb"
+
+    monkeypatch.setattr(settings, "system_config_cache_ttl_sec", 0.0)
+    cache.get()
+    assert cache.loads == 2
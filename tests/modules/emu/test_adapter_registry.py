@@ -0,0 +1,80 @@
+from dataclasses import replace
+
+import pytest
+
+from app.modules.emu.adapter import AdapterConfig
+from app.modules.emu.registry import AdapterRegistry
+
+
+class _FakeIpc:
+    def __init__(self):
+        self.disconnects = 0
+
+    def disconnect(self):
+        self.disconnects += 1
+
+
+class _FakeAdapter:
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.ipc = _FakeIpc()
+        self.adb = object()
+        self.mumu = None
+        self.consecutive_failures = 0
+
+
+def _cfg(**kw):
+    base = AdapterConfig(adb_path="adb", adb_addr="127.0.0.1:16384", pkg_name="pkg", instance_id=0)
+    return replace(base, **kw)
+
+
+@pytest.fixture
+def registry():
+    return AdapterRegistry(factory=_FakeAdapter)
+
+
+def test_acquire_reuses_adapter_and_counts_refs(registry):
+    first = registry.acquire(_cfg())
+    second = registry.acquire(_cfg())
+    assert first is second
+    assert registry.stats()["adapters"]["127.0.0.1:16384"]["refs"] == 2
+
+    registry.release(first)
+    registry.release(second)
+    # 引用归零后仍保留，下次直接复用
+    assert registry.acquire(_cfg()) is first
+    assert registry.stats()["created"] == 1
+
+
+def test_call_params_share_connection(registry):
+    primary = registry.acquire(_cfg())
+    other = registry.acquire(_cfg(pkg_name="other.pkg"))
+    assert other is not primary
+    assert other.cfg.pkg_name == "other.pkg"
+    assert other.ipc is primary.ipc and other.adb is primary.adb
+    assert registry.stats()["created"] == 1
+
+
+def test_connection_change_retires_after_last_release(registry):
+    old = registry.acquire(_cfg())
+    new = registry.acquire(_cfg(instance_id=1))
+    assert new is not old
+    # 旧 adapter 仍被占用，暂不断开
+    assert old.ipc.disconnects == 0
+    registry.release(old)
+    assert old.ipc.disconnects == 1
+    assert new.ipc.disconnects == 0
+
+
+def test_unhealthy_adapter_rebuilt_and_disconnect_all(registry):
+    adapter = registry.acquire(_cfg())
+    registry.release(adapter)
+    adapter.consecutive_failures = 3
+
+    rebuilt = registry.acquire(_cfg())
+    assert rebuilt is not adapter
+    assert adapter.ipc.disconnects == 1
+
+    registry.disconnect_all()
+    assert rebuilt.ipc.disconnects == 1
+    assert len(registry) == 0
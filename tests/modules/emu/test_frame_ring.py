@@ -0,0 +1,77 @@
+import numpy as np
+
+from app.modules.emu import frame_ring as frame_ring_module
+from app.modules.emu.adapter import AdapterConfig, EmulatorAdapter
+from app.modules.emu.frame_ring import FrameRing, write_frames
+
+
+class _DummyAdb:
+    def __init__(self):
+        self.calls = 0
+
+    def screencap(self, addr):
+        self.calls += 1
+        return b"png-%d" % self.calls
+
+    def tap(self, addr, x, y):
+        return None
+
+    def swipe(self, addr, x1, y1, x2, y2, dur_ms):
+        return None
+
+
+def _adapter(addr):
+    adapter = EmulatorAdapter(AdapterConfig(adb_path="adb", adb_addr=addr, pkg_name="pkg"))
+    adapter.adb = _DummyAdb()
+    return adapter
+
+
+def test_ring_keeps_last_n_references_with_actions():
+    ring = FrameRing(size=3)
+    frames = [np.full((2, 2, 3), i, dtype=np.uint8) for i in range(5)]
+    for frame in frames:
+        ring.push(frame, method="ipc")
+    ring.annotate("tap 1,2")
+
+    records = ring.snapshot()
+    assert [r.seq for r in records] == [3, 4, 5]
+    assert records[-1].image is frames[-1]
+    assert records[-1].actions == ["tap 1,2"]
+    assert ring.latest(max_age_ms=60_000) is records[-1]
+    assert ring.latest(max_age_ms=-1) is None
+    assert ring.snapshot(since=records[0].ts) == records
+    assert ring.snapshot(since=records[-1].ts + 1) == []
+
+
+def test_adapter_capture_feeds_shared_ring(monkeypatch):
+    monkeypatch.setattr(frame_ring_module, "_rings", {})
+    adapter = _adapter("127.0.0.1:7555")
+
+    adapter.capture("adb")
+    adapter.tap(10, 20)
+    adapter.capture("adb")
+    adapter.swipe(1, 2, 3, 4)
+
+    # 任务间重建 adapter 仍能读取同一模拟器的历史帧
+    records = _adapter("127.0.0.1:7555").frame_ring.snapshot()
+    assert [r.image for r in records] == [b"png-1", b"png-2"]
+    assert records[0].actions == ["tap 10,20"]
+    assert records[1].actions == ["swipe 1,2-3,4"]
+    assert adapter.adb.calls == 2
+
+
+def test_write_frames_latest_and_history(tmp_path):
+    ring = FrameRing(size=4)
+    for i in range(3):
+        ring.push(np.full((4, 4, 3), i * 50, dtype=np.uint8))
+        ring.annotate(f"tap {i},{i}")
+
+    written = write_frames(
+        ring.snapshot(), str(tmp_path / "fail.png"), history_dir=str(tmp_path / "fail")
+    )
+
+    assert written[0] == tmp_path / "fail.png"
+    assert (tmp_path / "fail.png").read_bytes().startswith(b"\x89PNG")
+    history = sorted(p.name for p in (tmp_path / "fail").iterdir())
+    assert len(history) == 2
+    assert history[0].startswith("00_") and history[0].endswith("tap_0,0.png")
@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.models import GameAccount
+from app.modules.executor import account_state
+from app.modules.vision.explore_detect import update_explore_progress
+
+
+@pytest.fixture()
+def session_factory(monkeypatch):
+    # 写回在 DB 线程池中执行，内存库需共享同一连接
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(account_state, "SessionLocal", factory)
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, sql, *a: statements.append(sql),
+    )
+    factory.statements = statements
+    yield factory
+    engine.dispose()
+
+
+def _load(factory, **fields):
+    with factory() as db:
+        acc = GameAccount(login_id="acc", **fields)
+        db.add(acc)
+        db.commit()
+        db.refresh(acc)
+        db.expunge(acc)
+        return acc
+
+
+@pytest.mark.asyncio
+async def test_writes_stay_in_memory_until_flush(session_factory):
+    acc = _load(session_factory, stamina=10, gongxun=0)
+    state = account_state.open_account_state(acc)
+    try:
+        session_factory.statements.clear()
+        account_state.update_account_fields(acc.id, stamina=50, gongxun=300)
+        account_state.update_account_fields(acc.id, stamina=60)
+        assert account_state.read_account_field(acc.id, "stamina") == 60
+        assert acc.stamina == 60  # 执行器持有的 current_account 同步可见
+        assert session_factory.statements == []
+
+        assert state.flush() == 2
+        updates = [s for s in session_factory.statements if s.startswith("UPDATE")]
+        assert len(updates) == 1
+        assert state.flush() == 0
+    finally:
+        await account_state.close_account_state(acc.id)
+
+    with session_factory() as db:
+        row = db.get(GameAccount, acc.id)
+        assert (row.stamina, row.gongxun) == (60, 300)
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_and_falls_back_to_direct_writes(session_factory):
+    acc = _load(session_factory, explore_progress=None)
+    account_state.open_account_state(acc)
+    update_explore_progress(acc.id, 3, "hard")
+    update_explore_progress(acc.id, 3, "simple")
+    await account_state.close_account_state(acc.id)
+    assert account_state.get_account_state(acc.id) is None
+
+    account_state.update_account_fields(acc.id, liao_level=5)
+    with session_factory() as db:
+        row = db.get(GameAccount, acc.id)
+        assert row.explore_progress["3"] == {"simple": True, "hard": True}
+        assert row.liao_level == 5
+
+    with pytest.raises(ValueError):
+        account_state.update_account_fields(acc.id, task_config={})
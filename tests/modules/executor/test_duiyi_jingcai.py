@@ -136,7 +136,7 @@ async def test_handle_dy_win_requires_jiangli_closed_confirmation(monkeypatch):
         "app.modules.executor.duiyi_jingcai.wait_for_template",
         fake_wait_for_template,
     )
-    monkeypatch.setattr("app.modules.executor.duiyi_jingcai.match_template", fake_match_template)
+    monkeypatch.setattr("app.modules.vision.context.match_template", fake_match_template)
     monkeypatch.setattr(executor, "_capture", fake_capture)
     monkeypatch.setattr(executor, "_tap", fake_tap)
     monkeypatch.setattr(executor, "_ensure_jiangli_closed", fake_ensure_jiangli_closed)
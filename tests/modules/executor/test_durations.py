@@ -0,0 +1,45 @@
+from app.core.constants import TaskType
+from app.modules.executor.durations import TaskDurationStats
+from app.modules.executor.planner import DEFAULT_TASK_DURATION_SEC
+
+
+def test_estimate_falls_back_to_default_until_enough_samples():
+    stats = TaskDurationStats(min_samples=3)
+    stats.record(TaskType.FOSTER, 40.0, account_id=1, persist=False)
+
+    assert stats.estimate(TaskType.FOSTER) == DEFAULT_TASK_DURATION_SEC[TaskType.FOSTER]
+
+    stats.record(TaskType.FOSTER, 60.0, account_id=2, persist=False)
+    stats.record(TaskType.FOSTER, 80.0, account_id=2, persist=False)
+
+    assert stats.estimate(TaskType.FOSTER) == 60.0
+    assert stats.estimate(TaskType.FOSTER, account_id=1) == 60.0
+
+
+def test_account_samples_take_precedence_and_failures_are_excluded():
+    stats = TaskDurationStats(min_samples=2)
+    for value in (100.0, 200.0, 300.0):
+        stats.record(TaskType.EXPLORE, value, account_id=1, emulator_id=5, persist=False)
+    for value in (900.0, 1000.0):
+        stats.record(TaskType.EXPLORE, value, account_id=2, persist=False)
+    stats.record(TaskType.EXPLORE, 5.0, account_id=1, success=False, persist=False)
+
+    assert stats.estimate(TaskType.EXPLORE, account_id=2) == 950.0
+    assert stats.estimate(TaskType.EXPLORE, account_id=1) == 200.0
+
+    row = stats.percentiles(TaskType.EXPLORE)
+    assert row["count"] == 5
+    assert row["failures"] == 1
+    assert row["p50"] == 300.0
+
+    snap = stats.snapshot(emulator_id=5)
+    assert snap["emulator"][0]["count"] == 3
+
+
+def test_record_buffers_rows_for_persistence():
+    stats = TaskDurationStats()
+    stats.record(TaskType.COOP, 12.5, account_id=3, emulator_id=1)
+    stats.record(TaskType.COOP, 1.0, persist=False)
+
+    assert len(stats._pending_rows) == 1
+    assert stats._pending_rows[0]["task_type"] == TaskType.COOP.value
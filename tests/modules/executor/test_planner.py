@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.constants import TaskType
+from app.modules.executor.planner import BatchPlanner
+from app.modules.executor.service import (
+    SCHEDULER_MODE_GLOBAL,
+    ExecutorService,
+    PendingBatch,
+)
+from app.modules.executor.types import TaskIntent
+
+
+def _batch(account_id, *task_types, wait_sec=0.0, now=None):
+    now = now or datetime.utcnow()
+    return PendingBatch(
+        account_id=account_id,
+        intents=[TaskIntent(account_id=account_id, task_type=t) for t in task_types],
+        enqueue_at=now - timedelta(seconds=wait_sec),
+    )
+
+
+def test_plan_orders_by_value_density_and_pins_urgent():
+    now = datetime.utcnow()
+    planner = BatchPlanner(duration_of=lambda t, a: 60.0, batch_overhead_sec=0.0)
+    batches = [
+        _batch(1, TaskType.CLIMB_TOWER, now=now),
+        _batch(2, TaskType.COOP, now=now),
+        _batch(3, TaskType.SCAN_QR, now=now),
+    ]
+
+    plan = planner.plan(batches, worker_count=2, now=now)
+
+    assert [p.account_id for p in plan.order] == [3, 2, 1]
+    assert plan.order[0].urgent is True
+    assert plan.makespan_sec == pytest.approx(120.0)
+    assert plan.saturated is False
+
+
+def test_plan_defers_low_value_batches_when_saturated():
+    now = datetime.utcnow()
+    planner = BatchPlanner(
+        duration_of=lambda t, a: 600.0,
+        batch_overhead_sec=0.0,
+        horizon_sec=900.0,
+        defer_priority=40,
+    )
+    batches = [
+        _batch(1, TaskType.DUIYI_JINGCAI, TaskType.CLIMB_TOWER, now=now),
+        _batch(2, TaskType.XUANSHANG, now=now),
+        _batch(3, TaskType.DELEGATE_HELP, now=now),
+    ]
+
+    plan = planner.plan(batches, worker_count=1, busy_remaining_sec=[300.0], now=now)
+
+    assert plan.saturated is True
+    assert plan.order[-1].account_id == 1
+    assert plan.order[-1].deferred is True
+    assert plan.deferred_count == 1
+    assert plan.makespan_sec == pytest.approx(300.0 + 600.0 * 4)
+
+
+@pytest.mark.asyncio
+async def test_global_mode_picks_planned_batch_and_merges_late_intents():
+    service = ExecutorService()
+    service._scheduler_mode = SCHEDULER_MODE_GLOBAL
+    service._workers = {1: object()}
+
+    assert service.enqueue_batch(
+        1, [TaskIntent(account_id=1, task_type=TaskType.CLIMB_TOWER)]
+    )
+    assert service.enqueue_batch(
+        2, [TaskIntent(account_id=2, task_type=TaskType.FOSTER)]
+    )
+    assert service.enqueue_batch(
+        1, [TaskIntent(account_id=1, task_type=TaskType.COOP)]
+    )
+
+    assert service._pick_dispatchable_index() == 1
+    merged = service._pending[0].intents
+    assert [i.task_type for i in merged] == [TaskType.COOP, TaskType.CLIMB_TOWER]
+    assert service._metrics["plan_merged_intents"] == 1
+
+    snapshot_plan = service._last_plan.to_dict()
+    assert snapshot_plan["batches"] == 2
+    assert snapshot_plan["order"][0]["account_id"] == 2
+
+
+class _IdleWorker:
+    def is_idle(self):
+        return True
+
+
+def test_drain_queries_reuse_last_plan_until_queue_changes(monkeypatch):
+    service = ExecutorService()
+    service._workers = {1: _IdleWorker()}
+    calls = []
+    plan = service._planner.plan
+
+    def counting_plan(*args, **kwargs):
+        calls.append(1)
+        return plan(*args, **kwargs)
+
+    monkeypatch.setattr(service._planner, "plan", counting_plan)
+    assert service.enqueue_batch(1, [TaskIntent(account_id=1, task_type=TaskType.FOSTER)])
+
+    first = service.predict_drain()
+    assert service.metrics_snapshot()["queue"]["predicted_drain_sec"] == first["drain_sec"]
+    assert service.predict_drain()["batches"] == 1
+    assert len(calls) == 1
+
+    assert service.enqueue_batch(2, [TaskIntent(account_id=2, task_type=TaskType.COOP)])
+    assert service.predict_drain()["batches"] == 2
+    assert len(calls) == 2
+
+    service._last_plan.planned_at -= timedelta(seconds=60)
+    service.predict_drain()
+    assert len(calls) == 3
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.constants import TaskType
+from app.modules.executor.process_group import WorkerProcessGroup, split_into_groups
+from app.modules.executor.types import TaskIntent
+
+
+class _FakeService:
+    def __init__(self):
+        self.done = []
+        self.intents = []
+
+    async def _on_task_done(self, account_id, success):
+        self.done.append((account_id, success))
+
+    async def notify_intent_done(self, account_id, intent, success):
+        self.intents.append((account_id, intent.task_type, success))
+
+
+def _rows(n):
+    return [SimpleNamespace(id=i, name=f"emu-{i}", adb_addr=f"127.0.0.1:{16384 + i}") for i in range(1, n + 1)]
+
+
+def test_split_into_groups_balances_emulators():
+    groups = split_into_groups(_rows(5), 2)
+    assert [[r.id for r in g] for g in groups] == [[1, 2, 3], [4, 5]]
+    assert [[r.id for r in g] for g in split_into_groups(_rows(2), 4)] == [[1], [2]]
+    assert split_into_groups([], 3) == []
+
+
+@pytest.mark.asyncio
+async def test_remote_worker_tracks_busy_state_from_child_messages():
+    service = _FakeService()
+    group = WorkerProcessGroup(0, _rows(2), service)
+    group.alive = True
+    sent = []
+    group._inbox = SimpleNamespace(put=sent.append)
+
+    worker = group.workers[1]
+    intents = [TaskIntent(account_id=7, task_type=TaskType.COOP)]
+    assert worker.is_idle()
+    assert await worker.submit(intents)
+    assert not worker.is_idle()
+    assert sent[0][0] == "submit" and sent[0][1] == 1
+
+    group._handle(("current", 1, 7, TaskType.COOP, datetime.utcnow()))
+    assert worker.current.account_id == 7
+
+    intents[0].started_at = datetime.utcnow()
+    group._handle(("intent_done", 1, 7, intents[0], True))
+    group._handle(("batch_done", 1, 7, True))
+    await asyncio.sleep(0)
+
+    assert worker.is_idle()
+    assert worker.current is None
+    assert service.intents == [(7, TaskType.COOP, True)]
+    assert service.done == [(7, True)]
+
+
+@pytest.mark.asyncio
+async def test_dead_child_fails_running_batches():
+    service = _FakeService()
+    group = WorkerProcessGroup(0, _rows(2), service)
+    group.alive = True
+    group._inbox = SimpleNamespace(put=lambda msg: None)
+
+    await group.workers[2].submit([TaskIntent(account_id=9, task_type=TaskType.FOSTER)])
+    group._handle(("__dead__",))
+    await asyncio.sleep(0)
+
+    assert group.alive is False
+    assert service.done == [(9, False)]
+    assert not group.workers[1].is_idle()
@@ -0,0 +1,124 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.modules.emu.adapter import AdapterConfig
+from app.modules.executor.rapid_click import (
+    CONFIRM_CHANGED,
+    CONFIRM_GONE,
+    rapid_click_template,
+)
+
+
+def _button() -> np.ndarray:
+    rng = np.random.default_rng(7)
+    return rng.integers(0, 255, (24, 32, 3), dtype=np.uint8)
+
+
+def _screen(*, button: bool, background: int = 40) -> np.ndarray:
+    frame = np.full((540, 960, 3), background, dtype=np.uint8)
+    if button:
+        frame[300:324, 400:432] = _button()
+    return frame
+
+
+class _FakeAdb:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def tap(self, addr, x, y):
+        self.owner.on_tap(x, y)
+
+
+class _FakeAdapter:
+    """on_tap 回调决定点击后的画面；captures / taps 记录调用次数。"""
+
+    def __init__(self, screen, on_tap):
+        self.cfg = AdapterConfig(adb_path="adb", adb_addr="127.0.0.1:9999", pkg_name="pkg")
+        self.adb = _FakeAdb(self)
+        self.screen = screen
+        self._on_tap = on_tap
+        self.captures = 0
+        self.taps = []
+
+    def capture_ndarray(self, method):
+        self.captures += 1
+        return self.screen
+
+    def on_tap(self, x, y):
+        self.taps.append((x, y))
+        self.screen = self._on_tap(len(self.taps), self.screen)
+
+
+@pytest.fixture
+def template(tmp_path):
+    path = tmp_path / "button.png"
+    cv2.imwrite(str(path), _button())
+    return str(path)
+
+
+async def _click(adapter, template, **kw):
+    params = dict(
+        timeout=1.0, settle=0, post_delay=0, rapid_count=5,
+        rapid_interval=0.001, wait_interval=0.001,
+    )
+    params.update(kw)
+    return await rapid_click_template(adapter, "adb", template, **params)
+
+
+@pytest.mark.asyncio
+async def test_stops_once_template_disappears(template):
+    adapter = _FakeAdapter(_screen(button=True), lambda n, s: _screen(button=False))
+
+    result = await _click(adapter, template)
+
+    assert result and result.found
+    assert result.clicks == 1 and result.clicks_needed == 1
+    assert result.confirmed == CONFIRM_GONE
+    assert len(adapter.taps) == 1
+    x, y = adapter.taps[0]
+    assert 400 <= x < 432 and 300 <= y < 324
+
+
+@pytest.mark.asyncio
+async def test_retaps_until_click_lands(template):
+    # 前两次点击未生效（画面不变），第三次按钮消失
+    adapter = _FakeAdapter(
+        _screen(button=True),
+        lambda n, s: _screen(button=n < 3),
+    )
+
+    result = await _click(adapter, template)
+
+    assert result.clicks == 3
+    assert result.confirmed == CONFIRM_GONE
+
+
+@pytest.mark.asyncio
+async def test_screen_change_confirms_and_counts_wasted_clicks(template, monkeypatch):
+    # 点击后背景切换但按钮仍在：画面变化即视为生效
+    def on_tap(n, s):
+        return _screen(button=True, background=40 if n % 2 == 0 else 200)
+
+    adapter = _FakeAdapter(_screen(button=True), on_tap)
+    result = await _click(adapter, template)
+    assert result.confirmed == CONFIRM_CHANGED
+    assert result.clicks == 1
+
+    # 关闭提前停止：跑满 rapid_count 轮，clicks_needed 记录首次确认时的点击数
+    monkeypatch.setattr(settings, "rapid_click_confirm_enabled", False)
+    adapter = _FakeAdapter(_screen(button=True), on_tap)
+    result = await _click(adapter, template, rapid_count=4)
+    assert result.confirmed == CONFIRM_CHANGED
+    assert result.clicks == 4 and result.clicks_needed == 1
+
+
+@pytest.mark.asyncio
+async def test_not_found_returns_falsy(template):
+    adapter = _FakeAdapter(_screen(button=False), lambda n, s: s)
+
+    result = await _click(adapter, template, timeout=0.05, rapid_count=3)
+
+    assert not result and not result.found
+    assert result.clicks == 0 and result.confirmed is None
@@ -0,0 +1,51 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from app.core.constants import TaskType
+from app.modules.executor.base import MockExecutor
+from app.modules.executor.registry import (
+    EXECUTOR_SPECS,
+    create_executor,
+    get_executor_class,
+)
+
+SRC_DIR = Path(__file__).resolve().parents[3] / "src"
+
+
+def test_every_registered_type_resolves_to_its_class():
+    for task_type, spec in EXECUTOR_SPECS.items():
+        cls = get_executor_class(task_type)
+        assert cls is not None and cls.__name__ == spec.class_name
+        assert get_executor_class(task_type.value) is cls
+
+
+def test_create_executor_context_and_fallback():
+    row = object()
+    digui = create_executor(
+        TaskType.DIGUI, worker_id=1, emulator_id=2, emulator_row=row, system_config=None,
+    )
+    assert type(digui).__name__ == "DiGuiExecutor"
+    assert digui.emulator_row is row and digui.emulator_id == 2
+    assert EXECUTOR_SPECS[TaskType.TEAM_YUHUN].with_context is False
+    mock = create_executor(TaskType.COOP, worker_id=1, emulator_id=1)
+    assert isinstance(mock, MockExecutor)
+
+
+def test_importing_worker_does_not_load_executor_modules(tmp_path):
+    code = (
+        "import sys\n"
+        "import app.modules.executor.worker\n"
+        "from app.modules.executor.registry import EXECUTOR_SPECS\n"
+        "loaded = [s.module for s in EXECUTOR_SPECS.values()"
+        " if 'app.modules.executor.' + s.module in sys.modules]\n"
+        "print(loaded)\n"
+        "from app.modules.executor import ExploreExecutor\n"
+        "print(ExploreExecutor.__name__)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True,
+        env={"PYTHONPATH": str(SRC_DIR), "PATH": "", "LOG_PATH": str(tmp_path)},
+    ).stdout.split()
+    assert out[-2:] == ["[]", "ExploreExecutor"]
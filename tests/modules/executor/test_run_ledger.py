@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import TaskRunRecord, TaskRunRollupHour, TaskRunRollupMinute
+from app.modules.executor import run_ledger as ledger_module
+from app.modules.executor.run_ledger import RunLedger
+
+
+@pytest.fixture()
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(ledger_module, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+def _recent_hour():
+    # 使用近期时间，避免被分钟级汇总的保留期清理
+    return (datetime.utcnow() - timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+
+
+def _record(ledger, task_type, started_at, seconds, success=True, **kwargs):
+    ledger.record(
+        task_type,
+        started_at=started_at,
+        finished_at=started_at + timedelta(seconds=seconds),
+        success=success,
+        **kwargs,
+    )
+
+
+def test_flush_appends_records_and_increments_rollups(session_factory):
+    ledger = RunLedger()
+    t0 = _recent_hour() + timedelta(minutes=15, seconds=20)
+    _record(ledger, "签到", t0, 30, capture_count=5, detect_count=9, account_id=1)
+    _record(ledger, "签到", t0 + timedelta(seconds=10), 50, success=False, error_code="task_failed")
+    assert ledger.flush_sync() == 2
+
+    # 第二批落在同一分钟 / 同一小时：累加到已有汇总行
+    _record(ledger, "签到", t0 + timedelta(seconds=20), 10, capture_count=1)
+    _record(ledger, "寄养", t0 + timedelta(minutes=50), 20)
+    assert ledger.flush_sync() == 2
+    assert ledger.flush_sync() == 0
+
+    with session_factory() as db:
+        assert db.query(TaskRunRecord).count() == 4
+        failed = db.query(TaskRunRecord).filter(TaskRunRecord.outcome == "failed").one()
+        assert failed.error_code == "task_failed"
+
+        minute = db.query(TaskRunRollupMinute).filter_by(task_type="签到").one()
+        assert minute.bucket_start == t0.replace(second=0)
+        assert (minute.total, minute.succeeded, minute.failed) == (3, 2, 1)
+        assert minute.duration_sum == pytest.approx(90)
+        assert minute.duration_max == pytest.approx(50)
+        assert (minute.capture_sum, minute.detect_sum) == (6, 9)
+
+        hours = {r.task_type: r.total for r in db.query(TaskRunRollupHour).all()}
+        assert hours == {"签到": 3, "寄养": 1}
+
+
+def test_summary_combines_hour_and_minute_edges(session_factory):
+    ledger = RunLedger()
+    base = _recent_hour()
+    _record(ledger, "探索突破", base + timedelta(minutes=10), 60)   # 区间外
+    _record(ledger, "探索突破", base + timedelta(minutes=40), 60)   # 首部分钟段
+    _record(ledger, "探索突破", base + timedelta(hours=1, minutes=5), 30, success=False)
+    _record(ledger, "签到", base + timedelta(hours=2, minutes=59), 10)  # 尾部分钟段
+    _record(ledger, "签到", base + timedelta(hours=3, minutes=1), 10)   # 区间外
+    ledger.flush_sync()
+
+    with session_factory() as db:
+        result = ledger.summary(db, base + timedelta(minutes=30), base + timedelta(hours=3))
+        assert result["overall"]["total"] == 3
+        assert result["overall"]["failed"] == 1
+        assert result["task_types"]["探索突破"]["total"] == 2
+        assert result["task_types"]["签到"]["total"] == 1
+
+        series = ledger.timeseries(
+            db, "hour", base, base + timedelta(hours=4), task_type="签到"
+        )
+        assert [(s["bucket_start"], s["total"]) for s in series] == [
+            ((base + timedelta(hours=2)).isoformat(), 1),
+            ((base + timedelta(hours=3)).isoformat(), 1),
+        ]
+        with pytest.raises(ValueError):
+            ledger.timeseries(db, "day", base)
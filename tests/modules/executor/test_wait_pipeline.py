@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.modules.emu.adapter import AdapterConfig
+from app.modules.executor import helpers
+from app.modules.vision.context import VisionContext
+from app.modules.vision.template import Match
+
+
+class _SlowAdapter:
+    """每次截图耗时 capture_sec，返回带序号的帧（帧各不相同，不触发同帧跳过）。"""
+
+    def __init__(self, capture_sec: float):
+        self.cfg = AdapterConfig(adb_path="adb", adb_addr="127.0.0.1:9998", pkg_name="pkg")
+        self.capture_sec = capture_sec
+        self.captures = 0
+
+    def capture_ndarray(self, method):
+        time.sleep(self.capture_sec)
+        self.captures += 1
+        return np.full((36, 64, 3), self.captures * 20 % 256, dtype=np.uint8)
+
+
+def _patch_match(monkeypatch, *, hit_at: int, match_sec: float):
+    async def fake_match_first(self, image, templates, **kwargs):
+        await asyncio.sleep(match_sec)
+        if int(image[0, 0, 0]) == hit_at * 20 % 256:
+            return templates[0], Match(x=1, y=2, w=3, h=4, score=0.99)
+        return None
+
+    monkeypatch.setattr(VisionContext, "match_first", fake_match_first)
+
+
+async def _wait(adapter):
+    return await helpers.wait_for_template(
+        adapter, "adb", "tpl.png", timeout=5.0, interval=0.0, dismiss_retry=0
+    )
+
+
+@pytest.mark.asyncio
+async def test_pipeline_overlaps_capture_with_matching(monkeypatch):
+    _patch_match(monkeypatch, hit_at=6, match_sec=0.03)
+
+    monkeypatch.setattr(settings, "vision_wait_pipeline_enabled", False)
+    serial_adapter = _SlowAdapter(0.03)
+    started = time.perf_counter()
+    assert await _wait(serial_adapter) is not None
+    serial = time.perf_counter() - started
+
+    monkeypatch.setattr(settings, "vision_wait_pipeline_enabled", True)
+    piped_adapter = _SlowAdapter(0.03)
+    started = time.perf_counter()
+    m = await _wait(piped_adapter)
+    piped = time.perf_counter() - started
+
+    assert m is not None and (m.x, m.y) == (1, 2)
+    assert serial_adapter.captures == 6
+    assert piped < serial * 0.8
+
+
+@pytest.mark.asyncio
+async def test_pipeline_cancels_prefetch_after_match(monkeypatch):
+    monkeypatch.setattr(settings, "vision_wait_pipeline_enabled", True)
+    _patch_match(monkeypatch, hit_at=3, match_sec=0.0)
+    adapter = _SlowAdapter(0.0)
+
+    m = await helpers.wait_for_template(
+        adapter, "adb", "tpl.png", timeout=5.0, interval=0.2, dismiss_retry=0
+    )
+    await asyncio.sleep(0.3)
+
+    assert m is not None
+    # 命中后，仍在 interval 等待中的预取截图被取消，不再发起截图
+    assert adapter.captures == 3
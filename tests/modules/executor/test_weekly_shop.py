@@ -51,13 +51,13 @@ async def test_weekly_shop_execute_never_swipes_when_retrying_item_search(monkey
 
     match_calls = {"count": 0}
 
-    def fake_match_template(screenshot, template_path):
+    def fake_match_template(screenshot, template_path, **_kwargs):
         match_calls["count"] += 1
         if match_calls["count"] == 1:
             return None
         return object()
 
-    monkeypatch.setattr("app.modules.executor.weekly_shop.match_template", fake_match_template)
+    monkeypatch.setattr("app.modules.vision.context.match_template", fake_match_template)
 
     async def fake_read_remaining(screenshot, match):
         return 1
@@ -99,10 +99,10 @@ async def test_weekly_shop_dismiss_popups_skip_click_when_no_reward(monkeypatch)
 
     executor._capture = fake_capture
 
-    def fake_match_template(screenshot, template_path):
+    def fake_match_template(screenshot, template_path, **_kwargs):
         return None
 
-    monkeypatch.setattr("app.modules.executor.weekly_shop.match_template", fake_match_template)
+    monkeypatch.setattr("app.modules.vision.context.match_template", fake_match_template)
 
     tap_calls = {"count": 0}
 
@@ -1,9 +1,11 @@
+from datetime import datetime
 from types import SimpleNamespace
 
 import pytest
 
 from app.core.constants import TaskType
 from app.modules.emu.async_adapter import AsyncEmulatorAdapter
+from app.modules.emu.frame_ring import FrameRing
 from app.modules.executor.types import TaskIntent
 import app.modules.executor.worker as worker_module
 from app.modules.executor.worker import WorkerActor
@@ -178,3 +180,33 @@ async def test_execute_batch_tasks_force_stop_on_abort_exceptions(
     assert force_stop_calls["count"] == 1
     assert (delay_calls["count"] == 1) is delay_called
     assert (mark_calls["count"] == 1) is mark_called
+
+
+@pytest.mark.asyncio
+async def test_fail_screenshot_ignores_frames_from_before_the_intent(monkeypatch):
+    worker = _build_worker()
+    worker.syscfg.save_fail_screenshot = True
+    written = []
+    monkeypatch.setattr(
+        worker_module, "write_frames_async", lambda records, path, **kw: written.append(records)
+    )
+
+    ring = FrameRing(size=4)
+    ring.push(b"previous-account")
+
+    class _Adapter:
+        cfg = SimpleNamespace(adb_addr="127.0.0.1:16384")
+        frame_ring = ring
+
+        def capture_ndarray(self, method):
+            ring.push(b"fresh")
+
+    # 启动 / 登录阶段失败：本任务没有截过图，缓冲里只有上一个账号的帧
+    intent = TaskIntent(account_id=2, task_type=TaskType.COOP, started_at=datetime.utcnow())
+    await worker._save_fail_screenshot(intent, _Adapter(), reason="launch")
+    assert [r.image for r in written[-1]] == [b"fresh"]
+
+    # 本任务期间已有截图时直接使用，不再额外截图
+    ring.push(b"during-task")
+    await worker._save_fail_screenshot(intent, _Adapter(), reason="task_failed")
+    assert [r.image for r in written[-1]] == [b"fresh", b"during-task"]
@@ -0,0 +1,49 @@
+from app.modules.ui.graph import Action, Edge, EdgeCostModel, UIGraph
+
+
+def _edge(src, dst, sleep_ms):
+    return Edge(src=src, dst=dst, actions=[Action("tap", (1, 1)), Action("sleep", (sleep_ms,))])
+
+
+def _graph():
+    graph = UIGraph(cost_model=EdgeCostModel())
+    # A -> C 直达但慢；A -> B -> C 两跳但更快
+    graph.add_edge(_edge("A", "C", 3000))
+    graph.add_edge(_edge("A", "B", 800))
+    graph.add_edge(_edge("B", "C", 800))
+    return graph
+
+
+def _hops(path):
+    return [e.dst for e in path]
+
+
+def test_find_path_prefers_expected_time_over_hops():
+    graph = _graph()
+    assert _hops(graph.find_path("A", "C")) == ["B", "C"]
+    # max_steps 限制下回退最少跳数
+    assert _hops(graph.find_path("A", "C", max_steps=0)) == ["C"]
+    assert graph.find_path("C", "A") is None
+
+
+def test_learned_failures_reroute_and_add_edge_invalidates():
+    graph = _graph()
+    slow_hop = graph.find_path("A", "C")[0]
+    for _ in range(6):
+        graph.record_edge(slow_hop, 1200, success=False)
+    assert _hops(graph.find_path("A", "C")) == ["C"]
+
+    graph.add_edge(_edge("A", "C", 10))
+    path = graph.find_path("A", "C")
+    assert _hops(path) == ["C"] and path[0].actions[1].args == (10,)
+
+
+def test_stats_shared_across_graph_instances():
+    model = EdgeCostModel()
+    first = UIGraph(cost_model=model)
+    first.add_edge(_edge("A", "B", 800))
+    first.record_edge(first.edges_from("A")[0], 2000, success=True)
+    second = UIGraph(cost_model=model)
+    second.add_edge(_edge("A", "B", 800))
+    assert model.cost(second.edges_from("A")[0]) > 1250
+    assert model.snapshot()[0]["samples"] == 1
@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+
+from app.modules.ui.detector import UIDetector
+from app.modules.ui.graph import Action, Edge, UIGraph
+from app.modules.ui.registry import TemplateDef, UIDef, UIRegistry
+from app.modules.ui.tracker import ScreenTracker, replay_session
+
+_SCREENS = ["A", "B", "C", "D", "E", "F", "G", "H"]
+
+
+def _build(tmp_path):
+    rng = np.random.default_rng(7)
+    registry = UIRegistry()
+    patches = {}
+    for i, ui in enumerate(_SCREENS):
+        patch = rng.integers(0, 255, (24, 24, 3), dtype=np.uint8)
+        path = tmp_path / f"{ui.lower()}_tag.png"
+        cv2.imwrite(str(path), patch)
+        patches[ui] = (patch, (10 + 30 * i, 10))
+        registry.register(
+            UIDef(id=ui, tag=f"{ui.lower()}_tag",
+                  templates=[TemplateDef(name=f"{ui.lower()}_tag", path=str(path))])
+        )
+    return registry, patches
+
+
+def _frame(patches, ui):
+    frame = np.zeros((60, 260, 3), dtype=np.uint8)
+    patch, (x, y) = patches[ui]
+    frame[y:y + 24, x:x + 24] = patch
+    return frame
+
+
+def test_tracker_learns_transitions():
+    tracker = ScreenTracker(top_k=2)
+    for ui in ["A", "B", "A", "B", "A", "UNKNOWN", "B", "A", "B"]:
+        tracker.observe(ui)
+    assert tracker.last == "B"
+    assert tracker.predict() == ["A", "B"]
+    assert tracker.predict(1, neighbors=["C"]) == ["A"]
+
+
+def test_replay_evaluates_fewer_templates_with_same_results(tmp_path):
+    registry, patches = _build(tmp_path)
+    graph = UIGraph()
+    for src in _SCREENS:
+        for dst in _SCREENS:
+            if src != dst:
+                graph.add_edge(Edge(src=src, dst=dst, actions=[Action("sleep", (800,))]))
+    # 反复在 G/H 之间往返（注册表末尾的界面）
+    session = ["G", "G", "H", "H", "G", "H", "G", "G", "H", "G"] * 3
+    frames = [_frame(patches, ui) for ui in session]
+
+    result = replay_session(UIDetector(registry), frames, graph=graph, top_k=2)
+    assert result["frames"] == len(session)
+    assert result["mismatches"] == 0
+    assert result["avg_templates_staged"] < result["avg_templates_baseline"]
+    assert result["tracker"]["predicted_hits"] >= len(session) - 4
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from app.core.thread_pool import shutdown_pools
+from app.modules.vision import loop_guard
+from app.modules.vision.context import VisionContext
+from app.modules.vision.loop_guard import VisionOnLoopError
+from app.modules.vision.template import match_template
+
+
+@pytest.fixture(autouse=True)
+def _reset_pools():
+    shutdown_pools()
+    yield
+    shutdown_pools()
+
+
+def _frame_with_patch():
+    rng = np.random.default_rng(7)
+    frame = np.zeros((120, 160), dtype=np.uint8)
+    patch = rng.integers(0, 255, (20, 24), dtype=np.uint8)
+    frame[40:60, 70:94] = patch
+    return frame, patch
+
+
+@pytest.mark.asyncio
+async def test_loop_guard_raise_blocks_sync_match_on_loop(monkeypatch):
+    monkeypatch.setattr(loop_guard.settings, "vision_loop_guard", "raise")
+    frame, patch = _frame_with_patch()
+
+    with pytest.raises(VisionOnLoopError):
+        match_template(frame, patch)
+
+
+def test_loop_guard_allows_sync_match_off_loop(monkeypatch):
+    monkeypatch.setattr(loop_guard.settings, "vision_loop_guard", "raise")
+    frame, patch = _frame_with_patch()
+
+    m = match_template(frame, patch, threshold=0.9)
+
+    assert m is not None
+    assert (m.x, m.y) == (70, 40)
+
+
+@pytest.mark.asyncio
+async def test_vision_context_runs_off_loop_under_raise_guard(monkeypatch):
+    monkeypatch.setattr(loop_guard.settings, "vision_loop_guard", "raise")
+    frame, patch = _frame_with_patch()
+    vision = VisionContext("127.0.0.1:16384")
+
+    m = await vision.match_template(frame, patch, threshold=0.9)
+    assert m is not None
+    assert (m.x, m.y) == (70, 40)
+
+    hits = await vision.find_all_templates(frame, patch, threshold=0.9)
+    assert len(hits) == 1
+
+
+@pytest.mark.asyncio
+async def test_vision_context_match_first_returns_first_hit(monkeypatch):
+    monkeypatch.setattr(loop_guard.settings, "vision_loop_guard", "raise")
+    frame, patch = _frame_with_patch()
+    missing = np.full((20, 24), 255, dtype=np.uint8)
+    missing[::2, ::2] = 0
+    vision = VisionContext()
+
+    hit = await vision.match_first(frame, [missing, patch], threshold=0.9)
+    assert hit is not None
+    tpl, m = hit
+    assert tpl is patch
+    assert (m.x, m.y) == (70, 40)
+
+    assert await vision.match_first(frame, [missing], threshold=0.9) is None
@@ -0,0 +1,74 @@
+import numpy as np
+
+from app.modules.vision.frame_cache import compute_frame_signature, dhash_from_signature
+from app.modules.vision.frame_index import FrameHashIndex, hamming64
+
+
+def _frame(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, (9, 16), dtype=np.uint8)
+    return np.kron(small, np.ones((60, 60), dtype=np.uint8))
+
+
+def _hash(frame):
+    sig = compute_frame_signature(frame)
+    return dhash_from_signature(sig), sig
+
+
+def test_dhash_is_stable_under_small_noise():
+    frame = _frame(1)
+    noisy = np.clip(frame.astype(np.int16) + 2, 0, 255).astype(np.uint8)
+
+    lhs, _ = _hash(frame)
+    rhs, _ = _hash(noisy)
+    other, _ = _hash(_frame(2))
+
+    assert hamming64(lhs, rhs) <= 3
+    assert hamming64(lhs, other) > 3
+
+
+def test_index_returns_near_frame_and_respects_key():
+    index = FrameHashIndex(max_entries=16, max_distance=3)
+    frame = _frame(1)
+    dhash, sig = _hash(frame)
+    index.put(("hints", True), dhash, "result-a", fp=1, signature=sig, now=0.0)
+
+    noisy_hash, noisy_sig = _hash(np.clip(frame.astype(np.int16) + 2, 0, 255).astype(np.uint8))
+    assert (
+        index.lookup(("hints", True), noisy_hash, signature=noisy_sig, ttl_ms=1000, now=0.5)
+        == "result-a"
+    )
+    assert index.lookup(("hints", False), noisy_hash, ttl_ms=1000, now=0.5) is None
+    other_hash, other_sig = _hash(_frame(2))
+    assert (
+        index.lookup(("hints", True), other_hash, signature=other_sig, ttl_ms=1000, now=0.5)
+        is None
+    )
+
+
+def test_index_ttl_and_capacity_eviction():
+    hashes = [0, 0xFFFF, 0xFFFF << 16, 0xFFFF << 32]
+    index = FrameHashIndex(max_entries=3, max_distance=2)
+    for i, h in enumerate(hashes):
+        index.put("k", h, i, fp=i, now=float(i))
+
+    assert len(index) == 3
+    assert index.lookup("k", hashes[0], fp=0, ttl_ms=10_000, now=4.0) is None
+    assert index.lookup("k", hashes[3], fp=3, ttl_ms=10_000, now=4.0) == 3
+
+    # ttl=1500ms: 只保留 ts >= 2.5 的条目
+    assert index.lookup("k", hashes[1], ttl_ms=1500, now=4.0) is None
+    assert len(index) == 1
+    assert index.stats()["evictions"] == 3
+
+
+def test_index_scales_to_thousands_of_entries():
+    rng = np.random.default_rng(0)
+    hashes = [int(h) for h in rng.integers(0, 2**63, 5000, dtype=np.int64)]
+    index = FrameHashIndex(max_entries=8192, max_distance=3)
+    for i, h in enumerate(hashes):
+        index.put("k", h, i, now=0.0)
+
+    for i in (0, 1234, 4999):
+        flipped = hashes[i] ^ (1 << 5) ^ (1 << 33)
+        assert index.lookup("k", flipped, ttl_ms=1000, now=0.1) == i
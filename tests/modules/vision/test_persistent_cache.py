@@ -0,0 +1,78 @@
+import numpy as np
+
+from app.modules.vision.frame_cache import (
+    compute_frame_signature,
+    dhash_from_signature,
+    fingerprint_from_signature,
+)
+from app.modules.vision.persistent_cache import (
+    KIND_POPUP,
+    KIND_UI,
+    PersistentDetectCache,
+    compute_template_set_hash,
+)
+
+
+def _write_png(path, value):
+    import cv2
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(str(path), np.full((8, 8), value, dtype=np.uint8))
+
+
+def _frame_keys(seed):
+    rng = np.random.default_rng(seed)
+    frame = np.kron(
+        rng.integers(0, 255, (9, 16), dtype=np.uint8), np.ones((60, 60), dtype=np.uint8)
+    )
+    sig = compute_frame_signature(frame)
+    return dhash_from_signature(sig), fingerprint_from_signature(sig), sig
+
+
+def test_results_survive_restart_and_template_edit_invalidates(tmp_path):
+    templates = tmp_path / "templates"
+    _write_png(templates / "ui" / "tag_a.png", 10)
+    db_path = str(tmp_path / "cache" / "detect.db")
+    dhash, fp, sig = _frame_keys(1)
+    key = (("TINGYUAN",), True)
+
+    store = PersistentDetectCache(db_path, template_dir=str(templates))
+    store.load()
+    store.put(
+        KIND_UI, key, dhash,
+        {"ui": "TINGYUAN", "score": 0.97, "debug": {"anchors": {"a": {"x": 1, "y": 2}}}},
+        fp=fp, signature=sig,
+    )
+    store.put(KIND_UI, key, dhash ^ 0xFF, {"ui": "UNKNOWN", "score": 0.1}, fp=fp + 1, signature=sig)
+    store.put(KIND_POPUP, "no_popup", dhash, True, fp=fp, signature=sig)
+    store.flush()
+
+    restarted = PersistentDetectCache(db_path, template_dir=str(templates))
+    restarted.load()
+    cached = restarted.lookup(KIND_UI, key, dhash, fp=fp, signature=sig, similarity=0.8)
+    assert cached["ui"] == "TINGYUAN"
+    assert cached["debug"]["anchors"]["a"] == {"x": 1, "y": 2}
+    assert restarted.lookup(KIND_POPUP, "no_popup", dhash, fp=fp, signature=sig, similarity=0.8)
+    assert restarted.stats()["entries"] == 2
+    assert restarted.lookup(KIND_UI, ((), True), dhash, fp=fp, signature=sig, similarity=0.8) is None
+    restarted.flush()
+
+    version = restarted.version
+    _write_png(templates / "ui" / "tag_a.png", 20)
+    assert compute_template_set_hash(str(templates)) != version
+
+    edited = PersistentDetectCache(db_path, template_dir=str(templates))
+    edited.load()
+    assert edited.lookup(KIND_UI, key, dhash, fp=fp, signature=sig, similarity=0.8) is None
+    assert edited.stats()["entries"] == 0
+    edited.flush()
+
+
+def test_lookup_before_load_returns_none(tmp_path, monkeypatch):
+    store = PersistentDetectCache(str(tmp_path / "c.db"), template_dir=str(tmp_path))
+    monkeypatch.setattr(store, "ensure_loading", lambda: None)
+    dhash, fp, sig = _frame_keys(2)
+
+    assert store.lookup(KIND_POPUP, "no_popup", dhash, fp=fp, signature=sig, similarity=0.8) is None
+    store.put(KIND_POPUP, "no_popup", dhash, True, fp=fp, signature=sig)
+    assert store.stats()["entries"] == 0
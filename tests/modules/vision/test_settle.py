@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from app.modules.vision.settle import (
+    SETTLE_STABLE,
+    SETTLE_TARGET,
+    SETTLE_TIMEOUT,
+    wait_until_settled,
+)
+
+
+def _frame(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, (9, 16, 3), dtype=np.uint8)
+    return np.kron(small, np.ones((60, 60, 1), dtype=np.uint8))
+
+
+def _capture_seq(seeds):
+    frames = [_frame(s) for s in seeds]
+    state = {"i": 0}
+
+    async def capture():
+        i = min(state["i"], len(frames) - 1)
+        state["i"] += 1
+        return frames[i]
+
+    return capture, state
+
+
+@pytest.mark.asyncio
+async def test_returns_early_once_frames_stop_changing():
+    capture, state = _capture_seq([1, 1, 1, 1, 1])
+    result = await wait_until_settled(capture, max_wait=5.0, interval=0.001, stable_frames=2)
+    assert result.reason == SETTLE_STABLE
+    assert state["i"] == 3
+    assert result.waited < 1.0
+
+
+@pytest.mark.asyncio
+async def test_require_change_ignores_static_start():
+    # 点击尚未生效（1,1,1）→ 画面过渡（2,3）→ 稳定（4,4,4）
+    capture, state = _capture_seq([1, 1, 1, 2, 3, 4, 4, 4])
+    result = await wait_until_settled(
+        capture, max_wait=5.0, require_change=True, interval=0.001, stable_frames=2
+    )
+    assert result.reason == SETTLE_STABLE
+    assert state["i"] == 8
+    assert np.array_equal(result.frame, _frame(4))
+
+
+@pytest.mark.asyncio
+async def test_target_hit_returns_immediately():
+    capture, state = _capture_seq([1, 2, 3, 4])
+    target_frame = _frame(3)
+
+    async def target(image):
+        return np.array_equal(image, target_frame)
+
+    result = await wait_until_settled(
+        capture, max_wait=5.0, target=target, require_change=True, interval=0.001
+    )
+    assert result.reason == SETTLE_TARGET
+    assert state["i"] == 3
+
+
+@pytest.mark.asyncio
+async def test_times_out_at_upper_bound():
+    seeds = list(range(100, 1100))
+    capture, _ = _capture_seq(seeds)
+    result = await wait_until_settled(capture, max_wait=0.05, interval=0.005)
+    assert result.reason == SETTLE_TIMEOUT
+    assert 0.05 <= result.waited < 0.5
+
+
+@pytest.mark.asyncio
+async def test_capture_failures_fall_back_to_timeout():
+    async def capture():
+        raise RuntimeError("adb offline")
+
+    result = await wait_until_settled(capture, max_wait=0.03, interval=0.005)
+    assert result.reason == SETTLE_TIMEOUT
+    assert result.captures == 0
@@ -0,0 +1,99 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.modules.vision.state_classifier import (
+    PixelPredicate,
+    StateClassifier,
+    StateDef,
+    TemplatePredicate,
+)
+
+
+def _patch(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, (24, 32, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def templates(tmp_path):
+    paths = {}
+    for name, seed in (("popup", 1), ("bet", 2), ("next", 3), ("alt", 4)):
+        path = tmp_path / f"{name}.png"
+        cv2.imwrite(str(path), _patch(seed))
+        paths[name] = str(path)
+    return paths
+
+
+def _frame(**placed):
+    frame = np.zeros((200, 300, 3), dtype=np.uint8)
+    for (x, y), seed in placed.values():
+        frame[y : y + 24, x : x + 32] = _patch(seed)
+    return frame
+
+
+def _classifier(t):
+    return StateClassifier(
+        [
+            StateDef("POPUP", [TemplatePredicate(t["popup"])], priority=50),
+            StateDef("NEXT", [TemplatePredicate(t["next"]), TemplatePredicate(t["alt"])], priority=10),
+            StateDef("BET", [TemplatePredicate(t["bet"], roi=(150, 100, 150, 100))], priority=10),
+        ]
+    )
+
+
+def test_priority_wins_and_full_scores(templates):
+    clf = _classifier(templates)
+    frame = _frame(popup=((10, 10), 1), bet=((200, 150), 2))
+
+    result = clf.classify(frame)
+    assert result.state == "POPUP"
+    assert (result.match.x, result.match.y) == (10, 10)
+    assert list(result.scores) == ["POPUP"]
+
+    full = clf.evaluate(frame)
+    assert full.state == "POPUP"
+    assert set(full.scores) == {"POPUP", "NEXT", "BET"}
+    assert full.scores["BET"] > 0.99
+
+
+def test_roi_limits_search_and_offsets_match(templates):
+    clf = _classifier(templates)
+    # bet 在 ROI 外不命中
+    assert clf.classify(_frame(bet=((10, 10), 2))).state is None
+    result = clf.classify(_frame(bet=((200, 150), 2)))
+    assert result.state == "BET"
+    assert (result.match.x, result.match.y) == (200, 150)
+
+
+def test_same_tier_reorders_by_hits(templates):
+    clf = _classifier(templates)
+    frame = _frame(bet=((200, 150), 2))
+    assert clf.stats()["order"] == ["POPUP", "NEXT", "BET"]
+    for _ in range(3):
+        clf.classify(frame)
+    assert clf.stats()["order"] == ["POPUP", "BET", "NEXT"]
+    # 自调整后同层命中的 BET 先于 NEXT 评估：只匹配 POPUP + BET 两个模板
+    assert clf.classify(frame).templates_evaluated == 2
+    assert clf.stats()["hits"]["BET"] == 4
+
+
+def test_pixel_predicate_and_all_mode(templates):
+    clf = StateClassifier(
+        [
+            StateDef(
+                "RED_NEXT",
+                [TemplatePredicate(templates["next"]), PixelPredicate(5, 5, (255, 0, 0), tolerance=10)],
+                mode="all",
+            )
+        ]
+    )
+    frame = _frame(next=((100, 100), 3))
+    assert clf.classify(frame).state is None
+    frame[5, 5] = (0, 0, 250)  # BGR
+    assert clf.classify(frame).state == "RED_NEXT"
+
+
+def test_duplicate_state_names_rejected(templates):
+    with pytest.raises(ValueError):
+        StateClassifier([StateDef("A", []), StateDef("A", [])])
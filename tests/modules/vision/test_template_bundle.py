@@ -0,0 +1,125 @@
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+from app.modules.vision.template import _GRAY_TEMPLATE_CACHE, match_template
+from app.modules.vision.template_bundle import (
+    TemplateBundle,
+    build_bundle,
+    get_template_bundle,
+    glob_templates,
+    reset_template_bundle,
+)
+from app.modules.vision.utils import load_image
+
+
+def _write_png(path, seed, shape=(12, 20, 3)):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    cv2.imwrite(str(path), rng.integers(0, 255, shape, dtype=np.uint8))
+
+
+def _make_assets(root):
+    _write_png(root / "ui" / "templates" / "tansuo_1.png", 1)
+    _write_png(root / "ui" / "templates" / "tansuo_2.png", 2)
+    _write_png(root / "ui" / "templates" / "liao_1.png", 3)
+    _write_png(root / "ui" / "templates" / "sub" / "tansuo_9.png", 4)
+    return root / "ui"
+
+
+def test_bundle_round_trip_matches_imread(tmp_path):
+    src = _make_assets(tmp_path / "assets")
+    out = tmp_path / "bundle.bin"
+    build_bundle(str(src), str(out))
+
+    bundle = TemplateBundle.open(str(out))
+    assert len(bundle) == 4
+    for png in sorted(src.rglob("*.png")):
+        expected = cv2.imread(str(png), cv2.IMREAD_COLOR)
+        key = png.as_posix()
+        assert key in bundle
+        assert np.array_equal(bundle.bgr(key), expected)
+        assert np.array_equal(
+            bundle.gray(key), cv2.cvtColor(expected, cv2.COLOR_BGR2GRAY)
+        )
+        assert not bundle.gray(key).flags.writeable
+
+    templates_dir = (src / "templates").as_posix()
+    assert bundle.glob(templates_dir, "tansuo_*.png") == [
+        f"{templates_dir}/tansuo_1.png",
+        f"{templates_dir}/tansuo_2.png",
+    ]
+    # 路径写法差异（反斜杠）仍可命中
+    assert bundle.bgr(f"{templates_dir}/liao_1.png".replace("/", "\\")) is not None
+
+
+def test_runtime_uses_bundle_and_rejects_stale(tmp_path, monkeypatch):
+    src = _make_assets(tmp_path / "assets")
+    out = tmp_path / "bundle.bin"
+    build_bundle(str(src), str(out))
+    monkeypatch.setattr(settings, "vision_template_bundle_enabled", True)
+    monkeypatch.setattr(settings, "vision_template_bundle_path", str(out))
+    reset_template_bundle()
+    try:
+        bundle = get_template_bundle()
+        assert bundle is not None
+        tpl_path = (src / "templates" / "tansuo_2.png").as_posix()
+        assert isinstance(load_image(tpl_path), np.memmap)
+
+        image = np.zeros((60, 80, 3), dtype=np.uint8)
+        image[20:32, 30:50] = cv2.imread(tpl_path, cv2.IMREAD_COLOR)
+        _GRAY_TEMPLATE_CACHE.pop(tpl_path, None)
+        match = match_template(image, tpl_path, threshold=0.95)
+        assert match is not None and (match.x, match.y) == (30, 20)
+        assert isinstance(_GRAY_TEMPLATE_CACHE.pop(tpl_path), np.memmap)
+
+        # 修改源 PNG 后资源包过期，回退到文件系统
+        _write_png(src / "templates" / "tansuo_3.png", 5)
+        reset_template_bundle()
+        assert get_template_bundle() is None
+        assert len(glob_templates((src / "templates").as_posix(), "tansuo_*.png")) == 3
+    finally:
+        reset_template_bundle()
+
+
+def test_freshness_check_stats_and_hashes_only_touched_pngs(tmp_path, monkeypatch):
+    src = _make_assets(tmp_path / "assets")
+    out = tmp_path / "bundle.bin"
+    build_bundle(str(src), str(out))
+    monkeypatch.setattr(settings, "vision_template_bundle_enabled", True)
+    monkeypatch.setattr(settings, "vision_template_bundle_path", str(out))
+
+    reads = []
+    read_bytes = Path.read_bytes
+
+    def _tracking_read(self):
+        reads.append(self.name)
+        return read_bytes(self)
+
+    monkeypatch.setattr(Path, "read_bytes", _tracking_read)
+    reset_template_bundle()
+    try:
+        # 未改动：只 stat，不读取 PNG
+        assert get_template_bundle() is not None
+        assert reads == []
+
+        # 复制 / 解压 / 重新 checkout 只改变 mtime：只重新哈希该文件，包仍可用
+        png = src / "templates" / "liao_1.png"
+        st = png.stat()
+        os.utime(png, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        reset_template_bundle()
+        assert get_template_bundle() is not None
+        assert reads == ["liao_1.png"]
+
+        # 原地改写（大小不变、内容不同）判定过期
+        data = bytearray(read_bytes(png))
+        data[-20] ^= 0xFF
+        png.write_bytes(bytes(data))
+        assert png.stat().st_size == st.st_size
+        reset_template_bundle()
+        assert get_template_bundle() is None
+    finally:
+        reset_template_bundle()
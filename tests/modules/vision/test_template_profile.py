@@ -0,0 +1,132 @@
+import json
+
+import cv2
+import numpy as np
+
+from app.modules.vision import template as template_mod
+from app.modules.vision.state_classifier import StateClassifier, StateDef, TemplatePredicate
+from app.modules.vision.template import find_all_templates, match_template
+from app.modules.vision.template_profile import TemplateProfiler, _main, build_report
+
+
+def _write_png(path, image):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(str(path), image)
+
+
+def _frame(seed=0, shape=(270, 480, 3)):
+    return np.random.default_rng(seed).integers(0, 255, shape, dtype=np.uint8)
+
+
+def test_match_template_records_calls_hits_and_roi(tmp_path, monkeypatch):
+    frame = _frame()
+    src = tmp_path / "ui"
+    hit_path = src / "hit.png"
+    miss_path = src / "miss.png"
+    _write_png(hit_path, frame[20:40, 30:60])
+    _write_png(miss_path, _frame(seed=7, shape=(20, 30, 3)))
+    _write_png(src / "never_called.png", _frame(seed=8, shape=(10, 10, 3)))
+
+    profiler = TemplateProfiler(enabled=True)
+    monkeypatch.setattr(template_mod, "template_profiler", profiler)
+    for _ in range(25):
+        assert match_template(frame, str(hit_path)) is not None
+        assert match_template(frame, str(miss_path)) is None
+    assert find_all_templates(frame, str(hit_path))
+    match_template(frame, frame[0:5, 0:5])  # ndarray 模板不计入
+
+    report = build_report(profiler.snapshot(), top=5, source_dir=str(src))
+    rows = {r["template"]: r for r in report["expensive"]}
+    hit_key, miss_key = hit_path.as_posix(), miss_path.as_posix()
+    assert set(rows) == {hit_key, miss_key}
+    assert rows[hit_key]["calls"] == 26 and rows[hit_key]["hits"] == 26
+    assert rows[hit_key]["score_bins"][-1] == 26
+    assert rows[miss_key]["hits"] == 0
+    assert [r["template"] for r in report["never_matched"]] == [miss_key]
+    assert report["unused"] == [(src / "never_called.png").as_posix()]
+
+    (candidate,) = report["roi_candidates"]
+    assert candidate["template"] == hit_key
+    assert candidate["roi"] == [14, 4, 62, 52]
+    assert candidate["area_ratio"] < 0.05
+
+
+def test_disabled_profiler_records_nothing_and_cli_reads_snapshot(tmp_path, monkeypatch, capsys):
+    frame = _frame()
+    path = tmp_path / "ui" / "a.png"
+    _write_png(path, frame[100:120, 200:240])
+
+    disabled = TemplateProfiler(enabled=False)
+    monkeypatch.setattr(template_mod, "template_profiler", disabled)
+    match_template(frame, str(path))
+    assert disabled.snapshot()["templates"] == {}
+
+    profiler = TemplateProfiler(enabled=True)
+    monkeypatch.setattr(template_mod, "template_profiler", profiler)
+    match_template(frame, str(path))
+    out = profiler.save(str(tmp_path / "profile.json"))
+    assert json.loads(open(out, encoding="utf-8").read())["templates"][path.as_posix()]["calls"] == 1
+
+    assert _main(["report", "--file", out, "--src", str(tmp_path / "ui"), "--json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["total_calls"] == 1 and report["unused"] == []
+    assert report["roi_candidates"] == []  # 样本不足不给建议
+
+
+def test_roi_crops_use_frame_coordinates_and_are_not_roi_candidates(tmp_path, monkeypatch):
+    frame = _frame()
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    path = tmp_path / "ui" / "cropped.png"
+    _write_png(path, frame[120:140, 300:330])
+
+    profiler = TemplateProfiler(enabled=True)
+    monkeypatch.setattr(template_mod, "template_profiler", profiler)
+    for _ in range(25):
+        # 与 UIDetector 相同：先按 ROI 切片再匹配
+        assert match_template(gray[100:200, 250:400], str(path)) is not None
+
+    assert template_mod._crop_origin(gray[100:200, 250:400]) == ((270, 480), (250, 100, 150, 100))
+    assert template_mod._crop_origin(gray) == ((270, 480), None)
+    stats = profiler.snapshot()["templates"][path.as_posix()]
+    assert stats["calls"] == 25 and stats["hits"] == 25
+    assert stats["roi_calls"] == 25 and stats["hit_box"] is None
+    assert build_report(profiler.snapshot(), source_dir=None)["roi_candidates"] == []
+
+
+def test_state_classifier_matches_are_profiled(tmp_path, monkeypatch):
+    frame = _frame()
+    full = tmp_path / "ui" / "state_full.png"
+    in_roi = tmp_path / "ui" / "state_roi.png"
+    _write_png(full, frame[50:70, 60:90])
+    _write_png(in_roi, frame[200:220, 400:430])
+
+    profiler = TemplateProfiler(enabled=True)
+    monkeypatch.setattr(template_mod, "template_profiler", profiler)
+    classifier = StateClassifier(
+        [
+            StateDef("A", [TemplatePredicate(str(full))], priority=10),
+            StateDef("B", [TemplatePredicate(str(in_roi), roi=(380, 180, 80, 60))]),
+        ]
+    )
+    assert classifier.classify(frame, full=True).state == "A"
+
+    templates = profiler.snapshot()["templates"]
+    assert templates[full.as_posix()]["hits"] == 1
+    assert templates[full.as_posix()]["hit_box"] == [60, 50, 90, 70]
+    assert templates[in_roi.as_posix()]["roi_calls"] == 1
+    assert templates[in_roi.as_posix()]["hits"] == 1
+
+
+def test_disabled_profiler_skips_crop_inference(tmp_path, monkeypatch):
+    frame = _frame()
+    path = tmp_path / "ui" / "skip.png"
+    _write_png(path, frame[10:30, 10:40])
+
+    def _fail(_arr):
+        raise AssertionError("画像关闭时不应推断 ROI")
+
+    monkeypatch.setattr(template_mod, "template_profiler", TemplateProfiler(enabled=False))
+    monkeypatch.setattr(template_mod, "_crop_origin", _fail)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    assert match_template(gray[0:100, 0:200], str(path)) is not None
+    assert find_all_templates(gray[0:100, 0:200], str(path))
@@ -0,0 +1,22 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.modules.web.routers import metrics as metrics_router
+
+
+def test_metrics_endpoint_disabled_by_default(monkeypatch):
+    assert type(settings).model_fields["metrics_endpoint_enabled"].default is False
+    monkeypatch.setattr(settings, "metrics_endpoint_enabled", False)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(metrics_router.get_metrics())
+    assert exc.value.status_code == 404
+
+
+def test_metrics_endpoint_renders_text_when_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_endpoint_enabled", True)
+    resp = asyncio.run(metrics_router.get_metrics())
+    assert resp.media_type.startswith("text/plain; version=0.0.4")
+    assert b"# TYPE oas_executor_queue_depth gauge" in resp.body